@@ -0,0 +1,65 @@
+"""add delta encoding columns to cold_snapshots
+
+Revision ID: 7c1f4d2a9b3e
+Revises: 002a45fbfe51
+Create Date: 2026-10-16
+
+Snapshots are now stored as a full keyframe every N snapshots with per-section
+deltas in between.  A delta row points at its keyframe via base_snapshot_id and
+only carries content for sections whose version changed since that keyframe.
+Existing rows have base_snapshot_id = NULL and are therefore keyframes, so no
+data migration is needed.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1f4d2a9b3e"
+down_revision: str | Sequence[str] | None = "002a45fbfe51"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add base_snapshot_id / section_versions to cold_snapshots."""
+    op.add_column(
+        "cold_snapshots",
+        sa.Column("base_snapshot_id", postgresql.UUID(as_uuid=True), nullable=True),
+    )
+    op.add_column(
+        "cold_snapshots",
+        sa.Column("section_versions", sa.JSON(), nullable=True),
+    )
+    op.create_foreign_key(
+        "cold_snapshots_base_snapshot_id_fkey",
+        "cold_snapshots",
+        "cold_snapshots",
+        ["base_snapshot_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index(
+        "ix_cold_snapshots_base_snapshot_id", "cold_snapshots", ["base_snapshot_id"]
+    )
+
+
+def downgrade() -> None:
+    """Drop delta encoding columns.
+
+    NOTE: delta rows cannot be read without their keyframe logic, so they are
+    deleted before the columns are dropped.
+    """
+    op.execute("DELETE FROM cold_snapshots WHERE base_snapshot_id IS NOT NULL")
+    op.drop_index("ix_cold_snapshots_base_snapshot_id", table_name="cold_snapshots")
+    op.drop_constraint(
+        "cold_snapshots_base_snapshot_id_fkey",
+        "cold_snapshots",
+        type_="foreignkey",
+    )
+    op.drop_column("cold_snapshots", "section_versions")
+    op.drop_column("cold_snapshots", "base_snapshot_id")
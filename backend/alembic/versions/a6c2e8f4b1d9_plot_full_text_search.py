@@ -0,0 +1,79 @@
+"""add full-text search columns and indexes to plots
+
+Revision ID: a6c2e8f4b1d9
+Revises: f3b7c9e1a4d8
+Create Date: 2026-10-16
+
+Plot search used ILIKE '%q%' on title / description, which cannot use a btree
+index and scanned every plot.  This adds:
+
+- plots.section_text: plain text extracted from all sections' Tiptap JSON,
+  refreshed by the snapshot batch for dirty plots
+- plots.search_vector: a generated tsvector over title (A), description and
+  tags (B) and section_text (C) with a GIN index, for ts_rank-ordered search
+- plots.search_text: a generated concatenation of the same fields with a
+  pg_trgm GIN index.  The 'simple' text search parser does not segment
+  Japanese, so substring matches go through this trigram index instead
+
+Both generated columns are PostgreSQL-only and are not mapped on the model.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a6c2e8f4b1d9"
+down_revision: str | Sequence[str] | None = "f3b7c9e1a4d8"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add section_text, search_vector, search_text and their GIN indexes."""
+    op.add_column("plots", sa.Column("section_text", sa.Text(), nullable=True))
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        """
+        ALTER TABLE plots ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A')
+            || setweight(
+                to_tsvector(
+                    'simple'::regconfig,
+                    coalesce(description, '') || ' ' || coalesce(tags::text, '')
+                ),
+                'B'
+            )
+            || setweight(
+                to_tsvector('simple'::regconfig, coalesce(section_text, '')), 'C'
+            )
+        ) STORED
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE plots ADD COLUMN search_text text
+        GENERATED ALWAYS AS (
+            coalesce(title, '') || ' ' || coalesce(description, '') || ' '
+            || coalesce(tags::text, '') || ' ' || coalesce(section_text, '')
+        ) STORED
+        """
+    )
+    op.execute("CREATE INDEX ix_plots_search_vector ON plots USING gin (search_vector)")
+    op.execute(
+        "CREATE INDEX ix_plots_search_text_trgm ON plots "
+        "USING gin (search_text gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    """Drop the search indexes and columns (pg_trgm is left installed)."""
+    op.drop_index("ix_plots_search_text_trgm", table_name="plots")
+    op.drop_index("ix_plots_search_vector", table_name="plots")
+    op.drop_column("plots", "search_text")
+    op.drop_column("plots", "search_vector")
+    op.drop_column("plots", "section_text")
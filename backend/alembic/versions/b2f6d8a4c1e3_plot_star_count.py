@@ -0,0 +1,46 @@
+"""add denormalized plots.star_count
+
+Revision ID: b2f6d8a4c1e3
+Revises: e5a9c3d7f2b6
+Create Date: 2026-10-16
+
+Star counts were computed with COUNT(stars.id) on every read (detail, lists,
+search) and GROUP BY over all plots for the popular ranking.  star_count is
+now maintained by star_service.add_star / remove_star in the same transaction
+and corrected by a daily reconciliation job.  Existing rows are backfilled
+from the stars table here; ix_plots_star_count serves the popular ranking.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b2f6d8a4c1e3"
+down_revision: str | Sequence[str] | None = "e5a9c3d7f2b6"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add plots.star_count, backfill it and index it."""
+    op.add_column(
+        "plots",
+        sa.Column("star_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE plots SET star_count = counts.n
+        FROM (SELECT plot_id, count(*) AS n FROM stars GROUP BY plot_id) AS counts
+        WHERE counts.plot_id = plots.id
+        """
+    )
+    op.create_index("ix_plots_star_count", "plots", ["star_count"])
+
+
+def downgrade() -> None:
+    """Drop plots.star_count."""
+    op.drop_index("ix_plots_star_count", table_name="plots")
+    op.drop_column("plots", "star_count")
@@ -0,0 +1,89 @@
+"""add content-addressed section blob store
+
+Revision ID: b4e8a1c6d2f7
+Revises: 7c1f4d2a9b3e
+Create Date: 2026-10-16
+
+Section Tiptap JSON is stored once in section_blobs keyed by the sha256 of its
+canonical JSON (zlib-compressed).  Snapshots reference blobs by hash and record
+those references in snapshot_blob_refs so unreferenced blobs can be collected
+set-based.  Forked / rolled back sections point at a shared blob through
+sections.content_hash until their first edit.  Existing rows keep their inline
+content, so no data migration is needed.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e8a1c6d2f7"
+down_revision: str | Sequence[str] | None = "7c1f4d2a9b3e"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create section_blobs / snapshot_blob_refs and sections.content_hash."""
+    op.create_table(
+        "section_blobs",
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    op.create_table(
+        "snapshot_blob_refs",
+        sa.Column("snapshot_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("blob_hash", sa.String(length=64), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["snapshot_id"], ["cold_snapshots.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["blob_hash"], ["section_blobs.hash"]),
+        sa.PrimaryKeyConstraint("snapshot_id", "blob_hash"),
+    )
+    op.create_index(
+        "ix_snapshot_blob_refs_blob_hash", "snapshot_blob_refs", ["blob_hash"]
+    )
+    op.add_column(
+        "sections",
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+    )
+    op.create_foreign_key(
+        "sections_content_hash_fkey",
+        "sections",
+        "section_blobs",
+        ["content_hash"],
+        ["hash"],
+    )
+    op.create_index("ix_sections_content_hash", "sections", ["content_hash"])
+
+
+def downgrade() -> None:
+    """Drop the blob store.
+
+    NOTE: blob content is zlib-compressed and cannot be inlined back from SQL,
+    so this downgrade refuses to run while any section still points at a blob.
+    Blob-backed snapshot entries become unreadable after downgrading.
+    """
+    op.execute(
+        "DO $$ BEGIN "
+        "IF EXISTS (SELECT 1 FROM sections WHERE content_hash IS NOT NULL) THEN "
+        "RAISE EXCEPTION 'sections still reference section_blobs'; "
+        "END IF; END $$"
+    )
+    op.drop_index("ix_sections_content_hash", table_name="sections")
+    op.drop_constraint("sections_content_hash_fkey", "sections", type_="foreignkey")
+    op.drop_column("sections", "content_hash")
+    op.drop_index("ix_snapshot_blob_refs_blob_hash", table_name="snapshot_blob_refs")
+    op.drop_table("snapshot_blob_refs")
+    op.drop_table("section_blobs")
@@ -0,0 +1,80 @@
+"""add section_search_text for section body search
+
+Revision ID: c8d4f2a7e915
+Revises: a6c2e8f4b1d9
+Create Date: 2026-10-16
+
+Section content is Tiptap JSON, which cannot be searched without walking the
+JSON at query time.  section_search_text keeps the extracted plain text per
+section, written in the same transaction as section edits.  Existing sections
+have no row yet; the search backfill job (search_service) fills them in
+batches, so no data migration is done here.
+
+PostgreSQL-only additions (not mapped on the model):
+- body_vector: generated tsvector over title (A) and body (B) with a GIN index
+- pg_trgm GIN indexes on title and body for substring / Japanese matches
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c8d4f2a7e915"
+down_revision: str | Sequence[str] | None = "a6c2e8f4b1d9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create section_search_text with its tsvector and trigram indexes."""
+    op.create_table(
+        "section_search_text",
+        sa.Column("section_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("plot_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("section_version", sa.Integer(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["section_id"], ["sections.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["plot_id"], ["plots.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("section_id"),
+    )
+    op.create_index(
+        "ix_section_search_text_plot_id", "section_search_text", ["plot_id"]
+    )
+
+    op.execute(
+        """
+        ALTER TABLE section_search_text ADD COLUMN body_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple'::regconfig, title), 'A')
+            || setweight(to_tsvector('simple'::regconfig, body), 'B')
+        ) STORED
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_section_search_text_body_vector "
+        "ON section_search_text USING gin (body_vector)"
+    )
+    op.execute(
+        "CREATE INDEX ix_section_search_text_title_trgm "
+        "ON section_search_text USING gin (title gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_section_search_text_body_trgm "
+        "ON section_search_text USING gin (body gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    """Drop section_search_text."""
+    op.drop_table("section_search_text")
@@ -0,0 +1,39 @@
+"""add trending_epoch
+
+Revision ID: c8e2a4f6b1d3
+Revises: f3b7e1c9a5d2
+Create Date: 2026-10-16
+
+plots.trending_score weights grow by 2x every half-life from a fixed epoch
+and overflowed a float after ~2.8 years.  The epoch now lives in this
+single-row table; the daily trending_score rebuild moves it forward and
+rewrites the scores relative to it.  Until the first rebuild the configured
+Settings.trending_epoch is used, which matches the existing scores.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c8e2a4f6b1d3"
+down_revision: str | Sequence[str] | None = "f3b7e1c9a5d2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create the trending_epoch table."""
+    op.create_table(
+        "trending_epoch",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("epoch", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the trending_epoch table."""
+    op.drop_table("trending_epoch")
@@ -0,0 +1,37 @@
+"""add section_blobs.last_referenced_at
+
+Revision ID: d4a9f2c7e3b8
+Revises: c8e2a4f6b1d3
+Create Date: 2026-10-16
+
+The blob GC grace period was measured from created_at, so an old blob that a
+fork, rollback or put_blobs reused in a not-yet-committed transaction could be
+deleted underneath it.  Writes that reuse a blob now stamp last_referenced_at
+(an UPDATE, which also makes a concurrent GC DELETE wait and re-check), and the
+GC measures the grace period from coalesce(last_referenced_at, created_at).
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a9f2c7e3b8"
+down_revision: str | Sequence[str] | None = "c8e2a4f6b1d3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add the last_referenced_at column to section_blobs."""
+    op.add_column(
+        "section_blobs",
+        sa.Column("last_referenced_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Drop the last_referenced_at column from section_blobs."""
+    op.drop_column("section_blobs", "last_referenced_at")
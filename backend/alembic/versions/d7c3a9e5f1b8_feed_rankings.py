@@ -0,0 +1,44 @@
+"""add feed_rankings for precomputed front-page feeds
+
+Revision ID: d7c3a9e5f1b8
+Revises: b2f6d8a4c1e3
+Create Date: 2026-10-16
+
+/plots/trending, /plots/popular and /plots/new aggregated stars on every
+request.  A background job (services/feed_service) now writes the top plots
+of each feed here, and the endpoints read them by primary key.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d7c3a9e5f1b8"
+down_revision: str | Sequence[str] | None = "b2f6d8a4c1e3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create feed_rankings."""
+    op.create_table(
+        "feed_rankings",
+        sa.Column("feed", sa.String(length=20), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("plot_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["plot_id"], ["plots.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("feed", "rank"),
+    )
+    op.create_index("ix_feed_rankings_plot_id", "feed_rankings", ["plot_id"])
+
+
+def downgrade() -> None:
+    """Drop feed_rankings."""
+    op.drop_index("ix_feed_rankings_plot_id", table_name="feed_rankings")
+    op.drop_table("feed_rankings")
@@ -0,0 +1,66 @@
+"""add snapshot_dirty_plots queue
+
+Revision ID: d91a3f6e5c20
+Revises: b4e8a1c6d2f7
+Create Date: 2026-10-16
+
+The snapshot batch no longer scans plots.updated_at for the last 5 minutes.
+Editing services enqueue the plot in snapshot_dirty_plots within the same
+transaction and the batch drains the queue with a cursor, so a delayed job run
+no longer misses edits.  Plots modified after their latest snapshot are
+enqueued here so nothing is lost across the deploy.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d91a3f6e5c20"
+down_revision: str | Sequence[str] | None = "b4e8a1c6d2f7"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create snapshot_dirty_plots and enqueue plots without a fresh snapshot."""
+    op.create_table(
+        "snapshot_dirty_plots",
+        sa.Column("plot_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("dirty_seq", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "first_marked_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(["plot_id"], ["plots.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("plot_id"),
+    )
+    op.create_index(
+        "ix_snapshot_dirty_plots_first_marked_at",
+        "snapshot_dirty_plots",
+        ["first_marked_at"],
+    )
+    op.execute(
+        """
+        INSERT INTO snapshot_dirty_plots (plot_id, dirty_seq)
+        SELECT p.id, 1
+        FROM plots p
+        WHERE NOT EXISTS (
+            SELECT 1 FROM cold_snapshots c
+            WHERE c.plot_id = p.id AND c.created_at >= p.updated_at
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop snapshot_dirty_plots."""
+    op.drop_index(
+        "ix_snapshot_dirty_plots_first_marked_at", table_name="snapshot_dirty_plots"
+    )
+    op.drop_table("snapshot_dirty_plots")
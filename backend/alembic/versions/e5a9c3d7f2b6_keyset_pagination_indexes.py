@@ -0,0 +1,58 @@
+"""add (filter, created_at, id) indexes for keyset pagination
+
+Revision ID: e5a9c3d7f2b6
+Revises: c8d4f2a7e915
+Create Date: 2026-10-16
+
+List endpoints accept an opaque cursor encoding the (created_at, id) of the
+last row of the previous page (services/pagination).  The next page is read
+with WHERE (created_at, id) < (:created_at, :id), which these indexes answer
+with a single range scan regardless of how deep the page is.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a9c3d7f2b6"
+down_revision: str | Sequence[str] | None = "c8d4f2a7e915"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (index name, table, columns)
+_INDEXES: list[tuple[str, str, list[str]]] = [
+    ("ix_plots_created_at_id", "plots", ["created_at", "id"]),
+    (
+        "ix_hot_operations_section_created_at_id",
+        "hot_operations",
+        ["section_id", "created_at", "id"],
+    ),
+    (
+        "ix_cold_snapshots_plot_created_at_id",
+        "cold_snapshots",
+        ["plot_id", "created_at", "id"],
+    ),
+    (
+        "ix_rollback_logs_plot_created_at_id",
+        "rollback_logs",
+        ["plot_id", "created_at", "id"],
+    ),
+    (
+        "ix_comments_thread_created_at_id",
+        "comments",
+        ["thread_id", "created_at", "id"],
+    ),
+]
+
+
+def upgrade() -> None:
+    """Create the keyset pagination indexes."""
+    for name, table, columns in _INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Drop the keyset pagination indexes."""
+    for name, table, _ in reversed(_INDEXES):
+        op.drop_index(name, table_name=table)
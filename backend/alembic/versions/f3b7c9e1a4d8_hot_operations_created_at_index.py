@@ -0,0 +1,30 @@
+"""add created_at index to hot_operations
+
+Revision ID: f3b7c9e1a4d8
+Revises: d91a3f6e5c20
+Create Date: 2026-10-16
+
+The HotOperation TTL purge now deletes expired rows in fixed-size chunks
+ordered by created_at, committing per chunk.  Each chunk looks up the oldest
+rows via this index instead of scanning the whole table.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b7c9e1a4d8"
+down_revision: str | Sequence[str] | None = "d91a3f6e5c20"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create ix_hot_operations_created_at."""
+    op.create_index("ix_hot_operations_created_at", "hot_operations", ["created_at"])
+
+
+def downgrade() -> None:
+    """Drop ix_hot_operations_created_at."""
+    op.drop_index("ix_hot_operations_created_at", table_name="hot_operations")
@@ -0,0 +1,43 @@
+"""add incrementally maintained plots.trending_score
+
+Revision ID: f3b7e1c9a5d2
+Revises: d7c3a9e5f1b8
+Create Date: 2026-10-16
+
+The trending feed was recomputed from a 72-hour window of stars by the feed
+refresh job.  trending_score now holds a forward-decayed sum of star, fork
+and comment weights that star_service / social_service bump in the same
+transaction, and /plots/trending reads ix_plots_trending_score directly.
+
+The score depends on runtime settings (half-life, epoch), so it is not
+backfilled here: run ``python -m app.services.trending_service`` after
+upgrading.  The now unused "trending" rows in feed_rankings are removed.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b7e1c9a5d2"
+down_revision: str | Sequence[str] | None = "d7c3a9e5f1b8"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add plots.trending_score and index it."""
+    op.add_column(
+        "plots",
+        sa.Column("trending_score", sa.Float(), server_default="0", nullable=False),
+    )
+    op.create_index("ix_plots_trending_score", "plots", ["trending_score"])
+    op.execute("DELETE FROM feed_rankings WHERE feed = 'trending'")
+
+
+def downgrade() -> None:
+    """Drop plots.trending_score."""
+    op.drop_index("ix_plots_trending_score", table_name="plots")
+    op.drop_column("plots", "trending_score")
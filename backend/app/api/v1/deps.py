@@ -1,12 +1,71 @@
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core import replica
 from app.core.auth import get_current_user, get_optional_user
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.schemas import CurrentUser
 
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _get_current_user_tracked(
+    request: Request,
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> CurrentUser:
+    """get_current_user に加え、書き込み系リクエストなら read-your-writes 用に記録する。
+
+    レスポンス返却後に記録すると、直後の読み取りがレプリカに行く可能性があるため
+    エンドポイント実行前に記録する。
+    """
+    if request.method not in SAFE_METHODS:
+        replica.mark_user_write(current_user.id)
+    return current_user
+
+
+def get_read_db(
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[CurrentUser | None, Depends(get_optional_user)],
+) -> Generator[Session]:
+    """読み取り専用セッション。レプリカ設定時はレプリカに振り分ける。
+
+    primary のセッションは実際にクエリするまで接続しないため、
+    レプリカを使う場合も依存として受け取るコストはほぼない。
+    """
+    balancer = replica.get_replica_balancer()
+    if balancer is None or replica.is_sticky_to_primary(
+        current_user.id if current_user else None
+    ):
+        yield db
+        return
+    with replica.replica_session(balancer) as replica_db:
+        yield replica_db
+
+
+async def get_async_read_db(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_user: Annotated[CurrentUser | None, Depends(get_optional_user)],
+) -> AsyncGenerator[AsyncSession]:
+    """get_read_db の非同期版。"""
+    balancer = replica.get_async_replica_balancer()
+    if balancer is None or replica.is_sticky_to_primary(
+        current_user.id if current_user else None
+    ):
+        yield db
+        return
+    async with replica.async_replica_session(balancer) as replica_db:
+        yield replica_db
+
+
 DbSession = Annotated[Session, Depends(get_db)]
-AuthUser = Annotated[CurrentUser, Depends(get_current_user)]
+# 読み取り専用のホットなエンドポイント（ポーリング対象）で使う非同期セッション
+AsyncDbSession = Annotated[AsyncSession, Depends(get_async_db)]
+# 読み取り専用エンドポイント用（レプリカ設定時はレプリカから読む）
+ReadDbSession = Annotated[Session, Depends(get_read_db)]
+AsyncReadDbSession = Annotated[AsyncSession, Depends(get_async_read_db)]
+AuthUser = Annotated[CurrentUser, Depends(_get_current_user_tracked)]
 OptionalUser = Annotated[CurrentUser | None, Depends(get_optional_user)]
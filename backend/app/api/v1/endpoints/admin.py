@@ -1,4 +1,4 @@
-"""Admin endpoints – BAN 管理。"""
+"""Admin endpoints – BAN 管理・運用メトリクス。"""
 
 import logging
 
@@ -6,8 +6,14 @@ from fastapi import APIRouter, HTTPException, Query, Response, status
 
 from app.api.v1.deps import AuthUser, DbSession
 from app.api.v1.utils import _get_plot_or_404, _get_user_or_404, _require_admin
+from app.core import pool_metrics
 from app.schemas import BanRequest
-from app.services import moderation_service
+from app.services import (
+    image_processor,
+    moderation_service,
+    operation_buffer,
+    snapshot_cleanup,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -83,3 +89,54 @@ def unban_user(
         plotId,
     )
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+# ─── GET /admin/db/pool ──────────────────────────
+@router.get("/admin/db/pool")
+def get_db_pool_metrics(current_user: AuthUser) -> dict:
+    """コネクションプールのメトリクスを返す（要管理者権限）。
+
+    エンジン名（"primary" / "async"）ごとに、チェックアウト中の接続数・
+    オーバーフロー数・接続取得待ち時間ヒストグラム・無効化された接続数を返す。
+    """
+    _require_admin(current_user)
+    return {"pools": pool_metrics.snapshot()}
+
+
+# ─── GET /admin/operations/buffer ────────────────
+@router.get("/admin/operations/buffer")
+def get_operation_buffer_metrics(current_user: AuthUser) -> dict:
+    """HotOperation の write-behind バッファのメトリクスを返す（要管理者権限）。
+
+    キュー深さ・フラッシュ件数・フラッシュ所要時間ヒストグラムなど。
+    バッファが無効な場合は {"enabled": false}。
+    """
+    _require_admin(current_user)
+    buffer = operation_buffer.get_operation_buffer()
+    if buffer is None:
+        return {"enabled": False}
+    return {"enabled": True, **buffer.snapshot()}
+
+
+# ─── GET /admin/images/processing ────────────────
+@router.get("/admin/images/processing")
+def get_image_processing_metrics(current_user: AuthUser) -> dict:
+    """画像アップロード処理プールのメトリクスを返す（要管理者権限）。
+
+    実行中・待ち件数、受付拒否数、待ち時間・処理時間ヒストグラム、
+    段階ごと（decode / resize / encode / upload）の所要時間など。
+    """
+    _require_admin(current_user)
+    return image_processor.get_image_processor().snapshot()
+
+
+# ─── GET /admin/snapshots/retention ──────────────
+@router.get("/admin/snapshots/retention")
+def get_snapshot_retention_progress(current_user: AuthUser) -> dict:
+    """スナップショット保持ポリシー適用の進捗を返す（要管理者権限）。
+
+    実行中（または直近）の実行の段階・走査した Plot 数・削除候補数・
+    削除件数・DELETE バッチ数・開始 / 終了時刻。
+    """
+    _require_admin(current_user)
+    return snapshot_cleanup.retention_progress()
@@ -19,7 +19,6 @@ import logging
 
 from fastapi import APIRouter, HTTPException, Query, status
 from sqlalchemy import func, select
-from sqlalchemy.orm import selectinload
 
 from app.api.v1.deps import AuthUser, DbSession
 from app.api.v1.utils import _get_user_by_username_or_404, plot_to_response
@@ -31,6 +30,7 @@ from app.schemas import (
     UserResponse,
 )
 from app.services import user_service
+from app.services.total_count import count_total
 
 logger = logging.getLogger(__name__)
 
@@ -148,29 +148,30 @@ def get_user_plots(
     """ユーザーが作成した Plot 一覧を取得する。"""
     user = _get_user_by_username_or_404(db, username)
 
-    total: int = db.execute(
-        select(func.count()).select_from(Plot).where(Plot.owner_id == user.id)
-    ).scalar_one()
+    query = select(Plot).where(Plot.owner_id == user.id)
 
-    # selectinload で stars を事前ロードし、N+1 問題を回避
+    # スター数は Plot.star_count を使うため Star は読み込まない
     # 自分が作成した Plot は作成順（created_at）で表示する。
     # オーナー自身が「いつ作ったか」を時系列で把握できるようにするため。
     plots = (
-        db.execute(
-            select(Plot)
-            .options(selectinload(Plot.stars))
-            .where(Plot.owner_id == user.id)
-            .order_by(Plot.created_at.desc())
-            .limit(limit)
-            .offset(offset)
-        )
+        db.execute(query.order_by(Plot.created_at.desc()).limit(limit).offset(offset))
         .scalars()
         .all()
     )
+    total = count_total(
+        db,
+        query,
+        endpoint="users.plots",
+        limit=limit,
+        offset=offset,
+        page_size=len(plots),
+        cache_key=(user.id,),
+    )
 
     return PlotListResponse(
         items=[plot_to_response(p) for p in plots],
         total=total,
+        totalIsEstimate=total.is_estimate,
         limit=limit,
         offset=offset,
     )
@@ -198,29 +199,30 @@ def get_user_contributions(
         .subquery()
     )
 
-    total: int = db.execute(
-        select(func.count()).select_from(contributed_plot_ids_subq)
-    ).scalar_one()
+    query = select(Plot).where(Plot.id.in_(select(contributed_plot_ids_subq)))
 
-    # selectinload で stars を事前ロードし、N+1 問題を回避
+    # スター数は Plot.star_count を使うため Star は読み込まない
     # コントリビューションした Plot は最終更新順（updated_at）で表示する。
     # 直近アクティブな Plot を上位に表示し、協業の進捗を追いやすくするため。
     plots = (
-        db.execute(
-            select(Plot)
-            .options(selectinload(Plot.stars))
-            .where(Plot.id.in_(select(contributed_plot_ids_subq)))
-            .order_by(Plot.updated_at.desc())
-            .limit(limit)
-            .offset(offset)
-        )
+        db.execute(query.order_by(Plot.updated_at.desc()).limit(limit).offset(offset))
         .scalars()
         .all()
     )
+    total = count_total(
+        db,
+        query,
+        endpoint="users.contributions",
+        limit=limit,
+        offset=offset,
+        page_size=len(plots),
+        cache_key=(user.id,),
+    )
 
     return PlotListResponse(
         items=[plot_to_response(p) for p in plots],
         total=total,
+        totalIsEstimate=total.is_estimate,
         limit=limit,
         offset=offset,
     )
@@ -11,14 +11,16 @@ from datetime import datetime
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.api.v1.deps import AuthUser, DbSession
 from app.api.v1.utils import section_to_response
 from app.models import Plot, Section
 from app.schemas import SectionResponse
-from app.services import history_service
+from app.services import blob_service, history_service, operation_buffer
 from app.services.history_service import ConflictError
+from app.services.operation_buffer import OperationBufferFull
+from app.services.pagination import InvalidCursorError
 
 router = APIRouter()
 
@@ -44,6 +46,26 @@ class CreateOperationResponse(BaseModel):
     version: int
 
 
+class BatchOperationItem(CreateOperationRequest):
+    sectionId: UUID
+
+
+class BatchOperationsRequest(BaseModel):
+    operations: list[BatchOperationItem] = Field(
+        min_length=1, max_length=history_service.MAX_BATCH_OPERATIONS
+    )
+
+
+class BatchOperationResult(BaseModel):
+    id: str
+    sectionId: str
+    version: int
+
+
+class BatchOperationsResponse(BaseModel):
+    items: list[BatchOperationResult]
+
+
 class HistoryItem(BaseModel):
     id: str
     sectionId: str
@@ -57,6 +79,9 @@ class HistoryItem(BaseModel):
 class HistoryListResponse(BaseModel):
     items: list[HistoryItem]
     total: int
+    totalIsEstimate: bool = False
+    # 次ページのカーソル（?cursor= に渡す）。最終ページなら null
+    nextCursor: str | None = None
 
 
 class DiffResponse(BaseModel):
@@ -103,6 +128,9 @@ class SnapshotResponse(BaseModel):
 class SnapshotListResponse(BaseModel):
     items: list[SnapshotResponse]
     total: int
+    totalIsEstimate: bool = False
+    # 次ページのカーソル（?cursor= に渡す）。最終ページなら null
+    nextCursor: str | None = None
 
 
 class SnapshotDetailResponse(BaseModel):
@@ -126,6 +154,9 @@ class RollbackLogResponse(BaseModel):
 class RollbackLogListResponse(BaseModel):
     items: list[RollbackLogResponse]
     total: int
+    totalIsEstimate: bool = False
+    # 次ページのカーソル（?cursor= に渡す）。最終ページなら null
+    nextCursor: str | None = None
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -148,10 +179,10 @@ def _build_plot_detail_response(plot: Plot, db: DbSession) -> PlotDetailResponse
         .all()
     )
 
+    blob_service.prefetch_section_contents(db, sections)
     section_responses = [section_to_response(s) for s in sections]
 
-    # starCount: starsリレーションが読み込まれていれば実数、なければ0
-    star_count = len(plot.stars) if plot.stars else 0
+    star_count = plot.star_count
     # Known limitation: isStarred is always False in rollback response.
     # Why: Rollback is a system-level operation and the requesting user's
     # star status is not relevant to the rollback result. To resolve this,
@@ -191,16 +222,34 @@ def create_operation(
     current_user: AuthUser,
 ):
     """Record an operation log for a section (Phase 1: hot, 72h TTL)."""
-    section = db.query(Section).filter(Section.id == section_id).first()
-    if not section:
-        raise HTTPException(status_code=404, detail="Section not found")
-
     payload = {
         "position": body.position,
         "content": body.content,
         "length": body.length,
     }
 
+    buffer = operation_buffer.get_operation_buffer()
+    if buffer is not None:
+        # 存在チェックはフラッシュ時にまとめて行う（リクエストごとに接続を取らない）
+        try:
+            result = buffer.submit(
+                section_id=section_id,
+                user_id=current_user.id,
+                operation_type=body.operationType,
+                payload=payload,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except OperationBufferFull as e:
+            raise HTTPException(
+                status_code=503, detail=str(e), headers={"Retry-After": "1"}
+            )
+        return {"id": str(result["id"]), "version": result["version"]}
+
+    section = db.query(Section).filter(Section.id == section_id).first()
+    if not section:
+        raise HTTPException(status_code=404, detail="Section not found")
+
     try:
         operation = history_service.record_operation(
             db=db,
@@ -215,6 +264,57 @@ def create_operation(
     return {"id": str(operation.id), "version": operation.version}
 
 
+@router.post(
+    "/plots/{plot_id}/operations",
+    status_code=201,
+    response_model=BatchOperationsResponse,
+)
+def create_operations_batch(
+    plot_id: UUID,
+    body: BatchOperationsRequest,
+    db: DbSession,
+    current_user: AuthUser,
+):
+    """Record an ordered batch of operations across sections of one plot."""
+    plot = db.query(Plot).filter(Plot.id == plot_id).first()
+    if not plot:
+        raise HTTPException(status_code=404, detail="Plot not found")
+
+    operations = [
+        {
+            "section_id": item.sectionId,
+            "operation_type": item.operationType,
+            "payload": {
+                "position": item.position,
+                "content": item.content,
+                "length": item.length,
+            },
+        }
+        for item in body.operations
+    ]
+
+    try:
+        results = history_service.record_operations_batch(
+            db=db,
+            plot_id=plot_id,
+            user_id=current_user.id,
+            operations=operations,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return {
+        "items": [
+            {
+                "id": str(r["id"]),
+                "sectionId": str(r["section_id"]),
+                "version": r["version"],
+            }
+            for r in results
+        ]
+    }
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 #  維持エンドポイント: 履歴一覧取得（72時間）
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -227,18 +327,23 @@ def get_history(
     db: DbSession,
     limit: int = Query(default=50, le=100, ge=1),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="前ページの nextCursor"),
 ):
     """Get operation history for a section (72h window only)."""
     section = db.query(Section).filter(Section.id == section_id).first()
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
 
-    items, total = history_service.get_history(
-        db=db,
-        section_id=section_id,
-        limit=limit,
-        offset=offset,
-    )
+    try:
+        items, total, next_cursor = history_service.get_history(
+            db=db,
+            section_id=section_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     history_items = []
     for item in items:
@@ -269,7 +374,12 @@ def get_history(
             )
         )
 
-    return HistoryListResponse(items=history_items, total=total)
+    return HistoryListResponse(
+        items=history_items,
+        total=total,
+        totalIsEstimate=total.is_estimate,
+        nextCursor=next_cursor,
+    )
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -320,6 +430,7 @@ def list_snapshots(
     db: DbSession,
     limit: int = Query(default=20, le=100, ge=1),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="前ページの nextCursor"),
 ):
     """Get snapshot list for a plot."""
     # Plotの存在確認
@@ -327,12 +438,16 @@ def list_snapshots(
     if not plot:
         raise HTTPException(status_code=404, detail="Plot not found")
 
-    snapshots, total = history_service.get_plot_snapshots(
-        db=db,
-        plot_id=plot_id,
-        limit=limit,
-        offset=offset,
-    )
+    try:
+        snapshots, total, next_cursor = history_service.get_plot_snapshots(
+            db=db,
+            plot_id=plot_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     items = [
         SnapshotResponse(
@@ -344,7 +459,12 @@ def list_snapshots(
         for s in snapshots
     ]
 
-    return SnapshotListResponse(items=items, total=total)
+    return SnapshotListResponse(
+        items=items,
+        total=total,
+        totalIsEstimate=total.is_estimate,
+        nextCursor=next_cursor,
+    )
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -373,7 +493,7 @@ def get_snapshot_detail(
         id=str(snapshot.id),
         plotId=str(snapshot.plot_id),
         version=snapshot.version,
-        content=snapshot.content,
+        content=history_service.resolve_snapshot_content(db, snapshot),
         createdAt=snapshot.created_at,
     )
 
@@ -436,6 +556,7 @@ def list_rollback_logs(
     current_user: AuthUser,
     limit: int = Query(default=20, le=100, ge=1),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="前ページの nextCursor"),
 ):
     """Get rollback audit logs for a plot (owner or admin only)."""
     # Plotの存在確認
@@ -453,12 +574,16 @@ def list_rollback_logs(
             detail="Only the plot owner or an admin can view rollback logs",
         )
 
-    items, total = history_service.get_rollback_logs(
-        db=db,
-        plot_id=plot_id,
-        limit=limit,
-        offset=offset,
-    )
+    try:
+        items, total, next_cursor = history_service.get_rollback_logs(
+            db=db,
+            plot_id=plot_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     log_items = []
     for item in items:
@@ -489,4 +614,9 @@ def list_rollback_logs(
             )
         )
 
-    return RollbackLogListResponse(items=log_items, total=total)
+    return RollbackLogListResponse(
+        items=log_items,
+        total=total,
+        totalIsEstimate=total.is_estimate,
+        nextCursor=next_cursor,
+    )
@@ -2,7 +2,7 @@
 
 docs/api.md の Images セクション準拠:
 - POST /  → 画像アップロード（要認証, multipart/form-data, 最大5MB）
-- GET /{filename} → 画像取得（認証不要）
+- GET /{filename} → 画像取得（認証不要, ETag / 304 / Range 対応, ?w= で縮小版）
 
 セキュリティ前提:
 - リバースプロキシ (nginx等) で client_max_body_size / client_header_timeout /
@@ -10,21 +10,25 @@ docs/api.md の Images セクション準拠:
   本エンドポイントはアプリケーション層の防御のみ担当する。
 """
 
-import asyncio
 import io
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import os
+import re
+from collections.abc import AsyncIterator
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
+from typing import BinaryIO
 
-from fastapi import APIRouter, HTTPException, UploadFile, status
+from fastapi import APIRouter, HTTPException, Query, Request, UploadFile, status
 from fastapi import Path as PathParam
-from fastapi.responses import Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from PIL import Image
 
 from app.api.v1.deps import AuthUser
 from app.core.config import get_settings
 from app.schemas import ImageUploadResponse
-from app.services import image_service
+from app.services import image_cache, image_processor, image_service
 
 logger = logging.getLogger(__name__)
 
@@ -38,24 +42,17 @@ _MEDIA_TYPES: dict[str, str] = {
     ".png": "image/png",
     ".gif": "image/gif",
     ".webp": "image/webp",
+    ".avif": "image/avif",
 }
 
-_image_executor: ThreadPoolExecutor | None = None
+# ファイル名は不変の UUID のため、ブラウザ・CDN に無期限でキャッシュさせる
+_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
+# 単一範囲の Range ヘッダー（bytes=a-b / bytes=a- / bytes=-n）
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
 
-def _get_image_executor() -> ThreadPoolExecutor:
-    """画像処理専用の ThreadPoolExecutor をシングルトンで取得する。
-
-    遅延初期化: 初回呼び出し時にのみ生成し、以降はキャッシュを返す。
-    """
-    global _image_executor  # noqa: PLW0603
-    if _image_executor is None:
-        settings = get_settings()
-        _image_executor = ThreadPoolExecutor(
-            max_workers=settings.image_processing_max_workers,
-            thread_name_prefix="image-proc",
-        )
-    return _image_executor
+# ディスク層の画像を送るときの読み込み単位
+_FILE_CHUNK_SIZE = 64 * 1024
 
 
 @router.post(
@@ -70,6 +67,7 @@ async def upload_image(file: UploadFile, current_user: AuthUser) -> ImageUploadR
     - 最大サイズ: 5MB
     - 自動リサイズ: 最大幅1920px、アスペクト比維持
     - 出力形式: 入力形式を保持（JPEG/JPEG, PNG/PNG, GIF/GIF, WEBP/WEBP）
+    - 画像処理が混み合っている場合は 503 + Retry-After（image_processor）
 
     Args:
         file: アップロードする画像ファイル
@@ -101,15 +99,18 @@ async def upload_image(file: UploadFile, current_user: AuthUser) -> ImageUploadR
             buffer.write(chunk)
         file_data = buffer.getvalue()
 
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(
-            _get_image_executor(),
-            image_service.process_and_save,
-            file_data,
-            file.filename,
+        result = await image_processor.get_image_processor().run(
+            image_service.process_and_save, file_data, file.filename
         )
     except HTTPException:
         raise
+    except image_processor.ImageProcessingBusy as e:
+        logger.warning("Image upload rejected: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(settings.image_processing_retry_after_seconds)},
+        ) from e
     except ValueError as e:
         logger.warning("Image upload validation failed: %s", e)
         raise HTTPException(
@@ -145,31 +146,226 @@ async def upload_image(file: UploadFile, current_user: AuthUser) -> ImageUploadR
     )
 
 
+async def _load_image(
+    filename: str, width: int | None, accept: set[str]
+) -> tuple[str, image_cache.CachedImage]:
+    """要求に最も近い派生画像を探し、(配信するキー, 画像) を返す。
+
+    派生画像がなければ（古い画像・生成失敗）元画像にフォールバックする。
+    元画像もなければ 404。
+    """
+    cache = image_cache.get_image_cache()
+    for key in image_service.variant_candidates(filename, width, accept):
+        if key != filename and cache.is_missing(key):
+            continue
+        try:
+            image = await image_cache.get_image(
+                key, image_service.stream_image_from_supabase, cache
+            )
+        except Exception as e:
+            if key != filename:
+                cache.mark_missing(key)
+                continue
+            logger.warning("Image not found in Supabase Storage: %s (%s)", key, e)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Image not found",
+            ) from e
+        return key, image
+    raise AssertionError("variant_candidates always ends with the original")
+
+
+def _is_not_modified(request: Request, image: image_cache.CachedImage) -> bool:
+    """If-None-Match / If-Modified-Since から 304 を返せるか判定する（RFC 9110 13.1）。"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # 弱い比較: W/ 接頭辞を無視して比較する
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return image.etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(image.last_modified) <= since
+    return False
+
+
+def _requested_range(
+    request: Request, headers: dict[str, str], size: int
+) -> tuple[int, int] | Response | None:
+    """Range / If-Range から送る範囲 (start, end) を返す。全体を送るなら None。
+
+    範囲を満たせなければ 416 のレスポンスを返す。
+    複数範囲や解釈できない Range は無視して全体を返す（RFC 9110 14.2 で許容）。
+    """
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # If-Range が現在の ETag / Last-Modified と一致しなければ全体を返す
+    if range_header is None or (
+        if_range is not None
+        and if_range not in (headers["ETag"], headers["Last-Modified"])
+    ):
+        return None
+
+    match = _RANGE_RE.match(range_header.strip())
+    if match is None or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or start > end:
+        return Response(
+            status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def _bytes_response(
+    request: Request, data: bytes, media_type: str, headers: dict[str, str]
+) -> Response:
+    """メモリ上の画像を返す。単一範囲の Range には 206 / 416 で応答する。"""
+    headers = {**headers, "Accept-Ranges": "bytes"}
+    byte_range = _requested_range(request, headers, len(data))
+    if isinstance(byte_range, Response):
+        return byte_range
+    if byte_range is None:
+        return Response(content=data, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    return Response(
+        content=data[start : end + 1],
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers={**headers, "Content-Range": f"bytes {start}-{end}/{len(data)}"},
+    )
+
+
+def _open_cached_file(path: Path) -> BinaryIO:
+    """ディスク層の画像ファイルを開く（スレッドプールから呼ぶ）。"""
+    return path.open("rb")
+
+
+async def _open_disk_image(
+    key: str, image: image_cache.CachedImage
+) -> tuple[image_cache.CachedImage, BinaryIO | None]:
+    """ディスク層の画像なら、送信前にファイルを開いて (画像, ファイル) を返す。
+
+    ディスク層のファイルは同じワーカーの別リクエストや、キャッシュディレクトリを
+    共有する他のワーカーの追い出しでいつ削除されてもおかしくない。開いた
+    ファイル記述子は削除後も読めるため、開いてから送る。開く前に削除されて
+    いたら取得し直す（ディスク層に書き直されるか、メモリ上の画像が返る）。
+    """
+    for attempt in range(2):
+        if image.data is not None or image.path is None:
+            return image, None
+        try:
+            return image, await run_in_threadpool(_open_cached_file, image.path)
+        except FileNotFoundError:
+            if attempt:
+                raise
+            logger.info("Cached image was evicted before sending; refetching: %s", key)
+            image = await image_cache.get_image(
+                key, image_service.stream_image_from_supabase
+            )
+    raise AssertionError("unreachable")
+
+
+def _file_response(
+    request: Request, file: BinaryIO, media_type: str, headers: dict[str, str]
+) -> Response:
+    """開いたファイルからチャンク単位でストリーミングする。Range には 206 / 416 で応答する。
+
+    ファイルは送信し終えたとき（またはレスポンスを返さないとき）に閉じる。
+    """
+    size = os.fstat(file.fileno()).st_size
+    headers = {**headers, "Accept-Ranges": "bytes"}
+    byte_range = _requested_range(request, headers, size)
+    if isinstance(byte_range, Response):
+        file.close()
+        return byte_range
+    start, end = byte_range or (0, size - 1)
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            await run_in_threadpool(file.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await run_in_threadpool(
+                    file.read, min(_FILE_CHUNK_SIZE, remaining)
+                )
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            file.close()
+
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range is None:
+        return StreamingResponse(body(), media_type=media_type, headers=headers)
+    return StreamingResponse(
+        body(),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"},
+    )
+
+
 @router.get("/{filename}")
 async def get_image(
+    request: Request,
     filename: str = PathParam(
         ...,
         pattern=r"^[a-f0-9]{32}\.[a-z0-9]+$",
         description="UUID hex (32 chars) + extension",
     ),
+    w: int | None = Query(
+        None,
+        ge=1,
+        le=10_000,
+        description="表示幅（px）。これ以上の幅の最小の縮小版を返す",
+    ),
 ) -> Response:
-    """画像取得。認証不要。"""
-    ext = Path(filename).suffix.lower()
-    media_type = _MEDIA_TYPES.get(ext, "application/octet-stream")
+    """画像取得。認証不要。
 
-    try:
-        content = image_service.download_image_from_supabase(filename)
-    except Exception as e:
-        logger.warning("Image not found in Supabase Storage: %s (%s)", filename, e)
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Image not found",
-        ) from e
+    ファイル名は不変の UUID のため、メモリ/ディスクのキャッシュ（image_cache）から返し、
+    ミス時のみ Supabase Storage から取得する。
+    - ?w= を指定すると、その幅以上の最小の縮小版を返す。Accept が WebP / AVIF を
+      含む場合はその形式の派生画像を優先する（image_service.variant_candidates）
+    - ETag は内容の SHA-256。If-None-Match / If-Modified-Since が一致すれば 304
+    - ディスク層の画像は送信前にファイルを開き、そのファイルからチャンク単位で
+      ストリーミングする（送信中に追い出されても途切れない）。Range / If-Range
+      （単一範囲）には 206 / 416 で応答する
+    """
+    accept = {
+        part.split(";")[0].strip()
+        for part in request.headers.get("accept", "").split(",")
+    }
+    key, image = await _load_image(filename, w, accept)
+    media_type = _MEDIA_TYPES.get(Path(key).suffix.lower(), "application/octet-stream")
 
-    return Response(
-        content=content,
-        media_type=media_type,
-        headers={
-            "Cache-Control": "public, max-age=31536000, immutable",
-        },
-    )
+    headers = {
+        "Cache-Control": _CACHE_CONTROL,
+        "ETag": image.etag,
+        "Last-Modified": formatdate(image.last_modified, usegmt=True),
+        # ?w= が同じでも Accept によって WebP / AVIF を返すことがある
+        "Vary": "Accept",
+    }
+    if _is_not_modified(request, image):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    image, file = await _open_disk_image(key, image)
+    if file is None:
+        return _bytes_response(request, image.data, media_type, headers)
+    return _file_response(request, file, media_type, headers)
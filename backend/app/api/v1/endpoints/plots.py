@@ -4,6 +4,7 @@ docs/api.md の Plots セクション準拠:
 - GET    /plots           → Plot 一覧取得（tag フィルタ, limit, offset）
 - POST   /plots           → Plot 作成（要認証）
 - GET    /plots/{plot_id}  → Plot 詳細取得
+- GET    /plots/{plot_id}/events → 変更イベントの SSE ストリーム
 - PUT    /plots/{plot_id}  → Plot 更新（要認証・作成者のみ）
 - DELETE /plots/{plot_id}  → Plot 削除（要認証・作成者のみ）
 - GET    /plots/trending   → 急上昇 Plot 一覧
@@ -16,19 +17,45 @@ docs/api.md の Plots セクション準拠:
 import logging
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import (
+    APIRouter,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from app.api.v1.deps import AuthUser, DbSession, OptionalUser
+from app.api.v1.deps import (
+    AsyncReadDbSession,
+    AuthUser,
+    DbSession,
+    OptionalUser,
+    ReadDbSession,
+)
 from app.api.v1.utils import (
     _get_plot_or_404,
     _require_admin,
+    etag_matches,
+    make_etag,
+    not_modified_response,
     plot_to_response,
     section_to_response,
 )
+from app.core import events
 from app.models import Plot, User
 from app.schemas import MessageResponse, PauseRequest
-from app.services import moderation_service, plot_service
+from app.services import (
+    blob_service,
+    feed_service,
+    moderation_service,
+    plot_service,
+)
+from app.services.pagination import InvalidCursorError
+from app.services.total_count import PageTotal
 
 logger = logging.getLogger(__name__)
 
@@ -79,14 +106,17 @@ def _to_plot_detail_dict(
     plot: Plot,
     star_count: int = 0,
     is_starred: bool = False,
+    section_contents: dict | None = None,
 ) -> dict:
     """Plot を PlotDetailResponse 形式に変換。api.md L563-574 準拠。
 
     PlotResponse の全フィールド + sections, owner を含む。
+    section_contents（セクションID → content）を渡すとそれを使う。
     """
+    contents = section_contents or {}
     result = _to_plot_dict(plot, star_count, is_starred)
     result["sections"] = [
-        section_to_response(s).model_dump()
+        section_to_response(s, contents.get(s.id, ...)).model_dump()
         for s in sorted(plot.sections or [], key=lambda s: s.order_index)
     ]
     result["owner"] = _serialize_user_brief(plot.owner)
@@ -102,9 +132,8 @@ def _enrich_plot(
 
     単一 Plot の場合に使用。リスト向けには _enrich_plots_batch() を使うこと。
     """
-    star_count = plot_service.get_star_count(db, plot.id)
     is_starred = plot_service.is_starred_by(db, plot.id, current_user_id)
-    return _to_plot_dict(plot, star_count, is_starred)
+    return _to_plot_dict(plot, plot.star_count, is_starred)
 
 
 def _enrich_plots_batch(
@@ -114,36 +143,36 @@ def _enrich_plots_batch(
 ) -> list[dict]:
     """複数 Plot にスター数と isStarred を一括付与する（N+1 回避）。
 
-    バッチクエリで star_count と is_starred を取得し、
+    star_count は Plot.star_count を使い、is_starred はバッチクエリで取得して
     各 Plot を PlotResponse dict に変換して返す。
     """
     if not plots:
         return []
 
     plot_ids = [p.id for p in plots]
-    star_counts = plot_service.get_star_counts_batch(db, plot_ids)
     starred_ids = plot_service.get_starred_plot_ids_batch(db, plot_ids, current_user_id)
 
-    return [
-        _to_plot_dict(p, star_counts.get(p.id, 0), p.id in starred_ids) for p in plots
-    ]
+    return [_to_plot_dict(p, p.star_count, p.id in starred_ids) for p in plots]
 
 
 def _enrich_plots_as_list(
     db: DbSession,
     plots: list[Plot],
     current_user_id: str | None,
-    total: int,
+    total: PageTotal,
     limit: int,
     offset: int,
+    next_cursor: str | None,
 ) -> dict:
     """Plot リストを PlotListResponse 形式に変換する。"""
     items = _enrich_plots_batch(db, plots, current_user_id)
     return {
         "items": items,
         "total": total,
+        "totalIsEstimate": total.is_estimate,
         "limit": limit,
         "offset": offset,
+        "nextCursor": next_cursor,
     }
 
 
@@ -153,11 +182,14 @@ def _enrich_plots_as_list(
 #       "trending" を UUID として解釈しようとして 422 エラーになる。
 @router.get("/trending")
 def list_trending(
-    db: DbSession,
+    db: ReadDbSession,
     current_user: OptionalUser,
     limit: int = Query(default=5, le=100, ge=1),
 ):
-    """急上昇 Plot 一覧（直近72時間のスター増加数でソート）。"""
+    """急上昇 Plot 一覧（時間減衰させたスター・フォーク・コメントのスコア順）。
+
+    Plot.trending_score はイベントごとに更新されるため、常に最新の順位を返す。
+    """
     plots = plot_service.list_trending(db, limit)
     user_id = current_user.id if current_user else None
     items = _enrich_plots_batch(db, plots, user_id)
@@ -172,12 +204,12 @@ def list_trending(
 # ─── GET /plots/popular ──────────────────────────────────────
 @router.get("/popular")
 def list_popular(
-    db: DbSession,
+    db: ReadDbSession,
     current_user: OptionalUser,
     limit: int = Query(default=5, le=100, ge=1),
 ):
-    """人気 Plot 一覧（全期間のスター総数でソート）。"""
-    plots = plot_service.list_popular(db, limit)
+    """人気 Plot 一覧（全期間のスター総数でソート、feed_service の計算結果）。"""
+    plots = feed_service.get_feed(db, "popular", limit)
     user_id = current_user.id if current_user else None
     items = _enrich_plots_batch(db, plots, user_id)
     return {
@@ -195,8 +227,8 @@ def list_new(
     current_user: OptionalUser,
     limit: int = Query(default=5, le=100, ge=1),
 ):
-    """新規 Plot 一覧（作成日時の降順）。"""
-    plots = plot_service.list_new(db, limit)
+    """新規 Plot 一覧（作成日時の降順、feed_service の計算結果）。"""
+    plots = feed_service.get_feed(db, "new", limit)
     user_id = current_user.id if current_user else None
     items = _enrich_plots_batch(db, plots, user_id)
     return {
@@ -215,11 +247,17 @@ def list_plots(
     tag: str | None = Query(default=None, description="タグでフィルタ"),
     limit: int = Query(default=20, le=100, ge=1),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="前ページの nextCursor"),
 ):
     """Plot 一覧取得。"""
-    plots, total = plot_service.list_plots(db, tag, limit, offset)
+    try:
+        plots, total, next_cursor = plot_service.list_plots(
+            db, tag, limit, offset, cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     user_id = current_user.id if current_user else None
-    return _enrich_plots_as_list(db, plots, user_id, total, limit, offset)
+    return _enrich_plots_as_list(db, plots, user_id, total, limit, offset, next_cursor)
 
 
 # ─── POST /plots ─────────────────────────────────────────────
@@ -234,26 +272,90 @@ def create_plot(body: CreatePlotRequest, db: DbSession, current_user: AuthUser):
         tags=body.tags,
         thumbnail_url=body.thumbnailUrl,
     )
-    star_count = plot_service.get_star_count(db, plot.id)
-    return _to_plot_dict(plot, star_count, is_starred=False)
+    return _to_plot_dict(plot, plot.star_count, is_starred=False)
 
 
 # ─── GET /plots/{plot_id} ────────────────────────────────────
 @router.get("/{plot_id}")
-def get_plot(plot_id: UUID, db: DbSession, current_user: OptionalUser):
-    """Plot 詳細取得。"""
+async def get_plot(
+    plot_id: UUID,
+    db: AsyncReadDbSession,
+    current_user: OptionalUser,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+):
+    """Plot 詳細取得。
+
+    フロントエンドが短い間隔でポーリングするため、AsyncSession で
+    スレッドプールを占有せずに処理する。レプリカ設定時はレプリカから読む。
+    If-None-Match が現在の ETag と一致すれば、本文を組み立てずに 304 を返す。
+    """
+    user_id = current_user.id if current_user else None
+    fingerprint = await plot_service.get_plot_fingerprint_async(db, plot_id, user_id)
+    if fingerprint is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Plot not found",
+        )
+    # isStarred がユーザーごとに異なるため、共有キャッシュには載せない
+    cache_headers = {"Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    etag = make_etag("plot", plot_id, *fingerprint)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag, cache_headers)
+
     try:
-        plot = plot_service.get_plot_detail(db, plot_id)
+        plot = await plot_service.get_plot_detail_async(db, plot_id)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         ) from e
 
-    user_id = current_user.id if current_user else None
-    star_count = plot_service.get_star_count(db, plot.id)
-    is_starred = plot_service.is_starred_by(db, plot.id, user_id)
-    return _to_plot_detail_dict(plot, star_count, is_starred)
+    contents = await blob_service.section_contents_async(db, plot.sections)
+    response.headers["ETag"] = etag
+    response.headers.update(cache_headers)
+    # スター数・スター有無は ETag 用のクエリで取得済み
+    return _to_plot_detail_dict(
+        plot, fingerprint.star_count, bool(fingerprint.is_starred), contents
+    )
+
+
+# ─── GET /plots/{plot_id}/events ─────────────────────────────
+@router.get("/{plot_id}/events")
+async def stream_plot_events(
+    plot_id: UUID,
+    request: Request,
+    db: AsyncReadDbSession,
+):
+    """Plot の変更イベントを Server-Sent Events で配信する。
+
+    2秒ごとのポーリングの代わりに使い、イベントを受けたら変更された
+    リソース（セクション・Plot 詳細）だけを再取得する。
+    イベント: section_created / section_updated / section_deleted /
+    section_reordered / plot_updated / plot_rolled_back / plot_paused /
+    plot_resumed / resync（取りこぼし時。全体を再取得する）
+    """
+    fingerprint = await plot_service.get_plot_fingerprint_async(db, plot_id, None)
+    if fingerprint is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Plot not found",
+        )
+    # ストリーム中に DB 接続を保持しないよう、ここで返却する
+    await db.close()
+
+    # ready 送信前に購読しておき、その間の変更を取りこぼさない
+    subscription = events.get_broker().subscribe(plot_id)
+    ready = {"plotId": str(plot_id), "version": fingerprint.version}
+    return StreamingResponse(
+        events.sse_stream(subscription, request.is_disconnected, ready),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # nginx 等のリバースプロキシでバッファリングさせない
+            "X-Accel-Buffering": "no",
+        },
+    )
 
 
 # ─── PUT /plots/{plot_id} ────────────────────────────────────
@@ -292,9 +394,8 @@ def update_plot(
             detail=str(e),
         ) from e
 
-    star_count = plot_service.get_star_count(db, plot.id)
     is_starred = plot_service.is_starred_by(db, plot.id, current_user.id)
-    return _to_plot_dict(plot, star_count, is_starred)
+    return _to_plot_dict(plot, plot.star_count, is_starred)
 
 
 # ─── DELETE /plots/{plot_id} ─────────────────────────────────
@@ -1,15 +1,15 @@
-"""Search endpoint: ILIKE ベースの Plot 検索。
+"""Search endpoint: 全文検索（tsvector + pg_trgm）による Plot 検索。
 
 docs/api.md の Search セクション準拠:
 - GET /  → Plot 検索（q, limit, offset）
+- GET /sections → セクション本文検索（一致箇所のスニペット付き）
 
-将来的に ts_vector ベースの全文検索に移行する場合、
-search_service.py 内のクエリロジックのみ修正すれば良い。
+クエリロジックは search_service.py を参照。
 """
 
 from fastapi import APIRouter, Query
 
-from app.api.v1.deps import DbSession
+from app.api.v1.deps import ReadDbSession
 from app.api.v1.utils import plot_to_response
 from app.services import search_service
 
@@ -18,12 +18,12 @@ router = APIRouter()
 
 @router.get("/")
 def search_plots(
-    db: DbSession,
+    db: ReadDbSession,
     q: str = Query(..., min_length=1, description="検索クエリ"),
     limit: int = Query(default=20, le=100, ge=1),
     offset: int = Query(default=0, ge=0),
 ):
-    """ILIKE を使用した Plot 検索。title と description を対象とする。"""
+    """Plot 検索。title / description / tags / セクション本文を対象に関連度順で返す。"""
     plot_star_pairs, total = search_service.search_plots(db, q, limit, offset)
 
     items = [
@@ -34,5 +34,38 @@ def search_plots(
     return {
         "items": items,
         "total": total,
+        "totalIsEstimate": total.is_estimate,
+        "query": q,
+    }
+
+
+@router.get("/sections")
+def search_sections(
+    db: ReadDbSession,
+    q: str = Query(..., min_length=1, description="検索クエリ"),
+    limit: int = Query(default=20, le=100, ge=1),
+    offset: int = Query(default=0, ge=0),
+):
+    """セクションのタイトル・本文を検索し、一致箇所のスニペット付きで返す。"""
+    results, total = search_service.search_sections(db, q, limit, offset)
+
+    items = [
+        {
+            "sectionId": str(r["section_id"]),
+            "plotId": str(r["plot_id"]),
+            "plotTitle": r["plot_title"],
+            "sectionTitle": r["section_title"],
+            "snippet": r["snippet"],
+            "highlights": [
+                {"start": start, "length": length} for start, length in r["highlights"]
+            ],
+        }
+        for r in results
+    ]
+
+    return {
+        "items": items,
+        "total": total,
+        "totalIsEstimate": total.is_estimate,
         "query": q,
     }
@@ -5,19 +5,28 @@ docs/api.md の Sections セクション準拠:
 - POST   /plots/{plot_id}/sections        → セクション作成（要認証）
 - GET    /sections/{section_id}           → セクション詳細取得
 - PUT    /sections/{section_id}           → セクション更新（要認証）
+- PATCH  /sections/{section_id}           → JSON Patch による差分更新（要認証）
 - DELETE /sections/{section_id}           → セクション削除（要認証）
 - POST   /sections/{section_id}/reorder   → セクション並び替え（要認証）
 """
 
+from typing import Any, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from pydantic import BaseModel, ConfigDict, Field
 
-from app.api.v1.deps import AuthUser, DbSession
-from app.api.v1.utils import section_to_response
+from app.api.v1.deps import AsyncDbSession, AuthUser, DbSession
+from app.api.v1.utils import (
+    etag_matches,
+    make_etag,
+    not_modified_response,
+    section_to_response,
+)
 from app.schemas import SectionListResponse, SectionResponse
-from app.services import section_service
+from app.services import blob_service, section_service
+from app.services.history_service import ConflictError
+from app.services.json_patch import MAX_PATCH_OPERATIONS
 
 router = APIRouter()
 
@@ -34,12 +43,34 @@ class UpdateSectionRequest(BaseModel):
     content: dict | None = None  # exclude_unset で「未指定」と「明示的 null」を区別
 
 
+class JsonPatchOperation(BaseModel):
+    """RFC 6902 の1操作。value の有無は exclude_unset で区別する。"""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    value: Any = None
+    from_: str | None = Field(default=None, alias="from")
+
+
+class PatchSectionRequest(BaseModel):
+    baseVersion: int  # noqa: N815
+    title: str | None = None
+    patch: list[JsonPatchOperation] = Field(
+        default_factory=list, max_length=MAX_PATCH_OPERATIONS
+    )
+
+
 class ReorderSectionRequest(BaseModel):
     newOrder: int  # noqa: N815
 
 
 # Section シリアライズは utils.section_to_response() に統一
 
+# GET レスポンスは毎回 ETag で再検証させる（ポーリングの大半を 304 にする）
+_REVALIDATE_HEADERS = {"Cache-Control": "no-cache"}
+
 
 # ─── エラーハンドリングヘルパー ────────────────────────────────
 
@@ -72,14 +103,29 @@ def _handle_service_error(e: Exception) -> None:
 
 # ─── GET /plots/{plot_id}/sections ────────────────────────────
 @router.get("/plots/{plot_id}/sections", response_model=SectionListResponse)
-def list_sections(plot_id: UUID, db: DbSession):
-    """セクション一覧取得。"""
+async def list_sections(
+    plot_id: UUID,
+    db: AsyncDbSession,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+):
+    """セクション一覧取得。If-None-Match が現在の ETag と一致すれば 304。"""
+    fingerprint = await section_service.get_sections_fingerprint_async(db, plot_id)
+    if fingerprint is None:
+        _handle_service_error(ValueError("Plot not found"))
+    etag = make_etag("sections", plot_id, *fingerprint)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag, _REVALIDATE_HEADERS)
+
     try:
-        sections, total = section_service.list_sections(db, plot_id)
+        sections, total = await section_service.list_sections_async(db, plot_id)
     except ValueError as e:
         _handle_service_error(e)
 
-    items = [section_to_response(s) for s in sections]
+    contents = await blob_service.section_contents_async(db, sections)
+    items = [section_to_response(s, contents[s.id]) for s in sections]
+    response.headers["ETag"] = etag
+    response.headers.update(_REVALIDATE_HEADERS)
     return SectionListResponse(items=items, total=total)
 
 
@@ -112,14 +158,29 @@ def create_section(
 
 # ─── GET /sections/{section_id} ──────────────────────────────
 @router.get("/sections/{section_id}", response_model=SectionResponse)
-def get_section(section_id: UUID, db: DbSession):
-    """セクション詳細取得。"""
+async def get_section(
+    section_id: UUID,
+    db: AsyncDbSession,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+):
+    """セクション詳細取得。If-None-Match が現在の ETag と一致すれば 304。"""
+    fingerprint = await section_service.get_section_fingerprint_async(db, section_id)
+    if fingerprint is None:
+        _handle_service_error(ValueError("Section not found"))
+    etag = make_etag("section", section_id, *fingerprint)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag, _REVALIDATE_HEADERS)
+
     try:
-        section = section_service.get_section(db, section_id)
+        section = await section_service.get_section_async(db, section_id)
     except ValueError as e:
         _handle_service_error(e)
 
-    return section_to_response(section)
+    contents = await blob_service.section_contents_async(db, [section])
+    response.headers["ETag"] = etag
+    response.headers.update(_REVALIDATE_HEADERS)
+    return section_to_response(section, contents[section.id])
 
 
 # ─── PUT /sections/{section_id} ──────────────────────────────
@@ -147,6 +208,39 @@ def update_section(
     return section_to_response(section)
 
 
+# ─── PATCH /sections/{section_id} ────────────────────────────
+@router.patch("/sections/{section_id}", response_model=SectionResponse)
+def patch_section(
+    section_id: UUID,
+    body: PatchSectionRequest,
+    db: DbSession,
+    current_user: AuthUser,
+):
+    """JSON Patch によるセクションの差分更新（要認証）。
+
+    baseVersion が現在の version と異なる場合、または test 操作が一致しない場合は
+    409（クライアントは最新を取得してからパッチを作り直す）。不正なパッチは 400。
+    """
+    operations = [op.model_dump(by_alias=True, exclude_unset=True) for op in body.patch]
+    try:
+        section = section_service.patch_section(
+            db,
+            section_id=section_id,
+            base_version=body.baseVersion,
+            operations=operations,
+            title=body.title,
+        )
+    except ConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        ) from e
+    except (ValueError, PermissionError) as e:
+        _handle_service_error(e)
+
+    return section_to_response(section)
+
+
 # ─── DELETE /sections/{section_id} ───────────────────────────
 @router.delete(
     "/sections/{section_id}",
@@ -16,6 +16,7 @@ from app.api.v1.deps import AuthUser, DbSession
 from app.api.v1.utils import plot_to_response
 from app.models import Comment, Thread, User
 from app.services import social_service
+from app.services.pagination import InvalidCursorError
 
 router = APIRouter()
 
@@ -114,11 +115,17 @@ def list_comments(
     db: DbSession,
     limit: int = Query(default=50, le=50),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="前ページの nextCursor"),
 ):
     """コメント一覧取得。"""
     try:
-        comment_user_pairs, total = social_service.list_comments(
-            db, thread_id, limit, offset
+        comment_user_pairs, total, next_cursor = social_service.list_comments(
+            db, thread_id, limit, offset, cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
         )
     except ValueError as e:
         raise HTTPException(
@@ -127,7 +134,12 @@ def list_comments(
         )
 
     items = [_serialize_comment(c, u) for c, u in comment_user_pairs]
-    return {"items": items, "total": total}
+    return {
+        "items": items,
+        "total": total,
+        "totalIsEstimate": total.is_estimate,
+        "nextCursor": next_cursor,
+    }
 
 
 # ─── POST /threads/{thread_id}/comments ──────────────────────
@@ -4,6 +4,7 @@
 - parse_uuid: 文字列 → UUID 変換（失敗時 400）
 - plot_to_response: Plot ORM → PlotResponse 変換
 - _require_admin: 管理者権限チェック（403）
+- make_etag / etag_matches / not_modified_response: 条件付き GET（ETag / 304）
 
 内部関数:
 - _get_plot_or_404: Plot 取得（未存在時 404）
@@ -11,13 +12,15 @@
 - _get_user_by_username_or_404: display_name で User 取得（未存在時 404）
 """
 
+import hashlib
 import uuid
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Response, status
 from sqlalchemy import select
 
 from app.schemas import CurrentUser, PlotResponse, SectionResponse
+from app.services import blob_service
 
 ADMIN_ROLE = "admin"
 
@@ -100,21 +103,10 @@ def plot_to_response(
     """Plot ORM → PlotResponse に変換する共通ヘルパー。
 
     star_count を明示的に渡すと、その値を使用する。
-    省略時は plot.stars リレーション（selectinload 済み前提）の長さを使用する。
-
-    Note:
-        star_count を省略する場合、呼び出し元で
-        ``selectinload(Plot.stars)`` を適用済みであること。
+    省略時は非正規化カウンタ plot.star_count を使用する（Star 行は読み込まない）。
     """
     if star_count is None:
-        # eager load されていない場合は遅延ロードで N+1 が発生するため、
-        # 明示的にエラーにして呼び出し元の修正を促す。
-        if "stars" not in plot.__dict__:
-            raise RuntimeError(
-                "plot.stars must be eagerly loaded with selectinload(). "
-                "Add .options(selectinload(Plot.stars)) to the query."
-            )
-        star_count = len(plot.stars)
+        star_count = plot.star_count
 
     return PlotResponse(
         id=str(plot.id),
@@ -132,19 +124,57 @@ def plot_to_response(
     )
 
 
-def section_to_response(section: "Section") -> SectionResponse:
+def section_to_response(section: "Section", content: Any = ...) -> SectionResponse:
     """Section ORM → SectionResponse に変換する共通ヘルパー。
 
     plots.py (PlotDetail), sections.py (CRUD), history.py (rollback)
     の3箇所で統一的に使用する。
+
+    content を渡すとその値を使う（AsyncSession では
+    blob_service.section_contents_async() で事前に解決して渡す）。
+    省略時は blob_service.section_content() で読み込む。
     """
+    if content is ...:
+        content = blob_service.section_content(section)
     return SectionResponse(
         id=str(section.id),
         plotId=str(section.plot_id),
         title=section.title,
-        content=section.content,
+        content=content,
         orderIndex=section.order_index,
         version=section.version,
         createdAt=section.created_at,
         updatedAt=section.updated_at,
     )
+
+
+# ─── 条件付き GET（ETag） ──────────────────────────────────────
+def make_etag(*parts: Any) -> str:
+    """parts から強い ETag（引用符付き）を作る。
+
+    parts にはレスポンス本文を決定する値（version・updated_at など）を渡す。
+    """
+    raw = "|".join(str(p) for p in parts).encode("utf-8")
+    return f'"{hashlib.sha256(raw).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match ヘッダーが etag に一致するか判定する。
+
+    RFC 9110 に従い、If-None-Match は弱い比較（W/ を無視）で判定し、
+    カンマ区切りの複数値と "*" を受け付ける。
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def not_modified_response(etag: str, headers: dict[str, str] | None = None) -> Response:
+    """304 Not Modified を返す（本文なし、ETag 付き）。"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, **(headers or {})},
+    )
@@ -1,6 +1,8 @@
+from datetime import UTC, datetime
 from functools import lru_cache
+from typing import Literal
 
-from pydantic import SecretStr, field_validator
+from pydantic import AwareDatetime, SecretStr, field_validator
 from pydantic.fields import Field
 from pydantic_settings import BaseSettings
 
@@ -18,6 +20,57 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = Field(default="", description="PostgreSQL connection URL")
+    # "queue": アプリ側でコネクションを保持する（Direct Connection / Session Pooler）
+    # "pgbouncer": Transaction Pooler 用。プールは pgbouncer に任せ（NullPool）、
+    #              サーバー側プリペアドステートメントを使わない
+    db_pool_mode: Literal["queue", "pgbouncer"] = "queue"
+    db_pool_size: int = Field(default=5, ge=1)
+    db_max_overflow: int = Field(default=10, ge=0)
+    db_pool_timeout: float = Field(default=30.0, gt=0)
+    db_pool_recycle: int = Field(default=-1, ge=-1)  # 秒。-1 で無効
+    db_pool_pre_ping: bool = True
+    # 読み取りレプリカ（JSON 配列）。空ならすべて primary で処理する
+    database_replica_urls: list[str] = []
+    replica_routing_strategy: Literal["round_robin", "least_connections"] = (
+        "round_robin"
+    )
+    # 書き込み後この秒数はそのユーザーの読み取りを primary に固定する（read-your-writes）
+    replica_sticky_seconds: float = Field(default=5.0, ge=0)
+
+    # Plot 変更イベント（SSE）
+    # "memory": プロセス内のみ / "postgres": LISTEN/NOTIFY で全ワーカーに配信
+    event_backend: Literal["memory", "postgres"] = "memory"
+    # LISTEN 用の接続先。Transaction Pooler では LISTEN できないため、
+    # Direct Connection / Session Pooler の URL を指定する（空なら database_url）
+    event_listen_url: str = ""
+
+    # HotOperation の write-behind（グループコミット）。無効なら1リクエスト1commit
+    operation_buffer_enabled: bool = False
+    operation_buffer_flush_interval_ms: float = Field(default=5.0, gt=0)
+    operation_buffer_max_batch: int = Field(default=500, gt=0)
+    operation_buffer_max_queue: int = Field(default=10000, gt=0)
+    operation_buffer_enqueue_timeout_seconds: float = Field(default=1.0, ge=0)
+
+    # 一覧の total 計算戦略（エンドポイント名 → "exact" / "cached" / "estimate" /
+    # "has_more" の JSON）。未指定は total_count.DEFAULT_STRATEGIES
+    total_count_strategies: dict[
+        str, Literal["exact", "cached", "estimate", "has_more"]
+    ] = {}
+    total_count_cache_seconds: float = Field(default=30.0, ge=0)
+
+    # トップページのフィード（popular / new）の再計算間隔（秒）
+    feed_refresh_seconds: float = Field(default=60.0, gt=0)
+    # trending のスコアの半減期（時間）。古いイベントほど寄与が小さくなる
+    trending_half_life_hours: float = Field(default=24.0, gt=0)
+    # trending_score の前方減衰の基準時刻の初期値（services/trending_service 参照）。
+    # 日次の再計算で trending_epoch テーブルの値に置き換わり、以降は使われない
+    trending_epoch: AwareDatetime = datetime(2026, 1, 1, tzinfo=UTC)
+
+    # HotOperation TTL purge
+    hot_operation_purge_batch_size: int = Field(default=5000, gt=0)
+    hot_operation_purge_sleep_seconds: float = Field(default=0.1, ge=0)
+    # hot_operations を日次パーティション化している場合のみ true にする
+    hot_operations_partitioned: bool = False
 
     # App
     app_name: str = "Plot Platform API"
@@ -32,7 +85,25 @@ class Settings(BaseSettings):
     max_image_width: int = Field(default=1920, gt=0)
     jpeg_quality: int = Field(default=85, ge=1, le=95)
 
+    # アップロード処理の実行先（services/image_processor）。"process" は Pillow の
+    # リサイズ・エンコードを別プロセスで行い、API スレッドと GIL を奪い合わない
+    image_processing_backend: Literal["thread", "process"] = "thread"
     image_processing_max_workers: int = Field(default=4, ge=1, le=32)
+    # ワーカーが埋まっているときに待たせる件数。超えたら 503 + Retry-After
+    image_processing_max_queue: int = Field(default=8, ge=0)
+    image_processing_retry_after_seconds: int = Field(default=2, ge=1)
+    # アップロード時に生成する縮小版の幅（max_image_width 未満のみ有効）と、
+    # 併せて生成する形式（Pillow が対応していない形式は無視される）
+    image_variant_widths: list[int] = [160, 480, 960]
+    image_variant_formats: list[Literal["webp", "avif"]] = ["webp"]
+
+    # GET /images のキャッシュ（services/image_cache）
+    # メモリ LRU の合計上限と、メモリに載せる画像1枚の上限（バイト）。0 で無効
+    image_cache_memory_bytes: int = Field(default=64 * 1024 * 1024, ge=0)
+    image_cache_memory_item_max_bytes: int = Field(default=256 * 1024, ge=0)
+    # ディスクキャッシュの場所（空ならシステムの一時ディレクトリ配下）と合計上限。0 で無効
+    image_cache_dir: str = ""
+    image_cache_disk_bytes: int = Field(default=1024 * 1024 * 1024, ge=0)
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
@@ -1,20 +1,73 @@
-from collections.abc import Generator
+import uuid
+from collections.abc import AsyncGenerator, Generator
 from functools import lru_cache
+from typing import Any
 
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, create_engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
 
-from app.core.config import get_settings
+from app.core import pool_metrics
+from app.core.config import Settings, get_settings
 
 settings = get_settings()
 
 
+def _engine_options(
+    settings: Settings, *, is_async: bool, name: str | None = None
+) -> dict[str, Any]:
+    """Settings のプール設定から create_engine / create_async_engine の引数を組み立てる。
+
+    name はメトリクス上のエンジン名（省略時は "primary" / "async"）。
+    """
+    if settings.debug:
+        connect_args: dict[str, Any] = {}
+    else:
+        # asyncpg は sslmode ではなく ssl を受け取る
+        connect_args = {"ssl": "require"} if is_async else {"sslmode": "require"}
+
+    options: dict[str, Any] = {
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+    if settings.db_pool_mode == "pgbouncer":
+        # Transaction Pooler はトランザクション単位でサーバー接続を付け替えるため、
+        # アプリ側ではプールせず、プリペアドステートメントも使わない
+        pool_cls: type[Pool] = NullPool
+        if is_async:
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: (
+                f"__asyncpg_{uuid.uuid4()}__"
+            )
+    else:
+        pool_cls = AsyncAdaptedQueuePool if is_async else QueuePool
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+
+    if name is None:
+        name = "async" if is_async else "primary"
+    options["poolclass"] = pool_metrics.instrumented_pool_class(pool_cls, name)
+    return options
+
+
 @lru_cache
 def get_engine() -> Engine:
     """データベースエンジンを遅延初期化で作成。
 
     モジュールインポート時ではなく、実際にDB接続が必要になった時点で作成される。
     これにより、環境変数未設定時のクラッシュを防ぎ、テスト時にモックしやすくなる。
+    プール設定は Settings.db_pool_* で変更できる。
     """
     settings = get_settings()
 
@@ -25,13 +78,11 @@ def get_engine() -> Engine:
             "For Supabase, use the Transaction Pooler URL (port 6543)."
         )
 
-    return create_engine(
-        settings.database_url,
-        pool_pre_ping=True,
-        pool_size=5,
-        max_overflow=10,
-        connect_args={} if settings.debug else {"sslmode": "require"},
+    engine = create_engine(
+        settings.database_url, **_engine_options(settings, is_async=False)
     )
+    pool_metrics.attach_pool_listeners(engine.pool, "primary")
+    return engine
 
 
 class Base(DeclarativeBase):
@@ -53,3 +104,55 @@ def get_db() -> Generator[Session]:
         yield db
     finally:
         db.close()
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Async (asyncpg) - ポーリングされる読み取り系エンドポイント用
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def to_async_url(database_url: str) -> str:
+    """同期用の DATABASE_URL を asyncpg ドライバの URL に変換する。
+
+    postgresql:// / postgresql+psycopg2:// → postgresql+asyncpg://
+    それ以外（テスト用 sqlite+aiosqlite など）はそのまま返す。
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """非同期エンジンを遅延初期化で作成。接続設定は get_engine() と揃える。"""
+    settings = get_settings()
+
+    if not settings.database_url:
+        raise RuntimeError(
+            "DATABASE_URL is not configured. "
+            "Please set the DATABASE_URL environment variable."
+        )
+
+    engine = create_async_engine(
+        to_async_url(settings.database_url),
+        **_engine_options(settings, is_async=True),
+    )
+    pool_metrics.attach_pool_listeners(engine.sync_engine.pool, "async")
+    return engine
+
+
+@lru_cache
+def get_async_session_local() -> async_sessionmaker[AsyncSession]:
+    """AsyncSessionLocal を遅延初期化で作成。
+
+    expire_on_commit=False: commit 後の属性アクセスで暗黙の IO が走らないようにする
+    （AsyncSession では暗黙の遅延ロードはエラーになる）。
+    """
+    return async_sessionmaker(
+        bind=get_async_engine(), autoflush=False, expire_on_commit=False
+    )
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession]:
+    AsyncSessionLocal = get_async_session_local()
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,301 @@
+"""Plot 変更イベントの pub/sub（SSE 変更フィード用）。
+
+編集系サービスが publish_plot_event() でイベントを発行し、
+GET /plots/{plot_id}/events（SSE）の購読者に配信する。
+クライアントはイベントを受けて変更されたリソースだけを再取得する。
+
+バックエンド（Settings.event_backend）:
+- "memory": 同一プロセス内の購読者にのみ配信する（ワーカー1つ・開発用）
+- "postgres": 発行時に同じトランザクションで pg_notify() し、各ワーカーの
+  LISTEN 接続（PostgresEventListener）が受信してプロセス内の購読者に配信する
+
+どちらのバックエンドでも、イベントはトランザクションの commit 時にだけ配信され、
+rollback されたイベントは配信されない。
+"""
+
+import asyncio
+import contextlib
+import itertools
+import json
+import logging
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event, make_url, text
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# LISTEN / NOTIFY のチャンネル名
+PG_CHANNEL = "plot_events"
+# 購読者ごとのキュー上限。溢れたら溜まった分を捨てて "resync" を送る
+SUBSCRIBER_QUEUE_SIZE = 100
+# 無通信時にコメント行を送る間隔（プロキシのアイドルタイムアウト対策）
+HEARTBEAT_SECONDS = 15.0
+# 切断時のクライアント再接続待ち（SSE の retry フィールド）
+CLIENT_RETRY_MS = 3000
+
+# Session.info に commit 待ちのイベントを積むキー
+_PENDING_KEY = "pending_plot_events"
+
+
+@dataclass(frozen=True)
+class PlotEvent:
+    """1件の変更イベント。data には変更後の version などを入れる。"""
+
+    plot_id: str
+    type: str
+    data: dict[str, Any] = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"plotId": self.plot_id, "type": self.type, "data": self.data},
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, payload: str) -> "PlotEvent":
+        raw = json.loads(payload)
+        return cls(plot_id=raw["plotId"], type=raw["type"], data=raw.get("data", {}))
+
+
+class Subscription:
+    """1つの SSE 接続の受信キュー。イベントループのスレッドからのみ操作する。"""
+
+    def __init__(self, plot_id: str, loop: asyncio.AbstractEventLoop) -> None:
+        self.plot_id = plot_id
+        self.loop = loop
+        self.queue: asyncio.Queue[PlotEvent] = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+
+    def push(self, plot_event: PlotEvent) -> None:
+        try:
+            self.queue.put_nowait(plot_event)
+        except asyncio.QueueFull:
+            # 読み出しが追いつかない接続は差分を諦め、全体の再取得を促す
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(PlotEvent(self.plot_id, "resync"))
+
+    async def get(self, timeout: float) -> PlotEvent | None:
+        """次のイベントを待つ。timeout 秒以内に来なければ None。"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class EventBroker:
+    """plot_id → 購読者 の管理。dispatch() はどのスレッドからでも呼べる。"""
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, plot_id: UUID | str) -> Subscription:
+        """購読を開始する。実行中のイベントループ内から呼ぶこと。"""
+        subscription = Subscription(str(plot_id), asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(subscription.plot_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.plot_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.plot_id]
+
+    def subscriber_count(self, plot_id: UUID | str | None = None) -> int:
+        with self._lock:
+            if plot_id is not None:
+                return len(self._subscribers.get(str(plot_id), ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+    def subscribed_plot_ids(self) -> list[str]:
+        with self._lock:
+            return list(self._subscribers)
+
+    def dispatch(self, plot_event: PlotEvent) -> None:
+        """購読者のイベントループにイベントを渡す。"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(plot_event.plot_id, ()))
+        for subscription in subscribers:
+            # ループ終了済み（シャットダウン中）の購読者は無視する
+            with contextlib.suppress(RuntimeError):
+                subscription.loop.call_soon_threadsafe(subscription.push, plot_event)
+
+
+_broker = EventBroker()
+
+
+def get_broker() -> EventBroker:
+    return _broker
+
+
+# ─── 発行 ──────────────────────────────────────────────────────
+def publish_plot_event(
+    db: Session, plot_id: UUID | str, event_type: str, data: dict[str, Any]
+) -> None:
+    """変更イベントを db の現在のトランザクションに紐づけて発行する。
+
+    commit 時に配信され、rollback されたら破棄される。commit は呼び出し側の責務。
+    """
+    plot_event = PlotEvent(str(plot_id), event_type, data)
+    if (
+        get_settings().event_backend == "postgres"
+        and db.get_bind().dialect.name == "postgresql"
+    ):
+        # NOTIFY はトランザクション内で発行すると commit 時に配信される
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": PG_CHANNEL, "payload": plot_event.to_json()},
+        )
+        return
+    db.info.setdefault(_PENDING_KEY, []).append(plot_event)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_pending_events(session: Session) -> None:
+    for plot_event in session.info.pop(_PENDING_KEY, ()):
+        _broker.dispatch(plot_event)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+# ─── SSE ───────────────────────────────────────────────────────
+_event_ids = itertools.count(1)
+
+
+def format_sse(
+    event_type: str, data: dict[str, Any], event_id: int | None = None
+) -> str:
+    """SSE の1メッセージを組み立てる。"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def sse_stream(
+    subscription: Subscription,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    ready_data: dict[str, Any],
+    *,
+    heartbeat_seconds: float = HEARTBEAT_SECONDS,
+) -> AsyncIterator[str]:
+    """購読中のイベントを SSE 形式で流す。切断されたら購読を解除して終了する。
+
+    最初に "ready"（現在の version など）を送る。イベント ID はプロセス内の連番で、
+    Last-Event-ID による再送はしないため、再接続したクライアントは
+    "ready" を受けた時点で必要なリソースを再取得する。
+    """
+    try:
+        yield f"retry: {CLIENT_RETRY_MS}\n" + format_sse("ready", ready_data)
+        while not await is_disconnected():
+            plot_event = await subscription.get(heartbeat_seconds)
+            if plot_event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(plot_event.type, plot_event.data, next(_event_ids))
+    finally:
+        _broker.unsubscribe(subscription)
+
+
+# ─── PostgreSQL LISTEN ─────────────────────────────────────────
+class PostgresEventListener:
+    """LISTEN plot_events で他ワーカーのイベントを受信し、プロセス内に配信する。
+
+    接続が切れた場合は指数バックオフで再接続する。切断中のイベントは失われるため、
+    再接続時には全購読者に "resync" を送る。
+    """
+
+    def __init__(self, dsn: str) -> None:
+        self._dsn = dsn
+        self._conn: Any = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+
+    async def _run(self) -> None:
+        import asyncpg
+
+        backoff = 1.0
+        reconnect = False
+        while not self._stopping:
+            try:
+                self._conn = await asyncpg.connect(self._dsn)
+                await self._conn.add_listener(PG_CHANNEL, self._on_notify)
+                logger.info("Listening for plot events on %s", PG_CHANNEL)
+                if reconnect:
+                    self._resync_all()
+                backoff = 1.0
+                while not self._conn.is_closed():
+                    await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Plot event listener connection failed")
+            reconnect = True
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def _on_notify(self, conn: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            _broker.dispatch(PlotEvent.from_json(payload))
+        except (ValueError, KeyError):
+            logger.warning("Ignoring malformed plot event payload: %s", payload)
+
+    def _resync_all(self) -> None:
+        for plot_id in _broker.subscribed_plot_ids():
+            _broker.dispatch(PlotEvent(plot_id, "resync"))
+
+
+_listener: PostgresEventListener | None = None
+
+
+def _listen_dsn() -> str:
+    """asyncpg.connect() 用の DSN（ドライバ指定なし）を返す。"""
+    settings = get_settings()
+    url = make_url(settings.event_listen_url or settings.database_url)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def start_event_listener() -> None:
+    """event_backend が "postgres" の場合に LISTEN を開始する（lifespan startup 用）。"""
+    global _listener
+    if get_settings().event_backend != "postgres" or _listener is not None:
+        return
+    _listener = PostgresEventListener(_listen_dsn())
+    await _listener.start()
+
+
+async def stop_event_listener() -> None:
+    """LISTEN を停止する（lifespan shutdown 用）。"""
+    global _listener
+    if _listener is not None:
+        await _listener.stop()
+        _listener = None
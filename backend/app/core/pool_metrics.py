@@ -0,0 +1,159 @@
+"""コネクションプールのメトリクス収集。
+
+database.py がエンジン作成時に instrumented_pool_class() でプールクラスを差し替え、
+attach_pool_listeners() でプールイベントを購読する。
+集計結果は snapshot() で取得し、管理者向けエンドポイントから公開する。
+
+収集する値:
+- checked_out / overflow / size: プールの現在値（QueuePool のみ）
+- checkouts / connects / timeouts: 累積カウンタ
+- invalidations: 無効化された接続数（pre-ping 失敗・切断検知を含む）
+- wait_ms: 接続取得待ち時間のヒストグラム（累積バケット）
+"""
+
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+# 接続取得待ち時間ヒストグラムのバケット上限（ミリ秒）
+WAIT_BUCKETS_MS: tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """1つのエンジン（プール）分のメトリクス。スレッドセーフ。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.pool: Pool | None = None
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+        # 最後の要素は +Inf バケット
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def observe_wait(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_sum_ms += elapsed_ms
+            self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+            for i, upper in enumerate(WAIT_BUCKETS_MS):
+                if elapsed_ms <= upper:
+                    self.wait_buckets[i] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+
+    def increment(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> dict[str, Any]:
+        """現在値と累積値を JSON 化可能な dict で返す。"""
+        with self._lock:
+            # Prometheus 形式に合わせて累積バケットにする
+            cumulative = []
+            running = 0
+            for upper, count in zip(
+                [*WAIT_BUCKETS_MS, "+Inf"], self.wait_buckets, strict=True
+            ):
+                running += count
+                cumulative.append({"le": upper, "count": running})
+
+            result: dict[str, Any] = {
+                "poolClass": type(self.pool).__name__ if self.pool else None,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+                "waitMs": {
+                    "count": self.wait_count,
+                    "sum": round(self.wait_sum_ms, 3),
+                    "max": round(self.wait_max_ms, 3),
+                    "buckets": cumulative,
+                },
+            }
+
+        if isinstance(self.pool, QueuePool):
+            result.update(
+                size=self.pool.size(),
+                checkedOut=self.pool.checkedout(),
+                checkedIn=self.pool.checkedin(),
+                overflow=self.pool.overflow(),
+            )
+        return result
+
+
+# エンジン名（"primary", "async" など）→ PoolMetrics
+_registry: dict[str, PoolMetrics] = {}
+_registry_lock = threading.Lock()
+
+
+def get_pool_metrics(name: str) -> PoolMetrics:
+    """名前に対応する PoolMetrics を返す（なければ作成）。"""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = PoolMetrics()
+        return _registry[name]
+
+
+def snapshot() -> dict[str, dict[str, Any]]:
+    """登録済みの全プールのメトリクスを返す。"""
+    with _registry_lock:
+        items = list(_registry.items())
+    return {name: metrics.snapshot() for name, metrics in items}
+
+
+def reset() -> None:
+    """全メトリクスを破棄する（テスト・エンジン再作成用）。"""
+    with _registry_lock:
+        _registry.clear()
+
+
+def instrumented_pool_class(pool_cls: type[Pool], name: str) -> type[Pool]:
+    """接続取得待ち時間を計測するプールクラスを返す。
+
+    SQLAlchemy にはチェックアウト開始のイベントがないため、
+    プールの _do_get() をラップして待ち時間とタイムアウトを記録する。
+    """
+    metrics = get_pool_metrics(name)
+
+    class _InstrumentedPool(pool_cls):  # type: ignore[valid-type,misc]
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except PoolTimeoutError:
+                metrics.increment("timeouts")
+                raise
+            finally:
+                metrics.observe_wait((time.perf_counter() - start) * 1000)
+
+    _InstrumentedPool.__name__ = pool_cls.__name__
+    _InstrumentedPool.__qualname__ = pool_cls.__qualname__
+    return _InstrumentedPool
+
+
+def attach_pool_listeners(pool: Pool, name: str) -> None:
+    """プールイベントを購読してカウンタを更新する。"""
+    metrics = get_pool_metrics(name)
+    metrics.pool = pool
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy) -> None:
+        metrics.increment("checkouts")
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_conn, record) -> None:
+        metrics.increment("connects")
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_conn, record, exception) -> None:
+        metrics.increment("invalidations")
@@ -0,0 +1,187 @@
+"""読み取りレプリカへのルーティング。
+
+Settings.database_replica_urls が設定されている場合、読み取り専用の
+エンドポイント（trending / popular / search / Plot 詳細）のセッションを
+レプリカに振り分ける。未設定なら primary をそのまま使う。
+
+- 振り分け: round_robin（順番）/ least_connections（処理中セッション数が最小）
+- read-your-writes: ユーザーが書き込み系リクエストを送ってから
+  replica_sticky_seconds 秒間は、そのユーザーの読み取りを primary に固定し、
+  レプリカ遅延で自分の編集が見えなくなるのを防ぐ
+
+NOTE: スティッキー情報はプロセス内に保持する。複数ワーカー構成では
+別ワーカーに振られた読み取りはスティッキーにならないため、
+replica_sticky_seconds はレプリカ遅延より十分長めに設定すること。
+"""
+
+import itertools
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import Literal
+from uuid import UUID
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core import pool_metrics
+from app.core.config import get_settings
+from app.core.database import _engine_options, to_async_url
+
+
+class ReplicaBalancer[T]:
+    """レプリカ（sessionmaker など）の選択と処理中セッション数の管理。スレッドセーフ。"""
+
+    def __init__(
+        self,
+        targets: list[T],
+        strategy: Literal["round_robin", "least_connections"] = "round_robin",
+    ) -> None:
+        if not targets:
+            raise ValueError("At least one replica is required")
+        self.targets = targets
+        self.strategy = strategy
+        self.in_flight = [0] * len(targets)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> int:
+        """使用するレプリカのインデックスを選び、処理中数を加算して返す。"""
+        with self._lock:
+            if self.strategy == "least_connections":
+                # 同数ならラウンドロビン順で先のものを選び、偏りを避ける
+                start = next(self._counter) % len(self.targets)
+                order = [
+                    (start + i) % len(self.targets) for i in range(len(self.targets))
+                ]
+                index = min(order, key=lambda i: self.in_flight[i])
+            else:
+                index = next(self._counter) % len(self.targets)
+            self.in_flight[index] += 1
+            return index
+
+    def release(self, index: int) -> None:
+        with self._lock:
+            self.in_flight[index] -= 1
+
+
+# ─── read-your-writes ──────────────────────────────────
+# user_id → primary 固定を解除する時刻（time.monotonic()）
+_recent_writers: dict[UUID, float] = {}
+_recent_writers_lock = threading.Lock()
+
+
+def mark_user_write(user_id: UUID) -> None:
+    """ユーザーの書き込みを記録し、一定時間その読み取りを primary に固定する。"""
+    sticky_seconds = get_settings().replica_sticky_seconds
+    if sticky_seconds <= 0:
+        return
+    now = time.monotonic()
+    with _recent_writers_lock:
+        _recent_writers[user_id] = now + sticky_seconds
+        # 期限切れエントリを掃除してメモリの増加を防ぐ
+        if len(_recent_writers) > 1000:
+            for uid in [u for u, exp in _recent_writers.items() if exp <= now]:
+                del _recent_writers[uid]
+
+
+def is_sticky_to_primary(user_id: UUID | None) -> bool:
+    """ユーザーが直近に書き込んでいて、primary から読むべきなら True。"""
+    if user_id is None:
+        return False
+    with _recent_writers_lock:
+        expires_at = _recent_writers.get(user_id)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del _recent_writers[user_id]
+            return False
+        return True
+
+
+def clear_recent_writes() -> None:
+    """スティッキー情報を破棄する（テスト用）。"""
+    with _recent_writers_lock:
+        _recent_writers.clear()
+
+
+# ─── Replica engines ──────────────────────────────────
+@lru_cache
+def get_replica_balancer() -> ReplicaBalancer[sessionmaker] | None:
+    """同期レプリカの sessionmaker を遅延初期化で作成。レプリカ未設定なら None。"""
+    settings = get_settings()
+    if not settings.database_replica_urls:
+        return None
+
+    factories = []
+    for i, url in enumerate(settings.database_replica_urls):
+        name = f"replica-{i}"
+        engine = create_engine(
+            url, **_engine_options(settings, is_async=False, name=name)
+        )
+        pool_metrics.attach_pool_listeners(engine.pool, name)
+        factories.append(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    return ReplicaBalancer(factories, settings.replica_routing_strategy)
+
+
+@lru_cache
+def get_async_replica_balancer() -> ReplicaBalancer[async_sessionmaker] | None:
+    """非同期レプリカの async_sessionmaker を遅延初期化で作成。未設定なら None。"""
+    settings = get_settings()
+    if not settings.database_replica_urls:
+        return None
+
+    factories = []
+    for i, url in enumerate(settings.database_replica_urls):
+        name = f"replica-{i}-async"
+        engine = create_async_engine(
+            to_async_url(url), **_engine_options(settings, is_async=True, name=name)
+        )
+        pool_metrics.attach_pool_listeners(engine.sync_engine.pool, name)
+        factories.append(
+            async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        )
+    return ReplicaBalancer(factories, settings.replica_routing_strategy)
+
+
+@contextmanager
+def replica_session(balancer: ReplicaBalancer[sessionmaker]) -> Generator[Session]:
+    """レプリカを1つ選んでセッションを開く。"""
+    index = balancer.acquire()
+    try:
+        with balancer.targets[index]() as db:
+            yield db
+    finally:
+        balancer.release(index)
+
+
+@asynccontextmanager
+async def async_replica_session(
+    balancer: ReplicaBalancer[async_sessionmaker],
+) -> AsyncGenerator[AsyncSession]:
+    """レプリカを1つ選んで AsyncSession を開く。"""
+    index = balancer.acquire()
+    try:
+        async with balancer.targets[index]() as db:
+            yield db
+    finally:
+        balancer.release(index)
+
+
+async def dispose_replicas() -> None:
+    """作成済みのレプリカエンジンを解放する（lifespan shutdown 用）。"""
+    if get_replica_balancer.cache_info().currsize:
+        balancer = get_replica_balancer()
+        if balancer is not None:
+            for factory in balancer.targets:
+                factory.kw["bind"].dispose()
+    if get_async_replica_balancer.cache_info().currsize:
+        async_balancer = get_async_replica_balancer()
+        if async_balancer is not None:
+            for factory in async_balancer.targets:
+                await factory.kw["bind"].dispose()
+    get_replica_balancer.cache_clear()
+    get_async_replica_balancer.cache_clear()
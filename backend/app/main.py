@@ -13,9 +13,19 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.api.v1.api import api_router
 from app.core.config import get_settings
-from app.core.database import get_engine, get_session_local
+from app.core.database import (
+    get_async_engine,
+    get_async_session_local,
+    get_engine,
+    get_session_local,
+)
+from app.core.events import start_event_listener, stop_event_listener
+from app.core.replica import dispose_replicas
 from app.core.supabase import get_supabase_client
 from app.services import image_service
+from app.services.feed_service import start_feed_scheduler
+from app.services.image_processor import start_image_processor, stop_image_processor
+from app.services.operation_buffer import start_operation_buffer, stop_operation_buffer
 from app.services.snapshot_cleanup import start_snapshot_cleanup
 from app.services.snapshot_scheduler import start_snapshot_scheduler
 
@@ -68,13 +78,28 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
         )
     start_snapshot_scheduler()
     start_snapshot_cleanup()
+    start_feed_scheduler()
+    await start_event_listener()
+    start_operation_buffer()
+    start_image_processor()
 
     yield
 
+    # 未フラッシュの操作を書き切ってからイベント配信・DB を止める
+    stop_operation_buffer()
+    await stop_event_listener()
+    stop_image_processor()
+
     # --- shutdown ---
     get_engine().dispose()
     get_engine.cache_clear()
     get_session_local.cache_clear()
+    # 非同期エンジンは使われた場合のみ作成されているので、その場合だけ解放する
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+    get_async_engine.cache_clear()
+    get_async_session_local.cache_clear()
+    await dispose_replicas()
     get_supabase_client.cache_clear()
     logger.info("Shutdown complete – DB connections disposed")
 
@@ -104,6 +129,8 @@ async def http_exception_handler(
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        # Retry-After / WWW-Authenticate などエンドポイントが指定したヘッダーを保持する
+        headers=exc.headers,
     )
 
 
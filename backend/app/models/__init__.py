@@ -4,10 +4,14 @@ from typing import Any
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
@@ -37,6 +41,8 @@ class User(Base):
 
 class Plot(Base):
     __tablename__ = "plots"
+    # キーセットページング（services/pagination）用
+    __table_args__ = (Index("ix_plots_created_at_id", "created_at", "id"),)
 
     id: Mapped[_uuid_mod.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=_uuid_mod.uuid4
@@ -58,6 +64,21 @@ class Plot(Base):
     # while Section.version counts content edits.
     version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     thumbnail_url: Mapped[str | None] = mapped_column(String, nullable=True)
+    # stars の件数の非正規化カウンタ。star_service.add_star / remove_star が
+    # 同じトランザクションで増減し、star_service.reconcile_star_counts が補正する。
+    # 人気順（plot_service.list_popular）のソート用にインデックスを張る
+    star_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False, index=True
+    )
+    # スター・フォーク・コメントを時間減衰させた急上昇スコア（前方減衰で保持）。
+    # trending_service.bump が同じトランザクションで加算し、
+    # 急上昇順（plot_service.list_trending）はこのインデックスを降順に読む
+    trending_score: Mapped[float] = mapped_column(
+        Float, default=0.0, server_default="0", nullable=False, index=True
+    )
+    # 全セクションから抽出したプレーンテキスト（検索用。スナップショットバッチで更新）
+    # PostgreSQL では search_vector / search_text の生成列の元になる（マイグレーション参照）
+    section_text: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -94,6 +115,15 @@ class Section(Base):
     )
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     content: Mapped[Any] = mapped_column(JSON, nullable=True)
+    # Copy-on-write reference into section_blobs. When set, the content lives in
+    # the blob store and `content` is NULL (forked / rolled back, not yet edited).
+    # Read through blob_service.section_content() instead of `content` directly.
+    content_hash: Mapped[str | None] = mapped_column(
+        String(64),
+        ForeignKey("section_blobs.hash"),
+        nullable=True,
+        index=True,
+    )
     order_index: Mapped[int] = mapped_column(Integer, default=0)
     version: Mapped[int] = mapped_column(Integer, default=1)
     created_at: Mapped[datetime] = mapped_column(
@@ -108,6 +138,12 @@ class Section(Base):
 
 class HotOperation(Base):
     __tablename__ = "hot_operations"
+    # キーセットページング（services/pagination）用: (フィルタ列, created_at, id)
+    __table_args__ = (
+        Index(
+            "ix_hot_operations_section_created_at_id", "section_id", "created_at", "id"
+        ),
+    )
 
     id: Mapped[_uuid_mod.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=_uuid_mod.uuid4
@@ -129,8 +165,9 @@ class HotOperation(Base):
         index=True,
     )
     version: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Indexed for the chunked TTL purge (history_service.delete_expired_hot_operations)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), server_default=func.now(), index=True
     )
 
     user: Mapped["User"] = relationship("User")
@@ -138,6 +175,10 @@ class HotOperation(Base):
 
 class ColdSnapshot(Base):
     __tablename__ = "cold_snapshots"
+    # キーセットページング（services/pagination）用: (フィルタ列, created_at, id)
+    __table_args__ = (
+        Index("ix_cold_snapshots_plot_created_at_id", "plot_id", "created_at", "id"),
+    )
 
     id: Mapped[_uuid_mod.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=_uuid_mod.uuid4
@@ -150,6 +191,17 @@ class ColdSnapshot(Base):
     )
     content: Mapped[Any] = mapped_column(JSON, nullable=True)
     version: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Delta snapshots reference the keyframe they were encoded against.
+    # NULL means this row is a keyframe (full plot JSON in `content`).
+    base_snapshot_id: Mapped[_uuid_mod.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("cold_snapshots.id", ondelete="CASCADE"),
+        nullable=True,
+        index=True,
+    )
+    # Keyframes only: {section_id: version} manifest used to encode later deltas
+    # without loading the keyframe's full content.
+    section_versions: Mapped[Any] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -158,10 +210,152 @@ class ColdSnapshot(Base):
     rollback_logs: Mapped[list["RollbackLog"]] = relationship(
         "RollbackLog", back_populates="snapshot"
     )
+    blob_refs: Mapped[list["SnapshotBlobRef"]] = relationship(
+        "SnapshotBlobRef", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+
+class SnapshotDirtyPlot(Base):
+    """Durable queue of plots edited since their last ColdSnapshot.
+
+    Written in the same transaction as the edit (see
+    snapshot_scheduler.mark_plot_dirty) and drained by the snapshot batch.
+    Repeated edits bump dirty_seq on the same row; the batch only deletes the
+    row if dirty_seq is unchanged, so edits made while snapshotting are kept.
+    """
+
+    __tablename__ = "snapshot_dirty_plots"
+
+    plot_id: Mapped[_uuid_mod.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("plots.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    dirty_seq: Mapped[int] = mapped_column(BigInteger, default=1, nullable=False)
+    # Set on first mark only, so a continuously edited plot keeps its place
+    first_marked_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
+
+
+class FeedRanking(Base):
+    """Precomputed front-page feeds (trending / popular / new).
+
+    Rebuilt every few seconds by feed_service.refresh_feeds; each feed is
+    replaced in a single transaction. Reading the top N of a feed is a
+    primary-key range scan instead of aggregating stars per request.
+    """
+
+    __tablename__ = "feed_rankings"
+
+    feed: Mapped[str] = mapped_column(String(20), primary_key=True)
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True)
+    plot_id: Mapped[_uuid_mod.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("plots.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+
+class TrendingEpoch(Base):
+    """Current forward-decay epoch of plots.trending_score (single row, id=1).
+
+    trending_service.rebuild_trending_scores moves it to the rebuild time and
+    rescales every score to it in the same transaction, so the
+    2 ** (hours / half_life) weights never grow towards float overflow.
+    Writers that bump a score lock this row (FOR SHARE) before the plot row.
+    """
+
+    __tablename__ = "trending_epoch"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    epoch: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class SectionBlob(Base):
+    """Content-addressed store for section Tiptap JSON.
+
+    hash is the sha256 of the canonical JSON; data is that JSON zlib-compressed.
+    Rows are immutable and shared by snapshots, forks and rollbacks.
+    """
+
+    __tablename__ = "section_blobs"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)  # uncompressed bytes
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    # Set whenever a write reuses the blob (blob_service.touch_blobs); the GC
+    # grace period counts from here so a blob reused by an uncommitted write
+    # is not collected.  NULL means never reused since creation.
+    last_referenced_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+
+class SectionSearchText(Base):
+    """Plain text extracted from a section's Tiptap JSON, for search.
+
+    Derived data: written in the same transaction as edits that change a
+    section's title or body (search_service.index_sections) and backfilled for
+    sections without a row.  section_version is the section version the text was
+    last changed at; hot operations bump sections.version without touching the
+    text and do not re-index.  On PostgreSQL the migration adds a generated
+    tsvector and trigram indexes over title / body.
+    """
+
+    __tablename__ = "section_search_text"
+
+    section_id: Mapped[_uuid_mod.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("sections.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    plot_id: Mapped[_uuid_mod.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("plots.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    title: Mapped[str] = mapped_column(String(200), nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    section_version: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class SnapshotBlobRef(Base):
+    """Blobs referenced by a ColdSnapshot (used by blob garbage collection)."""
+
+    __tablename__ = "snapshot_blob_refs"
+
+    snapshot_id: Mapped[_uuid_mod.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("cold_snapshots.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    blob_hash: Mapped[str] = mapped_column(
+        String(64),
+        ForeignKey("section_blobs.hash"),
+        primary_key=True,
+        index=True,
+    )
 
 
 class RollbackLog(Base):
     __tablename__ = "rollback_logs"
+    # キーセットページング（services/pagination）用: (フィルタ列, created_at, id)
+    __table_args__ = (
+        Index("ix_rollback_logs_plot_created_at_id", "plot_id", "created_at", "id"),
+    )
 
     id: Mapped[_uuid_mod.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=_uuid_mod.uuid4
@@ -282,6 +476,10 @@ class Thread(Base):
 
 class Comment(Base):
     __tablename__ = "comments"
+    # キーセットページング（services/pagination）用: (フィルタ列, created_at, id)
+    __table_args__ = (
+        Index("ix_comments_thread_created_at_id", "thread_id", "created_at", "id"),
+    )
 
     id: Mapped[_uuid_mod.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=_uuid_mod.uuid4
@@ -89,8 +89,12 @@ class PlotListResponse(BaseModel):
 
     items: list[PlotResponse]
     total: int
+    # total が推定値（キャッシュ・プランナ推定・下限）の場合 True
+    totalIsEstimate: bool = False
     limit: int
     offset: int
+    # 次ページのカーソル（?cursor= に渡す）。最終ページなら null
+    nextCursor: str | None = None
 
 
 # ─── Section ─────────────────────────────────────
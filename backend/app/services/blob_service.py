@@ -0,0 +1,264 @@
+"""セクションBlobストア - Tiptap JSON のコンテンツアドレス保存。
+
+同じ Tiptap JSON が sections / cold_snapshots / フォーク先 Plot に重複して
+保存されるのを防ぐため、正規化した JSON の sha256 をキーに
+section_blobs テーブルへ zlib 圧縮して1回だけ保存する。
+
+- スナップショット: セクションごとに "blob": <hash> を保存し、
+  snapshot_blob_refs に参照を記録する
+- フォーク / ロールバック: Section.content_hash に hash を設定し、
+  content は NULL のまま共有する（最初の編集時に content へ実体化）
+- GC: snapshot_cleanup が参照されなくなった Blob を削除する。既存 Blob を
+  再利用する書き込みは touch_blobs で last_referenced_at を更新し、参照の
+  commit 前に GC されないようにする
+
+Blob は不変なので、読み込み用のプロセス内キャッシュは無効化不要。
+"""
+
+import hashlib
+import json
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.models import Section, SectionBlob
+
+# プロセス内 LRU キャッシュの最大エントリ数（解凍済み JSON バイト列を保持）
+BLOB_CACHE_MAX_ENTRIES = 1024
+
+
+class _BlobCache:
+    """hash → 正規化 JSON バイト列 の LRU キャッシュ（スレッドセーフ）。
+
+    dict ではなくバイト列を保持し、取り出しのたびに json.loads するため
+    呼び出し側が戻り値を書き換えてもキャッシュは汚染されない。
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_cache = _BlobCache(BLOB_CACHE_MAX_ENTRIES)
+
+
+def canonical_json(content: Any) -> bytes:
+    """キー順・区切り文字を固定した JSON バイト列を返す（ハッシュの入力）。"""
+    return json.dumps(
+        content, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def compute_hash(data: bytes) -> str:
+    """正規化 JSON バイト列の sha256 を返す。"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def put_blobs(db: Session, contents: list[Any]) -> list[str | None]:
+    """複数の content を Blob として保存し、対応する hash のリストを返す。
+
+    - content が None の要素は None を返す（Blob を作らない）
+    - 既存 Blob は touch_blobs（1回の UPDATE）で GC から守りつつ存在を確認し、
+      未保存分のみ INSERT する
+    - 同時 INSERT は ON CONFLICT DO NOTHING で吸収する
+    commit は呼び出し側の責務。
+    """
+    hashes: list[str | None] = []
+    pending: dict[str, bytes] = {}
+    for content in contents:
+        if content is None:
+            hashes.append(None)
+            continue
+        data = canonical_json(content)
+        blob_hash = compute_hash(data)
+        hashes.append(blob_hash)
+        # Why: キャッシュにあってもGCで削除済みの可能性があるため、存在確認は必ずDBで行う
+        pending[blob_hash] = data
+
+    if pending:
+        existing = touch_blobs(db, pending.keys())
+        rows = [
+            {"hash": h, "data": zlib.compress(data), "size": len(data)}
+            for h, data in pending.items()
+            if h not in existing
+        ]
+        if rows:
+            db.execute(_insert_ignore_conflict(db).values(rows))
+        for h, data in pending.items():
+            _cache.put(h, data)
+
+    return hashes
+
+
+def touch_blobs(db: Session, hashes: Iterable[str]) -> set[str]:
+    """既存 Blob の last_referenced_at を現在時刻にし、存在した hash の集合を返す。
+
+    Blob を新しく参照する書き込みと同じトランザクションで呼ぶ（commit は呼び出し側）。
+    GC は last_referenced_at から猶予期間を数えるため、参照を commit する前に
+    削除されない。更新した行はロックされ、並行する GC の DELETE は commit を
+    待ってから条件を再評価する。GC が先に削除していた Blob は戻り値に含まれない。
+    """
+    wanted = set(hashes)
+    if not wanted:
+        return set()
+    return set(
+        db.execute(
+            update(SectionBlob)
+            .where(SectionBlob.hash.in_(wanted))
+            .values(last_referenced_at=func.now())
+            .returning(SectionBlob.hash)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+
+
+def put_blob(db: Session, content: Any) -> str | None:
+    """単一の content を Blob として保存し、hash を返す。"""
+    return put_blobs(db, [content])[0]
+
+
+def get_blobs(db: Session, hashes: Iterable[str]) -> dict[str, Any]:
+    """hash → content の辞書を返す。キャッシュにないものは1回のクエリで取得する。
+
+    存在しない hash がある場合は ValueError を raise する。
+    """
+    wanted, found, missing = _lookup_cache(hashes)
+    if missing:
+        rows = db.execute(_select_blobs(missing)).all()
+        _fill_cache(found, rows)
+    return _decode_found(wanted, found)
+
+
+async def get_blobs_async(db: AsyncSession, hashes: Iterable[str]) -> dict[str, Any]:
+    """get_blobs の非同期版。"""
+    wanted, found, missing = _lookup_cache(hashes)
+    if missing:
+        rows = (await db.execute(_select_blobs(missing))).all()
+        _fill_cache(found, rows)
+    return _decode_found(wanted, found)
+
+
+def _lookup_cache(
+    hashes: Iterable[str],
+) -> tuple[set[str], dict[str, bytes], list[str]]:
+    wanted = set(hashes)
+    found: dict[str, bytes] = {}
+    missing: list[str] = []
+    for h in wanted:
+        data = _cache.get(h)
+        if data is None:
+            missing.append(h)
+        else:
+            found[h] = data
+    return wanted, found, missing
+
+
+def _select_blobs(hashes: list[str]):
+    return select(SectionBlob.hash, SectionBlob.data).where(
+        SectionBlob.hash.in_(hashes)
+    )
+
+
+def _fill_cache(found: dict[str, bytes], rows) -> None:
+    for h, compressed in rows:
+        data = zlib.decompress(compressed)
+        _cache.put(h, data)
+        found[h] = data
+
+
+def _decode_found(wanted: set[str], found: dict[str, bytes]) -> dict[str, Any]:
+    if len(found) != len(wanted):
+        raise ValueError("Section blob not found")
+    return {h: json.loads(data) for h, data in found.items()}
+
+
+def section_content(section: Section) -> Any:
+    """Section の content を返す。Blob 参照中（content_hash あり）なら Blob から読む。"""
+    if section.content_hash is None:
+        return section.content
+
+    db = object_session(section)
+    if db is None:
+        raise RuntimeError("Section must be attached to a session to load its blob")
+    return get_blobs(db, [section.content_hash])[section.content_hash]
+
+
+def prefetch_section_contents(db: Session, sections: Iterable[Section]) -> None:
+    """Blob 参照中のセクションの content を1回のクエリでキャッシュに載せる（N+1 回避）。"""
+    hashes = {s.content_hash for s in sections if s.content_hash is not None}
+    if hashes:
+        get_blobs(db, hashes)
+
+
+async def section_contents_async(
+    db: AsyncSession, sections: Iterable[Section]
+) -> dict[Any, Any]:
+    """セクションID → content の辞書を返す（AsyncSession 用）。
+
+    AsyncSession では section_content() の同期クエリが使えないため、
+    Blob 参照中のセクションも含めて事前に解決しておく。
+    """
+    sections = list(sections)
+    hashes = {s.content_hash for s in sections if s.content_hash is not None}
+    blobs = await get_blobs_async(db, hashes) if hashes else {}
+    return {
+        s.id: blobs[s.content_hash] if s.content_hash is not None else s.content
+        for s in sections
+    }
+
+
+def hydrate_snapshot_sections(db: Session, content: dict) -> dict:
+    """スナップショット JSON 中の "blob" 参照を "content" に展開した dict を返す。"""
+    sections = content.get("sections", [])
+    hashes = {sec["blob"] for sec in sections if sec.get("blob")}
+    blobs = get_blobs(db, hashes) if hashes else {}
+
+    hydrated = []
+    for sec in sections:
+        entry = {k: v for k, v in sec.items() if k != "blob"}
+        if "blob" in sec:
+            entry["content"] = blobs[sec["blob"]] if sec["blob"] else None
+        hydrated.append(entry)
+
+    return {**content, "sections": hydrated}
+
+
+def _insert_ignore_conflict(db: Session):
+    """dialect に応じた INSERT ... ON CONFLICT (hash) DO NOTHING 文を返す。"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        return pg_insert(SectionBlob).on_conflict_do_nothing(index_elements=["hash"])
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        return sqlite_insert(SectionBlob).on_conflict_do_nothing(
+            index_elements=["hash"]
+        )
+    return insert(SectionBlob)
@@ -0,0 +1,169 @@
+"""Feed service - precomputed popular / new feeds.
+
+トップページの /plots/popular・/plots/new はアクセスのたびにクエリしていたため、
+バックグラウンドジョブで上位 FEED_SIZE 件の Plot ID をフィードごとに
+feed_rankings テーブルへ書き出し、エンドポイントは主キー順に limit 件読むだけにする。
+（trending は Plot.trending_score をイベントごとに更新するため対象外。
+trending_service 参照）
+
+- APScheduler IntervalTrigger（Settings.feed_refresh_seconds 秒ごと）
+- popular: Plot.star_count の降順
+- new: 作成日時の降順
+- 各フィードは1トランザクションで入れ替えるため、読み取り側は常に
+  どちらか一方の完全な結果を見る
+- 複数ワーカーで同時に動いた場合、PostgreSQL ではアドバイザリーロックで
+  1つだけが再計算する
+- まだ一度も計算されていない（行がない）フィードはその場で従来のクエリで返す
+  （デプロイ直後の最初の再計算まで）
+"""
+
+import logging
+from datetime import UTC, datetime
+from uuid import UUID
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models import FeedRanking, Plot
+from app.services import plot_service
+
+logger = logging.getLogger(__name__)
+
+FEEDS = ("popular", "new")
+
+# フィードごとに保存する件数（エンドポイントの limit の上限と同じ）
+FEED_SIZE = 100
+
+# 複数ワーカーでの同時再計算を防ぐ pg_try_advisory_xact_lock のキー
+FEED_REFRESH_LOCK_KEY = 0x46454544  # "FEED"
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite は tz なしで返すため UTC として扱う。"""
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+def compute_popular(db: Session) -> list[tuple[UUID, float]]:
+    """Plot.star_count（インデックス）の上位を返す。"""
+    rows = db.execute(
+        select(Plot.id, Plot.star_count)
+        .order_by(Plot.star_count.desc(), Plot.id.desc())
+        .limit(FEED_SIZE)
+    ).all()
+    return [(plot_id, float(count)) for plot_id, count in rows]
+
+
+def compute_new(db: Session) -> list[tuple[UUID, float]]:
+    """作成日時の新しい Plot を返す。スコアは作成日時の UNIX 時刻。"""
+    rows = db.execute(
+        select(Plot.id, Plot.created_at)
+        .order_by(Plot.created_at.desc(), Plot.id.desc())
+        .limit(FEED_SIZE)
+    ).all()
+    return [(plot_id, _as_utc(created_at).timestamp()) for plot_id, created_at in rows]
+
+
+def refresh_feeds(db: Session, now: datetime | None = None) -> dict[str, int]:
+    """全フィードを再計算して feed_rankings を入れ替え、フィードごとの件数を返す。
+
+    他のワーカーが再計算中の場合は何もせず空の dict を返す（PostgreSQL のみ）。
+    """
+    now = now or datetime.now(UTC)
+    if db.get_bind().dialect.name == "postgresql":
+        locked = db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"),
+            {"key": FEED_REFRESH_LOCK_KEY},
+        ).scalar()
+        if not locked:
+            db.rollback()
+            return {}
+
+    computed = {
+        "popular": compute_popular(db),
+        "new": compute_new(db),
+    }
+
+    for feed, ranked in computed.items():
+        db.execute(delete(FeedRanking).where(FeedRanking.feed == feed))
+        if ranked:
+            db.execute(
+                insert(FeedRanking),
+                [
+                    {
+                        "feed": feed,
+                        "rank": rank,
+                        "plot_id": plot_id,
+                        "score": score,
+                        "computed_at": now,
+                    }
+                    for rank, (plot_id, score) in enumerate(ranked)
+                ],
+            )
+    db.commit()
+    return {feed: len(ranked) for feed, ranked in computed.items()}
+
+
+def get_feed(db: Session, feed: str, limit: int) -> list[Plot]:
+    """フィードの上位 limit 件の Plot を順位順に返す。
+
+    feed_rankings にまだ行がない場合（初回計算前）は従来のクエリで返す。
+    """
+    plots = (
+        db.query(Plot)
+        .join(FeedRanking, FeedRanking.plot_id == Plot.id)
+        .filter(FeedRanking.feed == feed)
+        .order_by(FeedRanking.rank)
+        .limit(limit)
+        .all()
+    )
+    if plots:
+        return plots
+
+    if feed == "popular":
+        return plot_service.list_popular(db, limit)
+    return plot_service.list_new(db, limit)
+
+
+def start_feed_scheduler() -> None:
+    """Start the feed refresh scheduler (APScheduler IntervalTrigger).
+
+    main.py の lifespan から呼び出す。Settings.feed_refresh_seconds 秒ごとに再計算する。
+    APSchedulerが未インストールの場合は警告ログを出して無視する。
+    """
+    try:
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from apscheduler.triggers.interval import IntervalTrigger
+    except ImportError:
+        logger.warning(
+            "apscheduler is not installed. Feed scheduler will not start. "
+            "Install with: pip install apscheduler"
+        )
+        return
+
+    from app.core.database import get_db
+
+    interval = get_settings().feed_refresh_seconds
+
+    def _job() -> None:
+        """Scheduler job: rebuild feed_rankings in a fresh DB session."""
+        db = next(get_db())
+        try:
+            refresh_feeds(db)
+        except Exception:
+            db.rollback()
+            logger.exception("Feed refresh failed")
+        finally:
+            db.close()
+
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(
+        _job,
+        trigger=IntervalTrigger(seconds=interval),
+        id="feed_refresh",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.start()
+    logger.info("Feed scheduler started (interval: %.0f seconds)", interval)
@@ -12,14 +12,21 @@
 
 import difflib
 import json
+import time
 import uuid as _uuid
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, date, datetime, timedelta
 from uuid import UUID
 
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import insert as sa_insert
+from sqlalchemy import select
+from sqlalchemy import text as sa_text
 from sqlalchemy import update as sa_update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
+from app.core.events import publish_plot_event
 from app.models import (
     ColdSnapshot,
     HotOperation,
@@ -28,9 +35,15 @@ from app.models import (
     Section,
     User,
 )
+from app.services import blob_service
+from app.services.pagination import paginate
+from app.services.snapshot_scheduler import mark_plot_dirty
+from app.services.total_count import count_total
 
 # ホット操作のTTL（72時間）
 HOT_OPERATION_TTL_HOURS = 72
+# 一括記録1リクエストあたりの操作数上限（1文の INSERT のバインド変数数を抑える）
+MAX_BATCH_OPERATIONS = 500
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -79,6 +92,15 @@ def record_operation(
     )
     db.add(operation)
 
+    # 同一トランザクションでスナップショット対象としてキューに積む
+    mark_plot_dirty(db, section.plot_id)
+    publish_plot_event(
+        db,
+        section.plot_id,
+        "section_updated",
+        {"sectionId": str(section_id), "version": new_version},
+    )
+
     try:
         db.commit()
         db.refresh(operation)
@@ -88,6 +110,123 @@ def record_operation(
         raise
 
 
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  record_operations_batch: HotOperationの一括記録
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def record_operations_batch(
+    db: Session,
+    plot_id: UUID,
+    user_id: UUID,
+    operations: list[dict],
+) -> list[dict]:
+    """1つのPlot内の複数セクションへの操作をまとめて記録する。
+
+    operations は {"section_id", "operation_type", "payload"} の dict のリストで、
+    リクエスト順に version を割り当てる。record_operation を N 回呼ぶ場合と比べて
+    DB 往復は「検証 2回 + セクション数ぶんの UPDATE + INSERT 1回」に抑えられる
+    （採番と INSERT は insert_operations を参照）。
+
+    Returns:
+        [{"id", "section_id", "version"}, ...]（operations と同じ順）
+    """
+    if not operations:
+        raise ValueError("No operations given")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise ValueError(f"Too many operations (max {MAX_BATCH_OPERATIONS})")
+
+    section_ids = {op["section_id"] for op in operations}
+    found = set(
+        db.scalars(
+            select(Section.id).where(
+                Section.plot_id == plot_id, Section.id.in_(section_ids)
+            )
+        )
+    )
+    if len(found) != len(section_ids):
+        raise ValueError("Section not found")
+
+    if db.scalar(select(User.id).where(User.id == user_id)) is None:
+        raise ValueError("User not found")
+
+    rows = insert_operations(db, [{**op, "user_id": user_id} for op in operations])
+
+    mark_plot_dirty(db, plot_id)
+    for section_id, version in _last_versions(rows).items():
+        publish_plot_event(
+            db,
+            plot_id,
+            "section_updated",
+            {"sectionId": str(section_id), "version": version},
+        )
+
+    try:
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+
+    return rows
+
+
+def insert_operations(db: Session, operations: list[dict]) -> list[dict]:
+    """検証済みの操作に version を採番して1文で INSERT する（commit はしない）。
+
+    1. セクションごとに UPDATE ... SET version = version + n RETURNING version
+       で n 個分のバージョンを一度に確保する
+    2. 全操作を1つの multi-row INSERT で保存する
+
+    operations は {"section_id", "user_id", "operation_type", "payload"} の dict。
+    record_operations_batch と write-behind バッファ（operation_buffer）が共用する。
+
+    Returns:
+        [{"id", "section_id", "version"}, ...]（operations と同じ順）
+    """
+    # セクションごとの操作数（dict は挿入順を保つ）
+    counts: dict[UUID, int] = {}
+    for op in operations:
+        counts[op["section_id"]] = counts.get(op["section_id"], 0) + 1
+
+    # 同時実行されるバッチ同士のデッドロックを避けるため、ID 順に行ロックを取る
+    next_versions: dict[UUID, int] = {}
+    for section_id in sorted(counts, key=str):
+        stmt = (
+            sa_update(Section)
+            .where(Section.id == section_id)
+            .values(version=Section.version + counts[section_id])
+            .returning(Section.version)
+        )
+        last_version = db.execute(stmt).scalar_one()
+        next_versions[section_id] = last_version - counts[section_id] + 1
+
+    rows = []
+    for op in operations:
+        section_id = op["section_id"]
+        rows.append(
+            {
+                "id": _uuid.uuid4(),
+                "section_id": section_id,
+                "operation_type": op["operation_type"],
+                "payload": op.get("payload"),
+                "user_id": op["user_id"],
+                "version": next_versions[section_id],
+            }
+        )
+        next_versions[section_id] += 1
+
+    # 1文の multi-row INSERT（VALUES (...), (...), ...）
+    db.execute(sa_insert(HotOperation).values(rows))
+
+    return [
+        {"id": row["id"], "section_id": row["section_id"], "version": row["version"]}
+        for row in rows
+    ]
+
+
+def _last_versions(rows: list[dict]) -> dict[UUID, int]:
+    """insert_operations の結果から、セクションごとの最終 version を返す。"""
+    return {row["section_id"]: row["version"] for row in rows}
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 #  get_history: 操作ログ取得（72時間ウィンドウ）
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -96,25 +235,41 @@ def get_history(
     section_id: UUID,
     limit: int = 50,
     offset: int = 0,
-) -> tuple[list[dict], int]:
+    cursor: str | None = None,
+) -> tuple[list[dict], int, str | None]:
     """セクションの操作履歴を取得する（72時間のウィンドウのみ）。
 
-    ユーザー情報を含む履歴項目のリストと総数を返す。
+    ユーザー情報を含む履歴項目のリスト・総数・次ページのカーソルを返す。
+    cursor を指定した場合は offset の代わりにキーセットで続きを取得する。
     N+1クエリ問題を回避するためにバッチでユーザーを取得。
+
+    Raises:
+        ValueError: cursor が不正
     """
     cutoff = datetime.now(UTC) - timedelta(hours=HOT_OPERATION_TTL_HOURS)
 
-    query = (
-        db.query(HotOperation)
-        .filter(
-            HotOperation.section_id == section_id,
-            HotOperation.created_at >= cutoff,
-        )
-        .order_by(HotOperation.created_at.desc())
+    query = db.query(HotOperation).filter(
+        HotOperation.section_id == section_id,
+        HotOperation.created_at >= cutoff,
     )
 
-    total = query.count()
-    operations = query.offset(offset).limit(limit).all()
+    operations, next_cursor = paginate(
+        query,
+        HotOperation.created_at,
+        HotOperation.id,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+    )
+    total = count_total(
+        db,
+        query,
+        endpoint="history.operations",
+        limit=limit,
+        offset=None if cursor else offset,
+        page_size=len(operations),
+        cache_key=(section_id,),
+    )
 
     # ユーザーデータを一括読み込み
     user_ids = {op.user_id for op in operations}
@@ -142,7 +297,7 @@ def get_history(
             }
         )
 
-    return items, total
+    return items, total, next_cursor
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -194,8 +349,9 @@ def rollback_plot_to_snapshot(
             f"but current is {plot.version}"
         )
 
-    # スナップショットのcontent JSONを解析
-    snapshot_content = snapshot.content or {}
+    # スナップショットのcontent JSONを解析（差分スナップショットは復元してから使う）
+    # Why: Blob参照はそのまま content_hash に引き継ぎ、contentをコピーしない
+    snapshot_content = resolve_snapshot_content(db, snapshot, hydrate=False) or {}
     plot_meta = snapshot_content.get("plot", {})
     snapshot_sections = snapshot_content.get("sections", [])
 
@@ -212,20 +368,37 @@ def rollback_plot_to_snapshot(
         synchronize_session="fetch"
     )
 
+    # スナップショットの Blob をセクションから参照し直すので GC の猶予期間を延ばす
+    blob_service.touch_blobs(
+        db, {s["blob"] for s in snapshot_sections if s.get("blob")}
+    )
+
     # スナップショットのセクションを新規UUIDで再作成
+    new_sections = []
     for sec_data in snapshot_sections:
         new_section = Section(
             id=_uuid.uuid4(),
             plot_id=plot_id,
             title=sec_data.get("title", ""),
             content=sec_data.get("content"),
+            content_hash=sec_data.get("blob"),
             order_index=sec_data.get("orderIndex", 0),
             version=sec_data.get("version", 1),
         )
         db.add(new_section)
+        new_sections.append(new_section)
+    db.flush()
+
+    # search_service は本モジュールの extract_text を import するため遅延 import
+    from app.services import search_service
+
+    search_service.index_sections(db, new_sections)
 
     # Plotバージョンをインクリメント
     plot.version = plot.version + 1
+    mark_plot_dirty(db, plot_id)
+    # セクションは新しい UUID で作り直されるため、クライアントは全体を再取得する
+    publish_plot_event(db, plot_id, "plot_rolled_back", {"version": plot.version})
 
     # 監査ログを記録
     rollback_log = RollbackLog(
@@ -254,18 +427,36 @@ def get_plot_snapshots(
     plot_id: UUID,
     limit: int = 20,
     offset: int = 0,
-) -> tuple[list[ColdSnapshot], int]:
-    """PlotのColdSnapshot一覧を取得する（新しい順）。"""
-    query = (
-        db.query(ColdSnapshot)
-        .filter(ColdSnapshot.plot_id == plot_id)
-        .order_by(ColdSnapshot.created_at.desc())
-    )
+    cursor: str | None = None,
+) -> tuple[list[ColdSnapshot], int, str | None]:
+    """PlotのColdSnapshot一覧を取得する（新しい順）。
 
-    total = query.count()
-    snapshots = query.offset(offset).limit(limit).all()
+    戻り値は (スナップショット, 総数, 次ページのカーソル)。
 
-    return snapshots, total
+    Raises:
+        ValueError: cursor が不正
+    """
+    query = db.query(ColdSnapshot).filter(ColdSnapshot.plot_id == plot_id)
+
+    snapshots, next_cursor = paginate(
+        query,
+        ColdSnapshot.created_at,
+        ColdSnapshot.id,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+    )
+    total = count_total(
+        db,
+        query,
+        endpoint="history.snapshots",
+        limit=limit,
+        offset=None if cursor else offset,
+        page_size=len(snapshots),
+        cache_key=(plot_id,),
+    )
+
+    return snapshots, total, next_cursor
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -291,6 +482,60 @@ def get_snapshot_detail(
     return snapshot
 
 
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  resolve_snapshot_content: 差分スナップショットの復元
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def resolve_snapshot_content(
+    db: Session, snapshot: ColdSnapshot, hydrate: bool = True
+) -> dict | None:
+    """スナップショットのPlot全体JSONを返す。
+
+    キーフレーム（base_snapshot_id が None）はcontentをそのまま返す。
+    差分スナップショットは基点キーフレームのcontentと合成して復元する。
+    差分は常にキーフレームを直接参照するため、復元コストは最大2行の読み込み。
+
+    hydrate=True の場合、セクションの "blob" 参照を section_blobs から読み込んで
+    "content" に展開する。False の場合は "blob" 参照のまま返す（ロールバック用）。
+    """
+    if snapshot.base_snapshot_id is None:
+        content = snapshot.content
+    else:
+        base = db.get(ColdSnapshot, snapshot.base_snapshot_id)
+        if base is None:
+            raise ValueError("Snapshot keyframe not found")
+        content = apply_snapshot_delta(base.content, snapshot.content)
+
+    if content is None or not hydrate:
+        return content
+    return blob_service.hydrate_snapshot_sections(db, content)
+
+
+def apply_snapshot_delta(
+    keyframe_content: dict | None, delta_content: dict | None
+) -> dict:
+    """キーフレームのcontentに差分を適用してPlot全体JSONを組み立てる。
+
+    差分のセクションエントリに "blob" / "content" キーがない場合は、
+    キーフレーム中の同一IDのセクションの "blob" / "content" を引き継ぐ。
+    """
+    delta = delta_content or {}
+    keyframe_sections = (keyframe_content or {}).get("sections", [])
+    base_entries = {str(sec.get("id", "")): sec for sec in keyframe_sections}
+
+    sections = []
+    for entry in delta.get("sections", []):
+        sec = dict(entry)
+        if "content" not in sec and "blob" not in sec:
+            base_entry = base_entries.get(str(sec.get("id", "")), {})
+            if "blob" in base_entry:
+                sec["blob"] = base_entry["blob"]
+            else:
+                sec["content"] = base_entry.get("content")
+        sections.append(sec)
+
+    return {"plot": delta.get("plot", {}), "sections": sections}
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 #  get_rollback_logs: ロールバック監査ログ一覧取得
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -299,19 +544,34 @@ def get_rollback_logs(
     plot_id: UUID,
     limit: int = 20,
     offset: int = 0,
-) -> tuple[list[dict], int]:
+    cursor: str | None = None,
+) -> tuple[list[dict], int, str | None]:
     """PlotのRollbackLog一覧を取得する（新しい順）。
 
-    ユーザー情報を含むログ項目のリストと総数を返す。
+    ユーザー情報を含むログ項目のリスト・総数・次ページのカーソルを返す。
+
+    Raises:
+        ValueError: cursor が不正
     """
-    query = (
-        db.query(RollbackLog)
-        .filter(RollbackLog.plot_id == plot_id)
-        .order_by(RollbackLog.created_at.desc())
+    query = db.query(RollbackLog).filter(RollbackLog.plot_id == plot_id)
+
+    logs, next_cursor = paginate(
+        query,
+        RollbackLog.created_at,
+        RollbackLog.id,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+    )
+    total = count_total(
+        db,
+        query,
+        endpoint="history.rollback_logs",
+        limit=limit,
+        offset=None if cursor else offset,
+        page_size=len(logs),
+        cache_key=(plot_id,),
     )
-
-    total = query.count()
-    logs = query.offset(offset).limit(limit).all()
 
     # ユーザーデータを一括読み込み
     user_ids = {log.user_id for log in logs}
@@ -339,7 +599,7 @@ def get_rollback_logs(
             }
         )
 
-    return items, total
+    return items, total, next_cursor
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -386,8 +646,12 @@ def get_diff(
         raise ValueError("Snapshot not found for one or both versions")
 
     # スナップショットから該当セクションのコンテンツを抽出
-    from_content = _extract_section_content(from_snapshot.content, section_id)
-    to_content = _extract_section_content(to_snapshot.content, section_id)
+    from_content = _extract_section_content(
+        resolve_snapshot_content(db, from_snapshot), section_id
+    )
+    to_content = _extract_section_content(
+        resolve_snapshot_content(db, to_snapshot), section_id
+    )
 
     from_text = extract_text(from_content)
     to_text = extract_text(to_content)
@@ -425,11 +689,12 @@ def _extract_section_content(
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 #  テキスト抽出・差分計算ユーティリティ
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-def extract_text(content: dict | None) -> str:
+def extract_text(content: dict | None, *, fallback_json: bool = True) -> str:
     """Tiptap JSONコンテンツからプレーンテキストを抽出する。
 
     Tiptapドキュメントツリーを再帰的に走査してテキストノードを抽出する。
-    構造が認識できない場合はjson.dumpsにフォールバックする。
+    構造が認識できない場合はjson.dumpsにフォールバックする
+    （fallback_json=False なら空文字を返す。検索用テキストの抽出で使う）。
     """
     if not content:
         return ""
@@ -452,6 +717,8 @@ def extract_text(content: dict | None) -> str:
 
     if texts:
         return "\n".join(texts)
+    if not fallback_json:
+        return ""
     return json.dumps(content, ensure_ascii=False, sort_keys=True)
 
 
@@ -498,22 +765,182 @@ class ConflictError(Exception):
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 #  TTL cleanup: 72時間超過のHotOperationを削除
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-def delete_expired_hot_operations(db: Session) -> int:
+def delete_expired_hot_operations(
+    db: Session,
+    batch_size: int | None = None,
+    sleep_seconds: float | None = None,
+) -> int:
     """Delete hot_operations older than 72 hours.
 
     スケジューラから定期的に呼び出されることを想定。
-    HotOperationのTTL（72時間）を超過したレコードを一括削除する。
+    HotOperationのTTL（72時間）を超過したレコードを削除する。
+
+    テーブル全体を1トランザクションで削除すると /sections/{id}/operations の
+    書き込みが待たされるため、created_at 順に batch_size 件ずつ削除して
+    チャンクごとに commit し、チャンク間で sleep_seconds 待機する。
+    行はセッションに読み込まない（synchronize_session=False）。
+
+    hot_operations が日次パーティションの場合（settings.hot_operations_partitioned）は
+    期限切れのパーティションを丸ごと DROP してから残りをチャンク削除する。
+    DROP したパーティションの行数は pg_class.reltuples の推定値で数える。
+
+    Args:
+        db: Database session
+        batch_size: Rows per chunk (default: settings.hot_operation_purge_batch_size)
+        sleep_seconds: Pause between chunks
+            (default: settings.hot_operation_purge_sleep_seconds)
 
     Returns:
         Number of deleted records.
     """
+    settings = get_settings()
+    if batch_size is None:
+        batch_size = settings.hot_operation_purge_batch_size
+    if sleep_seconds is None:
+        sleep_seconds = settings.hot_operation_purge_sleep_seconds
+
     cutoff = datetime.now(UTC) - timedelta(hours=HOT_OPERATION_TTL_HOURS)
 
-    result = (
-        db.query(HotOperation)
-        .filter(HotOperation.created_at < cutoff)
-        .delete(synchronize_session="fetch")
+    total = 0
+    if settings.hot_operations_partitioned and _is_partitioned(db):
+        ensure_hot_operation_partitions(db)
+        total += drop_expired_hot_operation_partitions(db, cutoff)
+
+    chunk = (
+        select(HotOperation.id)
+        .where(HotOperation.created_at < cutoff)
+        .order_by(HotOperation.created_at)
+        .limit(batch_size)
+    )
+    while True:
+        result = db.execute(
+            sa_delete(HotOperation)
+            .where(HotOperation.id.in_(chunk))
+            .execution_options(synchronize_session=False)
+        )
+        deleted = result.rowcount or 0
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            break
+        if sleep_seconds > 0:
+            time.sleep(sleep_seconds)
+
+    return total
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  日次パーティション（PostgreSQL, 任意）
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# hot_operations を created_at の日次レンジパーティションにしておくと、
+# TTL 切れは DETACH PARTITION ... CONCURRENTLY と DROP TABLE で済む
+# （PostgreSQL 14 以降）。既存テーブルの変換は手動で行う:
+#
+#   ALTER TABLE hot_operations RENAME TO hot_operations_legacy;
+#   CREATE TABLE hot_operations (LIKE hot_operations_legacy INCLUDING DEFAULTS,
+#       PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at);
+#   -- ensure_hot_operation_partitions() でパーティション作成後にデータを移し、
+#   -- section_id / user_id の外部キーとインデックスを張り直す
+#
+# その上で HOT_OPERATIONS_PARTITIONED=true を設定する。
+HOT_OPERATION_PARTITION_PREFIX = "hot_operations_p"
+
+# 先行して作成しておく日次パーティションの日数
+HOT_OPERATION_PARTITIONS_AHEAD_DAYS = 3
+
+
+def _is_partitioned(db: Session) -> bool:
+    """hot_operations が PostgreSQL のパーティションテーブルかどうか。"""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(
+        db.execute(
+            sa_text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = 'hot_operations'"
+            )
+        ).scalar()
     )
 
+
+def _partition_name(day: date) -> str:
+    return f"{HOT_OPERATION_PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def ensure_hot_operation_partitions(
+    db: Session, days_ahead: int = HOT_OPERATION_PARTITIONS_AHEAD_DAYS
+) -> None:
+    """今日から days_ahead 日先までの日次パーティションを作成する（冪等）。"""
+    today = datetime.now(UTC).date()
+    for offset in range(days_ahead + 1):
+        day = today + timedelta(days=offset)
+        db.execute(
+            sa_text(
+                f"CREATE TABLE IF NOT EXISTS {_partition_name(day)} "
+                "PARTITION OF hot_operations "
+                f"FOR VALUES FROM ('{day.isoformat()}') "
+                f"TO ('{(day + timedelta(days=1)).isoformat()}')"
+            )
+        )
     db.commit()
-    return result
+
+
+def drop_expired_hot_operation_partitions(db: Session, cutoff: datetime) -> int:
+    """範囲の上限が cutoff 以前の日次パーティションを切り離してから DROP する。
+
+    パーティションを直接 DROP すると親の hot_operations に ACCESS EXCLUSIVE ロックが
+    かかり、/sections/{id}/operations の書き込みが止まる。そのため
+    DETACH PARTITION ... CONCURRENTLY（トランザクション外でのみ実行可能）で
+    書き込みを止めずに切り離し、親から外れたテーブルを DROP する。
+    前回の実行が途中で失敗して残った切り離し途中（FINALIZE 待ち）・切り離し済みの
+    テーブルも同じ手順で片付ける。件数は数えず（全件走査になるため）、
+    pg_class.reltuples の推定値を使う。
+
+    Returns:
+        Estimated number of rows removed with the dropped partitions.
+    """
+    partitions = db.execute(
+        sa_text(
+            "SELECT c.relname, i.inhrelid IS NOT NULL, "
+            "COALESCE(i.inhdetachpending, false), c.reltuples "
+            "FROM pg_class c "
+            "LEFT JOIN pg_inherits i ON i.inhrelid = c.oid "
+            "WHERE c.relkind = 'r' AND c.relname LIKE :prefix "
+            "AND (i.inhparent IS NULL OR i.inhparent = 'hot_operations'::regclass)"
+        ),
+        {"prefix": f"{HOT_OPERATION_PARTITION_PREFIX}%"},
+    ).all()
+    # DETACH ... CONCURRENTLY は自分以外のトランザクションの終了を待つため、
+    # このセッションのトランザクションを先に閉じておく
+    db.commit()
+
+    dropped_rows = 0
+    with db.get_bind().connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        for name, attached, detach_pending, reltuples in sorted(partitions):
+            try:
+                day = datetime.strptime(
+                    name.removeprefix(HOT_OPERATION_PARTITION_PREFIX), "%Y%m%d"
+                ).replace(tzinfo=UTC)
+            except ValueError:
+                continue
+            if day + timedelta(days=1) > cutoff:
+                continue
+            if detach_pending:
+                conn.execute(
+                    sa_text(
+                        f"ALTER TABLE hot_operations DETACH PARTITION {name} FINALIZE"
+                    )
+                )
+            elif attached:
+                conn.execute(
+                    sa_text(
+                        f"ALTER TABLE hot_operations DETACH PARTITION {name} CONCURRENTLY"
+                    )
+                )
+            conn.execute(sa_text(f"DROP TABLE {name}"))
+            # 一度も ANALYZE されていないテーブルの reltuples は -1
+            dropped_rows += max(int(reltuples), 0)
+
+    return dropped_rows
@@ -0,0 +1,364 @@
+"""画像キャッシュ: Supabase Storage の前段に置くメモリ LRU + ローカルディスクの2段キャッシュ。
+
+画像のファイル名は UUID で、一度保存した内容は変わらない（immutable）。
+そのため無効化は不要で、容量上限による追い出しだけを行う。
+
+- メモリ: 合計 Settings.image_cache_memory_bytes までの LRU。
+  Settings.image_cache_memory_item_max_bytes 以下の小さい画像（アバター・サムネイル）のみ
+- ディスク: Settings.image_cache_dir 以下に合計 Settings.image_cache_disk_bytes まで。
+  Storage からチャンク単位で一時ファイルに書いてから os.replace するため、
+  途中まで書かれたファイルは読まれず、取得中のメモリ使用量もチャンク1つ分で済む。
+  上限を超えたら最終アクセス（atime、ヒット時に明示的に更新）の古いものから削除する
+- 内容の SHA-256 を ETag にする（書き込み時に計算し、再起動後は初回アクセス時に計算）
+- ミス時の取得（ディスク読み込み・Supabase Storage からのダウンロード）は
+  スレッドプールで行い、イベントループを止めない
+- 同じ画像への同時ミスは1回の取得にまとめる（get_image）
+- 存在しなかった派生画像のキーは MISSING_TTL_SECONDS の間覚えておき、
+  Storage への問い合わせを繰り返さない（mark_missing / is_missing）
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Settings.image_cache_dir が空のときのディスクキャッシュの場所
+DEFAULT_CACHE_DIRNAME = "plot-image-cache"
+
+# 再起動後に ETag を計算するときの読み込み単位
+HASH_CHUNK_SIZE = 64 * 1024
+
+# ディスク上の画像の ETag を覚えておく最大件数
+ETAG_CACHE_MAX_ENTRIES = 100_000
+
+# 存在しなかったキーを覚えておく時間と最大件数
+MISSING_TTL_SECONDS = 300.0
+MISSING_MAX_ENTRIES = 10_000
+
+# 書き込み途中の一時ファイルの接尾辞（起動時のスキャンで削除する）
+_TMP_SUFFIX = ".tmp"
+
+# fetch(key, out): key の画像を out に書き出す（存在しなければ例外）
+Fetcher = Callable[[str, BinaryIO], None]
+
+
+class CachedImage(NamedTuple):
+    """キャッシュから取得した画像。path と data の少なくとも一方がある。"""
+
+    etag: str  # '"<sha256 hex>"'
+    size: int
+    last_modified: float  # キャッシュに入った時刻（UNIX 時刻）
+    path: Path | None = None  # ディスク層のファイル（送信前に開いてストリーミングする）
+    data: bytes | None = None  # メモリ層の画像
+
+
+class _HashingWriter:
+    """書き込みながら SHA-256 とサイズを数えるラッパー。"""
+
+    def __init__(self, out: BinaryIO) -> None:
+        self._out = out
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk: bytes) -> int:
+        self.hash.update(chunk)
+        self.size += len(chunk)
+        return self._out.write(chunk)
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.hash.hexdigest()}"'
+
+
+def _file_etag(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return f'"{digest.hexdigest()}"'
+
+
+class ImageCache:
+    """メモリ LRU + ディスクの2段キャッシュ。スレッドセーフ。
+
+    disk_bytes=0 でディスク層を、memory_bytes=0 でメモリ層を無効にする。
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        memory_bytes: int,
+        memory_item_max_bytes: int,
+        disk_bytes: int,
+    ) -> None:
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.memory_item_max_bytes = memory_item_max_bytes
+        self.disk_bytes = disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, CachedImage] = OrderedDict()
+        self._memory_used = 0
+        self._etags: OrderedDict[str, str] = OrderedDict()
+        self._missing: OrderedDict[str, float] = OrderedDict()
+        self._disk_used = 0
+        if disk_bytes > 0:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._disk_used = self._scan_disk()
+
+    # ─── メモリ層 ──────────────────────────────────────────────
+
+    def get_memory(self, key: str) -> CachedImage | None:
+        """メモリ層から取得する。ヒットしたら最近使ったものとして末尾に移す。"""
+        with self._lock:
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+            return image
+
+    def put_memory(self, key: str, image: CachedImage) -> None:
+        """小さい画像だけをメモリ層に入れ、上限を超えた分を古い順に追い出す。"""
+        if image.data is None:
+            return
+        if image.size > self.memory_item_max_bytes or image.size > self.memory_bytes:
+            return
+        image = image._replace(path=None)
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_used -= old.size
+            self._memory[key] = image
+            self._memory_used += image.size
+            while self._memory_used > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_used -= evicted.size
+
+    # ─── 存在しないキー ────────────────────────────────────────
+
+    def mark_missing(self, key: str) -> None:
+        """key が Storage に存在しなかったことを MISSING_TTL_SECONDS の間覚えておく。"""
+        with self._lock:
+            self._missing[key] = time.monotonic() + MISSING_TTL_SECONDS
+            self._missing.move_to_end(key)
+            while len(self._missing) > MISSING_MAX_ENTRIES:
+                self._missing.popitem(last=False)
+
+    def is_missing(self, key: str) -> bool:
+        """mark_missing されてから MISSING_TTL_SECONDS 以内なら True。"""
+        with self._lock:
+            expires = self._missing.get(key)
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self._missing[key]
+                return False
+            return True
+
+    # ─── ディスク層 ────────────────────────────────────────────
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key
+
+    def _remember_etag(self, key: str, etag: str) -> None:
+        with self._lock:
+            self._etags[key] = etag
+            self._etags.move_to_end(key)
+            while len(self._etags) > ETAG_CACHE_MAX_ENTRIES:
+                self._etags.popitem(last=False)
+
+    def _scan_disk(self) -> int:
+        """起動時に既存のキャッシュファイルの合計サイズを数え、残った一時ファイルを消す。"""
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(_TMP_SUFFIX):
+                Path(entry.path).unlink(missing_ok=True)
+                continue
+            total += entry.stat().st_size
+        return total
+
+    def get_disk(self, key: str) -> CachedImage | None:
+        """ディスク層から取得する（内容は読まない）。
+
+        ヒットしたら atime を現在時刻にして LRU の順序に反映する。
+        mtime はキャッシュに入った時刻のまま（Last-Modified に使う）。
+        """
+        if self.disk_bytes <= 0:
+            return None
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            os.utime(path, (time.time(), stat.st_mtime))
+            with self._lock:
+                etag = self._etags.get(key)
+            if etag is None:
+                etag = _file_etag(path)
+                self._remember_etag(key, etag)
+        except FileNotFoundError:
+            return None
+        return CachedImage(etag, stat.st_size, stat.st_mtime, path=path)
+
+    def store_disk(self, key: str, fetch: Fetcher) -> CachedImage:
+        """fetch の出力を一時ファイルに書いてから rename し、上限を超えていれば古いものを削除する。"""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=_TMP_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                writer = _HashingWriter(f)
+                fetch(key, writer)  # type: ignore[arg-type]
+            path = self._path(key)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._remember_etag(key, writer.etag)
+
+        with self._lock:
+            self._disk_used += writer.size
+            over = self._disk_used > self.disk_bytes
+        if over:
+            self._evict_disk(keep=key)
+        return CachedImage(writer.etag, writer.size, path.stat().st_mtime, path=path)
+
+    def _evict_disk(self, keep: str) -> None:
+        """最終アクセスの古いファイルから、合計が上限の 9 割になるまで削除する。
+
+        keep（直前に書いた画像）は、これから送るため削除しない。
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(_TMP_SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_atime, stat.st_size, entry.name))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = self.disk_bytes * 9 // 10
+        for _, size, name in entries:
+            if total <= target:
+                break
+            if name == keep:
+                continue
+            self._path(name).unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                self._etags.pop(name, None)
+        with self._lock:
+            self._disk_used = total
+
+    # ─── 取得 ──────────────────────────────────────────────────
+
+    def _fetch_to_memory(self, key: str, fetch: Fetcher) -> CachedImage:
+        """ディスク層を使わずに取得する（ディスク層が無効・書き込めない場合）。"""
+        buffer = io.BytesIO()
+        writer = _HashingWriter(buffer)
+        fetch(key, writer)  # type: ignore[arg-type]
+        return CachedImage(
+            writer.etag, writer.size, time.time(), data=buffer.getvalue()
+        )
+
+    def load(self, key: str, fetch: Fetcher) -> CachedImage:
+        """メモリ → ディスク → fetch の順に取得する（ブロッキング）。
+
+        小さい画像はメモリ層にも入れ、data 付きで返す。
+        それ以外はディスク層のファイル（path）を返し、呼び出し側がストリーミングする。
+        """
+        image = self.get_memory(key)
+        if image is not None:
+            return image
+
+        image = self.get_disk(key)
+        if image is None and self.disk_bytes > 0:
+            try:
+                image = self.store_disk(key, fetch)
+            except OSError:
+                # ディスクキャッシュに書けなくても画像は返す
+                logger.warning("Failed to write image cache: %s", key, exc_info=True)
+        if image is None:
+            image = self._fetch_to_memory(key, fetch)
+
+        small = image.size <= min(self.memory_item_max_bytes, self.memory_bytes)
+        if image.data is None and image.path is not None and small:
+            image = image._replace(data=image.path.read_bytes())
+        self.put_memory(key, image)
+        return image
+
+    def clear(self) -> None:
+        """メモリ層とディスク層を空にする。"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+            self._etags.clear()
+            self._missing.clear()
+        if self.disk_bytes > 0:
+            for entry in os.scandir(self.directory):
+                if entry.is_file():
+                    Path(entry.path).unlink(missing_ok=True)
+            with self._lock:
+                self._disk_used = 0
+
+
+@lru_cache
+def get_image_cache() -> ImageCache:
+    """Settings から ImageCache のシングルトンを生成する。"""
+    settings = get_settings()
+    directory = (
+        Path(settings.image_cache_dir)
+        if settings.image_cache_dir
+        else Path(tempfile.gettempdir()) / DEFAULT_CACHE_DIRNAME
+    )
+    return ImageCache(
+        directory,
+        memory_bytes=settings.image_cache_memory_bytes,
+        memory_item_max_bytes=settings.image_cache_memory_item_max_bytes,
+        disk_bytes=settings.image_cache_disk_bytes,
+    )
+
+
+# 取得中の画像: key → 取得タスク（同時ミスを1回の取得にまとめる）
+_inflight: dict[str, asyncio.Future[CachedImage]] = {}
+
+
+def _forget_inflight(key: str, future: asyncio.Future[CachedImage]) -> None:
+    if _inflight.get(key) is future:
+        del _inflight[key]
+
+
+async def get_image(
+    key: str,
+    fetch: Fetcher,
+    cache: ImageCache | None = None,
+) -> CachedImage:
+    """キャッシュ経由で画像を取得する。
+
+    メモリ層のヒットはその場で返す。それ以外はスレッドプールで
+    ImageCache.load を実行し、同じ key の同時リクエストは同じ取得結果を待つ。
+    fetch の例外はそのまま（待っている全リクエストに）伝わる。
+    """
+    cache = cache or get_image_cache()
+    image = cache.get_memory(key)
+    if image is not None:
+        return image
+
+    future = _inflight.get(key)
+    if future is None:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(None, cache.load, key, fetch)
+        _inflight[key] = future
+        future.add_done_callback(lambda f: _forget_inflight(key, f))
+    # 1つのリクエストがキャンセルされても、待っている他のリクエストの取得は止めない
+    return await asyncio.shield(future)
@@ -0,0 +1,322 @@
+"""画像アップロード処理の実行プール（受付上限・待ち時間メトリクス付き）。
+
+POST /images の process_and_save（デコード・LANCZOS リサイズ・エンコード・
+Storage へのアップロード）はリクエストスレッドの外で実行する。
+
+- バックエンド: Settings.image_processing_backend
+  - "thread": ThreadPoolExecutor（従来どおり。Pillow が GIL を握る区間は
+    API スレッドと CPU を奪い合う）
+  - "process": ProcessPoolExecutor（spawn）。起動時に image_processing_max_workers
+    個のワーカーを立ち上げ、Pillow のプラグインを読み込んでおく（ウォームアップ）
+- 受付上限: 実行中 + 待ち行列が max_workers + image_processing_max_queue 件に
+  達したら ImageProcessingBusy（→ 503 + Retry-After）。待ち行列を伸ばして
+  全リクエストを遅らせるより、溢れた分をすぐ断る
+- 復旧: ワーカーの異常終了（OOM kill・Pillow の segfault など）でプールが
+  BrokenExecutor になったら、その場で作り直して温め直す。壊れたプールに
+  投入済み・投入しようとした処理は ImageProcessingBusy（→ 503 + Retry-After）
+- メトリクス: 待ち時間（submit からワーカーが処理を始めるまで）・処理時間の
+  ヒストグラムと、process_and_save が返す段階ごと（decode / resize / encode /
+  upload）の所要時間。GET /admin/images/processing で参照する
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from functools import partial
+from typing import Any, Literal
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# 待ち時間・処理時間ヒストグラムのバケット上限（ミリ秒）
+LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+)  # fmt: skip
+# process_and_save が記録する段階
+STAGES: tuple[str, ...] = ("decode", "resize", "encode", "upload")
+
+
+class ImageProcessingBusy(Exception):
+    """実行中・待ちの画像処理が上限に達していて受け付けられない。"""
+
+
+def _init_worker() -> None:
+    """ワーカープロセスの初期化: 初回アップロードで読み込み待ちが出ないようにする。"""
+    from PIL import Image
+
+    from app.services import image_service  # noqa: F401
+
+    Image.init()
+    get_settings()
+
+
+def _warm_up() -> None:
+    """ワーカーを起動させるための空タスク。"""
+
+
+def _run_job(
+    fn: Callable[..., Any], submitted_at: float, *args: Any
+) -> tuple[Any, float, float]:
+    """ワーカー側で fn を実行し、(結果, 待ち時間ms, 処理時間ms) を返す。
+
+    プロセスをまたぐため、待ち時間は壁時計（time.time）の差で測る。
+    """
+    started_at = time.time()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return result, max(0.0, (started_at - submitted_at) * 1000), elapsed_ms
+
+
+class _Histogram:
+    """累積バケット付きのミリ秒ヒストグラム（ロックは呼び出し側で取る）。"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        # 最後の要素は +Inf バケット
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.sum_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for i, upper in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= upper:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        cumulative = []
+        running = 0
+        for upper, count in zip(
+            [*LATENCY_BUCKETS_MS, "+Inf"], self.buckets, strict=True
+        ):
+            running += count
+            cumulative.append({"le": upper, "count": running})
+        return {
+            "count": self.count,
+            "sum": round(self.sum_ms, 3),
+            "max": round(self.max_ms, 3),
+            "buckets": cumulative,
+        }
+
+
+class ImageProcessor:
+    """受付上限付きで画像処理をスレッド / プロセスプールに投入する。"""
+
+    def __init__(
+        self,
+        *,
+        backend: Literal["thread", "process"] = "thread",
+        max_workers: int = 4,
+        max_queue: int = 8,
+    ) -> None:
+        self.backend = backend
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+
+        # メトリクス（_lock で保護）
+        self.inflight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.queue_wait = _Histogram()
+        self.processing = _Histogram()
+        self.stage_count = dict.fromkeys(STAGES, 0)
+        self.stage_sum_ms = dict.fromkeys(STAGES, 0.0)
+        self.stage_max_ms = dict.fromkeys(STAGES, 0.0)
+
+    @property
+    def capacity(self) -> int:
+        """同時に受け付ける件数（実行中 + 待ち行列）。"""
+        return self.max_workers + self.max_queue
+
+    # ─── lifecycle ──────────────────────────────────────────
+    def start(self) -> None:
+        self._executor = self._create_executor()
+
+    def _create_executor(self) -> Executor:
+        if self.backend == "process":
+            executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            # ProcessPoolExecutor はワーカーを必要になってから起動するため、
+            # 空タスクで全ワーカーを先に立ち上げておく
+            for _ in range(self.max_workers):
+                executor.submit(_warm_up)
+            return executor
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="image-proc"
+        )
+
+    def _restart(self, broken: Executor) -> None:
+        """壊れたプールを新しいプールに差し替える（差し替え済み・停止済みなら何もしない）。"""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._create_executor()
+            self.restarts += 1
+        # 壊れたプールはワーカーの終了と待ちタスクの失敗を自身で済ませている。
+        # _on_done（プールの管理スレッド）から shutdown を呼ぶとデッドロックする
+        logger.warning("Image processing pool was broken; restarted it")
+
+    def stop(self) -> None:
+        """実行中の処理を待ってからプールを終了する。"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    # ─── submit ─────────────────────────────────────────────
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """fn(*args) をプールに投入し、(結果, 待ち時間ms, 処理時間ms) の Future を返す。
+
+        プロセスバックエンドでは fn・引数・戻り値は pickle 可能であること。
+
+        Raises:
+            ImageProcessingBusy: 受付上限に達している、停止中、またはプールの再起動中
+        """
+        with self._lock:
+            if self._executor is None:
+                self.rejected += 1
+                raise ImageProcessingBusy("Image processor is not running")
+            if self.inflight >= self.capacity:
+                self.rejected += 1
+                raise ImageProcessingBusy("Too many images are being processed")
+            self.inflight += 1
+            self.submitted += 1
+            executor = self._executor
+
+        try:
+            future = executor.submit(_run_job, fn, time.time(), *args)
+        except BrokenExecutor as e:
+            with self._lock:
+                self.inflight -= 1
+                self.rejected += 1
+            self._restart(executor)
+            raise ImageProcessingBusy("Image processor is restarting") from e
+        except Exception:
+            with self._lock:
+                self.inflight -= 1
+            raise
+        # 呼び出し側がキャンセルされても、枠は処理が実際に終わるまで解放しない
+        future.add_done_callback(partial(self._on_done, executor))
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """submit して結果を待つ（イベントループ用）。
+
+        Raises:
+            ImageProcessingBusy: 受付できない、または処理中にプールが壊れた
+        """
+        try:
+            result, _, _ = await asyncio.wrap_future(self.submit(fn, *args))
+        except BrokenExecutor as e:
+            raise ImageProcessingBusy("Image processor is restarting") from e
+        return result
+
+    def _on_done(self, executor: Executor, future: Future) -> None:
+        if not future.cancelled() and isinstance(future.exception(), BrokenExecutor):
+            # ワーカーが異常終了した。次の投入を待たずにプールを作り直す
+            self._restart(executor)
+        with self._lock:
+            self.inflight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+                return
+            result, wait_ms, elapsed_ms = future.result()
+            self.completed += 1
+            self.queue_wait.observe(wait_ms)
+            self.processing.observe(elapsed_ms)
+            for stage, ms in (getattr(result, "stage_ms", None) or {}).items():
+                if stage not in self.stage_count:
+                    continue
+                self.stage_count[stage] += 1
+                self.stage_sum_ms[stage] += ms
+                self.stage_max_ms[stage] = max(self.stage_max_ms[stage], ms)
+
+    # ─── metrics ────────────────────────────────────────────
+    def snapshot(self) -> dict[str, Any]:
+        """受付状況・待ち時間・段階ごとの所要時間を JSON 化可能な dict で返す。"""
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "maxWorkers": self.max_workers,
+                "maxQueue": self.max_queue,
+                "inflight": self.inflight,
+                "queueDepth": max(0, self.inflight - self.max_workers),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "restarts": self.restarts,
+                "queueWaitMs": self.queue_wait.snapshot(),
+                "processingMs": self.processing.snapshot(),
+                "stageMs": {
+                    stage: {
+                        "count": self.stage_count[stage],
+                        "sum": round(self.stage_sum_ms[stage], 3),
+                        "max": round(self.stage_max_ms[stage], 3),
+                    }
+                    for stage in STAGES
+                },
+            }
+
+
+_processor: ImageProcessor | None = None
+_processor_lock = threading.Lock()
+
+
+def get_image_processor() -> ImageProcessor:
+    """起動中のプロセッサを返す。未起動なら設定から生成して起動する（遅延初期化）。"""
+    global _processor
+    with _processor_lock:
+        if _processor is None:
+            settings = get_settings()
+            _processor = ImageProcessor(
+                backend=settings.image_processing_backend,
+                max_workers=settings.image_processing_max_workers,
+                max_queue=settings.image_processing_max_queue,
+            )
+            _processor.start()
+            logger.info(
+                "Image processor started (backend: %s, workers: %d, queue: %d)",
+                _processor.backend,
+                _processor.max_workers,
+                _processor.max_queue,
+            )
+        return _processor
+
+
+def start_image_processor() -> None:
+    """プールを起動してワーカーを温めておく（lifespan startup 用）。"""
+    get_image_processor()
+
+
+def stop_image_processor() -> None:
+    """実行中の画像処理を待ってプールを停止する（lifespan shutdown 用）。"""
+    global _processor
+    with _processor_lock:
+        processor, _processor = _processor, None
+    if processor is not None:
+        processor.stop()
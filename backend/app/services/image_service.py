@@ -1,13 +1,30 @@
-"""画像処理サービス: 検証, リサイズ, Supabase Storage 保存"""
+"""画像処理サービス: 検証, リサイズ, 派生画像の生成, Supabase Storage 保存
+
+派生画像（variant）: アップロード時に1回のデコードから、
+Settings.image_variant_widths の各幅の縮小版と、Settings.image_variant_formats の
+形式（WebP / AVIF）の兄弟画像を生成し、元のファイル名から導いたキーで保存する。
+
+    {hex}{ext}            … 元画像（最大幅 max_image_width）
+    {hex}.webp            … 元画像と同じサイズの WebP
+    {hex}_w480{ext}       … 幅480pxの縮小版
+    {hex}_w480.webp       … 幅480pxの WebP
+
+GET /images/{filename}?w= は variant_candidates で要求幅に最も近い派生画像から
+順に探す（派生画像のない古い画像は元画像にフォールバックする）。
+"""
 
 import io
+import time
 import uuid
+from contextlib import contextmanager
 from functools import lru_cache
 import logging
 from pathlib import Path
-from typing import NamedTuple
+from collections.abc import Collection, Iterator, Sequence
+from typing import BinaryIO, NamedTuple
 
-from PIL import Image
+import httpx
+from PIL import Image, features
 from storage3.exceptions import StorageApiError
 
 from app.core.config import get_settings
@@ -31,6 +48,14 @@ class ResizedImage(NamedTuple):
     extension: str  # ".jpg", ".png", ".gif", ".webp"
 
 
+class ImageVariant(NamedTuple):
+    """resize_image_with_variants が生成する派生画像"""
+
+    data: bytes
+    width: int | None  # 縮小版の幅（元画像と同じサイズの形式違いは None）
+    extension: str  # ".webp", ".avif", または元画像と同じ拡張子
+
+
 class ProcessedImage(NamedTuple):
     """process_and_save の戻り値: 保存先ファイル名とサイズとフォーマット情報"""
 
@@ -38,13 +63,24 @@ class ProcessedImage(NamedTuple):
     width: int
     height: int
     format: str  # "JPEG", "PNG", "GIF", "WEBP"
+    # 段階ごとの所要時間（ミリ秒）: "decode", "resize", "encode", "upload"
+    stage_ms: dict[str, float] | None = None
 
 
 MAX_IMAGE_HEIGHT = 10_000  # 高さの上限: 極端なアスペクト比の画像を拒否する
+
+# Image.resize の reducing_gap: 目標サイズのこの倍率を超える分は reduce()（整数倍の
+# ボックス縮小）で先に縮めてから LANCZOS をかける。3.0 なら LANCZOS 単独と
+# 見分けがつかない画質で、大きく縮小する場合の CPU 時間が大幅に減る
+RESIZE_REDUCING_GAP = 3.0
 MAX_GIF_FRAMES = (
     500  # GIFフレーム数上限: 大量フレームによるメモリ・処理時間の爆発を防止
 )
 
+# Supabase Storage からのダウンロードの読み込み単位とタイムアウト
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT_SECONDS = 30.0
+
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 # 出力用に一般的な拡張子を標準の拡張子にマッピングする
 EXTENSION_NORMALIZE = {".jpeg": ".jpg"}
@@ -66,6 +102,14 @@ CONTENT_TYPE_BY_EXTENSION: dict[str, str] = {
     ".png": "image/png",
     ".gif": "image/gif",
     ".webp": "image/webp",
+    ".avif": "image/avif",
+}
+
+# 派生画像の形式: Settings.image_variant_formats の値 → (Pillow のフォーマット, 拡張子)
+# 配信時は AVIF → WebP の順に優先する
+VARIANT_FORMATS: dict[str, tuple[str, str]] = {
+    "avif": ("AVIF", ".avif"),
+    "webp": ("WEBP", ".webp"),
 }
 
 _MAGIC_BYTES: dict[bytes, str] = {
@@ -77,6 +121,18 @@ _MAGIC_BYTES: dict[bytes, str] = {
 }
 
 
+@contextmanager
+def _timed(timings: dict[str, float] | None, stage: str) -> Iterator[None]:
+    """ブロックの所要時間（ミリ秒）を timings[stage] に加算する。None なら計測しない。"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            timings[stage] = timings.get(stage, 0.0) + elapsed_ms
+
+
 def validate_extension(filename: str) -> str:
     """正規化されたファイル拡張子を検証し、返す。
     拡張子が許可されていない場合は ValueError が発生する。
@@ -173,8 +229,8 @@ def _save_image(
     """フォーマット別に画像を保存する。"""
     if output_format == "PNG":
         img.save(output, format="PNG")
-    elif output_format == "WEBP":
-        img.save(output, format="WEBP", quality=quality)
+    elif output_format in ("WEBP", "AVIF"):
+        img.save(output, format=output_format, quality=quality)
     else:  # JPEG
         # プライバシー保護: EXIF メタデータ(GPS位置情報等)を除去して保存
         img.save(output, format="JPEG", quality=quality, exif=b"")
@@ -188,6 +244,84 @@ def resize_image(
     """max_width よりも幅が広い場合は画像のサイズを変更し、入力フォーマットを保持して出力する。
     (output_bytes, width, height, format, extension) を返す。
     """
+    resized, _ = resize_image_with_variants(image_data, max_width, quality)
+    return resized
+
+
+def _enabled_variant_formats(formats: Sequence[str]) -> list[tuple[str, str]]:
+    """Pillow が書き出せる派生画像の形式だけを (Pillow のフォーマット, 拡張子) で返す。"""
+    return [
+        VARIANT_FORMATS[name]
+        for name in formats
+        if name in VARIANT_FORMATS and features.check(name)
+    ]
+
+
+def _render_variants(
+    img: Image.Image,
+    output_format: str,
+    output_ext: str,
+    quality: int,
+    widths: Sequence[int],
+    formats: Sequence[str],
+    timings: dict[str, float] | None = None,
+) -> list[ImageVariant]:
+    """リサイズ済みの img から縮小版と形式違いの兄弟画像を生成する。
+
+    img より狭い幅の縮小版だけを作る（拡大はしない）。
+    """
+    modern = [
+        (fmt, ext)
+        for fmt, ext in _enabled_variant_formats(formats)
+        if fmt != output_format
+    ]
+    variants: list[ImageVariant] = []
+
+    def encode(source: Image.Image, width: int | None) -> None:
+        targets = [(output_format, output_ext)] if width is not None else []
+        for fmt, ext in targets + modern:
+            with _timed(timings, "encode"):
+                image = source
+                # パレット・グレースケール等は WebP / AVIF 用に RGB(A) にする
+                if fmt != output_format and image.mode not in ("RGB", "RGBA"):
+                    has_alpha = image.has_transparency_data
+                    image = image.convert("RGBA" if has_alpha else "RGB")
+                with io.BytesIO() as output:
+                    _save_image(image, output, fmt, quality)
+                    variants.append(ImageVariant(output.getvalue(), width, ext))
+
+    encode(img, None)
+    for width in sorted({w for w in widths if w < img.width}, reverse=True):
+        height = max(1, round(img.height * width / img.width))
+        with _timed(timings, "resize"):
+            smaller = img.resize(
+                (width, height),
+                Image.Resampling.LANCZOS,
+                reducing_gap=RESIZE_REDUCING_GAP,
+            )
+        encode(smaller, width)
+    return variants
+
+
+def resize_image_with_variants(
+    image_data: bytes,
+    max_width: int | None = None,
+    quality: int | None = None,
+    *,
+    widths: Sequence[int] = (),
+    formats: Sequence[str] = (),
+    timings: dict[str, float] | None = None,
+) -> tuple[ResizedImage, list[ImageVariant]]:
+    """resize_image と同じ変換に加え、同じデコード結果から派生画像を生成する。
+
+    widths: 縮小版の幅、formats: 併せて生成する形式（"webp" / "avif"）。
+    timings を渡すと "decode" / "resize" / "encode" の所要時間（ミリ秒）を加算する。
+    GIF はアニメーション保持のため派生画像を作らない。
+
+    画素数・高さの制限はヘッダーのサイズで判定し、デコード前に拒否する。
+    max_width より広い JPEG は draft() で 1/2・1/4・1/8 に縮小しながらデコードし
+    （目標サイズを下回らない最小の倍率）、その後 LANCZOS で目標サイズに合わせる。
+    """
     settings = get_settings()
     if max_width is None:
         max_width = settings.max_image_width
@@ -201,8 +335,6 @@ def resize_image(
 
     try:
         with Image.open(io.BytesIO(image_data)) as img:
-            img.load()  # 遅延デコードを強制実行して破損を早期検出
-
             # 入力フォーマットを検出し、出力フォーマットを決定する
             input_format = img.format  # 'JPEG', 'PNG', 'GIF', 'WEBP'
             output_format, output_ext = FORMAT_MAP.get(
@@ -223,29 +355,54 @@ def resize_image(
                     f"Image height {img.height}px exceeds maximum {MAX_IMAGE_HEIGHT}px"
                 )
 
-            # GIF はアニメーション保持のためリサイズせずそのまま保存する
-            if output_format == "GIF":
-                return _process_gif(img, output_format, output_ext, max_width)
-
-            # アスペクト比を維持してサイズを変更する
+            # アスペクト比を維持した出力サイズ（ヘッダーの元サイズから決める）
+            target_size = None
             if img.width > max_width:
                 ratio = max_width / img.width
-                new_height = int(img.height * ratio)
-                img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
+                target_size = (max_width, int(img.height * ratio))
 
-            # JPEG 出力時は透過モードを白背景に合成してRGBに変換する
-            if output_format == "JPEG":
-                img = _convert_for_jpeg(img)
+            with _timed(timings, "decode"):
+                # JPEG は DCT の段階で縮小してデコードし、メモリと CPU を抑える
+                if target_size is not None and input_format == "JPEG":
+                    img.draft(None, target_size)
+                img.load()  # 遅延デコードを強制実行して破損を早期検出
 
-            with io.BytesIO() as output:
+            # GIF はアニメーション保持のためリサイズせずそのまま保存する
+            if output_format == "GIF":
+                with _timed(timings, "encode"):
+                    gif = _process_gif(img, output_format, output_ext, max_width)
+                return gif, []
+
+            with _timed(timings, "resize"):
+                # draft() でちょうど目標サイズになった場合はリサイズ不要
+                if target_size is not None and img.size != target_size:
+                    img = img.resize(
+                        target_size,
+                        Image.Resampling.LANCZOS,
+                        reducing_gap=RESIZE_REDUCING_GAP,
+                    )
+
+                # JPEG 出力時は透過モードを白背景に合成してRGBに変換する
+                if output_format == "JPEG":
+                    img = _convert_for_jpeg(img)
+
+            with _timed(timings, "encode"), io.BytesIO() as output:
                 _save_image(img, output, output_format, quality)
-                return ResizedImage(
+                resized = ResizedImage(
                     output.getvalue(),
                     img.width,
                     img.height,
                     output_format,
                     output_ext,
                 )
+            variants = (
+                _render_variants(
+                    img, output_format, output_ext, quality, widths, formats, timings
+                )
+                if widths or formats
+                else []
+            )
+            return resized, variants
     except Image.DecompressionBombError as e:
         raise ValueError(f"Image too large: {e}") from e
     except (Image.UnidentifiedImageError, SyntaxError, OSError) as e:
@@ -257,6 +414,56 @@ def generate_filename(extension: str) -> str:
     return f"{uuid.uuid4().hex}{extension}"
 
 
+def variant_filename(filename: str, width: int | None, extension: str) -> str:
+    """元画像のファイル名から派生画像のキーを導く（"{hex}_w480.webp" など）。"""
+    stem = Path(filename).stem
+    suffix = f"_w{width}" if width is not None else ""
+    return f"{stem}{suffix}{extension}"
+
+
+def variant_candidates(
+    filename: str, width: int | None, accept: Collection[str] = ()
+) -> list[str]:
+    """GET /images/{filename}?w= で探す派生画像のキーを優先順に返す。
+
+    - width 以上の最小の縮小版 → 元画像の順（元画像の幅を超える要求は元画像）
+    - accept（クライアントが受け付ける MIME タイプ）に含まれる新しい形式を先に試す
+    - 最後の候補は常に元画像そのもの
+    """
+    settings = get_settings()
+    ext = Path(filename).suffix.lower()
+    if ext == ".gif":
+        return [filename]
+
+    sizes: list[int | None] = []
+    if width is not None:
+        wider = sorted(
+            w
+            for w in settings.image_variant_widths
+            if width <= w < settings.max_image_width
+        )
+        if wider:
+            sizes.append(wider[0])
+    sizes.append(None)
+
+    modern = [
+        variant_ext
+        for variant_ext in (".avif", ".webp")
+        if variant_ext != ext
+        and any(
+            VARIANT_FORMATS[f][1] == variant_ext for f in settings.image_variant_formats
+        )
+        and CONTENT_TYPE_BY_EXTENSION[variant_ext] in accept
+    ]
+    candidates = [
+        variant_filename(filename, size, candidate_ext)
+        for size in sizes
+        for candidate_ext in [*modern, ext]
+    ]
+    candidates[-1] = filename
+    return candidates
+
+
 @lru_cache
 def ensure_images_bucket_exists() -> None:
     """Supabase Storage の画像バケットが存在することを保証する。"""
@@ -310,12 +517,28 @@ def upload_image_to_supabase(data: bytes, filename: str, extension: str) -> None
         )
 
 
-def download_image_from_supabase(filename: str) -> bytes:
-    """Supabase Storage から画像バイトを取得する。"""
+def stream_image_from_supabase(filename: str, out: BinaryIO) -> None:
+    """Supabase Storage から画像を DOWNLOAD_CHUNK_SIZE ずつ out に書き出す。
+
+    storage3 の download() は本体全体を bytes で返すため、Storage の REST API を
+    直接ストリーミングで読み、メモリ使用量をチャンク1つ分に抑える。
+    存在しない場合などは httpx.HTTPStatusError を raise する。
+    """
     settings = get_settings()
-    supabase = get_supabase_client()
-    bucket = supabase.storage.from_(settings.supabase_images_bucket)
-    return bucket.download(filename)
+    key = settings.supabase_secret_key.get_secret_value()
+    url = (
+        f"{settings.supabase_url.rstrip('/')}/storage/v1/object/"
+        f"{settings.supabase_images_bucket}/{filename}"
+    )
+    with httpx.stream(
+        "GET",
+        url,
+        headers={"Authorization": f"Bearer {key}", "apikey": key},
+        timeout=DOWNLOAD_TIMEOUT_SECONDS,
+    ) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+            out.write(chunk)
 
 
 def process_and_save(
@@ -323,9 +546,11 @@ def process_and_save(
     original_filename: str,
 ) -> ProcessedImage:
     """完全なパイプライン: 検証、サイズ変更、保存
-    (ファイル名、幅、高さ、フォーマット) を返す
+    (ファイル名、幅、高さ、フォーマット、段階ごとの所要時間) を返す
     検証に失敗した場合は ValueError が発生する
     """
+    timings: dict[str, float] = {}
+
     # 1. ファイル拡張子を検証する
     ext = validate_extension(original_filename)
 
@@ -343,11 +568,28 @@ def process_and_save(
             f"File extension '{ext}' does not match content type '{detected_format}'"
         )
 
-    # 5. 入力フォーマットを保持してリサイズ・変換する
-    resized = resize_image(file_data)
+    # 5. 入力フォーマットを保持してリサイズ・変換し、同じデコード結果から派生画像を作る
+    settings = get_settings()
+    resized, variants = resize_image_with_variants(
+        file_data,
+        widths=settings.image_variant_widths,
+        formats=settings.image_variant_formats,
+        timings=timings,
+    )
 
     # 6. 入力フォーマットに応じた拡張子でファイル名を生成し、Supabase Storage に保存
     filename = generate_filename(resized.extension)
-    upload_image_to_supabase(resized.data, filename, resized.extension)
-
-    return ProcessedImage(filename, resized.width, resized.height, resized.format)
+    with _timed(timings, "upload"):
+        upload_image_to_supabase(resized.data, filename, resized.extension)
+
+        # 7. 派生画像を保存する（失敗しても配信時に元画像へフォールバックするため継続）
+        for variant in variants:
+            key = variant_filename(filename, variant.width, variant.extension)
+            try:
+                upload_image_to_supabase(variant.data, key, variant.extension)
+            except Exception:
+                logger.warning("Failed to upload image variant: %s", key, exc_info=True)
+
+    return ProcessedImage(
+        filename, resized.width, resized.height, resized.format, timings
+    )
@@ -0,0 +1,158 @@
+"""JSON Patch（RFC 6902）の適用。
+
+PATCH /sections/{section_id} で Tiptap JSON に差分を適用するために使う。
+入力ドキュメントは変更せず、適用後の新しいドキュメントを返す。
+
+- 不正なパッチ（存在しないパス・不正な op など）: JsonPatchError（ValueError）
+- test 操作の不一致: JsonPatchTestFailed（ConflictError → 409）
+"""
+
+import copy
+from typing import Any
+
+from app.services.history_service import ConflictError
+
+# 1リクエストあたりの操作数上限（巨大なパッチでの CPU 消費を防ぐ）
+MAX_PATCH_OPERATIONS = 1000
+
+
+class JsonPatchError(ValueError):
+    """パッチが不正、またはドキュメントに適用できない。"""
+
+
+class JsonPatchTestFailed(ConflictError):
+    """test 操作の値が一致しない（ドキュメントが想定と異なる）。"""
+
+
+def apply_patch(document: Any, operations: list[dict[str, Any]]) -> Any:
+    """operations を順に適用した新しいドキュメントを返す。
+
+    途中で失敗した場合は例外を送出し、部分的に適用された結果は返さない。
+    """
+    if len(operations) > MAX_PATCH_OPERATIONS:
+        raise JsonPatchError(
+            f"Invalid patch: too many operations (max {MAX_PATCH_OPERATIONS})"
+        )
+
+    result = copy.deepcopy(document)
+    for operation in operations:
+        result = _apply_operation(result, operation)
+    return result
+
+
+def _apply_operation(document: Any, operation: dict[str, Any]) -> Any:
+    op = operation.get("op")
+    path = operation.get("path")
+    if not isinstance(path, str):
+        raise JsonPatchError("Invalid patch: 'path' is required")
+
+    if op == "add":
+        return _add(document, path, copy.deepcopy(_require_value(operation)))
+    if op == "remove":
+        return _remove(document, path)[0]
+    if op == "replace":
+        value = copy.deepcopy(_require_value(operation))
+        document, _ = _remove(document, path)
+        return _add(document, path, value)
+    if op == "move":
+        from_path = _require_from(operation)
+        if path != from_path and path.startswith(from_path + "/"):
+            raise JsonPatchError("Invalid patch: cannot move a value into itself")
+        document, value = _remove(document, from_path)
+        return _add(document, path, value)
+    if op == "copy":
+        value = copy.deepcopy(_get(document, _require_from(operation)))
+        return _add(document, path, value)
+    if op == "test":
+        if _get(document, path) != _require_value(operation):
+            raise JsonPatchTestFailed(f"Patch test failed at '{path}'")
+        return document
+    raise JsonPatchError(f"Invalid patch: unsupported op '{op}'")
+
+
+def _require_value(operation: dict[str, Any]) -> Any:
+    if "value" not in operation:
+        raise JsonPatchError(f"Invalid patch: '{operation['op']}' requires 'value'")
+    return operation["value"]
+
+
+def _require_from(operation: dict[str, Any]) -> str:
+    from_path = operation.get("from")
+    if not isinstance(from_path, str):
+        raise JsonPatchError(f"Invalid patch: '{operation['op']}' requires 'from'")
+    return from_path
+
+
+def _parse_pointer(path: str) -> list[str]:
+    """JSON Pointer（RFC 6901）をトークン列に分解する。"""
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise JsonPatchError(f"Invalid patch: malformed path '{path}'")
+    return [t.replace("~1", "/").replace("~0", "~") for t in path[1:].split("/")]
+
+
+def _list_index(container: list, token: str, path: str, *, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid patch: bad array index in '{path}'")
+    index = int(token)
+    upper = len(container) if allow_end else len(container) - 1
+    if index > upper:
+        raise JsonPatchError(f"Invalid patch: array index out of range in '{path}'")
+    return index
+
+
+def _resolve_parent(document: Any, path: str) -> tuple[Any, str]:
+    tokens = _parse_pointer(path)
+    if not tokens:
+        raise JsonPatchError("Invalid patch: the document root cannot be a target")
+    parent = document
+    for token in tokens[:-1]:
+        parent = _child(parent, token, path)
+    return parent, tokens[-1]
+
+
+def _child(container: Any, token: str, path: str) -> Any:
+    if isinstance(container, dict):
+        if token not in container:
+            raise JsonPatchError(f"Invalid patch: path '{path}' does not exist")
+        return container[token]
+    if isinstance(container, list):
+        return container[_list_index(container, token, path, allow_end=False)]
+    raise JsonPatchError(f"Invalid patch: path '{path}' does not exist")
+
+
+def _get(document: Any, path: str) -> Any:
+    value = document
+    for token in _parse_pointer(path):
+        value = _child(value, token, path)
+    return value
+
+
+def _add(document: Any, path: str, value: Any) -> Any:
+    if path == "":
+        return value
+    parent, token = _resolve_parent(document, path)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, token, path, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Invalid patch: path '{path}' does not exist")
+    return document
+
+
+def _remove(document: Any, path: str) -> tuple[Any, Any]:
+    """path の値を取り除き、(ドキュメント, 取り除いた値) を返す。"""
+    if path == "":
+        return None, document
+    parent, token = _resolve_parent(document, path)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Invalid patch: path '{path}' does not exist")
+        return document, parent.pop(token)
+    if isinstance(parent, list):
+        return document, parent.pop(_list_index(parent, token, path, allow_end=False))
+    raise JsonPatchError(f"Invalid patch: path '{path}' does not exist")
@@ -5,6 +5,7 @@ from uuid import UUID
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from app.core.events import publish_plot_event
 from app.models import Plot, PlotBan
 
 
@@ -96,6 +97,7 @@ def pause_plot(
 
         plot.is_paused = True
         plot.pause_reason = reason
+        publish_plot_event(db, plot.id, "plot_paused", {})
         db.commit()
         db.refresh(plot)
         return plot
@@ -122,6 +124,7 @@ def resume_plot(
 
         plot.is_paused = False
         plot.pause_reason = None
+        publish_plot_event(db, plot.id, "plot_resumed", {})
         db.commit()
         db.refresh(plot)
         return plot
@@ -0,0 +1,370 @@
+"""HotOperation の write-behind バッファ（グループコミット）。
+
+POST /sections/{section_id}/operations はリクエストごとに
+SELECT → UPDATE → INSERT → COMMIT を行うため、編集が集中すると
+DB 接続あたりのスループットが commit の往復で頭打ちになる。
+
+Settings.operation_buffer_enabled が true の場合、record_operation の代わりに
+submit() でプロセス内のキューに積み、フラッシュスレッドが
+flush_interval_ms ごと（または max_batch 件たまった時点）に
+溜まった操作を1トランザクションでまとめて記録する。
+
+- 応答: submit() は自分の操作を含むトランザクションが commit されるまで待ち、
+  採番された version を返す。プロセスが落ちても ack 済みの操作は失われない
+  （代わりに最大 flush_interval_ms の遅延が乗る）
+- バックプレッシャー: キューが max_queue 件に達したら enqueue_timeout 秒まで待ち、
+  空かなければ OperationBufferFull（→ 503）
+- 応答待ちのタイムアウト: result_timeout 秒以内にフラッシュが始まらなければ
+  操作をキューから取り除いて OperationBufferFull（→ 503、記録されていないので
+  再送してよい）。フラッシュ中なら commit か失敗が確定するまで待つ
+- 部分失敗: まとめたトランザクションが失敗したら1件ずつ記録し直し、
+  失敗の原因になった操作だけをエラーにする
+- シャットダウン: stop() でキューを最後までフラッシュしてから終了する
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import get_session_local
+from app.core.events import publish_plot_event
+from app.models import Section, User
+from app.services import history_service
+from app.services.snapshot_scheduler import mark_plot_dirty
+
+logger = logging.getLogger(__name__)
+
+# フラッシュ所要時間ヒストグラムのバケット上限（ミリ秒）
+FLUSH_LATENCY_BUCKETS_MS: tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 1000)
+# submit() がフラッシュ開始を待つ上限。超えたら操作を取り下げて 503 を返す
+RESULT_TIMEOUT_SECONDS = 30.0
+
+
+class OperationBufferFull(Exception):
+    """キューが満杯、または停止中で操作を受け付けられない。"""
+
+
+@dataclass
+class _PendingOperation:
+    section_id: UUID
+    user_id: UUID
+    operation_type: str
+    payload: dict | None
+    future: Future = field(default_factory=Future)
+
+
+class OperationWriteBuffer:
+    """操作をキューに積み、バックグラウンドスレッドでグループコミットする。"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        flush_interval_ms: float = 5.0,
+        max_batch: int = history_service.MAX_BATCH_OPERATIONS,
+        max_queue: int = 10000,
+        enqueue_timeout: float = 1.0,
+        result_timeout: float = RESULT_TIMEOUT_SECONDS,
+    ) -> None:
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval_ms / 1000
+        # 1回の INSERT に載せる件数は一括記録の上限に合わせる
+        self.max_batch = min(max_batch, history_service.MAX_BATCH_OPERATIONS)
+        self.max_queue = max_queue
+        self.enqueue_timeout = enqueue_timeout
+        self.result_timeout = result_timeout
+
+        self._pending: deque[_PendingOperation] = deque()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+
+        # メトリクス（_cond で保護）
+        self.enqueued = 0
+        self.flushed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.retried = 0
+        self.flushes = 0
+        self.max_batch_rows = 0
+        self.flush_sum_ms = 0.0
+        self.flush_max_ms = 0.0
+        # 最後の要素は +Inf バケット
+        self.flush_buckets = [0] * (len(FLUSH_LATENCY_BUCKETS_MS) + 1)
+
+    # ─── lifecycle ──────────────────────────────────────────
+    def start(self) -> None:
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="operation-buffer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """新規受付を止め、キューに残った操作をフラッシュしてから終了する。"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # ─── enqueue ────────────────────────────────────────────
+    def submit(
+        self,
+        section_id: UUID,
+        user_id: UUID,
+        operation_type: str,
+        payload: dict | None = None,
+    ) -> dict:
+        """操作をキューに積み、commit されたら {"id", "section_id", "version"} を返す。
+
+        Raises:
+            ValueError: セクション・ユーザーが存在しない
+            OperationBufferFull: キューが満杯（バックプレッシャー）、停止中、または
+                result_timeout 秒以内にフラッシュされなかった（いずれも未記録）
+        """
+        pending = _PendingOperation(section_id, user_id, operation_type, payload)
+        with self._cond:
+            deadline = time.monotonic() + self.enqueue_timeout
+            while not self._stopping and len(self._pending) >= self.max_queue:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejected += 1
+                    raise OperationBufferFull("Operation queue is full")
+                self._cond.wait(remaining)
+            if self._stopping:
+                self.rejected += 1
+                raise OperationBufferFull("Operation buffer is shutting down")
+            self._pending.append(pending)
+            self.enqueued += 1
+            self._cond.notify_all()
+
+        try:
+            return pending.future.result(timeout=self.result_timeout)
+        except FutureTimeoutError:
+            with self._cond:
+                # まだキューにあればフラッシュされていないので取り下げる。
+                # 取り下げた操作は記録されないため、クライアントは安全に再送できる
+                if pending in self._pending:
+                    self._pending.remove(pending)
+                    self.timed_out += 1
+                    self._cond.notify_all()
+                    raise OperationBufferFull(
+                        "Timed out waiting for group commit"
+                    ) from None
+        # フラッシュ中: 記録されたかどうかが確定するまで待つ（応答後に記録されて
+        # 再送が重複するのを防ぐ）
+        return pending.future.result()
+
+    # ─── flush ──────────────────────────────────────────────
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # 最初の1件から flush_interval だけ待って後続をまとめる
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._pending) < self.max_batch and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = [
+                    self._pending.popleft()
+                    for _ in range(min(len(self._pending), self.max_batch))
+                ]
+                # 空きを待っている submit() を起こす
+                self._cond.notify_all()
+
+            start = time.perf_counter()
+            try:
+                self._flush(batch)
+            except Exception as e:
+                logger.exception("Operation buffer flush failed (%d rows)", len(batch))
+                if len(batch) > 1:
+                    self._flush_one_by_one(batch)
+                elif not batch[0].future.done():
+                    batch[0].future.set_exception(e)
+            self._observe_flush(batch, (time.perf_counter() - start) * 1000)
+
+    def _flush_one_by_one(self, batch: list[_PendingOperation]) -> None:
+        """まとめた記録が失敗したとき、未確定の操作を1件ずつ記録し直す。
+
+        1件の不正な操作（制約違反など）で同じバッチの正しい操作まで
+        失敗させないため。
+        """
+        remaining = [p for p in batch if not p.future.done()]
+        with self._cond:
+            self.retried += len(remaining)
+        for pending in remaining:
+            try:
+                self._flush([pending])
+            except Exception as e:
+                logger.exception("Operation buffer: operation failed on retry")
+                pending.future.set_exception(e)
+
+    def _flush(self, batch: list[_PendingOperation]) -> None:
+        """batch を1トランザクションで記録し、各 future に結果を設定する。"""
+        db = self._session_factory()
+        try:
+            section_plots = dict(
+                db.execute(
+                    select(Section.id, Section.plot_id).where(
+                        Section.id.in_({p.section_id for p in batch})
+                    )
+                ).all()
+            )
+            user_ids = set(
+                db.scalars(
+                    select(User.id).where(User.id.in_({p.user_id for p in batch}))
+                )
+            )
+
+            # 不正な操作だけを失敗させ、残りはそのまま記録する
+            valid = []
+            for pending in batch:
+                if pending.section_id not in section_plots:
+                    pending.future.set_exception(ValueError("Section not found"))
+                elif pending.user_id not in user_ids:
+                    pending.future.set_exception(ValueError("User not found"))
+                else:
+                    valid.append(pending)
+            if not valid:
+                return
+
+            rows = history_service.insert_operations(
+                db,
+                [
+                    {
+                        "section_id": p.section_id,
+                        "user_id": p.user_id,
+                        "operation_type": p.operation_type,
+                        "payload": p.payload,
+                    }
+                    for p in valid
+                ],
+            )
+
+            for plot_id in {section_plots[p.section_id] for p in valid}:
+                mark_plot_dirty(db, plot_id)
+            last_versions = {row["section_id"]: row["version"] for row in rows}
+            for section_id, version in last_versions.items():
+                publish_plot_event(
+                    db,
+                    section_plots[section_id],
+                    "section_updated",
+                    {"sectionId": str(section_id), "version": version},
+                )
+
+            try:
+                db.commit()
+            except SQLAlchemyError:
+                db.rollback()
+                raise
+
+            for pending, row in zip(valid, rows, strict=True):
+                pending.future.set_result(row)
+        finally:
+            db.close()
+
+    # ─── metrics ────────────────────────────────────────────
+    def _observe_flush(self, batch: list[_PendingOperation], elapsed_ms: float) -> None:
+        succeeded = sum(
+            1 for p in batch if p.future.done() and p.future.exception() is None
+        )
+        with self._cond:
+            self.flushes += 1
+            self.flushed += succeeded
+            self.failed += len(batch) - succeeded
+            self.max_batch_rows = max(self.max_batch_rows, len(batch))
+            self.flush_sum_ms += elapsed_ms
+            self.flush_max_ms = max(self.flush_max_ms, elapsed_ms)
+            for i, upper in enumerate(FLUSH_LATENCY_BUCKETS_MS):
+                if elapsed_ms <= upper:
+                    self.flush_buckets[i] += 1
+                    break
+            else:
+                self.flush_buckets[-1] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """キュー深さ・フラッシュ所要時間などを JSON 化可能な dict で返す。"""
+        with self._cond:
+            cumulative = []
+            running = 0
+            for upper, count in zip(
+                [*FLUSH_LATENCY_BUCKETS_MS, "+Inf"], self.flush_buckets, strict=True
+            ):
+                running += count
+                cumulative.append({"le": upper, "count": running})
+            return {
+                "queueDepth": len(self._pending),
+                "maxQueue": self.max_queue,
+                "enqueued": self.enqueued,
+                "flushed": self.flushed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timedOut": self.timed_out,
+                "retried": self.retried,
+                "flushes": self.flushes,
+                "maxBatchRows": self.max_batch_rows,
+                "flushMs": {
+                    "count": self.flushes,
+                    "sum": round(self.flush_sum_ms, 3),
+                    "max": round(self.flush_max_ms, 3),
+                    "buckets": cumulative,
+                },
+            }
+
+
+_buffer: OperationWriteBuffer | None = None
+
+
+def get_operation_buffer() -> OperationWriteBuffer | None:
+    """起動中のバッファを返す。無効化されている場合は None。"""
+    return _buffer
+
+
+def start_operation_buffer() -> None:
+    """operation_buffer_enabled の場合にバッファを開始する（lifespan startup 用）。"""
+    global _buffer
+    settings = get_settings()
+    if not settings.operation_buffer_enabled or _buffer is not None:
+        return
+
+    _buffer = OperationWriteBuffer(
+        get_session_local(),
+        flush_interval_ms=settings.operation_buffer_flush_interval_ms,
+        max_batch=settings.operation_buffer_max_batch,
+        max_queue=settings.operation_buffer_max_queue,
+        enqueue_timeout=settings.operation_buffer_enqueue_timeout_seconds,
+    )
+    _buffer.start()
+    logger.info(
+        "Operation write-behind buffer started (interval: %.1f ms, batch: %d)",
+        settings.operation_buffer_flush_interval_ms,
+        _buffer.max_batch,
+    )
+
+
+def stop_operation_buffer() -> None:
+    """残りの操作をフラッシュしてバッファを停止する（lifespan shutdown 用）。"""
+    global _buffer
+    if _buffer is not None:
+        _buffer.stop()
+        _buffer = None
@@ -0,0 +1,85 @@
+"""一覧のキーセット（カーソル）ページング。
+
+offset ページングは OFFSET 分の行を読み飛ばすため、深いページほど遅くなる。
+カーソルは直前のページ末尾の (created_at, id) を不透明なトークンにしたもので、
+次のページは WHERE (created_at, id) < (:created_at, :id) から読み始める。
+(フィルタ列, created_at, id) の複合インデックスがあれば、どのページも
+1ページ目と同じコストで取得できる。
+
+- 並び順は (created_at, id) で固定する（created_at が同じ行の順序を id で確定させる）
+- カーソルは offset の代わりに指定する。両方指定された場合はカーソルを優先する
+- 改ざん・破損したカーソルは InvalidCursorError（ValueError のサブクラス、→ 400）
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+
+class InvalidCursorError(ValueError):
+    """カーソルトークンを復元できない。"""
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """(created_at, id) を URL に載せられる不透明なトークンにする。"""
+    raw = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """encode_cursor の逆変換。不正なトークンは InvalidCursorError。"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def paginate(
+    query: Query,
+    created_col: InstrumentedAttribute[Any],
+    id_col: InstrumentedAttribute[Any],
+    *,
+    limit: int,
+    offset: int = 0,
+    cursor: str | None = None,
+    descending: bool = True,
+) -> tuple[list[Any], str | None]:
+    """query を (created_at, id) 順に1ページ分取得し、(行, 次のカーソル) を返す。
+
+    次のページがない場合、次のカーソルは None。
+    判定のため limit + 1 件取得する（余分な1件は返さない）。
+
+    Raises:
+        InvalidCursorError: cursor が不正
+    """
+    if descending:
+        query = query.order_by(created_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(created_col.asc(), id_col.asc())
+
+    if cursor is not None:
+        created_at, row_id = decode_cursor(cursor)
+        key = tuple_(created_col, id_col)
+        bound = tuple_(
+            literal(created_at, created_col.type), literal(row_id, id_col.type)
+        )
+        query = query.filter(key < bound if descending else key > bound)
+    elif offset:
+        query = query.offset(offset)
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(
+        getattr(last, created_col.key), getattr(last, id_col.key)
+    )
@@ -4,13 +4,17 @@ endpoint 層から呼び出され、DB 操作のみを担当する。
 失敗時は ValueError を raise し、endpoint 側で HTTPException に変換する。
 """
 
-from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from app.models import Plot, Star
+from app.core.events import publish_plot_event
+from app.models import Plot, Section, Star
+from app.services.pagination import paginate
+from app.services.snapshot_scheduler import mark_plot_dirty
+from app.services.total_count import count_total
 
 
 def list_plots(
@@ -18,11 +22,17 @@ def list_plots(
     tag: str | None = None,
     limit: int = 20,
     offset: int = 0,
-) -> tuple[list[Plot], int]:
-    """Plot 一覧を取得する。
+    cursor: str | None = None,
+) -> tuple[list[Plot], int, str | None]:
+    """Plot 一覧を取得する（新しい順）。
 
     tag が指定された場合、tags JSON カラムに含まれる Plot のみ返す。
-    戻り値は (Plot リスト, total件数) のタプル。
+    cursor を指定した場合は offset の代わりにキーセットで続きを取得する（pagination 参照）。
+    戻り値は (Plot リスト, total件数, 次ページのカーソル) のタプル。
+    total は PageTotal（total_count 参照）。
+
+    Raises:
+        ValueError: cursor が不正
     """
     query = db.query(Plot)
 
@@ -31,11 +41,20 @@ def list_plots(
         # tags カラムは JSON 型 (list[str]) なので、cast して検索する
         query = query.filter(Plot.tags.op("@>")(f'["{tag}"]'))
 
-    total = query.count()
-
-    plots = query.order_by(Plot.created_at.desc()).offset(offset).limit(limit).all()
+    plots, next_cursor = paginate(
+        query, Plot.created_at, Plot.id, limit=limit, offset=offset, cursor=cursor
+    )
+    total = count_total(
+        db,
+        query,
+        endpoint="plots.list",
+        limit=limit,
+        offset=None if cursor else offset,
+        page_size=len(plots),
+        cache_key=(tag,),
+    )
 
-    return plots, total
+    return plots, total, next_cursor
 
 
 def create_plot(
@@ -55,6 +74,8 @@ def create_plot(
         thumbnail_url=thumbnail_url,
     )
     db.add(plot)
+    db.flush()  # plot.id を確定させる
+    mark_plot_dirty(db, plot.id)
     db.commit()
     db.refresh(plot)
     return plot
@@ -71,6 +92,68 @@ def get_plot_detail(db: Session, plot_id: UUID) -> Plot:
     return plot
 
 
+async def get_plot_detail_async(db: AsyncSession, plot_id: UUID) -> Plot:
+    """get_plot_detail の非同期版。
+
+    AsyncSession では遅延ロードできないため、sections / owner を eager load する。
+    存在しない場合は ValueError を raise する。
+    """
+    result = await db.execute(
+        select(Plot)
+        .options(selectinload(Plot.sections), selectinload(Plot.owner))
+        .where(Plot.id == plot_id)
+    )
+    plot = result.scalar_one_or_none()
+    if not plot:
+        raise ValueError("Plot not found")
+    return plot
+
+
+async def get_plot_fingerprint_async(
+    db: AsyncSession, plot_id: UUID, user_id: UUID | None
+) -> Row | None:
+    """Plot 詳細レスポンスの ETag 元になる値を1回のクエリで取得する。
+
+    Plot.version / Plot.updated_at / セクションの最大 version・件数 /
+    star_count / is_starred（閲覧ユーザー）の Row を返す。Plot が存在しない場合は None。
+    セクションの作成・更新・削除・並び替えは Plot.updated_at も更新するため、
+    本文を組み立てずに変更有無を判定できる。
+    """
+    max_section_version = (
+        select(func.max(Section.version))
+        .where(Section.plot_id == Plot.id)
+        .correlate(Plot)
+        .scalar_subquery()
+    )
+    section_count = (
+        select(func.count(Section.id))
+        .where(Section.plot_id == Plot.id)
+        .correlate(Plot)
+        .scalar_subquery()
+    )
+    if user_id is not None:
+        starred = (
+            select(Star.id)
+            .where(Star.plot_id == Plot.id, Star.user_id == user_id)
+            .correlate(Plot)
+            .exists()
+        )
+    else:
+        starred = literal(False)
+
+    result = await db.execute(
+        select(
+            Plot.version,
+            Plot.updated_at,
+            max_section_version,
+            section_count,
+            Plot.star_count,
+            starred.label("is_starred"),
+        ).where(Plot.id == plot_id)
+    )
+    return result.first()
+
+
 def update_plot(
     db: Session,
     plot_id: UUID,
@@ -102,6 +185,9 @@ def update_plot(
     if thumbnail_url is not ...:
         plot.thumbnail_url = thumbnail_url
 
+    # title / description / tags はスナップショットに含まれる
+    mark_plot_dirty(db, plot.id)
+    publish_plot_event(db, plot.id, "plot_updated", {"version": plot.version})
     db.commit()
     db.refresh(plot)
     return plot
@@ -126,31 +212,13 @@ def delete_plot(db: Session, plot_id: UUID, user_id: UUID) -> None:
 
 
 def get_star_count(db: Session, plot_id: UUID) -> int:
-    """Plot のスター数を取得する。"""
-    return db.query(Star).filter(Star.plot_id == plot_id).count()
-
-
-def get_star_counts_batch(
-    db: Session,
-    plot_ids: list[UUID],
-) -> dict[UUID, int]:
-    """複数 Plot のスター数を1回のクエリで取得する（N+1 回避）。
-
-    戻り値は {plot_id: star_count} の辞書。plot_ids に含まれるが
-    スターが 0 件の Plot も 0 で含まれる。
-    """
-    if not plot_ids:
-        return {}
-
-    rows = (
-        db.query(Star.plot_id, func.count(Star.id))
-        .filter(Star.plot_id.in_(plot_ids))
-        .group_by(Star.plot_id)
-        .all()
+    """Plot のスター数（Plot.star_count）を取得する。Plot が存在しない場合は 0。"""
+    return (
+        db.execute(
+            select(Plot.star_count).where(Plot.id == plot_id)
+        ).scalar_one_or_none()
+        or 0
     )
-    counts = {plot_id: count for plot_id, count in rows}
-    # スターが付いていない Plot にも 0 を返す
-    return {pid: counts.get(pid, 0) for pid in plot_ids}
 
 
 def is_starred_by(db: Session, plot_id: UUID, user_id: UUID | None) -> bool:
@@ -163,6 +231,24 @@ def is_starred_by(db: Session, plot_id: UUID, user_id: UUID | None) -> bool:
     )
 
 
+async def get_star_count_async(db: AsyncSession, plot_id: UUID) -> int:
+    """get_star_count の非同期版。"""
+    result = await db.execute(select(Plot.star_count).where(Plot.id == plot_id))
+    return result.scalar_one_or_none() or 0
+
+
+async def is_starred_by_async(
+    db: AsyncSession, plot_id: UUID, user_id: UUID | None
+) -> bool:
+    """is_starred_by の非同期版。"""
+    if user_id is None:
+        return False
+    result = await db.execute(
+        select(Star.id).where(Star.plot_id == plot_id, Star.user_id == user_id).limit(1)
+    )
+    return result.first() is not None
+
+
 def get_starred_plot_ids_batch(
     db: Session,
     plot_ids: list[UUID],
@@ -185,35 +271,25 @@ def get_starred_plot_ids_batch(
 
 
 def list_trending(db: Session, limit: int = 5) -> list[Plot]:
-    """急上昇 Plot 一覧（直近72時間のスター増加数でソート）。"""
-    since = datetime.now(timezone.utc) - timedelta(hours=72)
-
-    # 直近72時間にスターされた Plot を、スター数降順で取得
-    results = (
-        db.query(Plot, func.count(Star.id).label("recent_stars"))
-        .join(Star, Star.plot_id == Plot.id)
-        .filter(Star.created_at >= since)
-        .group_by(Plot.id)
-        .order_by(func.count(Star.id).desc())
+    """急上昇 Plot 一覧（時間減衰させたスター・フォーク・コメントのスコア順）。
+
+    Plot.trending_score のインデックスを降順に読む（trending_service 参照）。
+    """
+    return (
+        db.query(Plot)
+        .filter(Plot.trending_score > 0)
+        .order_by(Plot.trending_score.desc())
         .limit(limit)
         .all()
     )
 
-    return [plot for plot, _ in results]
-
 
 def list_popular(db: Session, limit: int = 5) -> list[Plot]:
-    """人気 Plot 一覧（全期間のスター総数でソート）。"""
-    results = (
-        db.query(Plot, func.count(Star.id).label("total_stars"))
-        .outerjoin(Star, Star.plot_id == Plot.id)
-        .group_by(Plot.id)
-        .order_by(func.count(Star.id).desc())
-        .limit(limit)
-        .all()
-    )
+    """人気 Plot 一覧（全期間のスター総数でソート）。
 
-    return [plot for plot, _ in results]
+    Plot.star_count のインデックスを降順に読むため、全 Plot を集計しない。
+    """
+    return db.query(Plot).order_by(Plot.star_count.desc()).limit(limit).all()
 
 
 def list_new(db: Session, limit: int = 5) -> list[Plot]:
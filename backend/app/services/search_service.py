@@ -1,14 +1,65 @@
-"""検索サービス - ILIKE ベースの Plot 検索ロジック。
+"""検索サービス - Plot の全文検索ロジック。
 
 endpoint 層から呼び出され、DB 操作のみを担当する。
-将来的に ts_vector ベースの全文検索に移行する場合、
-このファイル内のクエリロジックのみ修正すれば良い。
+
+PostgreSQL:
+- plots.search_vector（title / description + tags / section_text を重み付けした
+  tsvector の生成列, GIN）に websearch_to_tsquery で一致させ、ts_rank 順に返す
+- 'simple' パーサは日本語を分かち書きしないため、plots.search_text
+  （同じフィールドを連結した生成列, pg_trgm の GIN）への ILIKE でも一致させる。
+  ILIKE は trigram インデックスで解決されるので全件走査にならない
+- どちらの生成列もマイグレーション（a6c2e8f4b1d9）で作成し、モデルには載せない
+
+SQLite（テスト）: title / description / section_text への ILIKE にフォールバックする。
+
+plots.section_text（全セクションのプレーンテキスト）はスナップショットバッチが
+dirty な Plot ごとに refresh_section_text() で更新する。
+
+セクション単位の検索（search_sections）は section_search_text テーブルを使う。
+本文・タイトルを変更する書き込み（作成・更新・パッチ・フォーク・ロールバック）と
+同じトランザクションで index_sections() が更新し、マイグレーション前からある
+セクションの欠けている行は run_search_backfill() が埋める。HotOperation の記録は
+sections.version を進めるが本文を変えないため、索引し直さない。
+
+どちらのテキストも SEARCH_TEXT_MAX_CHARS 文字で切り詰めてから書き込む。
+PostgreSQL は 1MB を超える tsvector を拒否する（string is too long for tsvector）
+ため、巨大な Plot / セクションがあると索引する書き込みごと失敗してしまう。
 """
 
-from sqlalchemy import func, or_
+import logging
+import time
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import func, literal_column, or_, select
+from sqlalchemy import update as sa_update
 from sqlalchemy.orm import Session
 
-from app.models import Plot, Star
+from app.models import Plot, Section, SectionSearchText
+from app.services import blob_service
+from app.services.history_service import extract_text
+from app.services.total_count import count_total
+
+logger = logging.getLogger(__name__)
+
+# to_tsvector / websearch_to_tsquery の設定（マイグレーションの生成列と揃える）
+SEARCH_TS_CONFIG = "simple"
+
+# 1回のバックフィルで section_text を埋める Plot 数
+SECTION_TEXT_BACKFILL_BATCH_SIZE = 200
+# 1回のバックフィルで section_search_text を埋めるセクション数
+SECTION_INDEX_BACKFILL_BATCH_SIZE = 500
+# 1回のジョブでバックフィルに使う時間の上限（残りは次回のジョブで続ける）
+SEARCH_BACKFILL_TIME_BUDGET_SECONDS = 30.0
+# スニペットに含める一致箇所前後の文字数
+SNIPPET_CONTEXT_CHARS = 60
+# plots.section_text / section_search_text.body に書き込む最大文字数。
+# UTF-8 で1文字最大4バイトでも tsvector の上限（1MB）に収まる長さにする
+SEARCH_TEXT_MAX_CHARS = 100_000
+
+_search_vector = literal_column("plots.search_vector")
+_search_text = literal_column("plots.search_text")
+_body_vector = literal_column("section_search_text.body_vector")
 
 
 def search_plots(
@@ -17,37 +68,334 @@ def search_plots(
     limit: int = 20,
     offset: int = 0,
 ) -> tuple[list[tuple[Plot, int]], int]:
-    """ILIKE を使用した Plot 検索。title と description を対象とする。
+    """Plot 検索。title / description / tags / セクション本文を対象とする。
 
     戻り値は ((Plot, star_count) のリスト, total件数) のタプル。
+    PostgreSQL では関連度（ts_rank）順、それ以外では作成日時の降順。
     """
-    # ILIKE ワイルドカード文字をエスケープし、DoS を防止する
-    escaped_q = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
-    pattern = f"%{escaped_q}%"
+    filter_cond, order_by = _search_clauses(db.get_bind().dialect.name, q)
+
+    query = db.query(Plot).filter(filter_cond)
+    plots = query.order_by(*order_by).offset(offset).limit(limit).all()
+    total = count_total(
+        db,
+        query,
+        endpoint="search.plots",
+        limit=limit,
+        offset=offset,
+        page_size=len(plots),
+        cache_key=(q,),
+    )
+
+    return [(plot, plot.star_count) for plot in plots], total
+
+
+def _search_clauses(dialect_name: str, q: str) -> tuple[Any, list[Any]]:
+    """dialect に応じた (WHERE 条件, ORDER BY 句のリスト) を返す。"""
+    pattern = _like_pattern(q)
+
+    if dialect_name == "postgresql":
+        tsquery = _tsquery(q)
+        filter_cond = or_(
+            _search_vector.op("@@")(tsquery),
+            _search_text.ilike(pattern, escape="\\"),
+        )
+        return filter_cond, [
+            func.ts_rank(_search_vector, tsquery).desc(),
+            # trigram でのみ一致した行（ts_rank = 0）は類似度で並べる
+            func.word_similarity(q, _search_text).desc(),
+            Plot.created_at.desc(),
+        ]
 
     filter_cond = or_(
         Plot.title.ilike(pattern, escape="\\"),
         Plot.description.ilike(pattern, escape="\\"),
+        Plot.section_text.ilike(pattern, escape="\\"),
     )
+    return filter_cond, [Plot.created_at.desc()]
+
+
+def _like_pattern(q: str) -> str:
+    # ILIKE ワイルドカード文字をエスケープし、DoS を防止する
+    escaped_q = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped_q}%"
 
-    total = db.query(Plot).filter(filter_cond).count()
 
-    # スター数を1回のクエリで取得する（N+1 回避）。
-    # LEFT OUTER JOIN で Star テーブルを結合し、plot ごとに COUNT する。
-    star_count_subq = (
-        db.query(Star.plot_id, func.count(Star.id).label("star_count"))
-        .group_by(Star.plot_id)
-        .subquery()
+def _tsquery(q: str):
+    return func.websearch_to_tsquery(
+        literal_column(f"'{SEARCH_TS_CONFIG}'::regconfig"), q
     )
 
-    items = (
-        db.query(Plot, func.coalesce(star_count_subq.c.star_count, 0))
-        .outerjoin(star_count_subq, Plot.id == star_count_subq.c.plot_id)
+
+# ─── セクション検索 ─────────────────────────────────────
+def search_sections(
+    db: Session,
+    q: str,
+    limit: int = 20,
+    offset: int = 0,
+) -> tuple[list[dict], int]:
+    """セクションのタイトル・本文を検索し、一致箇所のスニペット付きで返す。
+
+    section_search_text だけを参照するため、クエリ時に Tiptap JSON は読まない。
+    戻り値は (items, total)。items は section_id / plot_id / plot_title /
+    section_title / snippet / highlights（snippet 内の (start, length)）の dict。
+    """
+    pattern = _like_pattern(q)
+    if db.get_bind().dialect.name == "postgresql":
+        tsquery = _tsquery(q)
+        filter_cond = or_(
+            _body_vector.op("@@")(tsquery),
+            SectionSearchText.title.ilike(pattern, escape="\\"),
+            SectionSearchText.body.ilike(pattern, escape="\\"),
+        )
+        order_by = [
+            func.ts_rank(_body_vector, tsquery).desc(),
+            SectionSearchText.updated_at.desc(),
+        ]
+    else:
+        filter_cond = or_(
+            SectionSearchText.title.ilike(pattern, escape="\\"),
+            SectionSearchText.body.ilike(pattern, escape="\\"),
+        )
+        order_by = [SectionSearchText.updated_at.desc()]
+
+    rows = (
+        db.query(SectionSearchText, Plot.title)
+        .join(Plot, Plot.id == SectionSearchText.plot_id)
         .filter(filter_cond)
-        .order_by(Plot.created_at.desc())
+        .order_by(*order_by, SectionSearchText.section_id)
         .offset(offset)
         .limit(limit)
         .all()
     )
+    total = count_total(
+        db,
+        db.query(SectionSearchText).filter(filter_cond),
+        endpoint="search.sections",
+        limit=limit,
+        offset=offset,
+        page_size=len(rows),
+        cache_key=(q,),
+    )
+
+    items = []
+    for entry, plot_title in rows:
+        snippet, highlights = make_snippet(entry.body, q)
+        items.append(
+            {
+                "section_id": entry.section_id,
+                "plot_id": entry.plot_id,
+                "plot_title": plot_title,
+                "section_title": entry.title,
+                "snippet": snippet,
+                "highlights": highlights,
+            }
+        )
+    return items, total
+
+
+def make_snippet(body: str, q: str) -> tuple[str, list[tuple[int, int]]]:
+    """本文から最初の一致箇所の前後を切り出し、snippet 内の一致位置を返す。
+
+    クエリは空白区切りの語ごとに大文字小文字を無視して探す。
+    本文に一致しない場合（タイトルのみ一致など）は本文の先頭を返す。
+    HTML は返さず、強調表示はクライアントが highlights を使って行う。
+    """
+    terms = [t for t in q.lower().split() if t]
+    lowered = body.lower()
+    first = min(
+        (i for i in (lowered.find(t) for t in terms) if i >= 0),
+        default=-1,
+    )
+
+    if first < 0:
+        snippet = body[: SNIPPET_CONTEXT_CHARS * 2]
+        return snippet + ("…" if len(body) > len(snippet) else ""), []
+
+    start = max(0, first - SNIPPET_CONTEXT_CHARS)
+    end = min(len(body), first + SNIPPET_CONTEXT_CHARS * 2)
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(body) else ""
+    window = lowered[start:end]
+
+    highlights = []
+    for term in terms:
+        pos = window.find(term)
+        while pos >= 0:
+            highlights.append((len(prefix) + pos, len(term)))
+            pos = window.find(term, pos + len(term))
+    highlights.sort()
+    return prefix + body[start:end] + suffix, highlights
+
+
+def index_sections(db: Session, sections: list[Section]) -> None:
+    """セクションの検索用テキストを section_search_text に UPSERT する。
+
+    セクションの書き込みと同じトランザクションで呼ぶ（commit は呼び出し側）。
+    Blob 参照中のセクションは1回のクエリでまとめて Blob を読む。
+    タイトル・本文が変わっていない行は書き換えない（PostgreSQL で tsvector・
+    trigram インデックスの再計算を避けるため）。
+    """
+    if not sections:
+        return
+    blob_service.prefetch_section_contents(db, sections)
+    rows = [
+        {
+            "section_id": section.id,
+            "plot_id": section.plot_id,
+            "title": section.title,
+            "body": _cap_search_text(
+                extract_text(blob_service.section_content(section), fallback_json=False)
+            ),
+            "section_version": section.version,
+        }
+        for section in sections
+    ]
+    db.execute(
+        _search_text_upsert(db, rows).execution_options(synchronize_session=False)
+    )
+
+
+def _search_text_upsert(db: Session, rows: list[dict]):
+    """dialect に応じた section_search_text の UPSERT 文を返す。"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    stmt = dialect_insert(SectionSearchText).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["section_id"],
+        set_={
+            "title": stmt.excluded.title,
+            "body": stmt.excluded.body,
+            "section_version": stmt.excluded.section_version,
+            "updated_at": func.now(),
+        },
+        where=or_(
+            SectionSearchText.title != stmt.excluded.title,
+            SectionSearchText.body != stmt.excluded.body,
+        ),
+    )
+
+
+# ─── 検索用テキストの更新 ───────────────────────────────
+def _cap_search_text(text: str) -> str:
+    """検索用テキストを SEARCH_TEXT_MAX_CHARS 文字に切り詰める（先頭を残す）。"""
+    return text[:SEARCH_TEXT_MAX_CHARS]
+
+
+def build_section_text(db: Session, plot_id: UUID) -> str:
+    """Plot の全セクションのタイトルと本文をプレーンテキストにして連結する。
+
+    SEARCH_TEXT_MAX_CHARS 文字を超える分は切り捨てる。
+    """
+    sections = (
+        db.execute(
+            select(Section)
+            .where(Section.plot_id == plot_id)
+            .order_by(Section.order_index)
+        )
+        .scalars()
+        .all()
+    )
+    blob_service.prefetch_section_contents(db, sections)
+
+    parts: list[str] = []
+    length = 0
+    for section in sections:
+        if length >= SEARCH_TEXT_MAX_CHARS:
+            break
+        parts.append(section.title)
+        text = extract_text(blob_service.section_content(section), fallback_json=False)
+        if text:
+            parts.append(text)
+        length += len(section.title) + len(text) + 2
+    return _cap_search_text("\n".join(parts))
+
+
+def refresh_section_text(db: Session, plot_id: UUID) -> None:
+    """plots.section_text を現在のセクション内容で更新する（commit は呼び出し側）。
+
+    検索用の派生データなので Plot.updated_at は変更しない。
+    """
+    db.execute(
+        sa_update(Plot)
+        .where(Plot.id == plot_id)
+        .values(
+            section_text=build_section_text(db, plot_id),
+            updated_at=Plot.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def backfill_section_search_text(
+    db: Session, batch_size: int = SECTION_INDEX_BACKFILL_BATCH_SIZE
+) -> int:
+    """section_search_text の行が無いセクションを最大 batch_size 件索引して commit する。
+
+    マイグレーション前からあるセクションを拾う。version の不一致では選ばない
+    （HotOperation ごとに version が進むため、編集中のセクションを毎回
+    索引し直すことになる。本文を変える書き込みは同じトランザクションで索引する）。
+
+    Returns:
+        索引したセクション数
+    """
+    sections = (
+        db.execute(
+            select(Section)
+            .outerjoin(SectionSearchText, SectionSearchText.section_id == Section.id)
+            .where(SectionSearchText.section_id.is_(None))
+            .limit(batch_size)
+        )
+        .scalars()
+        .all()
+    )
+    index_sections(db, list(sections))
+    db.commit()
+    return len(sections)
 
-    return [(plot, star_count) for plot, star_count in items], total
+
+def run_search_backfill(
+    db: Session, time_budget_seconds: float = SEARCH_BACKFILL_TIME_BUDGET_SECONDS
+) -> None:
+    """検索用の派生データ（plots.section_text / section_search_text）を埋める。
+
+    スナップショットジョブから定期的に呼ぶ。バッチごとに commit し、
+    埋めるものがなくなるか time_budget_seconds を超えたら終了する。
+    """
+    deadline = time.monotonic() + time_budget_seconds
+    plots = sections = 0
+    while time.monotonic() < deadline:
+        plot_count = backfill_section_text(db)
+        section_count = backfill_section_search_text(db)
+        plots += plot_count
+        sections += section_count
+        if not plot_count and not section_count:
+            break
+    if plots or sections:
+        logger.info(
+            "Search backfill: %d plot(s), %d section(s) indexed", plots, sections
+        )
+
+
+def backfill_section_text(
+    db: Session, batch_size: int = SECTION_TEXT_BACKFILL_BATCH_SIZE
+) -> int:
+    """section_text が未設定の Plot を最大 batch_size 件埋めて commit する。
+
+    マイグレーション前から存在する Plot 用。スナップショットジョブから呼ぶ。
+
+    Returns:
+        更新した Plot 数
+    """
+    plot_ids = (
+        db.execute(select(Plot.id).where(Plot.section_text.is_(None)).limit(batch_size))
+        .scalars()
+        .all()
+    )
+    for plot_id in plot_ids:
+        refresh_section_text(db, plot_id)
+    db.commit()
+    return len(plot_ids)
@@ -11,11 +11,18 @@ endpoint 側で HTTPException に変換する。
 """
 
 from datetime import UTC, datetime
+from typing import Any
 from uuid import UUID
 
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.events import publish_plot_event
 from app.models import Plot, Section
+from app.services import blob_service, json_patch, search_service
+from app.services.history_service import ConflictError
+from app.services.snapshot_scheduler import mark_plot_dirty
 
 # api.md: セクション数が上限（255個）に達している場合は 400 Bad Request
 MAX_SECTIONS_PER_PLOT = 255
@@ -70,6 +77,46 @@ def list_sections(db: Session, plot_id: UUID) -> tuple[list[Section], int]:
     return sections, total
 
 
+async def list_sections_async(
+    db: AsyncSession, plot_id: UUID
+) -> tuple[list[Section], int]:
+    """list_sections の非同期版（ポーリングされる読み取り系エンドポイント用）。"""
+    plot_exists = await db.execute(select(Plot.id).where(Plot.id == plot_id))
+    if plot_exists.first() is None:
+        raise ValueError("Plot not found")
+
+    result = await db.execute(
+        select(Section).where(Section.plot_id == plot_id).order_by(Section.order_index)
+    )
+    sections = list(result.scalars().all())
+
+    return sections, len(sections)
+
+
+async def get_sections_fingerprint_async(
+    db: AsyncSession, plot_id: UUID
+) -> tuple | None:
+    """セクション一覧の ETag 元になる値を1回のクエリで取得する。
+
+    Plot.updated_at / セクションの最大 version・件数を返す。Plot が存在しない場合は None。
+    """
+    result = await db.execute(
+        select(
+            Plot.updated_at,
+            select(func.max(Section.version))
+            .where(Section.plot_id == Plot.id)
+            .correlate(Plot)
+            .scalar_subquery(),
+            select(func.count(Section.id))
+            .where(Section.plot_id == Plot.id)
+            .correlate(Plot)
+            .scalar_subquery(),
+        ).where(Plot.id == plot_id)
+    )
+    row = result.first()
+    return tuple(row) if row is not None else None
+
+
 # ─── 作成 ──────────────────────────────────────────────────────
 
 
@@ -138,9 +185,22 @@ def create_section(
         order_index=target_order,
     )
     db.add(section)
+    db.flush()  # section.id を確定させる
+    search_service.index_sections(db, [section])
 
-    # セクション変更を Plot.updated_at に反映（スナップショットスケジューラ連携）
+    # セクション変更を Plot.updated_at に反映し、スナップショット対象としてキューに積む
     plot.updated_at = datetime.now(UTC)
+    mark_plot_dirty(db, plot.id)
+    publish_plot_event(
+        db,
+        plot.id,
+        "section_created",
+        {
+            "sectionId": str(section.id),
+            "orderIndex": section.order_index,
+            "version": section.version,
+        },
+    )
 
     db.commit()
     db.refresh(section)
@@ -158,6 +218,29 @@ def get_section(db: Session, section_id: UUID) -> Section:
     return _get_section_or_raise(db, section_id)
 
 
+async def get_section_async(db: AsyncSession, section_id: UUID) -> Section:
+    """get_section の非同期版。
+
+    存在しない場合は ValueError("Section not found") を raise する。
+    """
+    result = await db.execute(select(Section).where(Section.id == section_id))
+    section = result.scalar_one_or_none()
+    if not section:
+        raise ValueError("Section not found")
+    return section
+
+
+async def get_section_fingerprint_async(
+    db: AsyncSession, section_id: UUID
+) -> tuple | None:
+    """セクション詳細の ETag 元になる (version, updated_at) を返す。存在しない場合は None。"""
+    result = await db.execute(
+        select(Section.version, Section.updated_at).where(Section.id == section_id)
+    )
+    row = result.first()
+    return tuple(row) if row is not None else None
+
+
 # ─── 更新 ──────────────────────────────────────────────────────
 
 
@@ -180,15 +263,92 @@ def update_section(
     if title is not None:
         section.title = title
     # content: ... は未指定、None は明示的にクリア
+    # Why: Blob共有中（content_hash あり）のセクションはここで自分専用の content を持つ
     if content is not ...:
         section.content = content
+        section.content_hash = None
 
     section.version = section.version + 1
+    search_service.index_sections(db, [section])
 
-    # セクション変更を Plot.updated_at に反映（スナップショットスケジューラ連携）
+    # セクション変更を Plot.updated_at に反映し、スナップショット対象としてキューに積む
     plot = db.query(Plot).filter(Plot.id == section.plot_id).first()
     if plot:
         plot.updated_at = datetime.now(UTC)
+        mark_plot_dirty(db, plot.id)
+    publish_plot_event(
+        db,
+        section.plot_id,
+        "section_updated",
+        {"sectionId": str(section.id), "version": section.version},
+    )
+
+    db.commit()
+    db.refresh(section)
+    return section
+
+
+def patch_section(
+    db: Session,
+    section_id: UUID,
+    base_version: int,
+    operations: list[dict[str, Any]],
+    title: str | None = None,
+) -> Section:
+    """セクションの content に JSON Patch を適用する。
+
+    - Section が見つからない場合: ValueError("Section not found")
+    - Plot が一時停止中の場合: PermissionError("Plot is paused")
+    - base_version が現在の version と異なる場合: ConflictError
+    - パッチが不正な場合、または適用結果がオブジェクト（か null）でない場合:
+      JsonPatchError（ValueError）
+    - test 操作が一致しない場合: JsonPatchTestFailed（ConflictError）
+
+    自動保存ごとに content 全体を送らずに済むよう、クライアントは
+    base_version 時点からの差分だけを送る。
+    """
+    section = (
+        db.query(Section).filter(Section.id == section_id).with_for_update().first()
+    )
+    if not section:
+        raise ValueError("Section not found")
+    _check_plot_not_paused(db, section.plot_id)
+
+    if section.version != base_version:
+        raise ConflictError(
+            f"Version conflict: expected {base_version}, "
+            f"but current is {section.version}"
+        )
+
+    if title is not None:
+        section.title = title
+    if operations:
+        # Why: Blob共有中（content_hash あり）のセクションはここで自分専用の content を持つ
+        content = json_patch.apply_patch(
+            blob_service.section_content(section), operations
+        )
+        # ルートパス "" の replace などで content 全体を配列・文字列にされると
+        # SectionResponse の検証に失敗し、以降の GET も 500 になるため拒否する
+        if content is not None and not isinstance(content, dict):
+            raise json_patch.JsonPatchError(
+                "Invalid patch: section content must be a JSON object"
+            )
+        section.content = content
+        section.content_hash = None
+
+    section.version = section.version + 1
+    search_service.index_sections(db, [section])
+
+    plot = db.query(Plot).filter(Plot.id == section.plot_id).first()
+    if plot:
+        plot.updated_at = datetime.now(UTC)
+        mark_plot_dirty(db, plot.id)
+    publish_plot_event(
+        db,
+        section.plot_id,
+        "section_updated",
+        {"sectionId": str(section.id), "version": section.version},
+    )
 
     db.commit()
     db.refresh(section)
@@ -210,6 +370,7 @@ def delete_section(db: Session, section_id: UUID) -> None:
     _check_plot_not_paused(db, section.plot_id)
 
     plot_id = section.plot_id
+    deleted_id = section.id
     deleted_order = section.order_index
 
     db.delete(section)
@@ -227,10 +388,12 @@ def delete_section(db: Session, section_id: UUID) -> None:
     for s in subsequent:
         s.order_index -= 1
 
-    # セクション変更を Plot.updated_at に反映（スナップショットスケジューラ連携）
+    # セクション変更を Plot.updated_at に反映し、スナップショット対象としてキューに積む
     plot = db.query(Plot).filter(Plot.id == plot_id).first()
     if plot:
         plot.updated_at = datetime.now(UTC)
+        mark_plot_dirty(db, plot.id)
+    publish_plot_event(db, plot_id, "section_deleted", {"sectionId": str(deleted_id)})
 
     db.commit()
 
@@ -295,10 +458,17 @@ def reorder_section(db: Session, section_id: UUID, new_order: int) -> Section:
 
     section.order_index = new_order
 
-    # セクション変更を Plot.updated_at に反映（スナップショットスケジューラ連携）
+    # セクション変更を Plot.updated_at に反映し、スナップショット対象としてキューに積む
     plot = db.query(Plot).filter(Plot.id == plot_id).first()
     if plot:
         plot.updated_at = datetime.now(UTC)
+        mark_plot_dirty(db, plot.id)
+    publish_plot_event(
+        db,
+        plot_id,
+        "section_reordered",
+        {"sectionId": str(section.id), "orderIndex": new_order},
+    )
 
     db.commit()
     db.refresh(section)
@@ -6,22 +6,101 @@ Retention policy:
 - 0-7 days: Keep all
 - 7-30 days: Keep 1 per hour (latest in each hour)
 - 30+ days: Keep 1 per day (latest in each day)
+- Keyframes still referenced by a surviving delta snapshot are always kept
+
+Each tier walks plots in keyset ranges (RETENTION_PLOT_BATCH_SIZE), computes
+the deletable snapshot ids for the range once with a window query, and deletes
+them in id chunks (RETENTION_BATCH_SIZE); snapshot content is never loaded.
+Use dry_run=True to only count candidates. Progress of the current / last run
+is kept in retention_progress() (GET /admin/snapshots/retention).
+
+Section blobs (section_blobs) no longer referenced by any snapshot or section
+are garbage-collected after the retention pass (see collect_unreferenced_blobs).
+
+The same scheduler also runs the HotOperation TTL purge, the daily
+plots.star_count reconciliation (star_service.reconcile_star_counts) and the
+daily plots.trending_score rebuild (trending_service.rebuild_trending_scores).
 """
 
 import logging
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import and_, delete, distinct, select
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, delete, exists, func, select
+from sqlalchemy.orm import Session, aliased
 
-from app.models import ColdSnapshot
+from app.models import ColdSnapshot, Plot, Section, SectionBlob, SnapshotBlobRef
 from app.services.history_service import delete_expired_hot_operations
+from app.services.star_service import reconcile_star_counts
+from app.services.trending_service import rebuild_trending_scores
 
 logger = logging.getLogger(__name__)
 
+# 作成・最後の再利用からこの時間が経過していない Blob は GC しない
+# （put_blobs / touch_blobs 直後でまだ参照が commit されていない Blob を守るため）
+BLOB_GC_GRACE_HOURS = 24
+
+# 1回の DELETE で削除する最大件数（ロック保持時間と WAL 量を抑える）
+RETENTION_BATCH_SIZE = 1000
+
+# 削除候補を1回のウィンドウ計算で求める Plot 数（候補 id の保持量を抑える）
+RETENTION_PLOT_BATCH_SIZE = 500
+
+# 保持ポリシーの段階: (バケット粒度, 対象の下限経過日数, 対象の上限経過日数)
+RETENTION_TIERS: tuple[tuple[str, int, int | None], ...] = (
+    ("hour", 7, 30),
+    ("day", 30, None),
+)
+
+
+@dataclass
+class RetentionProgress:
+    """実行中（または直近）の cleanup_old_snapshots の進捗カウンタ。"""
+
+    running: bool = False
+    dry_run: bool = False
+    tier: str | None = None
+    plots_scanned: int = 0
+    candidates: int = 0
+    deleted: int = 0
+    batches: int = 0
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
 
-def cleanup_old_snapshots(db: Session, plot_id: str | None = None) -> int:
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "dryRun": self.dry_run,
+            "tier": self.tier,
+            "plotsScanned": self.plots_scanned,
+            "candidates": self.candidates,
+            "deleted": self.deleted,
+            "batches": self.batches,
+            "startedAt": self.started_at.isoformat() if self.started_at else None,
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+_progress = RetentionProgress()
+
+
+def retention_progress() -> dict[str, Any]:
+    """実行中（または直近）の保持ポリシー適用の進捗を返す。"""
+    return _progress.snapshot()
+
+
+def cleanup_old_snapshots(
+    db: Session,
+    plot_id: str | None = None,
+    *,
+    dry_run: bool = False,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    plot_batch_size: int = RETENTION_PLOT_BATCH_SIZE,
+) -> int:
     """Apply retention policy to snapshots.
 
     各Plot単位でスナップショットの保持ポリシーを適用する。
@@ -29,123 +108,218 @@ def cleanup_old_snapshots(db: Session, plot_id: str | None = None) -> int:
     - 7-30日: 1時間あたり最新1件のみ保持
     - 30日以上: 1日あたり最新1件のみ保持
 
+    段階ごとに Plot を plot_id のキーセットで plot_batch_size 件ずつ区切り、
+    その範囲の「バケット内で最新でない」スナップショットの id をウィンドウ関数で
+    1回だけ求めてから、batch_size 件ずつ id 指定で DELETE する。
+    スナップショットの content は一切読み込まない。
+    進捗は retention_progress() で参照できる。
+
     Args:
         db: Database session
         plot_id: If provided, only clean up snapshots for this plot.
+        dry_run: If True, only count the snapshots that would be deleted.
+            (Keyframes released by deleting their deltas are not counted.)
+        batch_size: Max rows deleted (and committed) per statement.
+        plot_batch_size: Plots whose candidates are computed per window query.
 
     Returns:
-        Number of snapshots deleted.
+        Number of snapshots deleted (or that would be deleted in dry-run mode).
     """
+    global _progress
     now = datetime.now(UTC)
-    seven_days_ago = now - timedelta(days=7)
-    thirty_days_ago = now - timedelta(days=30)
+    progress = RetentionProgress(running=True, dry_run=dry_run, started_at=now)
+    _progress = progress
+    total_deleted = 0
 
-    # Get all plot_ids that have snapshots (or just the specified one)
-    if plot_id:
-        plot_ids = [plot_id]
-    else:
-        stmt = select(distinct(ColdSnapshot.plot_id))
+    try:
+        for granularity, min_age_days, max_age_days in RETENTION_TIERS:
+            progress.tier = granularity
+            older_than = now - timedelta(days=min_age_days)
+            newer_than = (
+                now - timedelta(days=max_age_days) if max_age_days is not None else None
+            )
+            tier_deleted = 0
+            started = time.monotonic()
+            for first, last, plots in _plot_ranges(db, plot_id, plot_batch_size):
+                progress.plots_scanned += plots
+                # Why: 差分を消すとその基点キーフレームが削除可能になるため、
+                # 候補がなくなるまで繰り返して同じ実行内で収束させる
+                while True:
+                    candidates = (
+                        db.execute(
+                            _thinnable_snapshot_ids(
+                                db,
+                                plot_range=(first, last),
+                                older_than=older_than,
+                                newer_than=newer_than,
+                                granularity=granularity,
+                            )
+                        )
+                        .scalars()
+                        .all()
+                    )
+                    progress.candidates += len(candidates)
+                    if dry_run:
+                        tier_deleted += len(candidates)
+                        break
+                    if not candidates:
+                        break
+                    pass_deleted = 0
+                    for i in range(0, len(candidates), batch_size):
+                        deleted = _delete_snapshots(db, candidates[i : i + batch_size])
+                        progress.batches += 1
+                        progress.deleted += deleted
+                        pass_deleted += deleted
+                    tier_deleted += pass_deleted
+                    if pass_deleted == 0:
+                        break
+            logger.info(
+                "Snapshot retention%s (%s tier): %d snapshot(s) %s "
+                "(%d plot(s) scanned, %.2fs elapsed)",
+                " dry-run" if dry_run else "",
+                granularity,
+                tier_deleted,
+                "would be deleted" if dry_run else "deleted",
+                progress.plots_scanned,
+                time.monotonic() - started,
+            )
+            total_deleted += tier_deleted
+    finally:
+        progress.running = False
+        progress.finished_at = datetime.now(UTC)
+
+    if total_deleted > 0 and not dry_run:
+        logger.info("Deleted %d old snapshot(s)", total_deleted)
+
+    return total_deleted
+
+
+def _plot_ranges(
+    db: Session, plot_id: str | UUID | None, plot_batch_size: int
+) -> Iterator[tuple[Any, Any, int]]:
+    """削除候補を求める plot_id の範囲 (first, last, 範囲内の Plot 数) を順に返す。
+
+    plot_id 指定時はその1件のみ。それ以外は plots を id のキーセットで走査する。
+    """
+    if plot_id is not None:
+        yield plot_id, plot_id, 1
+        return
+    after = None
+    while True:
+        stmt = select(Plot.id).order_by(Plot.id).limit(plot_batch_size)
+        if after is not None:
+            stmt = stmt.where(Plot.id > after)
         plot_ids = db.execute(stmt).scalars().all()
+        if not plot_ids:
+            return
+        yield plot_ids[0], plot_ids[-1], len(plot_ids)
+        after = plot_ids[-1]
 
-    total_deleted = 0
 
-    for pid in plot_ids:
-        # Phase 1: Clean 7-30 day range (keep 1 per hour)
-        deleted = _thin_snapshots_by_period(
-            db=db,
-            plot_id=pid,
-            older_than=seven_days_ago,
-            newer_than=thirty_days_ago,
-            group_format="hour",
-        )
-        total_deleted += deleted
-
-        # Phase 2: Clean 30+ day range (keep 1 per day)
-        deleted = _thin_snapshots_by_period(
-            db=db,
-            plot_id=pid,
-            older_than=thirty_days_ago,
-            newer_than=None,
-            group_format="day",
-        )
-        total_deleted += deleted
+def _delete_snapshots(db: Session, snapshot_ids: list[UUID]) -> int:
+    """id 指定でスナップショットを削除して commit し、削除件数を返す。
 
-    if total_deleted > 0:
-        db.commit()
-        logger.info(
-            "Deleted %d old snapshot(s) across %d plot(s)", total_deleted, len(plot_ids)
+    候補を求めた後に差分の基点になったキーフレームは削除しない。
+    """
+    delta = aliased(ColdSnapshot)
+    result = db.execute(
+        delete(ColdSnapshot)
+        .where(
+            ColdSnapshot.id.in_(snapshot_ids),
+            ~exists().where(delta.base_snapshot_id == ColdSnapshot.id),
         )
-
-    return total_deleted
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount or 0
 
 
-def _thin_snapshots_by_period(
+def _thinnable_snapshot_ids(
     db: Session,
-    plot_id: str | UUID,
+    plot_range: tuple[Any, Any],
     older_than: datetime,
     newer_than: datetime | None,
-    group_format: str,
-) -> int:
-    """Delete snapshots except the latest one per time bucket.
+    granularity: str,
+) -> Select:
+    """Build a SELECT of snapshot ids that are not the latest in their bucket.
+
+    (plot_id, バケット) ごとに created_at 降順で ROW_NUMBER を振り、2番目以降を
+    削除候補とする。差分スナップショットから参照されているキーフレームは
+    復元に必要なため候補から除外する。
 
     Args:
-        db: Database session
-        plot_id: Plot to clean up
+        db: Database session (used to pick the dialect's bucket expression)
+        plot_range: Only consider plots with first <= plot_id <= last
         older_than: Only consider snapshots older than this
         newer_than: Only consider snapshots newer than this (None = no lower bound)
-        group_format: "hour" or "day" - determines grouping granularity
-
-    Returns:
-        Number of snapshots deleted.
+        granularity: "hour" or "day" - determines grouping granularity
     """
-    # Build date range filter
-    filters = [
-        ColdSnapshot.plot_id == plot_id,
-        ColdSnapshot.created_at < older_than,
-    ]
+    bucket = _bucket_expr(db, granularity)
+    first, last = plot_range
+    filters = [ColdSnapshot.created_at < older_than]
     if newer_than is not None:
         filters.append(ColdSnapshot.created_at >= newer_than)
+    if first == last:
+        filters.append(ColdSnapshot.plot_id == first)
+    else:
+        filters.append(ColdSnapshot.plot_id.between(first, last))
+
+    ranked = (
+        select(
+            ColdSnapshot.id,
+            func.row_number()
+            .over(
+                partition_by=(ColdSnapshot.plot_id, bucket),
+                order_by=(ColdSnapshot.created_at.desc(), ColdSnapshot.id.desc()),
+            )
+            .label("rn"),
+        )
+        .where(*filters)
+        .subquery()
+    )
 
-    # Get all snapshots in this range, ordered by created_at desc
-    stmt = (
-        select(ColdSnapshot)
-        .where(and_(*filters))
-        .order_by(ColdSnapshot.created_at.desc())
+    delta = aliased(ColdSnapshot)
+    return select(ranked.c.id).where(
+        ranked.c.rn > 1,
+        ~exists().where(delta.base_snapshot_id == ranked.c.id),
     )
-    snapshots = db.execute(stmt).scalars().all()
 
-    if not snapshots:
-        return 0
 
-    # Group by time bucket and find IDs to delete
-    # (keep the latest snapshot in each bucket)
-    # Why: Use set without type param to avoid Column[UUID] vs UUID basedpyright noise
-    keep_ids: set[UUID] = set()
-    seen_buckets: set[str] = set()
+def _bucket_expr(db: Session, granularity: str):
+    """created_at を時間 / 日単位に切り捨てる SQL 式を返す。"""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(granularity, ColdSnapshot.created_at)
+    # Why: テスト用 SQLite には date_trunc がないため strftime で代替する
+    fmt = "%Y-%m-%d %H" if granularity == "hour" else "%Y-%m-%d"
+    return func.strftime(fmt, ColdSnapshot.created_at)
 
-    for snap in snapshots:
-        if group_format == "hour":
-            # Why: Group by year-month-day-hour for hourly retention
-            bucket = snap.created_at.strftime("%Y-%m-%d-%H")
-        else:
-            # Why: Group by year-month-day for daily retention
-            bucket = snap.created_at.strftime("%Y-%m-%d")
 
-        if bucket not in seen_buckets:
-            # This is the latest snapshot in this bucket (ordered desc)
-            seen_buckets.add(bucket)
-            keep_ids.add(snap.id)
+def collect_unreferenced_blobs(
+    db: Session, grace_hours: int = BLOB_GC_GRACE_HOURS
+) -> int:
+    """Delete section blobs no snapshot or section references any more.
 
-    # Delete all snapshots in the range that aren't in keep_ids
-    delete_ids = [snap.id for snap in snapshots if snap.id not in keep_ids]
+    参照の数を数える代わりに snapshot_blob_refs / sections.content_hash を
+    NOT EXISTS で突き合わせる集合演算1回で削除する（mark-and-sweep）。
+    スナップショットが CASCADE で消えても参照表が追従するため、参照カウントの
+    ずれが起きない。
 
-    if not delete_ids:
-        return 0
+    Returns:
+        Number of blobs deleted.
+    """
+    cutoff = datetime.now(UTC) - timedelta(hours=grace_hours)
+    stmt = delete(SectionBlob).where(
+        func.coalesce(SectionBlob.last_referenced_at, SectionBlob.created_at) < cutoff,
+        ~exists().where(SnapshotBlobRef.blob_hash == SectionBlob.hash),
+        ~exists().where(Section.content_hash == SectionBlob.hash),
+    )
+    deleted = db.execute(stmt).rowcount or 0
+    db.commit()
 
-    stmt_del = delete(ColdSnapshot).where(ColdSnapshot.id.in_(delete_ids))
-    db.execute(stmt_del)
+    if deleted > 0:
+        logger.info("Deleted %d unreferenced section blob(s)", deleted)
 
-    return len(delete_ids)
+    return deleted
 
 
 def start_snapshot_cleanup() -> None:
@@ -172,6 +346,7 @@ def start_snapshot_cleanup() -> None:
         db = next(get_db())
         try:
             cleanup_old_snapshots(db)
+            collect_unreferenced_blobs(db)
         except Exception:
             logger.exception("Snapshot cleanup failed")
         finally:
@@ -191,6 +366,26 @@ def start_snapshot_cleanup() -> None:
         finally:
             db.close()
 
+    def _star_count_reconcile_job() -> None:
+        """Scheduler job: fix plots.star_count drift against the stars table."""
+        db = next(get_db())
+        try:
+            reconcile_star_counts(db)
+        except Exception:
+            logger.exception("star_count reconciliation failed")
+        finally:
+            db.close()
+
+    def _trending_score_rebuild_job() -> None:
+        """Scheduler job: rebuild plots.trending_score from event history."""
+        db = next(get_db())
+        try:
+            rebuild_trending_scores(db)
+        except Exception:
+            logger.exception("trending_score rebuild failed")
+        finally:
+            db.close()
+
     scheduler = BackgroundScheduler()
     scheduler.add_job(
         _snapshot_cleanup_job,
@@ -204,6 +399,20 @@ def start_snapshot_cleanup() -> None:
         id="hot_operation_ttl_cleanup",
         replace_existing=True,
     )
+    scheduler.add_job(
+        _star_count_reconcile_job,
+        trigger=CronTrigger(hour=4, minute=0),
+        id="star_count_reconcile",
+        replace_existing=True,
+    )
+    scheduler.add_job(
+        _trending_score_rebuild_job,
+        trigger=CronTrigger(hour=4, minute=30),
+        id="trending_score_rebuild",
+        replace_existing=True,
+    )
     scheduler.start()
     logger.info("Snapshot cleanup scheduler started (daily at 3:00 AM)")
     logger.info("HotOperation TTL cleanup scheduler started (every 6 hours)")
+    logger.info("star_count reconciliation scheduler started (daily at 4:00 AM)")
+    logger.info("trending_score rebuild scheduler started (daily at 4:30 AM)")
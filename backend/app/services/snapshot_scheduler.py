@@ -2,21 +2,29 @@
 
 Spec: renew-api.md lines 227-241
 
-5分間隔で更新されたPlotのColdSnapshotを作成する。
+5分間隔で編集されたPlotのColdSnapshotを作成する。
 - APScheduler IntervalTrigger (5 minutes)
-- Plot.updated_at >= (now - 5min) のPlotを検索
-- Plot全体JSON（メタデータ + 全セクション）でColdSnapshotを作成
+- 編集系サービスが同一トランザクションで snapshot_dirty_plots に積んだPlotを
+  カーソルで走査する（ジョブが遅延しても編集を取りこぼさない）
+- N回に1回はPlot全体JSON（メタデータ + 全セクション）のキーフレームを保存し、
+  それ以外は直近キーフレームからversionが変わったセクションのcontentのみを
+  差分スナップショットとして保存する（復元は history_service 側で行う）
+- セクションcontentは section_blobs に1回だけ保存し、スナップショットには
+  "blob": <hash> の参照のみを記録する（blob_service 参照）
 - 10MBを超えるスナップショットはスキップ（警告ログ）
+- Plotごとに SAVEPOINT で処理し、失敗したPlotはキューの末尾に回す
+  （1件の失敗でバッチ全体が止まらないようにする）
 """
 
-import json
 import logging
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, datetime
+from uuid import UUID
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session, load_only
 
-from app.models import ColdSnapshot, Plot
+from app.models import ColdSnapshot, Plot, Section, SnapshotBlobRef, SnapshotDirtyPlot
+from app.services import blob_service
 
 logger = logging.getLogger(__name__)
 
@@ -26,16 +34,166 @@ MAX_SNAPSHOT_SIZE = 10 * 1024 * 1024
 # Snapshot interval in minutes
 SNAPSHOT_INTERVAL_MINUTES = 5
 
+# 1回のクエリ / commit で処理する dirty キューの件数
+SNAPSHOT_DIRTY_BATCH_SIZE = 100
+
+# Keyframe interval: 1 keyframe + (N-1) deltas（5分間隔なら1時間に1回の全量保存）
+SNAPSHOT_KEYFRAME_INTERVAL = 12
+
+
+def mark_plot_dirty(db: Session, plot_id: UUID) -> None:
+    """Plotをスナップショット対象としてキューに積む。
+
+    編集と同じトランザクションで呼び出すこと（commit は呼び出し側の責務）。
+    既にキューにある場合は dirty_seq をインクリメントする。
+    """
+    db.execute(
+        _dirty_upsert(db).values(
+            plot_id=plot_id, dirty_seq=1, first_marked_at=datetime.now(UTC)
+        )
+    )
+
+
+def _dirty_upsert(db: Session):
+    """dialect に応じた dirty キューの UPSERT 文を返す。"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        stmt = pg_insert(SnapshotDirtyPlot)
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        stmt = sqlite_insert(SnapshotDirtyPlot)
+    else:
+        return insert(SnapshotDirtyPlot)
+    return stmt.on_conflict_do_update(
+        index_elements=["plot_id"],
+        set_={"dirty_seq": SnapshotDirtyPlot.dirty_seq + 1},
+    )
+
+
+def _find_delta_base(db: Session, plot: Plot) -> ColdSnapshot | None:
+    """差分スナップショットの基点となるキーフレームを返す。
+
+    次のいずれかに該当する場合はNoneを返し、キーフレームの作成を促す。
+    - キーフレームが存在しない / マニフェスト（section_versions）を持たない
+    - キーフレーム作成後にロールバックされている（Plot.versionが異なる）
+    - キーフレームからの差分がすでに SNAPSHOT_KEYFRAME_INTERVAL - 1 件ある
+
+    キーフレームのcontent本体は読み込まない（load_onlyでマニフェストのみ取得）。
+    """
+    keyframe = db.execute(
+        select(ColdSnapshot)
+        .options(
+            load_only(
+                ColdSnapshot.id,
+                ColdSnapshot.version,
+                ColdSnapshot.section_versions,
+            )
+        )
+        .where(
+            ColdSnapshot.plot_id == plot.id,
+            ColdSnapshot.base_snapshot_id.is_(None),
+        )
+        .order_by(ColdSnapshot.created_at.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+    if keyframe is None or keyframe.section_versions is None:
+        return None
+    if keyframe.version != plot.version:
+        return None
+
+    delta_count = db.execute(
+        select(func.count())
+        .select_from(ColdSnapshot)
+        .where(ColdSnapshot.base_snapshot_id == keyframe.id)
+    ).scalar_one()
+    if delta_count >= SNAPSHOT_KEYFRAME_INTERVAL - 1:
+        return None
+
+    return keyframe
+
 
 def create_plot_snapshot(db: Session, plot: Plot) -> ColdSnapshot | None:
     """Create a ColdSnapshot for a plot.
 
-    Plot全体（メタデータ + 全セクション）をJSON化してColdSnapshotに保存する。
-    10MBを超える場合はNoneを返しスキップする。
+    キーフレームの場合はPlot全体（メタデータ + 全セクション）をJSON化して保存する。
+    差分の場合はセクション構成（id, title, orderIndex, version）は全件保存し、
+    contentは基点キーフレームからversionが変わったセクションのみ保存する。
+    contentは section_blobs に保存し、エントリには "blob": <hash> のみを持たせる。
+    新たに書き込むcontentの合計が10MBを超える場合はNoneを返しスキップする。
+
+    セクションは構成（id, title, orderIndex, version）のみ読み込み、contentは
+    スナップショットに書き込むセクション分だけを1回のクエリで取得する。
 
     Returns:
         ColdSnapshot if created, None if size limit exceeded.
     """
+    sections = (
+        db.execute(
+            select(Section)
+            .options(
+                load_only(
+                    Section.id,
+                    Section.title,
+                    Section.order_index,
+                    Section.version,
+                    Section.content_hash,
+                )
+            )
+            .where(Section.plot_id == plot.id)
+            .order_by(Section.order_index)
+        )
+        .scalars()
+        .all()
+    )
+    base = _find_delta_base(db, plot)
+    base_versions: dict = base.section_versions if base is not None else {}
+
+    # 差分: キーフレームと同一versionのセクションはcontentを省略する
+    changed = [
+        section
+        for section in sections
+        if base is None or base_versions.get(str(section.id)) != section.version
+    ]
+
+    # Why: フォーク / ロールバック直後のセクションは content_hash を共有しているので
+    # contentを読まず再ハッシュもせずそのまま参照する
+    to_store = [s for s in changed if s.content_hash is None]
+    contents = _load_section_contents(db, [s.id for s in to_store])
+
+    # Check size limit（Blob参照中のセクションは既に保存済みなので数えない）
+    snapshot_size = sum(
+        len(blob_service.canonical_json(contents[s.id]))
+        for s in to_store
+        if contents[s.id] is not None
+    )
+    if snapshot_size > MAX_SNAPSHOT_SIZE:
+        logger.warning(
+            "Snapshot for plot %s exceeds 10MB limit (%d bytes), skipping",
+            plot.id,
+            snapshot_size,
+        )
+        return None
+
+    stored = blob_service.put_blobs(db, [contents[s.id] for s in to_store])
+    blob_hashes = {s.id: h for s, h in zip(to_store, stored, strict=True)}
+    blob_hashes.update({s.id: s.content_hash for s in changed if s.content_hash})
+
+    section_entries = []
+    for section in sections:
+        entry = {
+            "id": str(section.id),
+            "title": section.title,
+            "orderIndex": section.order_index,
+            "version": section.version,
+        }
+        if section.id in blob_hashes:
+            entry["blob"] = blob_hashes[section.id]
+        section_entries.append(entry)
+
     # Build plot-wide JSON content
     content = {
         "plot": {
@@ -43,66 +201,146 @@ def create_plot_snapshot(db: Session, plot: Plot) -> ColdSnapshot | None:
             "description": plot.description,
             "tags": plot.tags or [],
         },
-        "sections": [
-            {
-                "id": str(section.id),
-                "title": section.title,
-                "content": section.content,
-                "orderIndex": section.order_index,
-                "version": section.version,
-            }
-            for section in sorted(plot.sections, key=lambda s: s.order_index)
-        ],
+        "sections": section_entries,
     }
 
-    # Check size limit
-    snapshot_json = json.dumps(content, ensure_ascii=False)
-    snapshot_size = len(snapshot_json.encode("utf-8"))
-    if snapshot_size > MAX_SNAPSHOT_SIZE:
-        logger.warning(
-            "Snapshot for plot %s exceeds 10MB limit (%d bytes), skipping",
-            plot.id,
-            snapshot_size,
+    if base is None:
+        snapshot = ColdSnapshot(
+            plot_id=plot.id,
+            content=content,
+            version=plot.version,
+            section_versions={str(s.id): s.version for s in sections},
         )
-        return None
-
-    snapshot = ColdSnapshot(
-        plot_id=plot.id,
-        content=content,
-        version=plot.version,
-    )
+    else:
+        snapshot = ColdSnapshot(
+            plot_id=plot.id,
+            content=content,
+            version=plot.version,
+            base_snapshot_id=base.id,
+        )
+    # GC 用に参照中の Blob を記録する（差分は自身が持つ Blob のみ。
+    # キーフレーム側の Blob はキーフレーム自身の参照で保護される）
+    snapshot.blob_refs = [
+        SnapshotBlobRef(blob_hash=h) for h in set(blob_hashes.values()) if h
+    ]
     db.add(snapshot)
     return snapshot
 
 
+def _load_section_contents(db: Session, section_ids: list[UUID]) -> dict:
+    """セクションID → content の辞書を1回のクエリで返す。"""
+    if not section_ids:
+        return {}
+    rows = db.execute(
+        select(Section.id, Section.content).where(Section.id.in_(section_ids))
+    ).all()
+    return dict(rows)
+
+
 def run_snapshot_batch(db: Session) -> int:
     """Run one batch of snapshot creation.
 
-    直近5分間に更新されたPlotを検索し、各PlotのColdSnapshotを作成する。
+    snapshot_dirty_plots を (first_marked_at, plot_id) のカーソルで
+    SNAPSHOT_DIRTY_BATCH_SIZE 件ずつ走査し、各PlotのColdSnapshotを作成する。
+    あわせて検索用の plots.section_text を更新する（search_service 参照）。
+    キューの行は読み取り時の dirty_seq のままの場合のみ削除するため、
+    処理中に入った編集は次回のバッチで拾われる。
+    各Plotは SAVEPOINT（begin_nested）内で処理する。失敗したPlotはログに残して
+    first_marked_at を現在時刻に更新し、キューの末尾に回す（この実行では再試行しない）。
+    先頭のPlotが失敗し続けても、後ろのPlotのスナップショットは作成される。
     バッチジョブ（APScheduler）から呼び出されることを想定。
 
     Returns:
         Number of snapshots created.
     """
-    cutoff = datetime.now(UTC) - timedelta(minutes=SNAPSHOT_INTERVAL_MINUTES)
-
-    # Find plots updated in last 5 minutes
-    stmt = (
-        select(Plot)
-        .where(Plot.updated_at >= cutoff)
-        .options(selectinload(Plot.sections))
-    )
-    plots = db.execute(stmt).scalars().all()
+    # search_service → history_service → 本モジュールの循環 import を避ける
+    from app.services import search_service
 
     count = 0
-    for plot in plots:
-        snapshot = create_plot_snapshot(db, plot)
-        if snapshot:
-            count += 1
+    drained = 0
+    failed: set[UUID] = set()
+    cursor: tuple | None = None
 
-    if count > 0:
+    while True:
+        stmt = (
+            select(
+                SnapshotDirtyPlot.plot_id,
+                SnapshotDirtyPlot.dirty_seq,
+                SnapshotDirtyPlot.first_marked_at,
+            )
+            .order_by(SnapshotDirtyPlot.first_marked_at, SnapshotDirtyPlot.plot_id)
+            .limit(SNAPSHOT_DIRTY_BATCH_SIZE)
+        )
+        if cursor is not None:
+            last_marked_at, last_plot_id = cursor
+            stmt = stmt.where(
+                or_(
+                    SnapshotDirtyPlot.first_marked_at > last_marked_at,
+                    and_(
+                        SnapshotDirtyPlot.first_marked_at == last_marked_at,
+                        SnapshotDirtyPlot.plot_id > last_plot_id,
+                    ),
+                )
+            )
+        entries = db.execute(stmt).all()
+        if not entries:
+            break
+
+        plots = {
+            plot.id: plot
+            for plot in db.execute(
+                select(Plot).where(Plot.id.in_([e.plot_id for e in entries]))
+            )
+            .scalars()
+            .all()
+        }
+        for entry in entries:
+            # 末尾に回したPlotはこの実行のカーソルの先で再び読まれるため飛ばす
+            if entry.plot_id in failed:
+                continue
+            plot = plots.get(entry.plot_id)
+            snapshot = None
+            try:
+                with db.begin_nested():
+                    if plot is not None:
+                        snapshot = create_plot_snapshot(db, plot)
+                        # 検索用のセクション本文テキストも同じタイミングで更新する
+                        search_service.refresh_section_text(db, plot.id)
+                    # サイズ超過でスキップしたPlotも次の編集まではキューから外す
+                    db.execute(
+                        delete(SnapshotDirtyPlot).where(
+                            SnapshotDirtyPlot.plot_id == entry.plot_id,
+                            SnapshotDirtyPlot.dirty_seq == entry.dirty_seq,
+                        )
+                    )
+            except Exception:
+                logger.exception(
+                    "Snapshot failed for plot %s; moved to the end of the queue",
+                    entry.plot_id,
+                )
+                failed.add(entry.plot_id)
+                db.execute(
+                    update(SnapshotDirtyPlot)
+                    .where(SnapshotDirtyPlot.plot_id == entry.plot_id)
+                    .values(first_marked_at=datetime.now(UTC))
+                )
+                continue
+            if snapshot is not None:
+                count += 1
         db.commit()
-        logger.info("Created %d snapshot(s) for %d updated plot(s)", count, len(plots))
+
+        drained += len(entries)
+        cursor = (entries[-1].first_marked_at, entries[-1].plot_id)
+        if len(entries) < SNAPSHOT_DIRTY_BATCH_SIZE:
+            break
+
+    if drained > 0:
+        logger.info(
+            "Created %d snapshot(s) for %d dirty plot(s) (%d failed)",
+            count,
+            drained,
+            len(failed),
+        )
 
     return count
 
@@ -127,11 +365,22 @@ def start_snapshot_scheduler() -> None:
 
     def _job() -> None:
         """Scheduler job: create snapshots in a fresh DB session."""
+        from app.services import search_service
+
         db = next(get_db())
         try:
             run_snapshot_batch(db)
         except Exception:
+            # 失敗したトランザクションを捨てないと、続くバックフィルが同じセッションで
+            # PendingRollbackError になり検索インデックスまで止まる
+            db.rollback()
             logger.exception("Snapshot batch failed")
+        try:
+            # マイグレーション前からある Plot / セクションの検索用テキストを少しずつ埋める
+            search_service.run_search_backfill(db)
+        except Exception:
+            db.rollback()
+            logger.exception("Search text backfill failed")
         finally:
             db.close()
 
@@ -4,12 +4,16 @@ endpoint 層から呼び出され、DB 操作のみを担当する。
 失敗時は ValueError を raise し、endpoint 側で HTTPException に変換する。
 """
 
+from datetime import UTC, datetime
 from uuid import UUID
 
 from sqlalchemy.orm import Session
 
 from app.models import Comment, Fork, Plot, Section, Thread, User
-
+from app.services import blob_service, search_service, trending_service
+from app.services.snapshot_scheduler import mark_plot_dirty
+from app.services.pagination import paginate
+from app.services.total_count import count_total
 
 # ─── フォーク ──────────────────────────────────────────────────
 
@@ -22,12 +26,16 @@ def fork_plot(
 ) -> Plot:
     """Plot をフォークする。Plot + 全 Sections を複製し、Fork 追跡レコードを作成する。
 
+    フォーク元の trending_score を加算する。
+
     元の Plot が見つからない場合は ValueError を raise する。
     """
     source = db.query(Plot).filter(Plot.id == plot_id).first()
     if not source:
         raise ValueError("Plot not found")
 
+    # Plot の行より先に基準時刻の行をロックする（trending_service のロック順序）
+    epoch = trending_service.current_epoch(db, lock=True)
     new_title = title if title else f"{source.title} (fork)"
     new_plot = Plot(
         title=new_title,
@@ -38,29 +46,44 @@ def fork_plot(
     db.add(new_plot)
     db.flush()  # new_plot.id を確定させる
 
-    # セクションを複製
+    # セクションを複製（content は section_blobs の Blob を共有し、コピーしない）
     source_sections = (
         db.query(Section)
         .filter(Section.plot_id == plot_id)
         .order_by(Section.order_index)
         .all()
     )
+    unshared = [s for s in source_sections if s.content_hash is None]
+    new_hashes = blob_service.put_blobs(db, [s.content for s in unshared])
+    # 共有中の Blob もフォーク先から参照するので GC の猶予期間を延ばす
+    blob_service.touch_blobs(
+        db, {s.content_hash for s in source_sections if s.content_hash}
+    )
+    blob_hashes = {s.id: h for s, h in zip(unshared, new_hashes, strict=True)}
+    new_sections = []
     for section in source_sections:
         new_section = Section(
             plot_id=new_plot.id,
             title=section.title,
-            content=section.content,
+            content_hash=section.content_hash or blob_hashes[section.id],
             order_index=section.order_index,
         )
         db.add(new_section)
+        new_sections.append(new_section)
+    db.flush()
+    search_service.index_sections(db, new_sections)
 
     # Fork 追跡レコードを作成
+    now = datetime.now(UTC)
     fork_record = Fork(
         source_plot_id=plot_id,
         new_plot_id=new_plot.id,
         user_id=user_id,
+        created_at=now,
     )
     db.add(fork_record)
+    trending_service.bump(db, plot_id, trending_service.FORK_WEIGHT, now, epoch)
+    mark_plot_dirty(db, new_plot.id)
 
     db.commit()
     db.refresh(new_plot)
@@ -110,25 +133,35 @@ def list_comments(
     thread_id: UUID,
     limit: int = 50,
     offset: int = 0,
-) -> tuple[list[tuple[Comment, User | None]], int]:
-    """コメント一覧を取得する。
+    cursor: str | None = None,
+) -> tuple[list[tuple[Comment, User | None]], int, str | None]:
+    """コメント一覧を取得する（古い順）。
 
-    戻り値は ((Comment, User|None) のリスト, total件数) のタプル。
-    Thread が見つからない場合は ValueError を raise する。
+    戻り値は ((Comment, User|None) のリスト, total件数, 次ページのカーソル) のタプル。
+    Thread が見つからない場合・cursor が不正な場合は ValueError を raise する。
     """
     thread = db.query(Thread).filter(Thread.id == thread_id).first()
     if not thread:
         raise ValueError("Thread not found")
 
-    total = db.query(Comment).filter(Comment.thread_id == thread_id).count()
-
-    comments = (
-        db.query(Comment)
-        .filter(Comment.thread_id == thread_id)
-        .order_by(Comment.created_at)
-        .offset(offset)
-        .limit(limit)
-        .all()
+    query = db.query(Comment).filter(Comment.thread_id == thread_id)
+    comments, next_cursor = paginate(
+        query,
+        Comment.created_at,
+        Comment.id,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        descending=False,
+    )
+    total = count_total(
+        db,
+        query,
+        endpoint="social.comments",
+        limit=limit,
+        offset=None if cursor else offset,
+        page_size=len(comments),
+        cache_key=(thread_id,),
     )
 
     items: list[tuple[Comment, User | None]] = []
@@ -136,7 +169,7 @@ def list_comments(
         user = db.query(User).filter(User.id == comment.user_id).first()
         items.append((comment, user))
 
-    return items, total
+    return items, total, next_cursor
 
 
 def create_comment(
@@ -148,7 +181,7 @@ def create_comment(
 ) -> tuple[Comment, User | None]:
     """コメントを投稿する。
 
-    戻り値は (Comment, User|None) のタプル。
+    戻り値は (Comment, User|None) のタプル。スレッドの Plot の trending_score を加算する。
     - 本文が 5000 文字を超える場合: ValueError("Content exceeds 5000 characters")
     - Thread が見つからない場合: ValueError("Thread not found")
     - 親コメントが見つからない場合: ValueError("Parent comment not found")
@@ -176,13 +209,20 @@ def create_comment(
             raise ValueError("Parent comment not found")
         resolved_parent_id = parent_comment_id
 
+    # Plot の行より先に基準時刻の行をロックする（trending_service のロック順序）
+    epoch = trending_service.current_epoch(db, lock=True)
+    now = datetime.now(UTC)
     comment = Comment(
         thread_id=thread_id,
         user_id=user_id,
         content=content,
         parent_comment_id=resolved_parent_id,
+        created_at=now,
     )
     db.add(comment)
+    trending_service.bump(
+        db, thread.plot_id, trending_service.COMMENT_WEIGHT, now, epoch
+    )
     db.commit()
     db.refresh(comment)
 
@@ -2,14 +2,25 @@
 
 endpoint 層から呼び出され、DB 操作のみを担当する。
 失敗時は ValueError を raise し、endpoint 側で HTTPException に変換する。
+
+Plot.star_count（非正規化カウンタ）はスターの追加・削除と同じトランザクションで
+増減する。ユーザー削除の CASCADE などカウンタを経由しない削除によるずれは
+reconcile_star_counts（定期ジョブ）で補正する。
+Plot.trending_score も同様に trending_service.bump で加減算する。
 """
 
+import logging
+from datetime import UTC, datetime
 from uuid import UUID
 
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.models import Plot, Star, User
+from app.services import trending_service
+
+logger = logging.getLogger(__name__)
 
 
 def get_plot_or_raise(db: Session, plot_id: UUID) -> Plot:
@@ -42,6 +53,23 @@ def list_stars(
     return result
 
 
+def _adjust_star_count(db: Session, plot_id: UUID, delta: int) -> None:
+    """Plot.star_count を delta だけ増減する（commit は呼び出し側）。
+
+    読み取り→書き込みではなく UPDATE ... SET star_count = star_count + delta で
+    同時スターでも値を失わない。スターは Plot の内容ではないため updated_at は変えない。
+    """
+    stmt = (
+        update(Plot)
+        .where(Plot.id == plot_id)
+        .values(star_count=Plot.star_count + delta, updated_at=Plot.updated_at)
+    )
+    if delta < 0:
+        # ずれていても負にはしない（reconcile_star_counts で補正される）
+        stmt = stmt.where(Plot.star_count > 0)
+    db.execute(stmt.execution_options(synchronize_session=False))
+
+
 def add_star(db: Session, plot_id: UUID, user_id: UUID) -> Star:
     """スターを追加する。
 
@@ -58,8 +86,16 @@ def add_star(db: Session, plot_id: UUID, user_id: UUID) -> Star:
         raise ValueError("Already starred")
 
     try:
-        star = Star(plot_id=plot_id, user_id=user_id)
+        # trending_score の加算と削除時の減算で同じ時刻を使うため明示する
+        now = datetime.now(UTC)
+        star = Star(plot_id=plot_id, user_id=user_id, created_at=now)
         db.add(star)
+        # 一意制約違反をカウンタ更新より先に検出する
+        db.flush()
+        # Plot の行より先に基準時刻の行をロックする（trending_service のロック順序）
+        epoch = trending_service.current_epoch(db, lock=True)
+        _adjust_star_count(db, plot_id, 1)
+        trending_service.bump(db, plot_id, trending_service.STAR_WEIGHT, now, epoch)
         db.commit()
         db.refresh(star)
         return star
@@ -75,13 +111,48 @@ def remove_star(db: Session, plot_id: UUID, user_id: UUID) -> None:
     """
     get_plot_or_raise(db, plot_id)
 
-    star = (
-        db.query(Star)
-        .filter(Star.plot_id == plot_id, Star.user_id == user_id)
-        .first()
-    )
-    if not star:
+    # 同時に削除された場合に二重に減算しないよう、実際に削除できた行数で判定する
+    deleted = db.execute(
+        delete(Star)
+        .where(Star.plot_id == plot_id, Star.user_id == user_id)
+        .returning(Star.created_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not deleted:
         raise ValueError("Not starred")
 
-    db.delete(star)
+    # Plot の行より先に基準時刻の行をロックする（trending_service のロック順序）
+    epoch = trending_service.current_epoch(db, lock=True)
+    _adjust_star_count(db, plot_id, -len(deleted))
+    for (created_at,) in deleted:
+        trending_service.bump(
+            db, plot_id, -trending_service.STAR_WEIGHT, created_at, epoch
+        )
     db.commit()
+
+
+def reconcile_star_counts(db: Session) -> int:
+    """Plot.star_count を stars の実件数に合わせ、補正した Plot 数を返す。
+
+    実件数と異なる行だけを更新する。スケジューラ（snapshot_cleanup）から定期実行する。
+    """
+    actual = (
+        select(func.count(Star.id))
+        .where(Star.plot_id == Plot.id)
+        .correlate(Plot)
+        .scalar_subquery()
+    )
+    fixed = (
+        db.execute(
+            update(Plot)
+            .where(Plot.star_count != actual)
+            .values(star_count=actual, updated_at=Plot.updated_at)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        or 0
+    )
+    db.commit()
+
+    if fixed:
+        logger.warning("Reconciled star_count on %d plot(s)", fixed)
+    return fixed
@@ -0,0 +1,177 @@
+"""一覧エンドポイントの total（総件数）の計算戦略。
+
+ページ取得のたびに正確な COUNT(*) を実行すると、大きなテーブルでは
+深いページほど（また毎クリックごとに）全件走査のコストがかかる。
+エンドポイントごとに次の戦略を選べるようにする:
+
+- "exact":    毎回 COUNT(*) する（従来どおり）
+- "cached":   COUNT(*) の結果を total_count_cache_seconds 秒キャッシュする
+- "estimate": PostgreSQL のプランナ推定行数（EXPLAIN）を使う。
+              推定が ESTIMATE_EXACT_THRESHOLD 未満なら正確に数える
+- "has_more": 件数は数えず、次のページがあるかだけを LIMIT 1 で調べる。
+              total は「少なくともこの件数」の下限になる
+
+どの戦略でも、ページが limit 未満（＝最終ページ）なら total は
+offset + 件数 で確定するため COUNT は実行しない。
+カーソルページング（offset=None）ではページの位置が分からないため、
+この省略と "has_more" は使えず、"exact" として数える。
+
+戦略は DEFAULT_STRATEGIES（エンドポイント名 → 戦略）を
+Settings.total_count_strategies で上書きできる。
+戻り値の PageTotal は int として扱え、is_estimate が True の場合は
+レスポンスの totalIsEstimate で正確な値ではないことをクライアントに伝える。
+"""
+
+import json
+import logging
+import threading
+import time
+from collections.abc import Hashable
+from typing import Literal
+
+from sqlalchemy import Select, func, literal, select
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+TotalStrategy = Literal["exact", "cached", "estimate", "has_more"]
+
+# エンドポイント名 → 既定の戦略
+DEFAULT_STRATEGIES: dict[str, TotalStrategy] = {
+    "plots.list": "cached",
+    "search.plots": "estimate",
+    "search.sections": "estimate",
+    "history.operations": "exact",
+    "history.snapshots": "exact",
+    "history.rollback_logs": "exact",
+    "social.comments": "exact",
+    "users.plots": "cached",
+    "users.contributions": "cached",
+}
+
+# プランナ推定がこの件数未満なら正確に数える（小さい結果では推定の誤差が目立つため）
+ESTIMATE_EXACT_THRESHOLD = 1000
+# キャッシュするキーの上限（超えたら期限切れを掃除し、それでも多ければ全消去）
+CACHE_MAX_ENTRIES = 10000
+
+
+class PageTotal(int):
+    """total 件数。int として扱え、推定値かどうかを is_estimate に持つ。"""
+
+    is_estimate: bool
+
+    def __new__(cls, value: int, is_estimate: bool = False) -> "PageTotal":
+        obj = super().__new__(cls, value)
+        obj.is_estimate = is_estimate
+        return obj
+
+
+def strategy_for(endpoint: str) -> TotalStrategy:
+    """エンドポイントに設定された戦略を返す（未登録なら "exact"）。"""
+    overrides = get_settings().total_count_strategies
+    return overrides.get(endpoint) or DEFAULT_STRATEGIES.get(endpoint, "exact")
+
+
+def count_total(
+    db: Session,
+    query: Select | Query,
+    *,
+    endpoint: str,
+    limit: int,
+    offset: int | None,
+    page_size: int,
+    cache_key: tuple[Hashable, ...] = (),
+) -> PageTotal:
+    """一覧クエリの total を endpoint の戦略で計算する。
+
+    Args:
+        query: ページングする前の一覧クエリ（ORDER BY は無視する）
+        offset: ページの先頭位置。カーソルページングでは None
+        page_size: 取得済みのページの件数
+        cache_key: "cached" 戦略でクエリを区別するためのパラメータ
+    """
+    stmt = query.statement if isinstance(query, Query) else query
+    stmt = stmt.order_by(None)
+    strategy = strategy_for(endpoint)
+
+    if offset is None:
+        # カーソルページング: 位置が分からないので省略も下限推定もできない
+        if strategy == "has_more":
+            strategy = "exact"
+    elif page_size < limit and (page_size > 0 or offset == 0):
+        # 最終ページなら件数は確定している
+        return PageTotal(offset + page_size)
+
+    if strategy == "has_more" and page_size > 0:
+        probe = select(literal(1)).select_from(
+            stmt.offset(offset + limit).limit(1).subquery()
+        )
+        has_more = db.execute(probe).first() is not None
+        return PageTotal(offset + page_size + int(has_more), is_estimate=has_more)
+
+    if strategy == "cached":
+        return _cached_count(db, stmt, (endpoint, *cache_key))
+
+    if strategy == "estimate":
+        estimated = _planner_estimate(db, stmt)
+        if estimated is not None and estimated >= ESTIMATE_EXACT_THRESHOLD:
+            # 推定が取得済みの範囲より小さいと矛盾するので下限で補正する
+            return PageTotal(
+                max(estimated, (offset or 0) + page_size), is_estimate=True
+            )
+
+    return PageTotal(_exact_count(db, stmt))
+
+
+def _exact_count(db: Session, stmt: Select) -> int:
+    return db.execute(select(func.count()).select_from(stmt.subquery())).scalar_one()
+
+
+def _planner_estimate(db: Session, stmt: Select) -> int | None:
+    """EXPLAIN のプランナ推定行数を返す。PostgreSQL 以外や失敗時は None。"""
+    dialect = db.get_bind().dialect
+    if dialect.name != "postgresql":
+        return None
+    try:
+        sql = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+        plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+    except Exception:
+        logger.warning("Planner estimate failed; falling back to COUNT", exc_info=True)
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+# ─── cached ───────────────────────────────────────────
+# (endpoint, *cache_key) → (期限（time.monotonic()）, 件数)
+_cache: dict[tuple, tuple[float, int]] = {}
+_cache_lock = threading.Lock()
+
+
+def _cached_count(db: Session, stmt: Select, key: tuple) -> PageTotal:
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+    if entry is not None and entry[0] > now:
+        # キャッシュ後に増減している可能性があるため推定値として返す
+        return PageTotal(entry[1], is_estimate=True)
+
+    value = _exact_count(db, stmt)
+    ttl = get_settings().total_count_cache_seconds
+    with _cache_lock:
+        if len(_cache) >= CACHE_MAX_ENTRIES:
+            for expired in [k for k, (exp, _) in _cache.items() if exp <= now]:
+                del _cache[expired]
+            if len(_cache) >= CACHE_MAX_ENTRIES:
+                _cache.clear()
+        _cache[key] = (now + ttl, value)
+    return PageTotal(value)
+
+
+def clear_cache() -> None:
+    """キャッシュした件数を破棄する（テスト用）。"""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,253 @@
+"""Trending service - incrementally maintained, time-decayed trending score.
+
+Plot.trending_score は「スター・フォーク・コメントを時間減衰させた重みの合計」を
+前方減衰（forward decay）で保持する。時刻 t のイベントの重みを
+
+    weight * 2 ** ((t - epoch) / half_life)
+
+として加算しておくと、現在時刻 now での減衰後スコアは
+trending_score / 2 ** ((now - epoch) / half_life) になる。
+割る値は全 Plot 共通なので、並び順は trending_score の大小そのもの。
+そのためイベントごとの更新は UPDATE 1行（O(1)）、/plots/trending は
+ix_plots_trending_score を降順に読むだけになる。
+
+- 半減期: Settings.trending_half_life_hours
+- 基準時刻: trending_epoch テーブルの1行（なければ Settings.trending_epoch）。
+  重みは半減期ごとに2倍になり、固定の基準時刻のままだと float の上限
+  （2 ** 1024）を超える（半減期24時間で約2.8年）。そのため日次の
+  rebuild_trending_scores が基準時刻を再計算時点に進め、全スコアを新しい
+  基準時刻に換算（rebase）してから、Plot をチャンクごとに再計算する
+- ロック順序: イベントを記録する書き込みは、Plot の行に触れる前に
+  current_epoch(db, lock=True) で基準時刻の行を共有ロックし、その値を bump に
+  渡す。rebase も基準時刻の行 → plots の順にロックするためデッドロックせず、
+  rebase と並行したイベントが古い基準時刻のまま加算されることもない
+- フォークの削除やユーザー削除の CASCADE など、ここを経由しない削除で生じた
+  ずれは rebuild_trending_scores（定期ジョブ・バックフィルコマンド）で補正する
+
+バックフィル: python -m app.services.trending_service
+"""
+
+import logging
+import math
+from collections import defaultdict
+from datetime import UTC, datetime
+from uuid import UUID
+
+from sqlalchemy import bindparam, case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models import Comment, Fork, Plot, Star, Thread, TrendingEpoch
+
+logger = logging.getLogger(__name__)
+
+# イベント種別ごとの重み
+STAR_WEIGHT = 1.0
+FORK_WEIGHT = 2.0
+COMMENT_WEIGHT = 0.5
+
+# trending_epoch テーブルの唯一の行の id
+TRENDING_EPOCH_ID = 1
+
+# rebuild_trending_scores が1トランザクションで再計算する Plot 数
+REBUILD_BATCH_SIZE = 1000
+
+# rebase 後の絶対値がこれを下回るスコアは 0 にする
+# （PostgreSQL の float8 の乗算は結果が 0 に丸められると underflow エラーになる）
+_MIN_REBASED_SCORE = 1e-300
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite は tz なしで返すため UTC として扱う。"""
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+def current_epoch(db: Session, *, lock: bool = False) -> datetime:
+    """現在の基準時刻を返す。まだ再計算されていなければ Settings.trending_epoch。
+
+    lock=True なら行を共有ロック（FOR SHARE）し、トランザクション終了まで
+    再計算による基準時刻の移動を待たせる。bump の呼び出し側は、Plot の行を
+    ロックする（UPDATE する）前にこれを呼ぶこと。
+    """
+    stmt = select(TrendingEpoch.epoch).where(TrendingEpoch.id == TRENDING_EPOCH_ID)
+    if lock:
+        stmt = stmt.with_for_update(read=True)
+    epoch = db.execute(stmt).scalar_one_or_none()
+    return _as_utc(epoch) if epoch is not None else get_settings().trending_epoch
+
+
+def event_score(weight: float, at: datetime, epoch: datetime) -> float:
+    """時刻 at に発生した重み weight のイベントが trending_score に加える値。
+
+    基準時刻より十分前のイベントは 0 に丸められる。基準時刻から約1000半減期
+    以上後のイベントは OverflowError（日次の再計算が止まっている場合のみ）。
+    """
+    elapsed_hours = (_as_utc(at) - _as_utc(epoch)).total_seconds() / 3600
+    half_life = get_settings().trending_half_life_hours
+    return weight * math.pow(2.0, elapsed_hours / half_life)
+
+
+def decayed_score(
+    trending_score: float, epoch: datetime, now: datetime | None = None
+) -> float:
+    """trending_score を now 時点の減衰後スコア（現在の重みに換算した値）に変換する。"""
+    return trending_score / event_score(1.0, now or datetime.now(UTC), epoch)
+
+
+def bump(
+    db: Session, plot_id: UUID, weight: float, at: datetime, epoch: datetime
+) -> None:
+    """Plot.trending_score にイベント1件分を加算する（commit は呼び出し側）。
+
+    epoch は同じトランザクションで先に current_epoch(db, lock=True) で読んだ
+    基準時刻。取り消し（スター削除など）は元のイベント時刻と負の weight で呼ぶ。
+    star_count と同様に UPDATE ... SET trending_score = trending_score + :delta で
+    更新し、updated_at は変えない。
+    基準時刻が長期間進んでおらず重みが float に収まらない場合は、
+    スター等の操作自体は失敗させずに加算を省く（次の再計算で反映される）。
+    """
+    try:
+        delta = event_score(weight, at, epoch)
+    except OverflowError:
+        logger.warning(
+            "trending_score weight overflowed; is the daily rebuild running?"
+        )
+        return
+    db.execute(
+        update(Plot)
+        .where(Plot.id == plot_id)
+        .values(
+            trending_score=Plot.trending_score + delta,
+            updated_at=Plot.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _rebase(db: Session, epoch: datetime) -> None:
+    """基準時刻を epoch に進め、全 Plot の trending_score を新しい基準時刻に換算する。
+
+    基準時刻の行 → plots の順にロックし、UPDATE 1文で換算して commit する。
+    並行する bump はこの間だけ待たされる。
+    """
+    state = db.get(TrendingEpoch, TRENDING_EPOCH_ID, with_for_update=True)
+    previous = (
+        _as_utc(state.epoch) if state is not None else get_settings().trending_epoch
+    )
+    if state is None:
+        db.add(TrendingEpoch(id=TRENDING_EPOCH_ID, epoch=epoch))
+    else:
+        state.epoch = epoch
+    db.flush()
+
+    # 旧基準時刻の重み 1 は新基準時刻では factor。基準時刻が戻る場合（時計の
+    # ずれ）は掛けると桁あふれしうるため換算せず、続く再計算に任せる
+    factor = event_score(1.0, previous, epoch)
+    if factor < 1.0:
+        if factor > 0.0:
+            rebased = case(
+                (func.abs(Plot.trending_score) < _MIN_REBASED_SCORE / factor, 0.0),
+                else_=Plot.trending_score * factor,
+            )
+        else:
+            rebased = 0.0
+        db.execute(
+            update(Plot)
+            .values(trending_score=rebased, updated_at=Plot.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+
+def _rebuild_chunk(
+    db: Session, epoch: datetime, after: UUID | None
+) -> tuple[UUID | None, int]:
+    """plot_id が after より大きい Plot を最大 REBUILD_BATCH_SIZE 件再計算して commit する。
+
+    対象の Plot 行を先にロックしてから履歴を集計するため、並行する bump は
+    集計に含まれる（先に commit 済み）か、この commit の後に加算されるかのどちらか。
+    戻り値は (最後の plot_id, 更新した Plot 数)。対象がなければ最後の plot_id は None。
+    """
+    stmt = select(Plot.id, Plot.trending_score).order_by(Plot.id)
+    if after is not None:
+        stmt = stmt.where(Plot.id > after)
+    current = db.execute(stmt.limit(REBUILD_BATCH_SIZE).with_for_update()).all()
+    if not current:
+        db.commit()
+        return None, 0
+    plot_ids = [plot_id for plot_id, _ in current]
+
+    scores: dict[UUID, float] = defaultdict(float)
+    events = [
+        (select(Star.plot_id, Star.created_at), Star.plot_id, STAR_WEIGHT),
+        (
+            select(Fork.source_plot_id, Fork.created_at),
+            Fork.source_plot_id,
+            FORK_WEIGHT,
+        ),
+        (
+            select(Thread.plot_id, Comment.created_at).join(
+                Thread, Thread.id == Comment.thread_id
+            ),
+            Thread.plot_id,
+            COMMENT_WEIGHT,
+        ),
+    ]
+    for stmt, plot_column, weight in events:
+        for plot_id, created_at in db.execute(stmt.where(plot_column.in_(plot_ids))):
+            scores[plot_id] += event_score(weight, created_at, epoch)
+
+    # 換算の丸め誤差だけの差は書き込まない。イベントのない Plot に残った
+    # ずれ（換算で小さくなっただけで 0 ではない）は 0 に戻すため abs_tol は付けない
+    changed = [
+        {"b_id": plot_id, "b_score": scores.get(plot_id, 0.0)}
+        for plot_id, old in current
+        if not math.isclose(old, scores.get(plot_id, 0.0), rel_tol=1e-9)
+    ]
+    if changed:
+        plots = Plot.__table__
+        db.execute(
+            update(plots)
+            .where(plots.c.id == bindparam("b_id"))
+            .values(trending_score=bindparam("b_score"), updated_at=plots.c.updated_at),
+            changed,
+        )
+    db.commit()
+    return plot_ids[-1], len(changed)
+
+
+def rebuild_trending_scores(db: Session, now: datetime | None = None) -> int:
+    """基準時刻を now に進め、stars / forks / comments の履歴から trending_score を
+    再計算し、更新した Plot 数を返す。
+
+    日次ジョブで基準時刻の前進（重みの桁あふれ防止）とずれの補正を兼ねる。
+    半減期・重みを変えたときにも実行する。
+    まず全スコアを新しい基準時刻に換算して commit し（順位は保たれる）、
+    その後 plot_id のキーセットで REBUILD_BATCH_SIZE 件ずつ、チャンクごとの
+    トランザクションで履歴から再計算する。基準時刻の行をロックするのは換算の間だけ。
+    """
+    epoch = now or datetime.now(UTC)
+    _rebase(db, epoch)
+
+    updated = 0
+    after: UUID | None = None
+    while True:
+        after, changed = _rebuild_chunk(db, epoch, after)
+        if after is None:
+            break
+        updated += changed
+
+    if updated:
+        logger.info("Rebuilt trending_score on %d plot(s)", updated)
+    return updated
+
+
+if __name__ == "__main__":
+    from app.core.database import get_db
+
+    logging.basicConfig(level=logging.INFO)
+    session = next(get_db())
+    try:
+        print(f"Rebuilt trending_score on {rebuild_trending_scores(session)} plot(s)")
+    finally:
+        session.close()
@@ -17,27 +17,41 @@ from unittest.mock import patch
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 from app.core.auth import get_current_user, get_optional_user
-from app.core.database import Base, get_db
+from app.core.database import Base, get_async_db, get_db
 from app.main import app
 from app.models import Plot, Section, User
 from app.schemas import CurrentUser
+from app.services import total_count
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 #  Test DB Engine (SQLite in-memory)
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Why: 非同期エンドポイント（AsyncDbSession）からも同じ DB を読めるよう、
+# 名前付きの共有キャッシュ in-memory DB を同期・非同期の両エンジンで開く。
+# DB は StaticPool が保持する同期側の接続が生きている間だけ存在する。
+_TEST_DB_URI = "file:plot_test?mode=memory&cache=shared&uri=true"
+
 TEST_ENGINE = create_engine(
-    "sqlite://",
+    f"sqlite:///{_TEST_DB_URI}",
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
 
+# 非同期側はイベントループをまたいで接続を使い回さないよう NullPool にする
+ASYNC_TEST_ENGINE = create_async_engine(
+    f"sqlite+aiosqlite:///{_TEST_DB_URI}",
+    poolclass=NullPool,
+)
+
 
 # SQLite は外部キー制約がデフォルト無効。テストで整合性を担保するために有効化する。
 @event.listens_for(TEST_ENGINE, "connect")
+@event.listens_for(ASYNC_TEST_ENGINE.sync_engine, "connect")
 def _enable_sqlite_fk(dbapi_conn, connection_record):
     cursor = dbapi_conn.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
@@ -45,6 +59,9 @@ def _enable_sqlite_fk(dbapi_conn, connection_record):
 
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=TEST_ENGINE)
+AsyncTestingSessionLocal = async_sessionmaker(
+    bind=ASYNC_TEST_ENGINE, autoflush=False, expire_on_commit=False
+)
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -67,6 +84,8 @@ ADMIN_USER_EMAIL = "admin@example.com"
 def db() -> Generator[Session, None, None]:
     """テストごとにテーブルを作成・破棄する SQLite セッション。"""
     Base.metadata.create_all(bind=TEST_ENGINE)
+    # total のキャッシュがテスト間で持ち越されないようにする
+    total_count.clear_cache()
     session = TestingSessionLocal()
     try:
         yield session
@@ -201,7 +220,13 @@ def _create_test_client(
     def _override_get_db():
         yield db
 
+    async def _override_get_async_db():
+        # 同期セッションで commit 済みのデータを別接続から読む
+        async with AsyncTestingSessionLocal() as async_db:
+            yield async_db
+
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_async_db] = _override_get_async_db
 
     if authenticated_user is not None:
 
@@ -6,12 +6,14 @@ SQLite 制約:
 """
 
 import uuid
+from unittest.mock import MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from app.models import ColdSnapshot, HotOperation, Plot, RollbackLog, Section, User
+from app.services.operation_buffer import OperationBufferFull
 from tests.conftest import TEST_USER_ID
 
 
@@ -47,6 +49,94 @@ class TestPostOperations:
         )
         assert resp.status_code == 404
 
+    def test_create_operation_buffer_full(
+        self, client: TestClient, test_section: Section
+    ) -> None:
+        """write-behind バッファが満杯 → 503 + Retry-After。"""
+        buffer = MagicMock()
+        buffer.submit.side_effect = OperationBufferFull("Operation queue is full")
+        with patch(
+            "app.services.operation_buffer.get_operation_buffer", return_value=buffer
+        ):
+            resp = client.post(
+                f"/api/v1/sections/{test_section.id}/operations",
+                json={"operationType": "insert", "position": 0, "content": "hello"},
+            )
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "1"
+
+
+class TestPostOperationsBatch:
+    """POST /api/v1/plots/{plot_id}/operations — AuthUser。"""
+
+    def test_create_operations_batch(
+        self,
+        client: TestClient,
+        db: Session,
+        test_plot: Plot,
+        test_section: Section,
+    ) -> None:
+        section_id = test_section.id
+        resp = client.post(
+            f"/api/v1/plots/{test_plot.id}/operations",
+            json={
+                "operations": [
+                    {
+                        "sectionId": str(section_id),
+                        "operationType": "insert",
+                        "position": 0,
+                        "content": "a",
+                    },
+                    {
+                        "sectionId": str(section_id),
+                        "operationType": "insert",
+                        "position": 1,
+                        "content": "b",
+                    },
+                ]
+            },
+        )
+        assert resp.status_code == 201
+        items = resp.json()["items"]
+        assert [i["version"] for i in items] == [2, 3]
+        assert all(i["sectionId"] == str(section_id) for i in items)
+        op = db.get(HotOperation, uuid.UUID(items[1]["id"]))
+        assert op.payload == {"position": 1, "content": "b", "length": None}
+
+    def test_create_operations_batch_empty(
+        self, client: TestClient, test_plot: Plot
+    ) -> None:
+        resp = client.post(
+            f"/api/v1/plots/{test_plot.id}/operations", json={"operations": []}
+        )
+        assert resp.status_code == 422
+
+    def test_create_operations_batch_plot_not_found(
+        self, client: TestClient, test_user: User, test_section: Section
+    ) -> None:
+        resp = client.post(
+            f"/api/v1/plots/{uuid.uuid4()}/operations",
+            json={
+                "operations": [
+                    {"sectionId": str(test_section.id), "operationType": "insert"}
+                ]
+            },
+        )
+        assert resp.status_code == 404
+
+    def test_create_operations_batch_unauthorized(
+        self, unauthed_client: TestClient, test_plot: Plot, test_section: Section
+    ) -> None:
+        resp = unauthed_client.post(
+            f"/api/v1/plots/{test_plot.id}/operations",
+            json={
+                "operations": [
+                    {"sectionId": str(test_section.id), "operationType": "insert"}
+                ]
+            },
+        )
+        assert resp.status_code == 401
+
 
 class TestGetHistory:
     """GET /api/v1/sections/{section_id}/history — 認証不要。"""
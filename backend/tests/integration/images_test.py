@@ -0,0 +1,258 @@
+"""Images endpoint の統合テスト（GET の条件付き・範囲リクエスト、POST の受付上限）。"""
+
+from pathlib import Path
+from typing import BinaryIO
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import images
+from app.services import image_cache, image_processor, image_service
+from app.services.image_cache import ImageCache
+from app.services.image_processor import ImageProcessor
+
+FILENAME = "0123456789abcdef0123456789abcdef.png"
+CONTENT = bytes(range(256)) * 4  # 1024 バイト
+
+
+@pytest.fixture(params=["disk", "memory"])
+def cached_image(
+    request: pytest.FixtureRequest, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Storage の代わりに CONTENT を返し、ディスク層またはメモリ層から配信させる。"""
+
+    def fetch(filename: str, out: BinaryIO) -> None:
+        if filename != FILENAME:
+            raise FileNotFoundError(filename)
+        out.write(CONTENT)
+
+    item_max = 0 if request.param == "disk" else len(CONTENT)
+    cache = ImageCache(
+        tmp_path,
+        memory_bytes=4096,
+        memory_item_max_bytes=item_max,
+        disk_bytes=1 << 20,
+    )
+    monkeypatch.setattr(image_service, "stream_image_from_supabase", fetch)
+    monkeypatch.setattr(image_cache, "get_image_cache", lambda: cache)
+
+
+@pytest.mark.usefixtures("cached_image")
+class TestGetImage:
+    """GET /api/v1/images/{filename} — 認証不要。"""
+
+    def test_returns_content_with_etag(self, unauthed_client: TestClient) -> None:
+        resp = unauthed_client.get(f"/api/v1/images/{FILENAME}")
+
+        assert resp.status_code == 200
+        assert resp.content == CONTENT
+        assert resp.headers["content-type"] == "image/png"
+        assert resp.headers["etag"].startswith('"')
+        assert resp.headers["accept-ranges"] == "bytes"
+        assert "immutable" in resp.headers["cache-control"]
+
+    def test_if_none_match_returns_304(self, unauthed_client: TestClient) -> None:
+        etag = unauthed_client.get(f"/api/v1/images/{FILENAME}").headers["etag"]
+
+        resp = unauthed_client.get(
+            f"/api/v1/images/{FILENAME}", headers={"If-None-Match": etag}
+        )
+
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["etag"] == etag
+
+    def test_if_modified_since_returns_304(self, unauthed_client: TestClient) -> None:
+        last_modified = unauthed_client.get(f"/api/v1/images/{FILENAME}").headers[
+            "last-modified"
+        ]
+
+        resp = unauthed_client.get(
+            f"/api/v1/images/{FILENAME}",
+            headers={"If-Modified-Since": last_modified},
+        )
+
+        assert resp.status_code == 304
+
+    def test_stale_etag_returns_content(self, unauthed_client: TestClient) -> None:
+        resp = unauthed_client.get(
+            f"/api/v1/images/{FILENAME}", headers={"If-None-Match": '"other"'}
+        )
+
+        assert resp.status_code == 200
+        assert resp.content == CONTENT
+
+    def test_range_returns_206(self, unauthed_client: TestClient) -> None:
+        resp = unauthed_client.get(
+            f"/api/v1/images/{FILENAME}", headers={"Range": "bytes=100-199"}
+        )
+
+        assert resp.status_code == 206
+        assert resp.content == CONTENT[100:200]
+        assert resp.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+
+    def test_suffix_range(self, unauthed_client: TestClient) -> None:
+        resp = unauthed_client.get(
+            f"/api/v1/images/{FILENAME}", headers={"Range": "bytes=-10"}
+        )
+
+        assert resp.status_code == 206
+        assert resp.content == CONTENT[-10:]
+
+    def test_unsatisfiable_range_returns_416(self, unauthed_client: TestClient) -> None:
+        resp = unauthed_client.get(
+            f"/api/v1/images/{FILENAME}", headers={"Range": "bytes=5000-"}
+        )
+
+        assert resp.status_code == 416
+        assert resp.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+    def test_width_falls_back_to_original(self, unauthed_client: TestClient) -> None:
+        """派生画像のない画像（古いアップロード）は ?w= でも元画像を返す。"""
+        resp = unauthed_client.get(f"/api/v1/images/{FILENAME}", params={"w": 200})
+
+        assert resp.status_code == 200
+        assert resp.content == CONTENT
+        assert resp.headers["content-type"] == "image/png"
+
+    def test_not_found(self, unauthed_client: TestClient) -> None:
+        resp = unauthed_client.get(
+            "/api/v1/images/ffffffffffffffffffffffffffffffff.png"
+        )
+
+        assert resp.status_code == 404
+
+
+class TestGetImageEvicted:
+    """ディスク層の画像が送信前後に追い出されても 200 で返す。"""
+
+    @pytest.fixture(autouse=True)
+    def storage(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+        requested: list[str] = []
+
+        def fetch(filename: str, out: BinaryIO) -> None:
+            requested.append(filename)
+            out.write(CONTENT)
+
+        cache = ImageCache(
+            tmp_path, memory_bytes=4096, memory_item_max_bytes=0, disk_bytes=1 << 20
+        )
+        monkeypatch.setattr(image_service, "stream_image_from_supabase", fetch)
+        monkeypatch.setattr(image_cache, "get_image_cache", lambda: cache)
+        return requested
+
+    def test_evicted_before_open_is_refetched(
+        self,
+        unauthed_client: TestClient,
+        storage: list[str],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        original = images._open_cached_file
+        evicted: list[Path] = []
+
+        def evict_once(path: Path) -> BinaryIO:
+            if not evicted:
+                path.unlink()
+                evicted.append(path)
+            return original(path)
+
+        monkeypatch.setattr(images, "_open_cached_file", evict_once)
+
+        resp = unauthed_client.get(f"/api/v1/images/{FILENAME}")
+
+        assert resp.status_code == 200
+        assert resp.content == CONTENT
+        assert storage == [FILENAME, FILENAME]
+
+    def test_evicted_while_sending_is_streamed(
+        self, unauthed_client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        original = images._open_cached_file
+
+        def open_then_evict(path: Path) -> BinaryIO:
+            file = original(path)
+            path.unlink()
+            return file
+
+        monkeypatch.setattr(images, "_open_cached_file", open_then_evict)
+
+        resp = unauthed_client.get(
+            f"/api/v1/images/{FILENAME}", headers={"Range": "bytes=100-199"}
+        )
+
+        assert resp.status_code == 206
+        assert resp.content == CONTENT[100:200]
+
+
+class TestGetImageVariants:
+    """?w= と Accept による派生画像の選択。"""
+
+    STEM = FILENAME.removesuffix(".png")
+
+    @pytest.fixture(autouse=True)
+    def storage(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+        objects = {
+            FILENAME: b"original",
+            f"{self.STEM}_w480.png": b"w480-png",
+            f"{self.STEM}_w480.webp": b"w480-webp",
+        }
+        requested: list[str] = []
+
+        def fetch(filename: str, out: BinaryIO) -> None:
+            requested.append(filename)
+            if filename not in objects:
+                raise LookupError(filename)
+            out.write(objects[filename])
+
+        cache = ImageCache(
+            tmp_path, memory_bytes=4096, memory_item_max_bytes=4096, disk_bytes=0
+        )
+        monkeypatch.setattr(image_service, "stream_image_from_supabase", fetch)
+        monkeypatch.setattr(image_cache, "get_image_cache", lambda: cache)
+        return requested
+
+    def test_picks_nearest_wider_variant(self, unauthed_client: TestClient) -> None:
+        resp = unauthed_client.get(f"/api/v1/images/{FILENAME}", params={"w": 300})
+
+        assert resp.content == b"w480-png"
+        assert resp.headers["content-type"] == "image/png"
+        assert "Accept" in resp.headers["vary"]
+
+    def test_prefers_webp_when_accepted(self, unauthed_client: TestClient) -> None:
+        resp = unauthed_client.get(
+            f"/api/v1/images/{FILENAME}",
+            params={"w": 300},
+            headers={"Accept": "image/avif,image/webp,*/*;q=0.8"},
+        )
+
+        assert resp.content == b"w480-webp"
+        assert resp.headers["content-type"] == "image/webp"
+
+    def test_missing_variant_is_remembered(
+        self, unauthed_client: TestClient, storage: list[str]
+    ) -> None:
+        for _ in range(2):
+            resp = unauthed_client.get(f"/api/v1/images/{FILENAME}", params={"w": 100})
+            assert resp.content == b"original"
+
+        assert storage.count(f"{self.STEM}_w160.png") == 1
+
+
+class TestUploadImageBusy:
+    """POST /api/v1/images/ — 画像処理プールが満杯のとき。"""
+
+    def test_returns_503_with_retry_after(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # 未起動のプロセッサは常に受付を拒否する
+        processor = ImageProcessor()
+        monkeypatch.setattr(image_processor, "get_image_processor", lambda: processor)
+
+        resp = client.post(
+            "/api/v1/images/",
+            files={"file": ("a.png", CONTENT, "image/png")},
+        )
+
+        assert resp.status_code == 503
+        assert resp.headers["retry-after"] == "2"
+        assert processor.snapshot()["rejected"] == 1
@@ -1,12 +1,14 @@
 """Integration tests for /api/v1/plots endpoints."""
 
 import uuid
+from datetime import UTC, datetime, timedelta
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
-from app.models import Plot, User
+from app.models import Plot, Section, Star, User
+from app.services import blob_service, star_service
 
 
 class TestGetPlots:
@@ -38,8 +40,48 @@ class TestGetPlots:
         data = resp.json()
         assert len(data["items"]) == 2
         assert data["total"] == 3
+        assert data["totalIsEstimate"] is False
         assert data["limit"] == 2
 
+        # 2回目は total をキャッシュから返すため推定値扱いになる
+        resp = client.get("/api/v1/plots/", params={"limit": 2, "offset": 0})
+        assert resp.json()["total"] == 3
+        assert resp.json()["totalIsEstimate"] is True
+
+    def test_get_plots_cursor_pagination(
+        self, client: TestClient, test_user: User, db: Session
+    ) -> None:
+        """nextCursor を辿ると offset と同じ順で全件を重複なく取得できる。"""
+        base = datetime(2026, 1, 1, tzinfo=UTC)
+        for i in range(5):
+            db.add(
+                Plot(
+                    title=f"Cursor Plot {i}",
+                    owner_id=test_user.id,
+                    tags=[],
+                    created_at=base + timedelta(minutes=i),
+                )
+            )
+        db.commit()
+
+        titles = []
+        params: dict = {"limit": 2}
+        while True:
+            resp = client.get("/api/v1/plots/", params=params)
+            assert resp.status_code == 200
+            data = resp.json()
+            titles += [item["title"] for item in data["items"]]
+            if data["nextCursor"] is None:
+                break
+            params = {"limit": 2, "cursor": data["nextCursor"]}
+
+        assert titles == [f"Cursor Plot {i}" for i in reversed(range(5))]
+        assert data["total"] == 5
+
+    def test_get_plots_invalid_cursor(self, client: TestClient) -> None:
+        resp = client.get("/api/v1/plots/", params={"cursor": "broken"})
+        assert resp.status_code == 400
+
     def test_get_plots_unauthenticated(
         self, unauthed_client: TestClient, test_user: User, test_plot: Plot
     ) -> None:
@@ -181,6 +223,108 @@ class TestGetPlotDetail:
         resp = client.get(f"/api/v1/plots/{fake_id}")
         assert resp.status_code == 404
 
+    def test_get_plot_detail_sections_and_star(
+        self,
+        client: TestClient,
+        db: Session,
+        test_user: User,
+        test_plot: Plot,
+        test_section: Section,
+    ) -> None:
+        """AsyncSession 経由でも sections・owner・スター状態が返る。"""
+        star_service.add_star(db, test_plot.id, test_user.id)
+
+        resp = client.get(f"/api/v1/plots/{test_plot.id}")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [s["id"] for s in data["sections"]] == [str(test_section.id)]
+        assert data["sections"][0]["content"] == test_section.content
+        assert data["owner"]["id"] == str(test_user.id)
+        assert data["starCount"] == 1
+        assert data["isStarred"] is True
+
+    def test_get_plot_detail_blob_backed_section(
+        self,
+        client: TestClient,
+        db: Session,
+        test_user: User,
+        test_plot: Plot,
+        test_section: Section,
+    ) -> None:
+        """Blob 共有中（フォーク直後）のセクションも content が展開される。"""
+        content = {"type": "doc", "text": "shared"}
+        test_section.content_hash = blob_service.put_blob(db, content)
+        test_section.content = None
+        db.commit()
+        # キャッシュを空にして非同期の Blob 読み込みを通す
+        blob_service._cache.clear()
+
+        resp = client.get(f"/api/v1/plots/{test_plot.id}")
+        assert resp.status_code == 200
+        assert resp.json()["sections"][0]["content"] == content
+
+
+class TestPlotDetailETag:
+    """GET /api/v1/plots/{plot_id} — ETag / If-None-Match による条件付き GET。"""
+
+    def test_not_modified_when_etag_matches(
+        self, client: TestClient, test_user: User, test_plot: Plot
+    ) -> None:
+        """同じ ETag で再取得すると本文なしの 304 を返す。"""
+        first = client.get(f"/api/v1/plots/{test_plot.id}")
+        etag = first.headers["etag"]
+        assert etag.startswith('"')
+
+        resp = client.get(
+            f"/api/v1/plots/{test_plot.id}", headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == 304
+        assert resp.headers["etag"] == etag
+        assert resp.content == b""
+
+    def test_section_edit_changes_etag(
+        self,
+        client: TestClient,
+        test_user: User,
+        test_plot: Plot,
+        test_section: Section,
+    ) -> None:
+        """セクション編集後は ETag が変わり、200 で新しい本文を返す。"""
+        etag = client.get(f"/api/v1/plots/{test_plot.id}").headers["etag"]
+
+        client.put(f"/api/v1/sections/{test_section.id}", json={"title": "Edited"})
+
+        resp = client.get(
+            f"/api/v1/plots/{test_plot.id}", headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+        assert resp.json()["sections"][0]["title"] == "Edited"
+
+    def test_star_changes_etag(
+        self, client: TestClient, db: Session, test_user: User, test_plot: Plot
+    ) -> None:
+        """スター数・スター状態も本文に含まれるため ETag に反映される。"""
+        etag = client.get(f"/api/v1/plots/{test_plot.id}").headers["etag"]
+
+        db.add(Star(plot_id=test_plot.id, user_id=test_user.id))
+        db.commit()
+
+        resp = client.get(
+            f"/api/v1/plots/{test_plot.id}", headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == 200
+        assert resp.json()["isStarred"] is True
+
+
+class TestPlotEvents:
+    """GET /api/v1/plots/{plot_id}/events — SSE ストリーム。"""
+
+    def test_plot_events_not_found(self, client: TestClient, test_user: User) -> None:
+        """存在しない Plot の購読 → 404（ストリームを開始しない）。"""
+        resp = client.get(f"/api/v1/plots/{uuid.uuid4()}/events")
+        assert resp.status_code == 404
+
 
 class TestUpdatePlot:
     """PUT /api/v1/plots/{plot_id} — AuthUser（作成者のみ）。"""
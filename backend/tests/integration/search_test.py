@@ -4,10 +4,13 @@
 - GET /api/v1/search/?q=...
 """
 
+import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.core import replica
 from app.models import Plot, User
+from app.services import section_service
 
 
 class TestSearch:
@@ -180,3 +183,85 @@ class TestSearch:
         assert data["total"] >= 1
         ids = [item["id"] for item in data["items"]]
         assert str(plot.id) in ids
+
+
+class TestSearchSections:
+    def test_search_sections(
+        self, client: TestClient, db: Session, test_plot: Plot
+    ) -> None:
+        section_service.create_section(
+            db,
+            test_plot.id,
+            "第一章",
+            content={
+                "type": "doc",
+                "content": [
+                    {
+                        "type": "paragraph",
+                        "content": [{"type": "text", "text": "港に雨が降る"}],
+                    }
+                ],
+            },
+        )
+
+        resp = client.get("/api/v1/search/sections", params={"q": "雨"})
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["total"] == 1
+        item = data["items"][0]
+        assert item["plotId"] == str(test_plot.id)
+        assert item["sectionTitle"] == "第一章"
+        assert item["snippet"] == "港に雨が降る"
+        assert item["highlights"] == [{"start": 2, "length": 1}]
+
+    def test_search_sections_requires_query(self, client: TestClient) -> None:
+        resp = client.get("/api/v1/search/sections")
+        assert resp.status_code == 422
+
+
+class TestReplicaRouting:
+    """レプリカ設定時の読み取りセッションの振り分け。"""
+
+    @pytest.fixture()
+    def replica_calls(self, db: Session, monkeypatch: pytest.MonkeyPatch) -> list[int]:
+        """テスト用 DB を指すレプリカを1つ登録し、セッション作成回数を記録する。"""
+        calls: list[int] = []
+        factory = sessionmaker(autoflush=False, bind=db.get_bind())
+
+        def _replica_factory() -> Session:
+            calls.append(1)
+            return factory()
+
+        balancer = replica.ReplicaBalancer([_replica_factory])
+        monkeypatch.setattr(replica, "get_replica_balancer", lambda: balancer)
+        replica.clear_recent_writes()
+        yield calls
+        replica.clear_recent_writes()
+
+    def test_search_reads_from_replica(
+        self,
+        client: TestClient,
+        test_plot: Plot,
+        replica_calls: list[int],
+    ) -> None:
+        resp = client.get("/api/v1/search/", params={"q": "Test"})
+
+        assert resp.status_code == 200
+        assert resp.json()["total"] >= 1
+        assert len(replica_calls) == 1
+
+    def test_reads_stick_to_primary_after_write(
+        self,
+        client: TestClient,
+        test_plot: Plot,
+        replica_calls: list[int],
+    ) -> None:
+        """書き込み直後の同じユーザーの読み取りは primary から行う。"""
+        resp = client.put(f"/api/v1/plots/{test_plot.id}", json={"title": "Updated"})
+        assert resp.status_code == 200
+
+        resp = client.get("/api/v1/search/", params={"q": "Updated"})
+
+        assert resp.status_code == 200
+        assert resp.json()["total"] == 1
+        assert replica_calls == []
@@ -0,0 +1,191 @@
+"""Integration tests for /api/v1/sections endpoints (read paths)."""
+
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models import Plot, Section, User
+
+
+class TestListSections:
+    """GET /api/v1/plots/{plot_id}/sections — AsyncSession で読み取る。"""
+
+    def test_list_sections(
+        self,
+        client: TestClient,
+        db: Session,
+        test_user: User,
+        test_plot: Plot,
+        test_section: Section,
+    ) -> None:
+        """order_index 昇順でセクション一覧を返す。"""
+        second = Section(
+            plot_id=test_plot.id,
+            title="Second",
+            content={"type": "doc", "content": []},
+            order_index=1,
+        )
+        db.add(second)
+        db.commit()
+
+        resp = client.get(f"/api/v1/plots/{test_plot.id}/sections")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["total"] == 2
+        assert [s["id"] for s in data["items"]] == [
+            str(test_section.id),
+            str(second.id),
+        ]
+
+    def test_list_sections_plot_not_found(
+        self, client: TestClient, test_user: User
+    ) -> None:
+        """存在しない Plot → 404。"""
+        resp = client.get(f"/api/v1/plots/{uuid.uuid4()}/sections")
+        assert resp.status_code == 404
+
+
+class TestGetSection:
+    """GET /api/v1/sections/{section_id} — AsyncSession で読み取る。"""
+
+    def test_get_section(
+        self, client: TestClient, test_user: User, test_section: Section
+    ) -> None:
+        """セクション詳細を返す。"""
+        resp = client.get(f"/api/v1/sections/{test_section.id}")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["id"] == str(test_section.id)
+        assert data["content"] == test_section.content
+        assert data["version"] == test_section.version
+
+    def test_get_section_not_found(self, client: TestClient, test_user: User) -> None:
+        """存在しないセクション → 404。"""
+        resp = client.get(f"/api/v1/sections/{uuid.uuid4()}")
+        assert resp.status_code == 404
+
+
+class TestSectionETag:
+    """GET /plots/{plot_id}/sections, GET /sections/{section_id} の条件付き GET。"""
+
+    def test_list_sections_not_modified(
+        self,
+        client: TestClient,
+        test_user: User,
+        test_plot: Plot,
+        test_section: Section,
+    ) -> None:
+        url = f"/api/v1/plots/{test_plot.id}/sections"
+        etag = client.get(url).headers["etag"]
+
+        resp = client.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.headers["etag"] == etag
+
+    def test_list_sections_etag_changes_on_delete(
+        self,
+        client: TestClient,
+        db: Session,
+        test_user: User,
+        test_plot: Plot,
+        test_section: Section,
+    ) -> None:
+        """セクション削除後は ETag が変わる（最大 version が変わらなくても）。"""
+        second = Section(plot_id=test_plot.id, title="Second", order_index=1)
+        db.add(second)
+        db.commit()
+        url = f"/api/v1/plots/{test_plot.id}/sections"
+        etag = client.get(url).headers["etag"]
+
+        client.delete(f"/api/v1/sections/{second.id}")
+
+        resp = client.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.json()["total"] == 1
+
+    def test_get_section_not_modified(
+        self, client: TestClient, test_user: User, test_section: Section
+    ) -> None:
+        """弱い比較（W/ 付き）・複数値の If-None-Match でも一致すれば 304。"""
+        url = f"/api/v1/sections/{test_section.id}"
+        etag = client.get(url).headers["etag"]
+
+        resp = client.get(url, headers={"If-None-Match": f'"other", W/{etag}'})
+        assert resp.status_code == 304
+
+    def test_get_section_modified(
+        self, client: TestClient, test_user: User, test_section: Section
+    ) -> None:
+        url = f"/api/v1/sections/{test_section.id}"
+        etag = client.get(url).headers["etag"]
+
+        client.put(url, json={"content": {"type": "doc", "content": []}})
+
+        resp = client.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+
+
+class TestPatchSection:
+    """PATCH /api/v1/sections/{section_id} — JSON Patch による差分更新。"""
+
+    def test_patch_section(
+        self, client: TestClient, test_user: User, test_section: Section
+    ) -> None:
+        base = test_section.version
+        resp = client.patch(
+            f"/api/v1/sections/{test_section.id}",
+            json={
+                "baseVersion": base,
+                "patch": [
+                    {"op": "add", "path": "/content/-", "value": {"type": "paragraph"}},
+                    {"op": "copy", "from": "/content/0", "path": "/content/-"},
+                ],
+            },
+        )
+
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["version"] == base + 1
+        assert data["content"]["content"] == [
+            {"type": "paragraph"},
+            {"type": "paragraph"},
+        ]
+
+    def test_patch_section_conflict(
+        self, client: TestClient, test_user: User, test_section: Section
+    ) -> None:
+        """baseVersion が古い場合は 409。"""
+        resp = client.patch(
+            f"/api/v1/sections/{test_section.id}",
+            json={"baseVersion": test_section.version - 1, "patch": []},
+        )
+        assert resp.status_code == 409
+
+    def test_patch_section_invalid_patch(
+        self, client: TestClient, test_user: User, test_section: Section
+    ) -> None:
+        """存在しないパスへの操作は 400（404 ではない）。"""
+        resp = client.patch(
+            f"/api/v1/sections/{test_section.id}",
+            json={
+                "baseVersion": test_section.version,
+                "patch": [{"op": "remove", "path": "/nope"}],
+            },
+        )
+        assert resp.status_code == 400
+
+    def test_patch_section_not_found(self, client: TestClient, test_user: User) -> None:
+        resp = client.patch(
+            f"/api/v1/sections/{uuid.uuid4()}", json={"baseVersion": 1, "patch": []}
+        )
+        assert resp.status_code == 404
+
+    def test_patch_section_unauthorized(
+        self, unauthed_client: TestClient, test_section: Section
+    ) -> None:
+        resp = unauthed_client.patch(
+            f"/api/v1/sections/{test_section.id}", json={"baseVersion": 1, "patch": []}
+        )
+        assert resp.status_code == 401
@@ -0,0 +1,77 @@
+"""blob_service のユニットテスト。
+
+テスト対象:
+- put_blobs / put_blob: 正規化 JSON の sha256 をキーに重複なく保存
+- get_blobs: hash → content の一括取得
+- section_content: Blob 共有中のセクションの content 読み出し
+"""
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Section, SectionBlob
+from app.services import blob_service
+
+
+class TestPutBlobs:
+    def test_same_content_same_hash(self, db: Session) -> None:
+        """キー順が違っても同じ JSON なら同じ hash になり、1行だけ保存される。"""
+        hashes = blob_service.put_blobs(
+            db, [{"type": "doc", "content": []}, {"content": [], "type": "doc"}]
+        )
+        db.commit()
+
+        assert hashes[0] == hashes[1]
+        assert db.query(SectionBlob).count() == 1
+
+    def test_none_content_has_no_blob(self, db: Session) -> None:
+        """content が None の要素は Blob を作らず None を返す。"""
+        assert blob_service.put_blobs(db, [None]) == [None]
+        assert db.query(SectionBlob).count() == 0
+
+    def test_put_existing_blob_is_noop(self, db: Session) -> None:
+        """保存済みの Blob を再度保存してもエラーにならない。"""
+        content = {"type": "doc", "text": "again"}
+        first = blob_service.put_blob(db, content)
+        db.commit()
+        second = blob_service.put_blob(db, content)
+        db.commit()
+
+        assert first == second
+        assert db.query(SectionBlob).count() == 1
+
+
+class TestGetBlobs:
+    def test_roundtrip(self, db: Session) -> None:
+        """保存した content をそのまま取り出せる。"""
+        content = {"type": "doc", "content": [{"type": "text", "text": "日本語"}]}
+        blob_hash = blob_service.put_blob(db, content)
+
+        assert blob_service.get_blobs(db, [blob_hash]) == {blob_hash: content}
+
+    def test_returned_dict_is_a_copy(self, db: Session) -> None:
+        """戻り値を書き換えてもキャッシュされた内容は変わらない。"""
+        blob_hash = blob_service.put_blob(db, {"type": "doc"})
+        blob_service.get_blobs(db, [blob_hash])[blob_hash]["type"] = "mutated"
+
+        assert blob_service.get_blobs(db, [blob_hash])[blob_hash] == {"type": "doc"}
+
+    def test_missing_blob_raises(self, db: Session) -> None:
+        """存在しない hash は ValueError。"""
+        with pytest.raises(ValueError, match="Section blob not found"):
+            blob_service.get_blobs(db, ["0" * 64])
+
+
+class TestSectionContent:
+    def test_inline_content(self, db: Session, test_section: Section) -> None:
+        """content_hash がないセクションは content をそのまま返す。"""
+        assert blob_service.section_content(test_section) == test_section.content
+
+    def test_shared_blob_content(self, db: Session, test_section: Section) -> None:
+        """content_hash があるセクションは Blob から content を読む。"""
+        content = {"type": "doc", "text": "shared"}
+        test_section.content_hash = blob_service.put_blob(db, content)
+        test_section.content = None
+        db.commit()
+
+        assert blob_service.section_content(test_section) == content
@@ -0,0 +1,164 @@
+"""events のユニットテスト。
+
+テスト対象:
+- publish_plot_event: commit 時にだけ購読者へ配信（rollback では破棄）
+- 編集系サービスが発行するイベント
+- Subscription: キュー溢れ時の resync
+- sse_stream: SSE 形式での送出と切断時の購読解除
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core import events
+from app.models import Plot, Section
+from app.services import moderation_service, section_service
+
+
+async def _drain(subscription: events.Subscription) -> list[events.PlotEvent]:
+    """ループに積まれた配信を処理させてから、キューの中身を取り出す。"""
+    await asyncio.sleep(0)
+    received = []
+    while not subscription.queue.empty():
+        received.append(subscription.queue.get_nowait())
+    return received
+
+
+class TestPublish:
+    def test_delivered_on_commit(self, db: Session, test_plot: Plot) -> None:
+        async def scenario() -> list[events.PlotEvent]:
+            subscription = events.get_broker().subscribe(test_plot.id)
+            try:
+                events.publish_plot_event(db, test_plot.id, "plot_updated", {"v": 1})
+                assert await _drain(subscription) == []
+                db.commit()
+                return await _drain(subscription)
+            finally:
+                events.get_broker().unsubscribe(subscription)
+
+        received = asyncio.run(scenario())
+
+        assert received == [
+            events.PlotEvent(str(test_plot.id), "plot_updated", {"v": 1})
+        ]
+
+    def test_discarded_on_rollback(self, db: Session, test_plot: Plot) -> None:
+        async def scenario() -> list[events.PlotEvent]:
+            subscription = events.get_broker().subscribe(test_plot.id)
+            try:
+                events.publish_plot_event(db, test_plot.id, "plot_updated", {})
+                db.rollback()
+                db.commit()
+                return await _drain(subscription)
+            finally:
+                events.get_broker().unsubscribe(subscription)
+
+        assert asyncio.run(scenario()) == []
+
+    def test_other_plots_not_delivered(self, db: Session, test_plot: Plot) -> None:
+        async def scenario() -> list[events.PlotEvent]:
+            subscription = events.get_broker().subscribe("other-plot")
+            try:
+                events.publish_plot_event(db, test_plot.id, "plot_updated", {})
+                db.commit()
+                return await _drain(subscription)
+            finally:
+                events.get_broker().unsubscribe(subscription)
+
+        assert asyncio.run(scenario()) == []
+
+
+class TestServiceEvents:
+    def test_section_update_and_pause(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        """セクション更新・一時停止で新しい version 付きのイベントが届く。"""
+
+        async def scenario() -> list[events.PlotEvent]:
+            subscription = events.get_broker().subscribe(test_plot.id)
+            try:
+                section_service.update_section(db, test_section.id, title="New")
+                moderation_service.pause_plot(db, test_plot.id, reason="test")
+                return await _drain(subscription)
+            finally:
+                events.get_broker().unsubscribe(subscription)
+
+        received = asyncio.run(scenario())
+
+        assert [(e.type, e.data) for e in received] == [
+            (
+                "section_updated",
+                {"sectionId": str(test_section.id), "version": test_section.version},
+            ),
+            ("plot_paused", {}),
+        ]
+
+    def test_failed_update_publishes_nothing(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        """一時停止中で更新が拒否された場合はイベントを発行しない。"""
+        test_plot.is_paused = True
+        db.commit()
+
+        async def scenario() -> list[events.PlotEvent]:
+            subscription = events.get_broker().subscribe(test_plot.id)
+            try:
+                with pytest.raises(PermissionError):
+                    section_service.update_section(db, test_section.id, title="X")
+                return await _drain(subscription)
+            finally:
+                events.get_broker().unsubscribe(subscription)
+
+        assert asyncio.run(scenario()) == []
+
+
+class TestSubscription:
+    def test_overflow_sends_resync(self) -> None:
+        async def scenario() -> list[events.PlotEvent]:
+            subscription = events.get_broker().subscribe("p")
+            try:
+                for i in range(events.SUBSCRIBER_QUEUE_SIZE + 1):
+                    subscription.push(
+                        events.PlotEvent("p", "section_updated", {"i": i})
+                    )
+                return await _drain(subscription)
+            finally:
+                events.get_broker().unsubscribe(subscription)
+
+        assert asyncio.run(scenario()) == [events.PlotEvent("p", "resync")]
+
+
+class TestSseStream:
+    def test_stream_format_and_unsubscribe(self) -> None:
+        async def scenario() -> list[str]:
+            broker = events.get_broker()
+            subscription = broker.subscribe("p")
+            disconnected = False
+
+            async def is_disconnected() -> bool:
+                return disconnected
+
+            stream = events.sse_stream(
+                subscription, is_disconnected, {"version": 3}, heartbeat_seconds=0.01
+            )
+            chunks = [await anext(stream)]
+            chunks.append(await anext(stream))  # heartbeat
+            broker.dispatch(
+                events.PlotEvent("p", "section_deleted", {"sectionId": "s"})
+            )
+            chunks.append(await anext(stream))
+            disconnected = True
+            async for _ in stream:
+                pass
+            assert broker.subscriber_count("p") == 0
+            return chunks
+
+        ready, heartbeat, deleted = asyncio.run(scenario())
+
+        assert ready.startswith("retry: ")
+        assert 'event: ready\ndata: {"version":3}\n\n' in ready
+        assert heartbeat == ": keepalive\n\n"
+        assert deleted.endswith('event: section_deleted\ndata: {"sectionId":"s"}\n\n')
+        assert deleted.startswith("id: ")
@@ -0,0 +1,61 @@
+"""feed_service（事前計算フィード）のユニットテスト。"""
+
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.models import FeedRanking, Plot, User
+from app.services import feed_service, star_service
+
+NOW = datetime(2026, 10, 16, 12, 0, tzinfo=UTC)
+
+
+def _add_plots(db: Session, user: User, n: int) -> list[Plot]:
+    plots = [
+        Plot(
+            title=f"Plot {i}",
+            owner_id=user.id,
+            tags=[],
+            created_at=NOW - timedelta(days=n - i),
+        )
+        for i in range(n)
+    ]
+    db.add_all(plots)
+    db.commit()
+    return plots
+
+
+class TestRefreshFeeds:
+    def test_popular_and_new(
+        self, db: Session, test_user: User, other_user: User
+    ) -> None:
+        first, second, third = _add_plots(db, test_user, 3)
+        star_service.add_star(db, first.id, test_user.id)
+        star_service.add_star(db, first.id, other_user.id)
+        star_service.add_star(db, second.id, test_user.id)
+
+        feed_service.refresh_feeds(db, now=NOW)
+
+        popular = feed_service.get_feed(db, "popular", 2)
+        assert [p.id for p in popular] == [first.id, second.id]
+        new = feed_service.get_feed(db, "new", 10)
+        assert [p.id for p in new] == [third.id, second.id, first.id]
+
+    def test_refresh_replaces_previous_rows(self, db: Session, test_user: User) -> None:
+        _add_plots(db, test_user, 3)
+        feed_service.refresh_feeds(db, now=NOW)
+        feed_service.refresh_feeds(db, now=NOW)
+
+        rows = db.query(FeedRanking).filter(FeedRanking.feed == "new").all()
+        assert sorted(r.rank for r in rows) == [0, 1, 2]
+
+
+class TestGetFeed:
+    def test_falls_back_before_first_refresh(
+        self, db: Session, test_user: User
+    ) -> None:
+        plots = _add_plots(db, test_user, 2)
+
+        new = feed_service.get_feed(db, "new", 10)
+
+        assert [p.id for p in new] == [plots[1].id, plots[0].id]
@@ -17,7 +17,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.models import ColdSnapshot, HotOperation, Plot, RollbackLog, Section, User
-from app.services import history_service
+from app.services import blob_service, history_service
 from app.services.history_service import ConflictError
 
 
@@ -141,6 +141,88 @@ class TestRecordOperation:
             mock_rollback.assert_called_once()
 
 
+class TestRecordOperationsBatch:
+    """record_operations_batch のテスト（SQLite 3.35+ は RETURNING に対応）。"""
+
+    def _second_section(self, db: Session, plot: Plot) -> Section:
+        section = Section(
+            plot_id=plot.id,
+            title="Second",
+            content={"type": "doc", "content": []},
+            order_index=1,
+        )
+        db.add(section)
+        db.commit()
+        return section
+
+    def test_versions_assigned_in_request_order(
+        self, db: Session, test_plot: Plot, test_section: Section, test_user: User
+    ) -> None:
+        """セクションごとに、リクエスト順で連番の version が振られる。"""
+        other = self._second_section(db, test_plot)
+        first_id, other_id = test_section.id, other.id
+        ops = [
+            {"section_id": first_id, "operation_type": "insert", "payload": {"n": 1}},
+            {"section_id": other_id, "operation_type": "insert", "payload": {"n": 2}},
+            {"section_id": first_id, "operation_type": "delete", "payload": {"n": 3}},
+        ]
+
+        results = history_service.record_operations_batch(
+            db, test_plot.id, test_user.id, ops
+        )
+
+        assert [(r["section_id"], r["version"]) for r in results] == [
+            (first_id, 2),
+            (other_id, 2),
+            (first_id, 3),
+        ]
+        db.expire_all()
+        assert db.get(Section, first_id).version == 3
+        assert db.get(Section, other_id).version == 2
+        stored = {
+            op.id: op
+            for op in db.query(HotOperation).filter(
+                HotOperation.id.in_([r["id"] for r in results])
+            )
+        }
+        assert len(stored) == 3
+        assert stored[results[2]["id"]].payload == {"n": 3}
+        assert stored[results[2]["id"]].operation_type == "delete"
+
+    def test_section_of_other_plot_rejected(
+        self, db: Session, test_plot: Plot, test_section: Section, test_user: User
+    ) -> None:
+        """別 Plot のセクションを含む場合は何も記録しない。"""
+        other_plot = Plot(title="Other", owner_id=test_user.id)
+        db.add(other_plot)
+        db.commit()
+        foreign = self._second_section(db, other_plot)
+        ops = [
+            {"section_id": test_section.id, "operation_type": "insert"},
+            {"section_id": foreign.id, "operation_type": "insert"},
+        ]
+
+        with pytest.raises(ValueError, match="Section not found"):
+            history_service.record_operations_batch(db, test_plot.id, test_user.id, ops)
+        assert db.query(HotOperation).count() == 0
+
+    def test_user_not_found(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        ops = [{"section_id": test_section.id, "operation_type": "insert"}]
+        with pytest.raises(ValueError, match="User not found"):
+            history_service.record_operations_batch(db, test_plot.id, uuid.uuid4(), ops)
+
+    def test_too_many_operations(
+        self, db: Session, test_plot: Plot, test_section: Section, test_user: User
+    ) -> None:
+        ops = [{"section_id": test_section.id, "operation_type": "insert"}] * (
+            history_service.MAX_BATCH_OPERATIONS + 1
+        )
+        with pytest.raises(ValueError, match="Too many operations"):
+            history_service.record_operations_batch(db, test_plot.id, test_user.id, ops)
+
+
 class TestListOperations:
     def test_list_operations(
         self, db: Session, test_section: Section, test_user: User
@@ -157,14 +239,14 @@ class TestListOperations:
         db.add(op)
         db.commit()
 
-        items, total = history_service.get_history(db, test_section.id)
+        items, total, _ = history_service.get_history(db, test_section.id)
         assert total == 1
         assert len(items) == 1
         assert items[0]["operation_type"] == "insert"
 
     def test_list_operations_empty(self, db: Session, test_section: Section) -> None:
         """操作履歴がない場合は空リスト。"""
-        items, total = history_service.get_history(db, test_section.id)
+        items, total, _ = history_service.get_history(db, test_section.id)
         assert total == 0
         assert items == []
 
@@ -248,13 +330,13 @@ class TestListSnapshots:
             db.add(ColdSnapshot(plot_id=test_plot.id, version=v, content={}))
         db.commit()
 
-        snapshots, total = history_service.get_plot_snapshots(db, test_plot.id)
+        snapshots, total, _ = history_service.get_plot_snapshots(db, test_plot.id)
         assert total == 3
         assert len(snapshots) == 3
 
     def test_list_snapshots_empty(self, db: Session, test_plot: Plot) -> None:
         """スナップショットがない場合は空リスト。"""
-        snapshots, total = history_service.get_plot_snapshots(db, test_plot.id)
+        snapshots, total, _ = history_service.get_plot_snapshots(db, test_plot.id)
         assert total == 0
         assert snapshots == []
 
@@ -278,6 +360,155 @@ class TestGetSnapshotDetail:
             history_service.get_snapshot_detail(db, test_plot.id, uuid.uuid4())
 
 
+class TestResolveSnapshotContent:
+    """差分スナップショットの復元（resolve_snapshot_content）のテスト。"""
+
+    def _keyframe_and_delta(
+        self, db: Session, plot: Plot, section_id: str
+    ) -> tuple[ColdSnapshot, ColdSnapshot]:
+        keyframe = ColdSnapshot(
+            plot_id=plot.id,
+            version=0,
+            content={
+                "plot": {"title": "Keyframe"},
+                "sections": [
+                    {
+                        "id": section_id,
+                        "title": "S1",
+                        "content": {"type": "doc", "content": []},
+                        "orderIndex": 0,
+                        "version": 1,
+                    },
+                    {
+                        "id": "kept",
+                        "title": "S2",
+                        "content": {"type": "doc", "text": "kept"},
+                        "orderIndex": 1,
+                        "version": 1,
+                    },
+                ],
+            },
+            section_versions={section_id: 1, "kept": 1},
+        )
+        db.add(keyframe)
+        db.flush()
+        delta = ColdSnapshot(
+            plot_id=plot.id,
+            version=0,
+            base_snapshot_id=keyframe.id,
+            content={
+                "plot": {"title": "Delta"},
+                "sections": [
+                    {"id": "kept", "title": "S2", "orderIndex": 0, "version": 1},
+                    {
+                        "id": section_id,
+                        "title": "S1",
+                        "content": {"type": "doc", "text": "changed"},
+                        "orderIndex": 1,
+                        "version": 2,
+                    },
+                ],
+            },
+        )
+        db.add(delta)
+        db.commit()
+        return keyframe, delta
+
+    def test_keyframe_returned_as_is(self, db: Session, test_plot: Plot) -> None:
+        """キーフレームはcontentをそのまま返す。"""
+        keyframe, _ = self._keyframe_and_delta(db, test_plot, "s1")
+        assert history_service.resolve_snapshot_content(db, keyframe) == (
+            keyframe.content
+        )
+
+    def test_delta_merged_with_keyframe(self, db: Session, test_plot: Plot) -> None:
+        """差分はキーフレームのcontentを引き継いで全量に復元される。"""
+        _, delta = self._keyframe_and_delta(db, test_plot, "s1")
+
+        content = history_service.resolve_snapshot_content(db, delta)
+        assert content is not None
+        assert content["plot"] == {"title": "Delta"}
+        assert [s["id"] for s in content["sections"]] == ["kept", "s1"]
+        assert content["sections"][0]["content"] == {"type": "doc", "text": "kept"}
+        assert content["sections"][1]["content"] == {"type": "doc", "text": "changed"}
+
+    def test_rollback_from_delta(
+        self, db: Session, test_plot: Plot, test_user: User
+    ) -> None:
+        """差分スナップショットからもPlot全体をロールバックできる。"""
+        _, delta = self._keyframe_and_delta(db, test_plot, "s1")
+
+        history_service.rollback_plot_to_snapshot(
+            db, test_plot.id, delta.id, test_user.id
+        )
+
+        sections = (
+            db.query(Section)
+            .filter(Section.plot_id == test_plot.id)
+            .order_by(Section.order_index)
+            .all()
+        )
+        assert [s.content for s in sections] == [
+            {"type": "doc", "text": "kept"},
+            {"type": "doc", "text": "changed"},
+        ]
+
+    def test_blob_entries_hydrated(self, db: Session, test_plot: Plot) -> None:
+        """ "blob" 参照のエントリは section_blobs の内容で "content" に展開される。"""
+        body = {"type": "doc", "text": "from blob"}
+        blob_hash = blob_service.put_blob(db, body)
+        keyframe = ColdSnapshot(
+            plot_id=test_plot.id,
+            version=0,
+            content={"plot": {}, "sections": [{"id": "s1", "blob": blob_hash}]},
+            section_versions={"s1": 1},
+        )
+        delta = ColdSnapshot(
+            plot_id=test_plot.id,
+            version=0,
+            content={"plot": {}, "sections": [{"id": "s1", "version": 1}]},
+        )
+        db.add(keyframe)
+        db.flush()
+        delta.base_snapshot_id = keyframe.id
+        db.add(delta)
+        db.commit()
+
+        content = history_service.resolve_snapshot_content(db, delta)
+        assert content is not None
+        assert content["sections"] == [{"id": "s1", "version": 1, "content": body}]
+
+        raw = history_service.resolve_snapshot_content(db, delta, hydrate=False)
+        assert raw is not None
+        assert raw["sections"][0]["blob"] == blob_hash
+
+    def test_rollback_shares_blob(
+        self, db: Session, test_plot: Plot, test_user: User
+    ) -> None:
+        """Blob 参照のスナップショットからのロールバックは content をコピーしない。"""
+        body = {"type": "doc", "text": "from blob"}
+        blob_hash = blob_service.put_blob(db, body)
+        snapshot = ColdSnapshot(
+            plot_id=test_plot.id,
+            version=0,
+            content={
+                "plot": {},
+                "sections": [{"id": "s1", "title": "S1", "blob": blob_hash}],
+            },
+        )
+        db.add(snapshot)
+        db.commit()
+
+        history_service.rollback_plot_to_snapshot(
+            db, test_plot.id, snapshot.id, test_user.id
+        )
+
+        section = db.query(Section).filter(Section.plot_id == test_plot.id).one()
+        assert section.content is None
+        assert section.content_hash == blob_hash
+        assert blob_service.section_content(section) == body
+
+
 class TestRollbackPlot:
     def test_rollback_plot(self, db: Session, test_plot: Plot, test_user: User) -> None:
         """スナップショットから Plot をロールバックできる。"""
@@ -414,14 +645,14 @@ class TestListRollbackLogs:
         db.add(log)
         db.commit()
 
-        items, total = history_service.get_rollback_logs(db, test_plot.id)
+        items, total, _ = history_service.get_rollback_logs(db, test_plot.id)
         assert total == 1
         assert len(items) == 1
         assert items[0]["reason"] == "Test"
 
     def test_list_rollback_logs_empty(self, db: Session, test_plot: Plot) -> None:
         """ロールバックログがない場合は空リスト。"""
-        items, total = history_service.get_rollback_logs(db, test_plot.id)
+        items, total, _ = history_service.get_rollback_logs(db, test_plot.id)
         assert total == 0
         assert items == []
 
@@ -514,6 +745,62 @@ class TestCleanupOldOperations:
         assert remaining == 1
 
 
+class TestChunkedHotOperationPurge:
+    """期限切れ HotOperation のチャンク削除のテスト。"""
+
+    def _expired_ops(
+        self, db: Session, section: Section, user: User, count: int
+    ) -> None:
+        ops = [
+            HotOperation(
+                section_id=section.id,
+                operation_type="insert",
+                payload={"i": i},
+                user_id=user.id,
+                version=i + 1,
+            )
+            for i in range(count)
+        ]
+        db.add_all(ops)
+        db.flush()
+        for i, op in enumerate(ops):
+            op.created_at = datetime.now(UTC) - timedelta(hours=80, minutes=i)
+        db.commit()
+
+    def test_deletes_in_chunks(
+        self, db: Session, test_section: Section, test_user: User
+    ) -> None:
+        """batch_size ごとにチャンク削除し、チャンク間で待機する。"""
+        self._expired_ops(db, test_section, test_user, 5)
+
+        with patch.object(history_service.time, "sleep") as mock_sleep:
+            deleted = history_service.delete_expired_hot_operations(
+                db, batch_size=2, sleep_seconds=0.5
+            )
+
+        assert deleted == 5
+        assert db.query(HotOperation).count() == 0
+        # 2件 + 2件 + 1件: 満杯のチャンクの後だけ待機する
+        assert mock_sleep.call_count == 2
+        mock_sleep.assert_called_with(0.5)
+
+    def test_partitioned_setting_ignored_without_partitions(
+        self, db: Session, test_section: Section, test_user: User
+    ) -> None:
+        """パーティション設定が有効でもテーブルが非パーティションなら行削除する。"""
+        self._expired_ops(db, test_section, test_user, 3)
+        settings = MagicMock(
+            hot_operation_purge_batch_size=100,
+            hot_operation_purge_sleep_seconds=0,
+            hot_operations_partitioned=True,
+        )
+
+        with patch.object(history_service, "get_settings", return_value=settings):
+            deleted = history_service.delete_expired_hot_operations(db)
+
+        assert deleted == 3
+
+
 class TestListOperationsLimitOffset:
     """get_history の limit/offset パラメータテスト。
 
@@ -534,7 +821,7 @@ class TestListOperationsLimitOffset:
             db.add(op)
         db.commit()
 
-        items, total = history_service.get_history(db, test_section.id, limit=2)
+        items, total, _ = history_service.get_history(db, test_section.id, limit=2)
         assert total == 5
         assert len(items) == 2
 
@@ -551,7 +838,7 @@ class TestListOperationsLimitOffset:
             db.add(op)
         db.commit()
 
-        items, total = history_service.get_history(
+        items, total, _ = history_service.get_history(
             db, test_section.id, limit=10, offset=3
         )
         assert total == 5
@@ -571,7 +858,9 @@ class TestListSnapshotsLimitOffset:
             db.add(ColdSnapshot(plot_id=test_plot.id, version=v + 1, content={}))
         db.commit()
 
-        snapshots, total = history_service.get_plot_snapshots(db, test_plot.id, limit=2)
+        snapshots, total, _ = history_service.get_plot_snapshots(
+            db, test_plot.id, limit=2
+        )
         assert total == 5
         assert len(snapshots) == 2
 
@@ -581,7 +870,7 @@ class TestListSnapshotsLimitOffset:
             db.add(ColdSnapshot(plot_id=test_plot.id, version=v + 1, content={}))
         db.commit()
 
-        snapshots, total = history_service.get_plot_snapshots(
+        snapshots, total, _ = history_service.get_plot_snapshots(
             db, test_plot.id, limit=10, offset=3
         )
         assert total == 5
@@ -614,7 +903,7 @@ class TestListRollbackLogsLimitOffset:
             )
         db.commit()
 
-        items, total = history_service.get_rollback_logs(db, test_plot.id, limit=2)
+        items, total, _ = history_service.get_rollback_logs(db, test_plot.id, limit=2)
         assert total == 5
         assert len(items) == 2
 
@@ -637,7 +926,7 @@ class TestListRollbackLogsLimitOffset:
             )
         db.commit()
 
-        items, total = history_service.get_rollback_logs(
+        items, total, _ = history_service.get_rollback_logs(
             db, test_plot.id, limit=10, offset=3
         )
         assert total == 5
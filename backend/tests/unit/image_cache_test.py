@@ -0,0 +1,161 @@
+"""image_cache（メモリ LRU + ディスクの2段キャッシュ）のユニットテスト。"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import BinaryIO
+
+import pytest
+
+from app.services import image_cache
+from app.services.image_cache import CachedImage, ImageCache
+
+
+def _cache(tmp_path: Path, **kwargs: int) -> ImageCache:
+    options = {"memory_bytes": 100, "memory_item_max_bytes": 40, "disk_bytes": 1000}
+    options.update(kwargs)
+    return ImageCache(tmp_path, **options)
+
+
+def _fetcher(content: bytes, calls: list[str] | None = None):
+    def fetch(key: str, out: BinaryIO) -> None:
+        if calls is not None:
+            calls.append(key)
+        # チャンク単位で書き出す
+        for i in range(0, len(content), 16):
+            out.write(content[i : i + 16])
+
+    return fetch
+
+
+def _image(data: bytes) -> CachedImage:
+    return CachedImage('"etag"', len(data), 0.0, data=data)
+
+
+class TestMemoryTier:
+    def test_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        cache = _cache(tmp_path)
+        cache.put_memory("a", _image(b"a" * 40))
+        cache.put_memory("b", _image(b"b" * 40))
+        cache.get_memory("a")  # a を最近使ったものにする
+
+        cache.put_memory("c", _image(b"c" * 40))
+
+        assert cache.get_memory("a") is not None
+        assert cache.get_memory("b") is None
+        assert cache.get_memory("c") is not None
+
+    def test_skips_large_items(self, tmp_path: Path) -> None:
+        cache = _cache(tmp_path)
+
+        cache.put_memory("big", _image(b"x" * 41))
+
+        assert cache.get_memory("big") is None
+
+
+class TestDiskTier:
+    def test_store_is_atomic_and_hashes_content(self, tmp_path: Path) -> None:
+        cache = _cache(tmp_path)
+        content = b"d" * 100
+
+        stored = cache.store_disk("a.png", _fetcher(content))
+
+        assert stored.path == tmp_path / "a.png"
+        assert stored.etag == f'"{hashlib.sha256(content).hexdigest()}"'
+        assert sorted(os.listdir(tmp_path)) == ["a.png"]
+        assert cache.get_disk("a.png") == stored
+
+    def test_failed_fetch_leaves_nothing(self, tmp_path: Path) -> None:
+        def fetch(key: str, out: BinaryIO) -> None:
+            out.write(b"partial")
+            raise RuntimeError("connection reset")
+
+        cache = _cache(tmp_path)
+        with pytest.raises(RuntimeError):
+            cache.store_disk("a.png", fetch)
+
+        assert os.listdir(tmp_path) == []
+
+    def test_evicts_least_recently_accessed(self, tmp_path: Path) -> None:
+        cache = _cache(tmp_path, disk_bytes=250)
+        cache.store_disk("old", _fetcher(b"o" * 100))
+        os.utime(tmp_path / "old", (1, 1))
+        cache.store_disk("mid", _fetcher(b"m" * 100))
+        os.utime(tmp_path / "mid", (2, 2))
+        cache.get_disk("old")  # 読まれた old は最近使ったものになる
+
+        cache.store_disk("new", _fetcher(b"n" * 100))
+
+        assert sorted(os.listdir(tmp_path)) == ["new", "old"]
+
+    def test_startup_removes_partial_writes(self, tmp_path: Path) -> None:
+        (tmp_path / "abc.tmp").write_bytes(b"partial")
+        (tmp_path / "kept").write_bytes(b"12345")
+
+        cache = _cache(tmp_path)
+
+        assert not (tmp_path / "abc.tmp").exists()
+        kept = cache.get_disk("kept")
+        assert kept is not None
+        assert kept.etag == f'"{hashlib.sha256(b"12345").hexdigest()}"'
+
+
+class TestLoad:
+    def test_fetches_once_then_serves_from_cache(self, tmp_path: Path) -> None:
+        calls: list[str] = []
+        fetch = _fetcher(b"image", calls)
+
+        cache = _cache(tmp_path)
+        first = cache.load("a.png", fetch)
+        assert cache.load("a.png", fetch).data == b"image"
+        # メモリ層を空にしてもディスク層から返す
+        fresh = _cache(tmp_path)
+        assert fresh.load("a.png", fetch).etag == first.etag
+
+        assert calls == ["a.png"]
+
+    def test_large_images_are_served_from_disk(self, tmp_path: Path) -> None:
+        cache = _cache(tmp_path)
+
+        image = cache.load("big.png", _fetcher(b"x" * 200))
+
+        assert image.data is None
+        assert image.path is not None
+        assert cache.get_memory("big.png") is None
+
+    def test_without_disk_tier(self, tmp_path: Path) -> None:
+        cache = _cache(tmp_path / "unused", disk_bytes=0)
+
+        image = cache.load("big.png", _fetcher(b"x" * 200))
+
+        assert image.data == b"x" * 200
+        assert not (tmp_path / "unused").exists()
+
+
+class TestGetImage:
+    def test_concurrent_misses_share_one_fetch(self, tmp_path: Path) -> None:
+        cache = _cache(tmp_path)
+        release = threading.Event()
+        calls: list[str] = []
+
+        def fetch(key: str, out: BinaryIO) -> None:
+            calls.append(key)
+            release.wait(timeout=5)
+            out.write(b"image")
+
+        async def scenario() -> list[CachedImage]:
+            tasks = [
+                asyncio.create_task(image_cache.get_image("a.png", fetch, cache))
+                for _ in range(5)
+            ]
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*tasks)
+
+        results = asyncio.run(scenario())
+
+        assert [r.data for r in results] == [b"image"] * 5
+        assert calls == ["a.png"]
+        assert image_cache._inflight == {}
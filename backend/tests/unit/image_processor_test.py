@@ -0,0 +1,133 @@
+"""image_processor（画像処理プールの受付上限・メトリクス）のユニットテスト。"""
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import pytest
+
+from app.services.image_processor import ImageProcessingBusy, ImageProcessor
+
+
+@dataclass
+class _Result:
+    stage_ms: dict[str, float]
+
+
+def _square(n: int) -> int:
+    """プロセスバックエンド用（spawn 先から import できるモジュールレベル関数）。"""
+    return n * n
+
+
+def _fail() -> None:
+    raise ValueError("broken image")
+
+
+def _crash() -> None:
+    """ワーカープロセスの異常終了（OOM kill・segfault）を再現する。"""
+    os._exit(1)
+
+
+class TestImageProcessor:
+    def test_rejects_when_full(self) -> None:
+        """実行中 + 待ち行列が上限に達したら ImageProcessingBusy。"""
+        release = threading.Event()
+        processor = ImageProcessor(max_workers=1, max_queue=1)
+        processor.start()
+        try:
+            running = processor.submit(release.wait)
+            queued = processor.submit(release.wait)
+            with pytest.raises(ImageProcessingBusy):
+                processor.submit(release.wait)
+            assert processor.snapshot()["queueDepth"] == 1
+
+            release.set()
+            running.result(timeout=2)
+            queued.result(timeout=2)
+            # 完了すると枠が空く
+            processor.submit(release.wait).result(timeout=2)
+        finally:
+            release.set()
+            processor.stop()
+
+        metrics = processor.snapshot()
+        assert metrics["submitted"] == 3
+        assert metrics["completed"] == 3
+        assert metrics["rejected"] == 1
+        assert metrics["inflight"] == 0
+
+    def test_rejects_when_stopped(self) -> None:
+        processor = ImageProcessor()
+        with pytest.raises(ImageProcessingBusy):
+            processor.submit(_square, 2)
+
+    def test_records_queue_wait_and_stages(self) -> None:
+        """待ち時間・処理時間と、結果の stage_ms を段階ごとに集計する。"""
+
+        def job() -> _Result:
+            time.sleep(0.02)
+            return _Result({"decode": 1.5, "upload": 3.0, "unknown": 9.0})
+
+        processor = ImageProcessor(max_workers=1)
+        processor.start()
+        try:
+            first = processor.submit(job)
+            second = processor.submit(job)
+            first.result(timeout=2)
+            _, wait_ms, elapsed_ms = second.result(timeout=2)
+        finally:
+            processor.stop()
+
+        # 2件目は1件目の処理が終わるまで待たされる
+        assert wait_ms >= 10
+        assert elapsed_ms >= 10
+        metrics = processor.snapshot()
+        assert metrics["queueWaitMs"]["count"] == 2
+        assert metrics["processingMs"]["buckets"][-1]["count"] == 2
+        assert metrics["stageMs"]["decode"] == {"count": 2, "sum": 3.0, "max": 1.5}
+        assert metrics["stageMs"]["upload"]["sum"] == 6.0
+        assert metrics["stageMs"]["resize"]["count"] == 0
+        assert "unknown" not in metrics["stageMs"]
+
+    def test_failure_releases_slot(self) -> None:
+        processor = ImageProcessor(max_workers=1, max_queue=0)
+        processor.start()
+        try:
+            with pytest.raises(ValueError, match="broken image"):
+                asyncio.run(processor.run(_fail))
+            assert asyncio.run(processor.run(_square, 3)) == 9
+        finally:
+            processor.stop()
+
+        metrics = processor.snapshot()
+        assert metrics["failed"] == 1
+        assert metrics["completed"] == 1
+
+    def test_process_backend(self) -> None:
+        """プロセスバックエンドでも同じ API で結果を返す。"""
+        processor = ImageProcessor(backend="process", max_workers=1)
+        processor.start()
+        try:
+            assert asyncio.run(processor.run(_square, 7)) == 49
+        finally:
+            processor.stop()
+        assert processor.snapshot()["completed"] == 1
+
+    def test_process_backend_recovers_from_crashed_worker(self) -> None:
+        """ワーカーが落ちてもプールを作り直し、その間の処理は ImageProcessingBusy。"""
+        processor = ImageProcessor(backend="process", max_workers=1)
+        processor.start()
+        try:
+            with pytest.raises(ImageProcessingBusy):
+                asyncio.run(processor.run(_crash))
+            assert asyncio.run(processor.run(_square, 5)) == 25
+        finally:
+            processor.stop()
+
+        metrics = processor.snapshot()
+        assert metrics["restarts"] == 1
+        assert metrics["failed"] == 1
+        assert metrics["completed"] == 1
+        assert metrics["inflight"] == 0
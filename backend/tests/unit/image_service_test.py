@@ -12,6 +12,7 @@ api.md 仕様:
 - validate_content_type: バイナリデータからのコンテンツタイプ検証
 - validate_file_size: ファイルサイズ制限の検証
 - resize_image: 画像リサイズ（最大幅1920px）
+- resize_image_with_variants / variant_candidates: 縮小版・WebP 派生画像
 - generate_filename: ユニークファイル名の生成
 - save_image: ディスクへの画像保存
 - process_and_save: バリデーション + リサイズ + 保存の統合パイプライン
@@ -271,3 +272,124 @@ class TestResizeImage:
         data = _create_test_png(100, 100)
         result = image_service.resize_image(data)
         assert result is not None
+
+    def test_large_jpeg_decodes_in_draft_mode(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """max_width より広い JPEG は draft() で縮小デコードし、目標サイズに合わせる。"""
+        from PIL import Image, JpegImagePlugin
+
+        drafts: list[tuple[int, int] | None] = []
+        original_draft = JpegImagePlugin.JpegImageFile.draft
+
+        def spy(
+            self: JpegImagePlugin.JpegImageFile,
+            mode: str | None,
+            size: tuple[int, int] | None,
+        ) -> object:
+            drafts.append(size)
+            return original_draft(self, mode, size)
+
+        monkeypatch.setattr(JpegImagePlugin.JpegImageFile, "draft", spy)
+        buf = io.BytesIO()
+        Image.new("RGB", (4000, 3000), color="blue").save(buf, format="JPEG")
+
+        result = image_service.resize_image(buf.getvalue())
+
+        assert drafts == [(1920, 1440)]
+        assert (result.width, result.height, result.format) == (1920, 1440, "JPEG")
+
+    def test_tall_image_rejected_before_decode(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """高さ制限はヘッダーのサイズで判定し、ピクセルをデコードしない。"""
+        from PIL import ImageFile
+
+        def fail_load(self: ImageFile.ImageFile) -> None:
+            raise AssertionError("image was decoded")
+
+        data = _create_test_png(10, image_service.MAX_IMAGE_HEIGHT + 1)
+        monkeypatch.setattr(ImageFile.ImageFile, "load", fail_load)
+
+        with pytest.raises(ValueError, match="exceeds maximum"):
+            image_service.resize_image(data)
+
+
+# ─── 派生画像（variant） ──────────────────────────────────────────────
+
+
+class TestResizeImageWithVariants:
+    """resize_image_with_variants のテスト。"""
+
+    def test_generates_narrower_widths_and_webp(self) -> None:
+        from PIL import Image
+
+        data = _create_test_png(1000, 500)
+        resized, variants = image_service.resize_image_with_variants(
+            data, widths=[160, 480, 1200], formats=["webp"]
+        )
+
+        assert (resized.width, resized.extension) == (1000, ".png")
+        # 元画像より広い 1200 は作らない
+        assert sorted((v.width or 0, v.extension) for v in variants) == [
+            (0, ".webp"),
+            (160, ".png"),
+            (160, ".webp"),
+            (480, ".png"),
+            (480, ".webp"),
+        ]
+        small = next(v for v in variants if v.width == 160 and v.extension == ".png")
+        with Image.open(io.BytesIO(small.data)) as img:
+            assert img.size == (160, 80)
+
+    def test_gif_has_no_variants(self) -> None:
+        from PIL import Image
+
+        buf = io.BytesIO()
+        Image.new("P", (300, 300)).save(buf, format="GIF")
+
+        _, variants = image_service.resize_image_with_variants(
+            buf.getvalue(), widths=[160], formats=["webp"]
+        )
+
+        assert variants == []
+
+    def test_records_stage_timings(self) -> None:
+        timings: dict[str, float] = {}
+        image_service.resize_image_with_variants(
+            _create_test_png(2000, 1000), widths=[160], timings=timings
+        )
+
+        assert set(timings) == {"decode", "resize", "encode"}
+        assert all(ms >= 0 for ms in timings.values())
+
+
+class TestVariantCandidates:
+    """variant_candidates のテスト（既定: 幅 160/480/960、WebP）。"""
+
+    NAME = "0123456789abcdef0123456789abcdef.jpg"
+    STEM = "0123456789abcdef0123456789abcdef"
+
+    def test_picks_smallest_variant_at_least_as_wide(self) -> None:
+        assert image_service.variant_candidates(self.NAME, 300) == [
+            f"{self.STEM}_w480.jpg",
+            self.NAME,
+        ]
+
+    def test_prefers_webp_when_accepted(self) -> None:
+        assert image_service.variant_candidates(
+            self.NAME, 160, {"image/webp", "*/*"}
+        ) == [
+            f"{self.STEM}_w160.webp",
+            f"{self.STEM}_w160.jpg",
+            f"{self.STEM}.webp",
+            self.NAME,
+        ]
+
+    def test_wider_than_variants_uses_original(self) -> None:
+        assert image_service.variant_candidates(self.NAME, 1500) == [self.NAME]
+        assert image_service.variant_candidates(self.NAME, None) == [self.NAME]
+
+    def test_gif_is_always_original(self) -> None:
+        name = f"{self.STEM}.gif"
+        assert image_service.variant_candidates(name, 160, {"image/webp"}) == [name]
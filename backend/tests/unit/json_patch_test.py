@@ -0,0 +1,79 @@
+"""json_patch のユニットテスト（RFC 6902 の主要な例）。"""
+
+import pytest
+
+from app.services.json_patch import JsonPatchError, JsonPatchTestFailed, apply_patch
+
+
+class TestApplyPatch:
+    def test_add_replace_remove(self) -> None:
+        doc = {"a": 1, "list": [1, 3]}
+
+        result = apply_patch(
+            doc,
+            [
+                {"op": "add", "path": "/b", "value": 2},
+                {"op": "add", "path": "/list/1", "value": 2},
+                {"op": "add", "path": "/list/-", "value": 4},
+                {"op": "replace", "path": "/a", "value": 10},
+                {"op": "remove", "path": "/b"},
+            ],
+        )
+
+        assert result == {"a": 10, "list": [1, 2, 3, 4]}
+        # 入力ドキュメントは変更しない
+        assert doc == {"a": 1, "list": [1, 3]}
+
+    def test_move_and_copy(self) -> None:
+        doc = {"src": {"x": 1}, "list": ["a", "b", "c"]}
+
+        result = apply_patch(
+            doc,
+            [
+                {"op": "copy", "from": "/src", "path": "/dst"},
+                {"op": "move", "from": "/list/0", "path": "/list/2"},
+            ],
+        )
+
+        assert result == {"src": {"x": 1}, "dst": {"x": 1}, "list": ["b", "c", "a"]}
+
+    def test_escaped_pointer(self) -> None:
+        result = apply_patch({"a/b": 1, "m~n": 2}, [{"op": "remove", "path": "/a~1b"}])
+        assert result == {"m~n": 2}
+        assert apply_patch(result, [{"op": "test", "path": "/m~0n", "value": 2}]) == {
+            "m~n": 2
+        }
+
+    def test_test_failure(self) -> None:
+        with pytest.raises(JsonPatchTestFailed):
+            apply_patch({"a": 1}, [{"op": "test", "path": "/a", "value": 2}])
+
+    @pytest.mark.parametrize(
+        "operation",
+        [
+            {"op": "remove", "path": "/missing"},
+            {"op": "replace", "path": "/list/5", "value": 1},
+            {"op": "add", "path": "/list/01", "value": 1},
+            {"op": "add", "path": "/a"},
+            {"op": "move", "path": "/list/0"},
+            {"op": "move", "from": "/obj", "path": "/obj/inner"},
+            {"op": "add", "path": "no-slash", "value": 1},
+            {"op": "unknown", "path": "/a"},
+        ],
+    )
+    def test_invalid_operations(self, operation: dict) -> None:
+        with pytest.raises(JsonPatchError):
+            apply_patch({"list": [1], "obj": {}}, [operation])
+
+    def test_failure_is_atomic(self) -> None:
+        """途中の操作が失敗しても入力ドキュメントは変更されない。"""
+        doc = {"a": 1}
+        with pytest.raises(JsonPatchError):
+            apply_patch(
+                doc,
+                [
+                    {"op": "add", "path": "/b", "value": 2},
+                    {"op": "remove", "path": "/c"},
+                ],
+            )
+        assert doc == {"a": 1}
@@ -0,0 +1,165 @@
+"""operation_buffer（HotOperation の write-behind バッファ）のユニットテスト。
+
+フラッシュスレッドは TestingSessionLocal で別セッションを開く。
+テスト用エンジンは StaticPool のため、テストの db セッションと同じ接続を共有する。
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import HotOperation, Plot, Section, User
+from app.services import history_service
+from app.services.operation_buffer import OperationBufferFull, OperationWriteBuffer
+from tests.conftest import TestingSessionLocal
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+class TestOperationWriteBuffer:
+    def test_group_commit_assigns_sequential_versions(
+        self, db: Session, test_section: Section, test_user: User
+    ) -> None:
+        """同時に積まれた操作が1回のフラッシュで記録され、連番の version が返る。"""
+        section_id, user_id = test_section.id, test_user.id
+        buffer = OperationWriteBuffer(TestingSessionLocal, flush_interval_ms=100)
+        buffer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=5) as pool:
+                futures = [
+                    pool.submit(buffer.submit, section_id, user_id, "insert", {"n": i})
+                    for i in range(5)
+                ]
+                results = [f.result() for f in futures]
+        finally:
+            buffer.stop()
+
+        assert sorted(r["version"] for r in results) == [2, 3, 4, 5, 6]
+        db.expire_all()
+        assert db.get(Section, section_id).version == 6
+        assert db.query(HotOperation).count() == 5
+
+        metrics = buffer.snapshot()
+        assert metrics["enqueued"] == 5
+        assert metrics["flushed"] == 5
+        assert metrics["failed"] == 0
+        assert metrics["queueDepth"] == 0
+        assert 1 <= metrics["flushes"] <= 5
+        assert metrics["flushMs"]["buckets"][-1]["count"] == metrics["flushes"]
+
+    def test_invalid_section_fails_only_that_operation(
+        self, db: Session, test_section: Section, test_user: User
+    ) -> None:
+        section_id, user_id = test_section.id, test_user.id
+        buffer = OperationWriteBuffer(TestingSessionLocal, flush_interval_ms=100)
+        buffer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                ok = pool.submit(buffer.submit, section_id, user_id, "insert")
+                bad = pool.submit(buffer.submit, uuid.uuid4(), user_id, "insert")
+                assert ok.result()["version"] == 2
+                with pytest.raises(ValueError, match="Section not found"):
+                    bad.result()
+        finally:
+            buffer.stop()
+
+        assert buffer.snapshot()["failed"] == 1
+
+    def test_backpressure_and_flush_on_stop(
+        self, db: Session, test_plot: Plot, test_section: Section, test_user: User
+    ) -> None:
+        """キューが満杯なら OperationBufferFull。stop() で残りをフラッシュする。"""
+        section_id, user_id = test_section.id, test_user.id
+        buffer = OperationWriteBuffer(
+            TestingSessionLocal, max_queue=1, enqueue_timeout=0
+        )
+        results: list[dict] = []
+        # フラッシュスレッド未起動のまま1件積む
+        waiter = threading.Thread(
+            target=lambda: results.append(buffer.submit(section_id, user_id, "insert"))
+        )
+        waiter.start()
+        _wait_for(lambda: buffer.snapshot()["queueDepth"] == 1)
+
+        with pytest.raises(OperationBufferFull):
+            buffer.submit(section_id, user_id, "insert")
+        assert buffer.snapshot()["rejected"] == 1
+
+        buffer.start()
+        buffer.stop()
+        waiter.join(timeout=2)
+
+        assert results and results[0]["version"] == 2
+        assert buffer.snapshot()["queueDepth"] == 0
+
+    def test_submit_after_stop_rejected(
+        self, db: Session, test_section: Section, test_user: User
+    ) -> None:
+        buffer = OperationWriteBuffer(TestingSessionLocal)
+        buffer.start()
+        buffer.stop()
+        with pytest.raises(OperationBufferFull, match="shutting down"):
+            buffer.submit(test_section.id, test_user.id, "insert")
+
+    def test_failed_group_retries_one_by_one(
+        self,
+        db: Session,
+        test_section: Section,
+        test_user: User,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """まとめた記録が失敗しても、原因の操作以外は1件ずつ記録し直される。"""
+        section_id, user_id = test_section.id, test_user.id
+        original = history_service.insert_operations
+
+        def insert_operations(session: Session, rows: list[dict]) -> list[dict]:
+            if any(row["payload"] == {"bad": True} for row in rows):
+                raise RuntimeError("constraint violation")
+            return original(session, rows)
+
+        monkeypatch.setattr(history_service, "insert_operations", insert_operations)
+        buffer = OperationWriteBuffer(TestingSessionLocal, flush_interval_ms=100)
+        buffer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                ok = pool.submit(buffer.submit, section_id, user_id, "insert", {})
+                bad = pool.submit(
+                    buffer.submit, section_id, user_id, "insert", {"bad": True}
+                )
+                assert ok.result()["version"] == 2
+                with pytest.raises(RuntimeError, match="constraint violation"):
+                    bad.result()
+        finally:
+            buffer.stop()
+
+        db.expire_all()
+        assert db.query(HotOperation).count() == 1
+        metrics = buffer.snapshot()
+        assert metrics["flushed"] == 1
+        assert metrics["failed"] == 1
+        assert metrics["retried"] == 2
+
+    def test_timed_out_operation_is_withdrawn(
+        self, db: Session, test_section: Section, test_user: User
+    ) -> None:
+        """フラッシュ前にタイムアウトした操作はキューから取り除かれ、記録されない。"""
+        buffer = OperationWriteBuffer(TestingSessionLocal, result_timeout=0.05)
+        # フラッシュスレッド未起動なのでフラッシュは始まらない
+        with pytest.raises(OperationBufferFull, match="Timed out"):
+            buffer.submit(test_section.id, test_user.id, "insert")
+
+        assert buffer.snapshot()["queueDepth"] == 0
+        assert buffer.snapshot()["timedOut"] == 1
+        buffer.start()
+        buffer.stop()
+        db.expire_all()
+        assert db.query(HotOperation).count() == 0
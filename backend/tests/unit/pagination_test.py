@@ -0,0 +1,130 @@
+"""pagination（キーセットページング）のユニットテスト。"""
+
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Comment, Plot, Thread, User
+from app.services import pagination, social_service
+from app.services.pagination import InvalidCursorError
+
+
+def _add_plots(db: Session, user: User, created: list[datetime]) -> list[Plot]:
+    plots = [
+        Plot(title=f"Plot {i}", owner_id=user.id, tags=[], created_at=c)
+        for i, c in enumerate(created)
+    ]
+    db.add_all(plots)
+    db.commit()
+    return plots
+
+
+def _walk(db: Session, limit: int, **kwargs) -> list[list[Plot]]:
+    """カーソルを辿って全ページを取得する。"""
+    pages = []
+    cursor = None
+    while True:
+        rows, cursor = pagination.paginate(
+            db.query(Plot),
+            Plot.created_at,
+            Plot.id,
+            limit=limit,
+            cursor=cursor,
+            **kwargs,
+        )
+        pages.append(rows)
+        if cursor is None:
+            return pages
+
+
+class TestCursorToken:
+    def test_round_trip(self) -> None:
+        created_at = datetime(2026, 10, 16, 12, 30, 45, 123456, tzinfo=UTC)
+        row_id = uuid.uuid4()
+
+        token = pagination.encode_cursor(created_at, row_id)
+
+        assert "=" not in token
+        assert pagination.decode_cursor(token) == (created_at, row_id)
+
+    @pytest.mark.parametrize("token", ["", "not-a-cursor", "WzEsMl0", "e30"])
+    def test_invalid_cursor(self, token: str) -> None:
+        with pytest.raises(InvalidCursorError):
+            pagination.decode_cursor(token)
+
+
+class TestPaginate:
+    def test_walk_matches_offset_order(self, db: Session, test_user: User) -> None:
+        base = datetime(2026, 1, 1, tzinfo=UTC)
+        # 同じ created_at の行を含めても重複・欠落しない（id で順序が確定する）
+        created = [base + timedelta(minutes=i // 2) for i in range(7)]
+        _add_plots(db, test_user, created)
+
+        pages = _walk(db, limit=3)
+
+        assert [len(p) for p in pages] == [3, 3, 1]
+        walked = [p.id for page in pages for p in page]
+        expected = [
+            p.id
+            for p in db.query(Plot).order_by(Plot.created_at.desc(), Plot.id.desc())
+        ]
+        assert walked == expected
+
+    def test_ascending(self, db: Session, test_user: User) -> None:
+        base = datetime(2026, 1, 1, tzinfo=UTC)
+        _add_plots(db, test_user, [base + timedelta(minutes=i) for i in range(5)])
+
+        pages = _walk(db, limit=2, descending=False)
+
+        titles = [p.title for page in pages for p in page]
+        assert titles == [f"Plot {i}" for i in range(5)]
+
+    def test_exact_multiple_has_no_empty_last_page(
+        self, db: Session, test_user: User
+    ) -> None:
+        base = datetime(2026, 1, 1, tzinfo=UTC)
+        _add_plots(db, test_user, [base + timedelta(minutes=i) for i in range(4)])
+
+        pages = _walk(db, limit=2)
+
+        assert [len(p) for p in pages] == [2, 2]
+
+    def test_offset_used_without_cursor(self, db: Session, test_user: User) -> None:
+        base = datetime(2026, 1, 1, tzinfo=UTC)
+        _add_plots(db, test_user, [base + timedelta(minutes=i) for i in range(5)])
+
+        rows, next_cursor = pagination.paginate(
+            db.query(Plot), Plot.created_at, Plot.id, limit=2, offset=3
+        )
+
+        assert [p.title for p in rows] == ["Plot 1", "Plot 0"]
+        assert next_cursor is None
+
+
+class TestServiceCursors:
+    def test_list_comments_cursor(self, db: Session, test_user: User) -> None:
+        thread = Thread(plot_id=_add_plots(db, test_user, [datetime.now(UTC)])[0].id)
+        db.add(thread)
+        db.flush()
+        base = datetime(2026, 1, 1, tzinfo=UTC)
+        for i in range(3):
+            db.add(
+                Comment(
+                    thread_id=thread.id,
+                    user_id=test_user.id,
+                    content=f"c{i}",
+                    created_at=base + timedelta(minutes=i),
+                )
+            )
+        db.commit()
+
+        first, total, cursor = social_service.list_comments(db, thread.id, limit=2)
+        rest, total_2, end = social_service.list_comments(
+            db, thread.id, limit=2, cursor=cursor
+        )
+
+        assert [c.content for c, _ in first + rest] == ["c0", "c1", "c2"]
+        assert total == total_2 == 3
+        assert end is None
@@ -10,7 +10,7 @@ import pytest
 from sqlalchemy.orm import Session
 
 from app.models import Plot, Star, User
-from app.services import plot_service
+from app.services import plot_service, star_service
 
 
 class TestListPlots:
@@ -19,13 +19,13 @@ class TestListPlots:
         plot_service.create_plot(db, test_user.id, "Plot A")
         plot_service.create_plot(db, test_user.id, "Plot B")
 
-        plots, total = plot_service.list_plots(db)
+        plots, total, _ = plot_service.list_plots(db)
         assert total == 2
         assert len(plots) == 2
 
     def test_list_plots_empty(self, db: Session) -> None:
         """Plot が存在しない場合、空リストを返す。"""
-        plots, total = plot_service.list_plots(db)
+        plots, total, _ = plot_service.list_plots(db)
         assert total == 0
         assert plots == []
 
@@ -34,7 +34,7 @@ class TestListPlots:
         for i in range(5):
             plot_service.create_plot(db, test_user.id, f"Plot {i}")
 
-        plots, total = plot_service.list_plots(db, limit=3)
+        plots, total, _ = plot_service.list_plots(db, limit=3)
         assert total == 5  # total は全件数
         assert len(plots) == 3  # limit で制限
 
@@ -43,7 +43,7 @@ class TestListPlots:
         for i in range(5):
             plot_service.create_plot(db, test_user.id, f"Plot {i}")
 
-        plots, total = plot_service.list_plots(db, limit=2, offset=3)
+        plots, total, _ = plot_service.list_plots(db, limit=2, offset=3)
         assert total == 5
         assert len(plots) == 2  # 残り2件
 
@@ -52,7 +52,7 @@ class TestListPlots:
         for i in range(25):
             plot_service.create_plot(db, test_user.id, f"Plot {i}")
 
-        plots, total = plot_service.list_plots(db)
+        plots, total, _ = plot_service.list_plots(db)
         assert total == 25
         assert len(plots) == 20  # デフォルト limit=20
 
@@ -169,9 +169,7 @@ class TestListTrending:
     def test_list_trending(self, db: Session, test_user: User) -> None:
         """直近のスターがある Plot がトレンドに含まれる。"""
         plot = plot_service.create_plot(db, test_user.id, "Trending")
-        star = Star(plot_id=plot.id, user_id=test_user.id)
-        db.add(star)
-        db.commit()
+        star_service.add_star(db, plot.id, test_user.id)
 
         result = plot_service.list_trending(db)
         assert len(result) >= 1
@@ -189,9 +187,7 @@ class TestListTrending:
         """デフォルト limit は 5（api.md 仕様: default=5）。"""
         for i in range(7):
             p = plot_service.create_plot(db, test_user.id, f"T{i}")
-            star = Star(plot_id=p.id, user_id=test_user.id)
-            db.add(star)
-        db.commit()
+            star_service.add_star(db, p.id, test_user.id)
 
         result = plot_service.list_trending(db)
         assert len(result) == 5  # デフォルト limit=5
@@ -200,9 +196,7 @@ class TestListTrending:
         """limit パラメータでトレンド取得件数を変更できる。"""
         for i in range(5):
             p = plot_service.create_plot(db, test_user.id, f"T{i}")
-            star = Star(plot_id=p.id, user_id=test_user.id)
-            db.add(star)
-        db.commit()
+            star_service.add_star(db, p.id, test_user.id)
 
         result = plot_service.list_trending(db, limit=2)
         assert len(result) == 2
@@ -219,6 +213,20 @@ class TestListPopular:
         result = plot_service.list_popular(db)
         assert len(result) >= 1
 
+    def test_list_popular_sorted_by_star_count(
+        self, db: Session, test_user: User, other_user: User
+    ) -> None:
+        """Plot.star_count の降順で返す。"""
+        one = plot_service.create_plot(db, test_user.id, "One star")
+        two = plot_service.create_plot(db, test_user.id, "Two stars")
+        plot_service.create_plot(db, test_user.id, "No stars")
+        star_service.add_star(db, one.id, test_user.id)
+        star_service.add_star(db, two.id, test_user.id)
+        star_service.add_star(db, two.id, other_user.id)
+
+        result = plot_service.list_popular(db, limit=2)
+        assert [p.id for p in result] == [two.id, one.id]
+
     def test_list_popular_empty(self, db: Session) -> None:
         """Plot がない場合、空リストを返す。"""
         result = plot_service.list_popular(db)
@@ -280,9 +288,7 @@ class TestGetStarCount:
     ) -> None:
         """スター数を正しくカウントできる。"""
         assert plot_service.get_star_count(db, test_plot.id) == 0
-        star = Star(plot_id=test_plot.id, user_id=test_user.id)
-        db.add(star)
-        db.commit()
+        star_service.add_star(db, test_plot.id, test_user.id)
         assert plot_service.get_star_count(db, test_plot.id) == 1
 
 
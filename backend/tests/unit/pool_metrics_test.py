@@ -0,0 +1,127 @@
+"""pool_metrics のユニットテスト。
+
+テスト対象:
+- PoolMetrics.observe_wait: 待ち時間ヒストグラム（累積バケット）
+- instrumented_pool_class / attach_pool_listeners: チェックアウト・タイムアウトの記録
+- database._engine_options: Settings のプール設定の反映
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.core import pool_metrics
+from app.core.config import Settings
+from app.core.database import _engine_options
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    pool_metrics.reset()
+    yield
+    pool_metrics.reset()
+
+
+def _sqlite_engine(name: str, **kwargs):
+    engine = create_engine(
+        "sqlite://",
+        poolclass=pool_metrics.instrumented_pool_class(QueuePool, name),
+        **kwargs,
+    )
+    pool_metrics.attach_pool_listeners(engine.pool, name)
+    return engine
+
+
+class TestWaitHistogram:
+    def test_buckets_are_cumulative(self) -> None:
+        """le バケットは累積で、上限を超える値は +Inf にだけ入る。"""
+        metrics = pool_metrics.PoolMetrics()
+        metrics.observe_wait(0.5)
+        metrics.observe_wait(30)
+        metrics.observe_wait(60_000)
+
+        wait = metrics.snapshot()["waitMs"]
+        buckets = {b["le"]: b["count"] for b in wait["buckets"]}
+
+        assert wait["count"] == 3
+        assert wait["max"] == 60_000
+        assert buckets[1] == 1
+        assert buckets[25] == 1
+        assert buckets[50] == 2
+        assert buckets[5000] == 2
+        assert buckets["+Inf"] == 3
+
+
+class TestInstrumentedPool:
+    def test_checkout_and_gauges(self) -> None:
+        """チェックアウト数・接続数と QueuePool の現在値が記録される。"""
+        engine = _sqlite_engine("test", pool_size=1, max_overflow=1)
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with engine.connect() as conn2:
+                conn2.execute(text("SELECT 1"))
+                snap = pool_metrics.snapshot()["test"]
+                assert snap["checkedOut"] == 2
+                assert snap["overflow"] == 1
+
+        snap = pool_metrics.snapshot()["test"]
+        assert snap["poolClass"] == "QueuePool"
+        assert snap["checkouts"] == 2
+        assert snap["connects"] == 2
+        assert snap["checkedOut"] == 0
+        assert snap["waitMs"]["count"] == 2
+        engine.dispose()
+
+    def test_timeout_is_counted(self) -> None:
+        """プール枯渇で接続取得がタイムアウトすると timeouts が増える。"""
+        engine = _sqlite_engine("test", pool_size=1, max_overflow=0, pool_timeout=0.01)
+
+        with engine.connect(), pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+        snap = pool_metrics.snapshot()["test"]
+        assert snap["timeouts"] == 1
+        assert snap["waitMs"]["sum"] >= 10
+        engine.dispose()
+
+    def test_invalidation_is_counted(self) -> None:
+        """無効化された接続（pre-ping 失敗など）が invalidations に記録される。"""
+        engine = _sqlite_engine("test")
+
+        with engine.connect() as conn:
+            conn.invalidate()
+
+        assert pool_metrics.snapshot()["test"]["invalidations"] == 1
+        engine.dispose()
+
+
+class TestEngineOptions:
+    def test_queue_mode(self) -> None:
+        settings = Settings(
+            database_url="postgresql://x/y",
+            debug=True,
+            db_pool_size=7,
+            db_max_overflow=3,
+        )
+        options = _engine_options(settings, is_async=False)
+
+        assert issubclass(options["poolclass"], QueuePool)
+        assert options["pool_size"] == 7
+        assert options["max_overflow"] == 3
+        assert options["connect_args"] == {}
+
+    def test_pgbouncer_mode_disables_pooling_and_prepared_statements(self) -> None:
+        """pgbouncer モードでは NullPool を使い、asyncpg の文キャッシュを無効化する。"""
+        settings = Settings(
+            database_url="postgresql://x/y", debug=False, db_pool_mode="pgbouncer"
+        )
+        options = _engine_options(settings, is_async=True)
+        name_func = options["connect_args"]["prepared_statement_name_func"]
+
+        assert issubclass(options["poolclass"], NullPool)
+        assert "pool_size" not in options
+        assert options["connect_args"]["statement_cache_size"] == 0
+        assert options["connect_args"]["ssl"] == "require"
+        assert name_func() != name_func()
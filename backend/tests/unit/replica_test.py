@@ -0,0 +1,69 @@
+"""replica のユニットテスト。
+
+テスト対象:
+- ReplicaBalancer: round_robin / least_connections の振り分け
+- mark_user_write / is_sticky_to_primary: read-your-writes の primary 固定
+"""
+
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from app.core import replica
+
+
+@pytest.fixture(autouse=True)
+def _clear_recent_writes():
+    replica.clear_recent_writes()
+    yield
+    replica.clear_recent_writes()
+
+
+class TestReplicaBalancer:
+    def test_round_robin(self) -> None:
+        balancer = replica.ReplicaBalancer(["a", "b", "c"], "round_robin")
+
+        picked = []
+        for _ in range(6):
+            index = balancer.acquire()
+            picked.append(balancer.targets[index])
+            balancer.release(index)
+
+        assert picked == ["a", "b", "c", "a", "b", "c"]
+
+    def test_least_connections_skips_busy_replica(self) -> None:
+        """処理中セッションが多いレプリカは選ばれない。"""
+        balancer = replica.ReplicaBalancer(["a", "b"], "least_connections")
+        busy = balancer.acquire()
+
+        for _ in range(3):
+            index = balancer.acquire()
+            assert index != busy
+            balancer.release(index)
+
+        balancer.release(busy)
+        assert balancer.in_flight == [0, 0]
+
+    def test_requires_targets(self) -> None:
+        with pytest.raises(ValueError):
+            replica.ReplicaBalancer([])
+
+
+class TestReadYourWrites:
+    def test_sticky_after_write(self) -> None:
+        user_id = uuid.uuid4()
+        assert replica.is_sticky_to_primary(user_id) is False
+
+        replica.mark_user_write(user_id)
+
+        assert replica.is_sticky_to_primary(user_id) is True
+        assert replica.is_sticky_to_primary(uuid.uuid4()) is False
+        assert replica.is_sticky_to_primary(None) is False
+
+    def test_sticky_expires(self) -> None:
+        user_id = uuid.uuid4()
+        with patch("app.core.replica.time.monotonic", return_value=100.0):
+            replica.mark_user_write(user_id)
+        with patch("app.core.replica.time.monotonic", return_value=10_000.0):
+            assert replica.is_sticky_to_primary(user_id) is False
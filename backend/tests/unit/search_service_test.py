@@ -1,13 +1,21 @@
 """search_service のユニットテスト。
 
-NOTE: search_plots は ILIKE を使用しており、SQLite でも動作する。
+NOTE: SQLite では search_plots は ILIKE にフォールバックするため動作する。
+PostgreSQL の tsvector / pg_trgm クエリは SQL のコンパイル結果のみ検証する。
 tag 検索は @> 演算子が必要なため search_service には tag 検索機能はない。
 """
 
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 
-from app.models import Plot, Star, User
-from app.services import search_service
+from app.models import Plot, Section, SectionSearchText, User
+from app.services import (
+    history_service,
+    search_service,
+    section_service,
+    star_service,
+)
 
 
 def _create_plot(
@@ -175,9 +183,8 @@ class TestSearchPlots:
         db.add(other)
         db.commit()
 
-        db.add(Star(plot_id=plot.id, user_id=test_user.id))
-        db.add(Star(plot_id=plot.id, user_id=other.id))
-        db.commit()
+        star_service.add_star(db, plot.id, test_user.id)
+        star_service.add_star(db, plot.id, other.id)
 
         items, total = search_service.search_plots(db, "StarCountTest")
         assert total == 1
@@ -265,3 +272,198 @@ class TestSearchPlots:
 
         items, total = search_service.search_plots(db, "DualMatch")
         assert total == 1
+
+
+class TestPostgresSearchClauses:
+    def test_uses_tsvector_and_trigram_indexes(self) -> None:
+        """tsvector の @@ と trigram 用の ILIKE を OR し、ts_rank 順に並べる。"""
+        cond, order_by = search_service._search_clauses("postgresql", "物語 rain")
+        sql = str(
+            select(Plot.id)
+            .where(cond)
+            .order_by(*order_by)
+            .compile(dialect=postgresql.dialect())
+        )
+        assert "plots.search_vector @@ websearch_to_tsquery('simple'::regconfig" in sql
+        assert "plots.search_text ILIKE" in sql
+        assert "ORDER BY ts_rank(plots.search_vector" in sql
+        assert "word_similarity(" in sql
+
+
+class TestSectionText:
+    def _add_section(self, db: Session, plot: Plot, title: str, text: str) -> None:
+        db.add(
+            Section(
+                plot_id=plot.id,
+                title=title,
+                content={
+                    "type": "doc",
+                    "content": [
+                        {
+                            "type": "paragraph",
+                            "content": [{"type": "text", "text": text}],
+                        }
+                    ],
+                },
+                order_index=0,
+            )
+        )
+        db.commit()
+
+    def test_refresh_makes_section_body_searchable(
+        self, db: Session, test_plot: Plot
+    ) -> None:
+        """refresh_section_text 後はセクション本文でもヒットする。"""
+        self._add_section(db, test_plot, "第一章", "雨の日の物語")
+        items, total = search_service.search_plots(db, "雨の日")
+        assert total == 0
+
+        search_service.refresh_section_text(db, test_plot.id)
+        db.commit()
+
+        items, total = search_service.search_plots(db, "雨の日")
+        assert total == 1
+        assert items[0][0].id == test_plot.id
+
+    def test_build_section_text_skips_empty_documents(
+        self, db: Session, test_plot: Plot
+    ) -> None:
+        """本文のないセクションは JSON 文字列ではなくタイトルのみになる。"""
+        db.add(
+            Section(
+                plot_id=test_plot.id,
+                title="Empty",
+                content={"type": "doc", "content": []},
+                order_index=0,
+            )
+        )
+        db.commit()
+        assert search_service.build_section_text(db, test_plot.id) == "Empty"
+
+    def test_refresh_keeps_updated_at(self, db: Session, test_plot: Plot) -> None:
+        before = test_plot.updated_at
+        self._add_section(db, test_plot, "Chapter", "body")
+        search_service.refresh_section_text(db, test_plot.id)
+        db.commit()
+        db.refresh(test_plot)
+        assert test_plot.updated_at == before
+
+    def test_backfill_fills_missing_section_text(
+        self, db: Session, test_plot: Plot
+    ) -> None:
+        self._add_section(db, test_plot, "Chapter", "backfilled body")
+        assert search_service.backfill_section_text(db) == 1
+        assert search_service.backfill_section_text(db) == 0
+
+        items, total = search_service.search_plots(db, "backfilled")
+        assert total == 1
+
+
+def _doc(text: str) -> dict:
+    return {
+        "type": "doc",
+        "content": [{"type": "paragraph", "content": [{"type": "text", "text": text}]}],
+    }
+
+
+class TestSectionSearch:
+    def test_section_write_indexes_body(self, db: Session, test_plot: Plot) -> None:
+        """セクションの作成・更新で section_search_text が同じトランザクションで更新される。"""
+        section = section_service.create_section(
+            db, test_plot.id, "Chapter 1", content=_doc("The rainy harbor at dawn")
+        )
+        items, total = search_service.search_sections(db, "harbor")
+        assert total == 1
+        assert items[0]["section_id"] == section.id
+        assert items[0]["plot_title"] == test_plot.title
+        assert items[0]["snippet"] == "The rainy harbor at dawn"
+        assert items[0]["highlights"] == [(10, 6)]
+
+        section_service.update_section(db, section.id, content=_doc("Sunny field"))
+        assert search_service.search_sections(db, "harbor")[1] == 0
+        assert search_service.search_sections(db, "sunny")[1] == 1
+
+    def test_delete_removes_index_row(self, db: Session, test_plot: Plot) -> None:
+        section = section_service.create_section(
+            db, test_plot.id, "Chapter", content=_doc("temporary")
+        )
+        section_service.delete_section(db, section.id)
+        assert db.query(SectionSearchText).count() == 0
+
+    def test_backfill_indexes_missing_rows(
+        self, db: Session, test_section: Section
+    ) -> None:
+        """索引のないセクションをバックフィルで埋める。"""
+        test_section.content = _doc("backfilled text")
+        db.commit()
+        assert search_service.backfill_section_search_text(db) == 1
+        assert search_service.backfill_section_search_text(db) == 0
+        assert search_service.search_sections(db, "backfilled")[1] == 1
+
+    def test_operations_do_not_reindex(
+        self, db: Session, test_section: Section, test_user: User
+    ) -> None:
+        """HotOperation で version が進んでも本文は変わらないので索引し直さない。"""
+        search_service.index_sections(db, [test_section])
+        db.commit()
+
+        history_service.record_operation(db, test_section.id, test_user.id, "insert")
+
+        assert search_service.backfill_section_search_text(db) == 0
+
+    def test_unchanged_text_is_not_rewritten(
+        self, db: Session, test_section: Section
+    ) -> None:
+        search_service.index_sections(db, [test_section])
+        db.commit()
+        row = db.get(SectionSearchText, test_section.id)
+        indexed_version = row.section_version
+
+        test_section.version += 1
+        search_service.index_sections(db, [test_section])
+        db.commit()
+        db.refresh(row)
+        assert row.section_version == indexed_version
+
+        test_section.title = "Renamed"
+        test_section.version += 1
+        search_service.index_sections(db, [test_section])
+        db.commit()
+        db.refresh(row)
+        assert (row.title, row.section_version) == ("Renamed", indexed_version + 2)
+
+    def test_oversized_text_is_capped(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        """tsvector の上限を超えないよう、検索用テキストは上限文字数で切り詰める。"""
+        cap = search_service.SEARCH_TEXT_MAX_CHARS
+        test_section.content = _doc("needle " + "x" * cap)
+        db.commit()
+
+        search_service.index_sections(db, [test_section])
+        search_service.refresh_section_text(db, test_plot.id)
+        db.commit()
+
+        assert len(db.get(SectionSearchText, test_section.id).body) == cap
+        db.refresh(test_plot)
+        assert len(test_plot.section_text) == cap
+        assert search_service.search_sections(db, "needle")[1] == 1
+
+
+class TestMakeSnippet:
+    def test_window_around_first_match(self) -> None:
+        body = "a" * 100 + "Needle" + "b" * 200
+        snippet, highlights = search_service.make_snippet(body, "needle")
+        assert snippet.startswith("…") and snippet.endswith("…")
+        start, length = highlights[0]
+        assert snippet[start : start + length] == "Needle"
+
+    def test_multiple_terms_highlighted(self) -> None:
+        snippet, highlights = search_service.make_snippet("雨の日と晴れの日", "雨 晴れ")
+        assert snippet == "雨の日と晴れの日"
+        assert highlights == [(0, 1), (4, 2)]
+
+    def test_no_body_match_returns_head(self) -> None:
+        snippet, highlights = search_service.make_snippet("x" * 300, "title-only")
+        assert highlights == []
+        assert snippet == "x" * search_service.SNIPPET_CONTEXT_CHARS * 2 + "…"
@@ -7,6 +7,7 @@ api.md 仕様:
 - POST /plots/{plotId}/sections → create_section (403 if paused, 400 if limit)
 - GET /sections/{sectionId} → get_section
 - PUT /sections/{sectionId} → update_section (403 if paused)
+- PATCH /sections/{sectionId} → patch_section (409 if baseVersion is stale)
 - DELETE /sections/{sectionId} → delete_section (403 if paused)
 - POST /sections/{sectionId}/reorder → reorder_section (403 if paused)
 """
@@ -17,8 +18,9 @@ import pytest
 from sqlalchemy.orm import Session
 
 from app.models import Plot, Section, User
-from app.services import section_service
-
+from app.services import blob_service, section_service
+from app.services.history_service import ConflictError
+from app.services.json_patch import JsonPatchError, JsonPatchTestFailed
 
 # ─── list_sections ──────────────────────────────────────────────
 
@@ -165,6 +167,21 @@ class TestUpdateSection:
         updated = section_service.update_section(db, test_section.id, content=None)
         assert updated.content is None
 
+    def test_update_section_content_detaches_blob(
+        self, db: Session, test_section: Section
+    ) -> None:
+        """Blob共有中のセクションも content 更新で自分専用の content を持つ。"""
+        test_section.content_hash = blob_service.put_blob(db, test_section.content)
+        test_section.content = None
+        db.commit()
+
+        new_content = {"type": "doc", "content": [{"type": "paragraph"}]}
+        updated = section_service.update_section(
+            db, test_section.id, content=new_content
+        )
+        assert updated.content_hash is None
+        assert blob_service.section_content(updated) == new_content
+
     def test_update_section_not_found(self, db: Session) -> None:
         """存在しないセクションの更新は ValueError。"""
         with pytest.raises(ValueError, match="Section not found"):
@@ -190,6 +207,104 @@ class TestUpdateSection:
         assert test_section.version == v1 + 1
 
 
+# ─── patch_section ──────────────────────────────────────────────
+
+
+class TestPatchSection:
+    _ADD_PARAGRAPH = [
+        {
+            "op": "add",
+            "path": "/content/-",
+            "value": {"type": "paragraph", "content": [{"type": "text", "text": "hi"}]},
+        }
+    ]
+
+    def test_patch_applies_operations(self, db: Session, test_section: Section) -> None:
+        """content にパッチが適用され、version がインクリメントされる。"""
+        base = test_section.version
+
+        updated = section_service.patch_section(
+            db, test_section.id, base, self._ADD_PARAGRAPH
+        )
+
+        assert updated.version == base + 1
+        assert updated.content["content"][0]["content"][0]["text"] == "hi"
+
+    def test_patch_stale_base_version_conflicts(
+        self, db: Session, test_section: Section
+    ) -> None:
+        """base_version が古いと ConflictError になり、何も変更されない。"""
+        base = test_section.version
+        section_service.update_section(db, test_section.id, title="Other edit")
+
+        with pytest.raises(ConflictError, match="Version conflict"):
+            section_service.patch_section(
+                db, test_section.id, base, self._ADD_PARAGRAPH
+            )
+
+        db.refresh(test_section)
+        assert test_section.content == {"type": "doc", "content": []}
+
+    def test_patch_test_operation_failure(
+        self, db: Session, test_section: Section
+    ) -> None:
+        """test 操作が一致しない場合は JsonPatchTestFailed（409 相当）。"""
+        ops = [{"op": "test", "path": "/type", "value": "paragraph"}]
+        with pytest.raises(JsonPatchTestFailed):
+            section_service.patch_section(
+                db, test_section.id, test_section.version, ops
+            )
+
+    def test_patch_invalid_path(self, db: Session, test_section: Section) -> None:
+        ops = [{"op": "remove", "path": "/missing"}]
+        with pytest.raises(JsonPatchError, match="does not exist"):
+            section_service.patch_section(
+                db, test_section.id, test_section.version, ops
+            )
+
+    @pytest.mark.parametrize("value", [[1], "x"])
+    def test_patch_root_replace_with_non_object(
+        self, db: Session, test_section: Section, value: object
+    ) -> None:
+        """content 全体をオブジェクト以外に置き換えるパッチは拒否し、保存しない。"""
+        ops = [{"op": "replace", "path": "", "value": value}]
+        with pytest.raises(JsonPatchError, match="must be a JSON object"):
+            section_service.patch_section(
+                db, test_section.id, test_section.version, ops
+            )
+
+        db.refresh(test_section)
+        assert test_section.content == {"type": "doc", "content": []}
+
+    def test_patch_blob_backed_section(
+        self, db: Session, test_section: Section
+    ) -> None:
+        """Blob 共有中のセクションは Blob の内容にパッチを当て、共有を解除する。"""
+        shared = {"type": "doc", "content": [{"type": "paragraph"}]}
+        test_section.content_hash = blob_service.put_blob(db, shared)
+        test_section.content = None
+        db.commit()
+
+        updated = section_service.patch_section(
+            db,
+            test_section.id,
+            test_section.version,
+            [{"op": "remove", "path": "/content/0"}],
+        )
+
+        assert updated.content_hash is None
+        assert updated.content == {"type": "doc", "content": []}
+
+    def test_patch_plot_is_paused(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        test_plot.is_paused = True
+        db.commit()
+
+        with pytest.raises(PermissionError, match="Plot is paused"):
+            section_service.patch_section(db, test_section.id, test_section.version, [])
+
+
 # ─── delete_section ──────────────────────────────────────────────
 
 
@@ -10,6 +10,8 @@ api.md 仕様:
 
 テスト対象:
 - cleanup_old_snapshots: Plot 単位 / 全 Plot のスナップショット間引き
+  （SQL 集合演算によるバッチ削除・dry-run）
+- collect_unreferenced_blobs: 参照されなくなった section_blobs の GC
 - start_snapshot_cleanup: APScheduler によるバックグラウンドジョブ登録
 """
 
@@ -18,9 +20,15 @@ from datetime import datetime, timedelta, timezone
 import pytest
 from sqlalchemy.orm import Session
 
-from app.models import ColdSnapshot, Plot, Section, User
-from app.services import snapshot_cleanup
-
+from app.models import (
+    ColdSnapshot,
+    Plot,
+    Section,
+    SectionBlob,
+    SnapshotBlobRef,
+    User,
+)
+from app.services import blob_service, snapshot_cleanup
 
 # ─── ヘルパー ──────────────────────────────────────────────
 
@@ -245,6 +253,105 @@ class TestCleanupOldSnapshots:
         assert recent is not None
 
 
+class TestSetBasedRetention:
+    """SQL の集合演算による間引き（バッチ削除・dry-run）のテスト。"""
+
+    def _same_hour_snapshots(
+        self, db: Session, plot: Plot, count: int
+    ) -> list[ColdSnapshot]:
+        # 時刻によってバケット境界をまたがないよう、時間の先頭に揃える
+        base_time = (datetime.now(timezone.utc) - timedelta(days=10)).replace(
+            minute=0, second=0, microsecond=0
+        )
+        return [
+            _create_snapshot(
+                db, plot, version=i + 1, created_at=base_time + timedelta(minutes=i)
+            )
+            for i in range(count)
+        ]
+
+    def test_latest_in_bucket_kept(self, db: Session, test_plot: Plot) -> None:
+        """同じバケット内では最新の1件だけが残る。"""
+        snaps = self._same_hour_snapshots(db, test_plot, 5)
+
+        deleted = snapshot_cleanup.cleanup_old_snapshots(db, plot_id=test_plot.id)
+
+        assert deleted == 4
+        remaining = db.query(ColdSnapshot).filter_by(plot_id=test_plot.id).all()
+        assert [s.id for s in remaining] == [snaps[-1].id]
+
+    def test_small_batches(self, db: Session, test_plot: Plot) -> None:
+        """batch_size より多い削除対象も複数バッチで全て削除される。"""
+        self._same_hour_snapshots(db, test_plot, 6)
+
+        deleted = snapshot_cleanup.cleanup_old_snapshots(db, batch_size=2)
+
+        assert deleted == 5
+        assert db.query(ColdSnapshot).count() == 1
+
+    def test_dry_run_deletes_nothing(self, db: Session, test_plot: Plot) -> None:
+        """dry_run では削除対象の件数だけを返し、何も削除しない。"""
+        self._same_hour_snapshots(db, test_plot, 4)
+
+        would_delete = snapshot_cleanup.cleanup_old_snapshots(db, dry_run=True)
+
+        assert would_delete == 3
+        assert db.query(ColdSnapshot).count() == 4
+
+    def test_walks_plots_in_ranges(self, db: Session, test_user: User) -> None:
+        """Plot を plot_batch_size 件ずつ区切っても全 Plot が間引かれ、進捗が残る。"""
+        plots = []
+        for i in range(3):
+            plot = Plot(title=f"Range Plot {i}", owner_id=test_user.id, tags=[])
+            db.add(plot)
+            db.commit()
+            self._same_hour_snapshots(db, plot, 3)
+            plots.append(plot)
+
+        deleted = snapshot_cleanup.cleanup_old_snapshots(
+            db, batch_size=1, plot_batch_size=2
+        )
+
+        assert deleted == 6
+        for plot in plots:
+            assert db.query(ColdSnapshot).filter_by(plot_id=plot.id).count() == 1
+        progress = snapshot_cleanup.retention_progress()
+        assert progress["running"] is False
+        assert progress["deleted"] == 6
+        assert progress["batches"] == 6
+        assert progress["candidates"] == 6
+        # 2段階 × 3 Plot
+        assert progress["plotsScanned"] == 6
+
+    def test_keyframe_released_when_deltas_deleted(
+        self, db: Session, test_plot: Plot
+    ) -> None:
+        """参照していた差分が全て間引かれたキーフレームは同じ実行内で削除される。"""
+        base_time = (datetime.now(timezone.utc) - timedelta(days=10)).replace(
+            minute=0, second=0, microsecond=0
+        )
+        keyframe = _create_snapshot(db, test_plot, version=1, created_at=base_time)
+        delta = ColdSnapshot(
+            plot_id=test_plot.id,
+            version=1,
+            base_snapshot_id=keyframe.id,
+            content={"plot": {}, "sections": []},
+        )
+        db.add(delta)
+        db.flush()
+        delta.created_at = base_time + timedelta(minutes=1)
+        db.commit()
+        latest = _create_snapshot(
+            db, test_plot, version=1, created_at=base_time + timedelta(minutes=2)
+        )
+
+        deleted = snapshot_cleanup.cleanup_old_snapshots(db)
+
+        assert deleted == 2
+        remaining = db.query(ColdSnapshot).all()
+        assert [s.id for s in remaining] == [latest.id]
+
+
 # ─── start_snapshot_cleanup ──────────────────────────────────
 
 
@@ -269,3 +376,106 @@ class TestStartSnapshotCleanup:
         except Exception:
             # スケジューラの二重起動や環境依存のエラーは許容
             pass
+
+
+class TestCleanupKeepsReferencedKeyframes:
+    """差分スナップショットの基点キーフレームは間引かれない。"""
+
+    def test_keyframe_referenced_by_recent_delta_kept(
+        self, db: Session, test_plot: Plot, test_user: User
+    ) -> None:
+        """同じ時間帯で間引かれる位置にあるキーフレームでも、差分から参照されていれば残る。"""
+        now = datetime.now(timezone.utc)
+        base_time = now - timedelta(days=10)
+
+        keyframe = _create_snapshot(db, test_plot, version=1, created_at=base_time)
+        # 同じ1時間内の後続スナップショット（通常ならこちらが残りキーフレームは消える）
+        _create_snapshot(
+            db, test_plot, version=1, created_at=base_time + timedelta(minutes=5)
+        )
+        delta = ColdSnapshot(
+            plot_id=test_plot.id,
+            version=1,
+            base_snapshot_id=keyframe.id,
+            content={"plot": {}, "sections": []},
+        )
+        db.add(delta)
+        db.commit()
+
+        snapshot_cleanup.cleanup_old_snapshots(db, plot_id=test_plot.id)
+
+        assert db.get(ColdSnapshot, keyframe.id) is not None
+        assert db.get(ColdSnapshot, delta.id) is not None
+
+
+# ─── collect_unreferenced_blobs ─────────────────────────────
+
+
+class TestCollectUnreferencedBlobs:
+    """参照されなくなった section_blobs の GC。"""
+
+    def _old_blob(self, db: Session, content: dict) -> str:
+        """猶予期間を過ぎた Blob を作成するヘルパー。"""
+        blob_hash = blob_service.put_blob(db, content)
+        db.commit()
+        blob = db.get(SectionBlob, blob_hash)
+        blob.created_at = datetime.now(timezone.utc) - timedelta(days=2)
+        db.commit()
+        return blob_hash
+
+    def test_unreferenced_blob_deleted(self, db: Session) -> None:
+        """どこからも参照されていない古い Blob は削除される。"""
+        blob_hash = self._old_blob(db, {"type": "doc", "text": "orphan"})
+
+        deleted = snapshot_cleanup.collect_unreferenced_blobs(db)
+
+        assert deleted == 1
+        assert db.get(SectionBlob, blob_hash) is None
+
+    def test_recent_blob_kept(self, db: Session) -> None:
+        """猶予期間内の Blob は参照がなくても削除しない。"""
+        blob_hash = blob_service.put_blob(db, {"type": "doc", "text": "fresh"})
+        db.commit()
+
+        assert snapshot_cleanup.collect_unreferenced_blobs(db) == 0
+        assert db.get(SectionBlob, blob_hash) is not None
+
+    def test_blob_referenced_by_snapshot_or_section_kept(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        """スナップショット・セクションから参照されている Blob は残る。"""
+        snap_hash = self._old_blob(db, {"type": "doc", "text": "snapshot"})
+        section_hash = self._old_blob(db, {"type": "doc", "text": "section"})
+        snap = _create_snapshot(db, test_plot, version=1)
+        db.add(SnapshotBlobRef(snapshot_id=snap.id, blob_hash=snap_hash))
+        test_section.content_hash = section_hash
+        db.commit()
+
+        assert snapshot_cleanup.collect_unreferenced_blobs(db) == 0
+
+        # スナップショットが削除されると参照も消え、次回の GC で回収される
+        db.delete(snap)
+        db.commit()
+        assert snapshot_cleanup.collect_unreferenced_blobs(db) == 1
+        assert db.get(SectionBlob, snap_hash) is None
+        assert db.get(SectionBlob, section_hash) is not None
+
+    def test_reused_old_blob_kept(self, db: Session) -> None:
+        """作成が古くても、再利用された Blob は再利用時刻から猶予期間を数える。"""
+        content = {"type": "doc", "text": "reused"}
+        blob_hash = self._old_blob(db, content)
+
+        # 参照を commit する前に GC が走っても消えない
+        assert blob_service.put_blob(db, content) == blob_hash
+        assert snapshot_cleanup.collect_unreferenced_blobs(db) == 0
+        assert db.get(SectionBlob, blob_hash) is not None
+
+    def test_stale_reuse_collected(self, db: Session) -> None:
+        """最後の再利用から猶予期間を過ぎ、参照もなければ削除される。"""
+        blob_hash = self._old_blob(db, {"type": "doc", "text": "stale"})
+        blob = db.get(SectionBlob, blob_hash)
+        blob.last_referenced_at = datetime.now(timezone.utc) - timedelta(days=2)
+        db.commit()
+
+        assert snapshot_cleanup.collect_unreferenced_blobs(db) == 1
+        assert db.get(SectionBlob, blob_hash) is None
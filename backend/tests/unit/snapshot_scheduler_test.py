@@ -7,14 +7,22 @@ api.md 仕様:
 
 テスト対象:
 - create_plot_snapshot: 個別Plotのスナップショット作成
-- run_snapshot_batch: バッチ処理で全Plotのスナップショットを一括作成
+- run_snapshot_batch: dirty キューのPlotのスナップショットを一括作成
+- mark_plot_dirty: 編集と同一トランザクションでのキュー登録
 """
 
 import pytest
 from sqlalchemy.orm import Session
 
-from app.models import ColdSnapshot, Plot, Section, User
-from app.services import snapshot_scheduler
+from app.models import (
+    ColdSnapshot,
+    Plot,
+    Section,
+    SectionBlob,
+    SnapshotDirtyPlot,
+    User,
+)
+from app.services import blob_service, section_service, snapshot_scheduler
 
 
 class TestCreatePlotSnapshot:
@@ -78,23 +86,38 @@ class TestCreatePlotSnapshot:
 class TestRunSnapshotBatch:
     """run_snapshot_batch のテスト。
 
-    全 Plot に対してバッチでスナップショットを作成する。
+    dirty キュー（snapshot_dirty_plots）に積まれた Plot のスナップショットを作成する。
     """
 
     def test_batch_with_plots(
         self, db: Session, test_plot: Plot, test_user: User
     ) -> None:
-        """Plot が存在する場合、バッチ処理でスナップショットが作成される。"""
+        """キューに Plot がある場合、バッチ処理でスナップショットが作成される。"""
+        snapshot_scheduler.mark_plot_dirty(db, test_plot.id)
+        db.commit()
+
         created = snapshot_scheduler.run_snapshot_batch(db)
         assert created >= 1
 
+    def test_batch_refreshes_section_text(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        """バッチ処理で検索用の plots.section_text も更新される。"""
+        snapshot_scheduler.mark_plot_dirty(db, test_plot.id)
+        db.commit()
+
+        snapshot_scheduler.run_snapshot_batch(db)
+
+        db.refresh(test_plot)
+        assert test_plot.section_text == test_section.title
+
     def test_batch_empty_no_plots(self, db: Session) -> None:
         """Plot が存在しない場合、0 を返す。"""
         created = snapshot_scheduler.run_snapshot_batch(db)
         assert created == 0
 
     def test_batch_multiple_plots(self, db: Session, test_user: User) -> None:
-        """複数の Plot がある場合、全てのスナップショットが作成される。"""
+        """複数の Plot がキューにある場合、全てのスナップショットが作成される。"""
         for i in range(3):
             plot = Plot(
                 title=f"Batch Plot {i}",
@@ -102,7 +125,252 @@ class TestRunSnapshotBatch:
                 tags=[],
             )
             db.add(plot)
+            db.flush()
+            snapshot_scheduler.mark_plot_dirty(db, plot.id)
         db.commit()
 
         created = snapshot_scheduler.run_snapshot_batch(db)
         assert created == 3
+
+    def test_clean_plot_not_snapshotted(self, db: Session, test_plot: Plot) -> None:
+        """キューにない Plot は最近更新されていてもスナップショットを作らない。"""
+        created = snapshot_scheduler.run_snapshot_batch(db)
+        assert created == 0
+
+    def test_queue_drained(self, db: Session, test_plot: Plot) -> None:
+        """処理済みの Plot はキューから削除され、2回目のバッチでは何もしない。"""
+        snapshot_scheduler.mark_plot_dirty(db, test_plot.id)
+        snapshot_scheduler.mark_plot_dirty(db, test_plot.id)
+        db.commit()
+
+        assert snapshot_scheduler.run_snapshot_batch(db) == 1
+        assert db.query(SnapshotDirtyPlot).count() == 0
+        assert snapshot_scheduler.run_snapshot_batch(db) == 0
+
+    def test_drains_across_pages(
+        self, db: Session, test_user: User, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """バッチサイズを超えるキューもカーソルで最後まで処理する。"""
+        monkeypatch.setattr(snapshot_scheduler, "SNAPSHOT_DIRTY_BATCH_SIZE", 2)
+        for i in range(5):
+            plot = Plot(title=f"Paged Plot {i}", owner_id=test_user.id, tags=[])
+            db.add(plot)
+            db.flush()
+            snapshot_scheduler.mark_plot_dirty(db, plot.id)
+        db.commit()
+
+        assert snapshot_scheduler.run_snapshot_batch(db) == 5
+        assert db.query(SnapshotDirtyPlot).count() == 0
+
+    def test_edit_during_snapshot_kept_in_queue(
+        self, db: Session, test_plot: Plot, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """スナップショット作成中に入った編集はキューに残り、次回処理される。"""
+        snapshot_scheduler.mark_plot_dirty(db, test_plot.id)
+        db.commit()
+
+        original = snapshot_scheduler.create_plot_snapshot
+
+        def _create_and_edit(db: Session, plot: Plot) -> ColdSnapshot | None:
+            snapshot = original(db, plot)
+            snapshot_scheduler.mark_plot_dirty(db, plot.id)
+            return snapshot
+
+        monkeypatch.setattr(
+            snapshot_scheduler, "create_plot_snapshot", _create_and_edit
+        )
+        assert snapshot_scheduler.run_snapshot_batch(db) == 1
+        assert db.get(SnapshotDirtyPlot, test_plot.id) is not None
+
+    def test_failing_plot_does_not_block_queue(
+        self, db: Session, test_user: User, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """1件の Plot が失敗しても後ろの Plot は処理され、失敗した Plot は末尾に回る。"""
+        monkeypatch.setattr(snapshot_scheduler, "SNAPSHOT_DIRTY_BATCH_SIZE", 2)
+        plots = []
+        for i in range(3):
+            plot = Plot(title=f"Queued Plot {i}", owner_id=test_user.id, tags=[])
+            db.add(plot)
+            db.flush()
+            snapshot_scheduler.mark_plot_dirty(db, plot.id)
+            plots.append(plot)
+        db.commit()
+        broken = plots[0]
+        marked_at = db.get(SnapshotDirtyPlot, broken.id).first_marked_at
+
+        original = snapshot_scheduler.create_plot_snapshot
+
+        def _fail_for_broken(db: Session, plot: Plot) -> ColdSnapshot | None:
+            snapshot = original(db, plot)
+            if plot.id == broken.id:
+                db.flush()
+                raise ValueError("Section blob not found")
+            return snapshot
+
+        monkeypatch.setattr(
+            snapshot_scheduler, "create_plot_snapshot", _fail_for_broken
+        )
+        assert snapshot_scheduler.run_snapshot_batch(db) == 2
+
+        # 失敗した Plot の書き込みは捨てられ、キューの末尾に残る
+        assert db.query(ColdSnapshot).filter_by(plot_id=broken.id).count() == 0
+        remaining = db.query(SnapshotDirtyPlot).all()
+        assert [entry.plot_id for entry in remaining] == [broken.id]
+        assert remaining[0].first_marked_at > marked_at
+
+        monkeypatch.setattr(snapshot_scheduler, "create_plot_snapshot", original)
+        assert snapshot_scheduler.run_snapshot_batch(db) == 1
+        assert db.query(SnapshotDirtyPlot).count() == 0
+
+
+class TestMarkPlotDirty:
+    """編集系サービスがスナップショット対象をキューに積むことのテスト。"""
+
+    def test_section_update_marks_plot(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        """セクション更新と同じトランザクションでキューに積まれる。"""
+        db.query(SnapshotDirtyPlot).delete()
+        db.commit()
+
+        section_service.update_section(db, test_section.id, title="Edited")
+
+        entry = db.get(SnapshotDirtyPlot, test_plot.id)
+        assert entry is not None
+        assert entry.dirty_seq == 1
+
+    def test_repeated_marks_bump_seq(self, db: Session, test_plot: Plot) -> None:
+        """同じ Plot を何度積んでも1行のまま dirty_seq が増える。"""
+        db.query(SnapshotDirtyPlot).delete()
+        for _ in range(3):
+            snapshot_scheduler.mark_plot_dirty(db, test_plot.id)
+        db.commit()
+
+        entries = db.query(SnapshotDirtyPlot).all()
+        assert len(entries) == 1
+        assert entries[0].dirty_seq == 3
+
+
+class TestDeltaSnapshots:
+    """キーフレーム + 差分スナップショットのテスト。
+
+    SNAPSHOT_KEYFRAME_INTERVAL 回に1回は全量のキーフレームを保存し、
+    それ以外はversionが変わったセクションのcontentのみを保存する。
+    """
+
+    def _snapshot(self, db: Session, plot: Plot) -> ColdSnapshot:
+        snap = snapshot_scheduler.create_plot_snapshot(db, plot)
+        assert snap is not None
+        db.commit()
+        db.refresh(snap)
+        return snap
+
+    def test_first_snapshot_is_keyframe(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        """最初のスナップショットはキーフレーム（全セクションのBlob参照を含む）。"""
+        snap = self._snapshot(db, test_plot)
+        assert snap.base_snapshot_id is None
+        assert snap.section_versions == {str(test_section.id): test_section.version}
+        assert "blob" in snap.content["sections"][0]
+
+    def test_unchanged_section_content_omitted(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        """キーフレームから変化のないセクションは差分にcontentを含めない。"""
+        keyframe = self._snapshot(db, test_plot)
+
+        delta = self._snapshot(db, test_plot)
+        assert delta.base_snapshot_id == keyframe.id
+        assert delta.section_versions is None
+        assert delta.content["sections"][0]["id"] == str(test_section.id)
+        assert "blob" not in delta.content["sections"][0]
+
+    def test_changed_section_content_included(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        """versionが変わったセクションのみ差分にcontentが含まれる。"""
+        unchanged = Section(
+            plot_id=test_plot.id,
+            title="Unchanged",
+            content={"type": "doc", "content": []},
+            order_index=1,
+        )
+        db.add(unchanged)
+        db.commit()
+        db.refresh(test_plot)
+        self._snapshot(db, test_plot)
+
+        new_content = {"type": "doc", "content": [{"type": "text", "text": "x"}]}
+        test_section.content = new_content
+        test_section.version += 1
+        db.commit()
+        db.refresh(test_plot)
+
+        delta = self._snapshot(db, test_plot)
+        entries = {e["id"]: e for e in delta.content["sections"]}
+        blob_hash = entries[str(test_section.id)]["blob"]
+        assert blob_service.get_blobs(db, [blob_hash])[blob_hash] == new_content
+        assert "blob" not in entries[str(unchanged.id)]
+
+    def test_keyframe_after_interval(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        """差分が SNAPSHOT_KEYFRAME_INTERVAL - 1 件たまると次はキーフレームになる。"""
+        keyframe = self._snapshot(db, test_plot)
+        for _ in range(snapshot_scheduler.SNAPSHOT_KEYFRAME_INTERVAL - 1):
+            delta = self._snapshot(db, test_plot)
+            assert delta.base_snapshot_id == keyframe.id
+
+        next_snap = self._snapshot(db, test_plot)
+        assert next_snap.base_snapshot_id is None
+
+    def test_keyframe_after_rollback(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        """ロールバックでPlot.versionが変わった場合は新たなキーフレームを作る。"""
+        self._snapshot(db, test_plot)
+        test_plot.version += 1
+        db.commit()
+
+        snap = self._snapshot(db, test_plot)
+        assert snap.base_snapshot_id is None
+
+
+class TestSnapshotBlobs:
+    """スナップショットのcontentが section_blobs に重複なく保存されることのテスト。"""
+
+    def test_identical_content_stored_once(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        """同一contentのセクションは1つのBlobを共有する。"""
+        twin = Section(
+            plot_id=test_plot.id,
+            title="Twin",
+            content=test_section.content,
+            order_index=1,
+        )
+        db.add(twin)
+        db.commit()
+        db.refresh(test_plot)
+
+        snap = snapshot_scheduler.create_plot_snapshot(db, test_plot)
+        db.commit()
+
+        hashes = {e["blob"] for e in snap.content["sections"]}
+        assert len(hashes) == 1
+        assert db.query(SectionBlob).count() == 1
+        assert [r.blob_hash for r in snap.blob_refs] == list(hashes)
+
+    def test_shared_section_reuses_blob(
+        self, db: Session, test_plot: Plot, test_section: Section
+    ) -> None:
+        """content_hash を持つセクションは再ハッシュせずそのBlobを参照する。"""
+        blob_hash = blob_service.put_blob(db, {"type": "doc", "content": []})
+        test_section.content = None
+        test_section.content_hash = blob_hash
+        db.commit()
+        db.refresh(test_plot)
+
+        snap = snapshot_scheduler.create_plot_snapshot(db, test_plot)
+        assert snap.content["sections"][0]["blob"] == blob_hash
@@ -6,7 +6,7 @@ import pytest
 from sqlalchemy.orm import Session
 
 from app.models import Plot, Section, Thread, User
-from app.services import social_service
+from app.services import blob_service, social_service
 
 
 class TestCreateFork:
@@ -26,6 +26,22 @@ class TestCreateFork:
         new_plot = social_service.fork_plot(db, test_plot.id, test_user.id)
         assert new_plot.title == f"{test_plot.title} (fork)"
 
+    def test_create_fork_shares_section_blobs(
+        self, db: Session, test_plot: Plot, test_section: Section, test_user: User
+    ) -> None:
+        """フォーク先のセクションは content をコピーせず元と同じ Blob を参照する。"""
+        new_plot = social_service.fork_plot(db, test_plot.id, test_user.id)
+
+        forked = db.query(Section).filter(Section.plot_id == new_plot.id).one()
+        assert forked.content is None
+        assert forked.content_hash is not None
+        assert blob_service.section_content(forked) == test_section.content
+
+        # フォークのフォークも同じ Blob を共有する
+        second = social_service.fork_plot(db, new_plot.id, test_user.id)
+        refork = db.query(Section).filter(Section.plot_id == second.id).one()
+        assert refork.content_hash == forked.content_hash
+
     def test_create_fork_not_found(self, db: Session, test_user: User) -> None:
         """存在しない Plot のフォークは ValueError。"""
         with pytest.raises(ValueError, match="Plot not found"):
@@ -70,7 +86,7 @@ class TestListComments:
         db.refresh(thread)
 
         social_service.create_comment(db, thread.id, test_user.id, "Comment 1")
-        items, total = social_service.list_comments(db, thread.id)
+        items, total, _ = social_service.list_comments(db, thread.id)
         assert total == 1
         assert len(items) == 1
         comment, user = items[0]
@@ -83,7 +99,7 @@ class TestListComments:
         db.commit()
         db.refresh(thread)
 
-        items, total = social_service.list_comments(db, thread.id)
+        items, total, _ = social_service.list_comments(db, thread.id)
         assert total == 0
         assert items == []
 
@@ -106,12 +122,12 @@ class TestListComments:
             social_service.create_comment(db, thread.id, test_user.id, f"Comment {i}")
 
         # limit=2, offset=0 → 先頭2件
-        items, total = social_service.list_comments(db, thread.id, limit=2, offset=0)
+        items, total, _ = social_service.list_comments(db, thread.id, limit=2, offset=0)
         assert total == 3
         assert len(items) == 2
 
         # limit=2, offset=2 → 残り1件
-        items, total = social_service.list_comments(db, thread.id, limit=2, offset=2)
+        items, total, _ = social_service.list_comments(db, thread.id, limit=2, offset=2)
         assert total == 3
         assert len(items) == 1
 
@@ -5,7 +5,7 @@ import uuid
 import pytest
 from sqlalchemy.orm import Session
 
-from app.models import Plot, User
+from app.models import Plot, Star, User
 from app.services import star_service
 
 
@@ -94,3 +94,44 @@ class TestRemoveStar:
         """存在しない Plot のスターを削除すると ValueError（404 相当）。"""
         with pytest.raises(ValueError, match="Plot not found"):
             star_service.remove_star(db, NON_EXISTENT_PLOT_ID, test_user.id)
+
+
+class TestStarCount:
+    def test_add_and_remove_maintain_counter(
+        self, db: Session, test_plot: Plot, test_user: User, other_user: User
+    ) -> None:
+        """add_star / remove_star が Plot.star_count を増減する（updated_at は不変）。"""
+        updated_at = test_plot.updated_at
+        star_service.add_star(db, test_plot.id, test_user.id)
+        star_service.add_star(db, test_plot.id, other_user.id)
+        db.refresh(test_plot)
+        assert test_plot.star_count == 2
+        assert test_plot.updated_at == updated_at
+
+        star_service.remove_star(db, test_plot.id, test_user.id)
+        db.refresh(test_plot)
+        assert test_plot.star_count == 1
+
+    def test_duplicate_star_does_not_increment(
+        self, db: Session, test_plot: Plot, test_user: User
+    ) -> None:
+        star_service.add_star(db, test_plot.id, test_user.id)
+        with pytest.raises(ValueError, match="Already starred"):
+            star_service.add_star(db, test_plot.id, test_user.id)
+        db.refresh(test_plot)
+        assert test_plot.star_count == 1
+
+    def test_reconcile_fixes_drift(
+        self, db: Session, test_plot: Plot, test_user: User, other_user: User
+    ) -> None:
+        """カウンタを経由しない変更によるずれを実件数に補正する。"""
+        star_service.add_star(db, test_plot.id, test_user.id)
+        # カウンタを経由せずに Star を追加（ユーザー削除の CASCADE などに相当）
+        db.add(Star(plot_id=test_plot.id, user_id=other_user.id))
+        db.commit()
+
+        assert star_service.reconcile_star_counts(db) == 1
+        db.refresh(test_plot)
+        assert test_plot.star_count == 2
+        # ずれがなければ何も更新しない
+        assert star_service.reconcile_star_counts(db) == 0
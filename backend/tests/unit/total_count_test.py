@@ -0,0 +1,139 @@
+"""total_count（一覧の total 計算戦略）のユニットテスト。"""
+
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Plot, User
+from app.services import total_count
+
+
+def _add_plots(db: Session, user: User, n: int) -> None:
+    for i in range(n):
+        db.add(Plot(title=f"Plot {i}", owner_id=user.id, tags=[]))
+    db.commit()
+
+
+def _settings(strategies: dict[str, str], cache_seconds: float = 30.0) -> MagicMock:
+    return MagicMock(
+        total_count_strategies=strategies,
+        total_count_cache_seconds=cache_seconds,
+    )
+
+
+class TestCountTotal:
+    def test_last_page_skips_count(self, db: Session, test_user: User) -> None:
+        """ページが limit 未満なら COUNT を実行せず offset + 件数を返す。"""
+        with patch.object(total_count, "_exact_count") as exact:
+            total = total_count.count_total(
+                db, select(Plot), endpoint="x", limit=20, offset=40, page_size=7
+            )
+
+        exact.assert_not_called()
+        assert total == 47
+        assert total.is_estimate is False
+
+    def test_exact_counts_all_rows(self, db: Session, test_user: User) -> None:
+        _add_plots(db, test_user, 5)
+
+        total = total_count.count_total(
+            db,
+            db.query(Plot).order_by(Plot.created_at),
+            endpoint="unknown.endpoint",
+            limit=2,
+            offset=0,
+            page_size=2,
+        )
+
+        assert total == 5
+        assert total.is_estimate is False
+
+    def test_has_more_returns_lower_bound(self, db: Session, test_user: User) -> None:
+        _add_plots(db, test_user, 5)
+        query = select(Plot)
+
+        with patch.object(
+            total_count, "get_settings", return_value=_settings({"x": "has_more"})
+        ):
+            first = total_count.count_total(
+                db, query, endpoint="x", limit=2, offset=0, page_size=2
+            )
+            exact_end = total_count.count_total(
+                db, query, endpoint="x", limit=2, offset=3, page_size=2
+            )
+
+        # 次のページがある → 下限として「取得済み + 1」
+        assert first == 3
+        assert first.is_estimate is True
+        # 次のページがない → 件数は確定
+        assert exact_end == 5
+        assert exact_end.is_estimate is False
+
+    def test_cached_hit_is_flagged_as_estimate(
+        self, db: Session, test_user: User
+    ) -> None:
+        _add_plots(db, test_user, 3)
+        query = select(Plot)
+        kwargs = {"endpoint": "x", "limit": 2, "offset": 0, "page_size": 2}
+
+        with patch.object(
+            total_count, "get_settings", return_value=_settings({"x": "cached"})
+        ):
+            first = total_count.count_total(db, query, cache_key=("a",), **kwargs)
+            _add_plots(db, test_user, 2)
+            cached = total_count.count_total(db, query, cache_key=("a",), **kwargs)
+            other_key = total_count.count_total(db, query, cache_key=("b",), **kwargs)
+
+        assert (first, first.is_estimate) == (3, False)
+        assert (cached, cached.is_estimate) == (3, True)
+        assert (other_key, other_key.is_estimate) == (5, False)
+
+    def test_estimate_falls_back_to_exact_on_sqlite(
+        self, db: Session, test_user: User
+    ) -> None:
+        """プランナ推定は PostgreSQL 専用。SQLite では正確な COUNT になる。"""
+        _add_plots(db, test_user, 4)
+
+        total = total_count.count_total(
+            db, select(Plot), endpoint="search.plots", limit=2, offset=0, page_size=2
+        )
+
+        assert total == 4
+        assert total.is_estimate is False
+
+    def test_large_planner_estimate_used(self, db: Session, test_user: User) -> None:
+        with (
+            patch.object(total_count, "_planner_estimate", return_value=50000),
+            patch.object(total_count, "_exact_count") as exact,
+        ):
+            total = total_count.count_total(
+                db,
+                select(Plot),
+                endpoint="search.plots",
+                limit=20,
+                offset=0,
+                page_size=20,
+            )
+
+        exact.assert_not_called()
+        assert total == 50000
+        assert total.is_estimate is True
+
+    def test_small_planner_estimate_counts_exactly(
+        self, db: Session, test_user: User
+    ) -> None:
+        _add_plots(db, test_user, 3)
+
+        with patch.object(total_count, "_planner_estimate", return_value=10):
+            total = total_count.count_total(
+                db,
+                select(Plot),
+                endpoint="search.plots",
+                limit=2,
+                offset=0,
+                page_size=2,
+            )
+
+        assert total == 3
+        assert total.is_estimate is False
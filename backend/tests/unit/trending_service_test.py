@@ -0,0 +1,231 @@
+"""trending_service（時間減衰スコア）のユニットテスト。"""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models import Plot, Star, TrendingEpoch, User
+from app.services import plot_service, social_service, star_service, trending_service
+
+
+def _score(db: Session, plot: Plot) -> float:
+    db.refresh(plot)
+    return plot.trending_score
+
+
+def _decayed(db: Session, plot: Plot) -> float:
+    return trending_service.decayed_score(
+        _score(db, plot), trending_service.current_epoch(db)
+    )
+
+
+EPOCH = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+class TestEventScore:
+    def test_doubles_every_half_life(self) -> None:
+        half_life = get_settings().trending_half_life_hours
+        at = datetime(2026, 10, 16, tzinfo=UTC)
+
+        later = trending_service.event_score(
+            1.0, at + timedelta(hours=half_life), EPOCH
+        )
+
+        assert later == pytest.approx(2 * trending_service.event_score(1.0, at, EPOCH))
+
+    def test_decayed_score_of_fresh_event_is_its_weight(self) -> None:
+        now = datetime(2026, 10, 16, tzinfo=UTC)
+        raw = trending_service.event_score(trending_service.FORK_WEIGHT, now, EPOCH)
+
+        assert trending_service.decayed_score(raw, EPOCH, now) == pytest.approx(
+            trending_service.FORK_WEIGHT
+        )
+
+    def test_events_long_before_epoch_round_to_zero(self) -> None:
+        at = EPOCH - timedelta(days=3650)
+        assert trending_service.event_score(1.0, at, EPOCH) == 0.0
+
+
+class TestIncrementalUpdates:
+    def test_star_add_and_remove(
+        self, db: Session, test_plot: Plot, test_user: User
+    ) -> None:
+        star_service.add_star(db, test_plot.id, test_user.id)
+        assert _decayed(db, test_plot) == pytest.approx(
+            trending_service.STAR_WEIGHT, rel=1e-3
+        )
+
+        star_service.remove_star(db, test_plot.id, test_user.id)
+        assert _score(db, test_plot) == pytest.approx(0.0, abs=1e-6)
+
+    def test_fork_and_comment_bump_plot(
+        self, db: Session, test_plot: Plot, test_user: User
+    ) -> None:
+        social_service.fork_plot(db, test_plot.id, test_user.id)
+        thread = social_service.create_thread(db, test_plot.id)
+        social_service.create_comment(db, thread.id, test_user.id, "hi")
+
+        expected = trending_service.FORK_WEIGHT + trending_service.COMMENT_WEIGHT
+        assert _decayed(db, test_plot) == pytest.approx(expected, rel=1e-3)
+
+
+class TestRebuild:
+    def test_recent_stars_outrank_older_ones(
+        self, db: Session, test_user: User, other_user: User, admin_user: User
+    ) -> None:
+        now = datetime.now(UTC)
+        old = plot_service.create_plot(db, test_user.id, "Old")
+        recent = plot_service.create_plot(db, test_user.id, "Recent")
+        # old: 48時間前のスター2件（半減期24時間で重み 0.25 × 2）、recent: 1時間前の1件
+        for user in (test_user, other_user):
+            db.add(
+                Star(
+                    plot_id=old.id,
+                    user_id=user.id,
+                    created_at=now - timedelta(hours=48),
+                )
+            )
+        db.add(
+            Star(
+                plot_id=recent.id,
+                user_id=admin_user.id,
+                created_at=now - timedelta(hours=1),
+            )
+        )
+        db.commit()
+
+        assert trending_service.rebuild_trending_scores(db) == 2
+
+        result = plot_service.list_trending(db)
+        assert [p.id for p in result] == [recent.id, old.id]
+
+    def test_matches_incremental_score(
+        self, db: Session, test_plot: Plot, test_user: User, other_user: User
+    ) -> None:
+        star_service.add_star(db, test_plot.id, test_user.id)
+        social_service.fork_plot(db, test_plot.id, other_user.id)
+        incremental = _decayed(db, test_plot)
+
+        trending_service.rebuild_trending_scores(db)
+        assert _decayed(db, test_plot) == pytest.approx(incremental, rel=1e-6)
+
+    def test_resets_plots_without_events(self, db: Session, test_plot: Plot) -> None:
+        test_plot.trending_score = 5.0
+        db.commit()
+
+        trending_service.rebuild_trending_scores(db)
+
+        assert _score(db, test_plot) == 0.0
+        assert plot_service.list_trending(db) == []
+
+    def test_rebuilds_in_chunks(
+        self,
+        db: Session,
+        test_user: User,
+        other_user: User,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Plot を REBUILD_BATCH_SIZE 件ずつ再計算しても全 Plot が補正される。"""
+        monkeypatch.setattr(trending_service, "REBUILD_BATCH_SIZE", 2)
+        plots = [
+            plot_service.create_plot(db, test_user.id, f"Plot {i}") for i in range(5)
+        ]
+        for plot in plots[::2]:
+            db.add(Star(plot_id=plot.id, user_id=other_user.id))
+        plots[1].trending_score = 5.0
+        db.commit()
+
+        assert trending_service.rebuild_trending_scores(db) == 4
+
+        decayed = [_decayed(db, plot) for plot in plots]
+        assert decayed == pytest.approx([1.0, 0.0, 1.0, 0.0, 1.0], abs=1e-3)
+
+    def test_rebase_keeps_order_before_recompute(
+        self, db: Session, test_user: User
+    ) -> None:
+        """換算だけでも、新しい基準時刻での減衰後スコアと順位は変わらない。"""
+        half_life = get_settings().trending_half_life_hours
+        now = datetime.now(UTC)
+        plots = [
+            plot_service.create_plot(db, test_user.id, f"Plot {i}") for i in range(3)
+        ]
+        epoch = trending_service.current_epoch(db)
+        for plot, weight in zip(plots, (1.0, 3.0, 0.0), strict=True):
+            plot.trending_score = trending_service.event_score(weight, now, epoch)
+        db.commit()
+
+        new_epoch = now + timedelta(hours=half_life)
+        trending_service._rebase(db, new_epoch)
+
+        assert trending_service.current_epoch(db) == new_epoch
+        rebased = [
+            trending_service.decayed_score(_score(db, plot), new_epoch, now)
+            for plot in plots
+        ]
+        assert rebased == pytest.approx([1.0, 3.0, 0.0])
+
+
+class TestEpochRollover:
+    """固定の基準時刻から遠く離れても重みが桁あふれしない。"""
+
+    FAR_FUTURE = datetime(2031, 6, 1, tzinfo=UTC)
+
+    def test_fixed_epoch_overflows_far_in_the_future(self) -> None:
+        with pytest.raises(OverflowError):
+            trending_service.event_score(1.0, self.FAR_FUTURE, EPOCH)
+
+    def test_rebuild_moves_epoch_and_rescales(
+        self, db: Session, test_user: User, other_user: User, admin_user: User
+    ) -> None:
+        old = plot_service.create_plot(db, test_user.id, "Old")
+        recent = plot_service.create_plot(db, test_user.id, "Recent")
+        for user in (test_user, other_user):
+            db.add(
+                Star(
+                    plot_id=old.id,
+                    user_id=user.id,
+                    created_at=self.FAR_FUTURE - timedelta(hours=48),
+                )
+            )
+        db.add(
+            Star(
+                plot_id=recent.id,
+                user_id=admin_user.id,
+                created_at=self.FAR_FUTURE - timedelta(hours=1),
+            )
+        )
+        db.commit()
+
+        trending_service.rebuild_trending_scores(db, now=self.FAR_FUTURE)
+
+        assert db.get(TrendingEpoch, trending_service.TRENDING_EPOCH_ID) is not None
+        assert trending_service.current_epoch(db) == self.FAR_FUTURE
+        assert _score(db, old) == pytest.approx(0.5)
+        assert [p.id for p in plot_service.list_trending(db)] == [recent.id, old.id]
+
+        # 新しい基準時刻に対してはイベントごとの加算も桁あふれしない
+        trending_service.bump(
+            db,
+            old.id,
+            trending_service.FORK_WEIGHT,
+            self.FAR_FUTURE,
+            trending_service.current_epoch(db, lock=True),
+        )
+        db.commit()
+        assert _score(db, old) == pytest.approx(2.5)
+        assert [p.id for p in plot_service.list_trending(db)] == [old.id, recent.id]
+
+    def test_bump_skips_overflowing_weight(self, db: Session, test_plot: Plot) -> None:
+        """基準時刻が進んでいなくても bump は例外を出さない。"""
+        trending_service.bump(
+            db,
+            test_plot.id,
+            trending_service.STAR_WEIGHT,
+            self.FAR_FUTURE,
+            trending_service.current_epoch(db, lock=True),
+        )
+        db.commit()
+
+        assert _score(db, test_plot) == 0.0